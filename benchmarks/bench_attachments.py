@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark anonymizing calendars full of inline attachments.
+
+Run with ``python benchmarks/bench_attachments.py``.
+"""
+
+import argparse
+import base64
+import os
+import time
+from datetime import datetime
+
+from icalendar import Calendar, Event
+from icalendar.prop import vBinary
+
+from icalendar_anonymizer import anonymize
+
+
+def make_calendar(events: int, attachment_size: int) -> Calendar:
+    """Build a calendar where every event has one inline attachment."""
+    cal = Calendar()
+    cal.add("version", "2.0")
+    cal.add("prodid", "-//Benchmark//EN")
+    payload = os.urandom(attachment_size)
+    for i in range(events):
+        event = Event()
+        event.add("uid", f"event-{i}@example.com")
+        event.add("summary", f"Event number {i}")
+        event.add("dtstart", datetime(2024, 1, 1, 9, 0, 0))
+        event.add("attach", vBinary(payload, params={"FMTTYPE": "application/pdf"}))
+        cal.add_component(event)
+    return Calendar.from_ical(cal.to_ical())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--size", type=int, default=1_000_000, help="attachment size in bytes")
+    args = parser.parse_args()
+
+    cal = make_calendar(args.events, args.size)
+    input_size = len(base64.b64encode(b"x" * args.size)) * args.events
+
+    start = time.perf_counter()
+    result = anonymize(cal, salt=b"benchmark")
+    elapsed = time.perf_counter() - start
+    output_size = len(result.to_ical())
+
+    print(f"events: {args.events}, attachment: {args.size} bytes")
+    print(f"anonymize: {elapsed:.3f}s ({input_size / elapsed / 1e6:.1f} MB/s)")
+    print(f"attachment data in: {input_size} bytes, calendar out: {output_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
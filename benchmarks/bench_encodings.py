@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark the hash encodings.
+
+Compares run time and output size of ``anonymize()`` for each encoding of
+:class:`~icalendar_anonymizer.HashFormat` at its default lengths, and the
+raw speed of ``hash_text`` on one long value.
+Run with ``python benchmarks/bench_encodings.py``.
+"""
+
+import argparse
+import time
+
+from bench_pseudonyms import build_calendar
+
+from icalendar_anonymizer import HashFormat, anonymize
+from icalendar_anonymizer._hash import ENCODINGS, hash_text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000, help="number of events")
+    parser.add_argument("--words", type=int, default=1_000_000, help="words for hash_text")
+    args = parser.parse_args()
+
+    cal = build_calendar(args.events)
+    text = " ".join(f"word{index}" for index in range(args.words))
+    print(f"input: {args.events} events, {len(cal.to_ical()) / 1e6:.1f} MB")
+
+    for encoding in ENCODINGS:
+        hash_format = HashFormat(encoding)
+        start = time.perf_counter()
+        output = anonymize(cal, salt=b"benchmark", hash_format=hash_format).to_ical()
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        hash_text(text, b"benchmark", hash_format)
+        words_per_second = args.words / (time.perf_counter() - start)
+        print(
+            f"{encoding:7} {hash_format.text_length:2}/{hash_format.uid_length:2} chars  "
+            f"{elapsed:6.2f}s  output {len(output) / 1e6:6.2f} MB  "
+            f"hash_text {words_per_second / 1e6:4.2f}M words/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
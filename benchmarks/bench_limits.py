@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark limits on pathological and on ordinary calendars.
+
+Compares the time :func:`check_ical` takes to reject a pathological
+calendar with the time parsing it would take, and the overhead of checking
+an ordinary calendar that is within the limits.
+Run with ``python benchmarks/bench_limits.py``.
+"""
+
+import argparse
+import time
+
+from bench_pseudonyms import build_calendar
+from icalendar import Calendar
+
+from icalendar_anonymizer import LimitExceeded, Limits, anonymize
+from icalendar_anonymizer.limits import check_ical
+
+HEADER = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Benchmark//EN\r\n"
+FOOTER = b"END:VCALENDAR\r\n"
+
+# Limits of the web service
+LIMITS = Limits(
+    max_size=10 * 1024 * 1024,
+    max_line_length=1024 * 1024,
+    max_components=50_000,
+    max_properties=200_000,
+    max_depth=10,
+)
+
+
+def tiny_properties(size: int) -> bytes:
+    """Fill size bytes with one event of tiny X- properties."""
+    count = size // len(b"X-A:1\r\n")
+    return HEADER + b"BEGIN:VEVENT\r\n" + b"X-A:1\r\n" * count + b"END:VEVENT\r\n" + FOOTER
+
+
+def folded_line(size: int) -> bytes:
+    """Fill size bytes with one folded DESCRIPTION."""
+    folds = b"\r\n ".join([b"x" * 73] * (size // 76))
+    return HEADER + b"BEGIN:VEVENT\r\nDESCRIPTION:" + folds + b"\r\nEND:VEVENT\r\n" + FOOTER
+
+
+def empty_components(size: int) -> bytes:
+    """Fill size bytes with empty events."""
+    count = size // len(b"BEGIN:VEVENT\r\nEND:VEVENT\r\n")
+    return HEADER + b"BEGIN:VEVENT\r\nEND:VEVENT\r\n" * count + FOOTER
+
+
+def deep_nesting(depth: int) -> bytes:
+    """Nest alarms depth levels deep."""
+    return HEADER + b"BEGIN:VALARM\r\n" * depth + b"END:VALARM\r\n" * depth + FOOTER
+
+
+def measure(function) -> float:
+    """Return the wall time of function in seconds."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def rejected(data: bytes) -> str:
+    """Return which limit rejects data."""
+    try:
+        check_ical(data, LIMITS)
+    except LimitExceeded as e:
+        return f"{e.limit} at line {e.line}"
+    return "accepted"
+
+
+def main() -> None:
+    """Time rejection, parsing and the overhead of the check."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=8 * 1024 * 1024, help="bytes of input")
+    parser.add_argument("--events", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'input':<18} {'check':>9} {'parse':>9}  result")
+    cases = {
+        "tiny properties": tiny_properties(args.size),
+        "folded line": folded_line(args.size),
+        "empty components": empty_components(args.size),
+        "deep nesting": deep_nesting(900),
+    }
+    for name, data in cases.items():
+        check = measure(lambda data=data: rejected(data))
+        parse = measure(lambda data=data: Calendar.from_ical(data))
+        print(f"{name:<18} {check * 1000:>7.1f}ms {parse * 1000:>7.0f}ms  {rejected(data)}")
+
+    data = build_calendar(args.events).to_ical()
+    check = measure(lambda: check_ical(data, LIMITS))
+    total = measure(lambda: anonymize(Calendar.from_ical(data)).to_ical())
+    print(
+        f"\n{args.events} ordinary events ({len(data)} bytes): check {check * 1000:.1f}ms, "
+        f"parse and anonymize {total * 1000:.0f}ms ({check / total:.2%})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark anonymizing the calendar parts of an mbox archive.
+
+Writes an archive of invitations, each with a text part and a base64
+encoded calendar part, then times :func:`anonymize_mail` by number of
+threads, writing calendars and rewriting messages, and measures its peak
+memory in a separate run: only a window of messages is held in memory, so
+the peak stays far below the size of the archive.
+Run with ``python benchmarks/bench_mail.py``.
+"""
+
+import argparse
+import base64
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from bench_pseudonyms import build_calendar
+from icalendar import Calendar
+
+from icalendar_anonymizer.mail import anonymize_mail
+
+SALT = b"benchmark-salt"
+
+
+def write_mbox(path: Path, messages: int, events: int) -> None:
+    """Write an archive of messages, each inviting to a calendar of events."""
+    cal = build_calendar(messages * events)
+    with path.open("wb") as fp:
+        for number in range(messages):
+            invitation = Calendar()
+            invitation.add("prodid", "-//Benchmark//EN")
+            invitation.add("version", "2.0")
+            invitation.add("method", "REQUEST")
+            for event in cal.subcomponents[number * events : (number + 1) * events]:
+                invitation.add_component(event)
+            fp.write(
+                b"From organizer@example.com Mon Jan 15 14:00:00 2024\n"
+                b"From: Organizer <organizer@example.com>\n"
+                b"Subject: Invitation\n"
+                b"MIME-Version: 1.0\n"
+                b'Content-Type: multipart/alternative; boundary="BOUNDARY"\n'
+                b"\n"
+                b"--BOUNDARY\n"
+                b"Content-Type: text/plain\n"
+                b"\n"
+                b"You have been invited.\n"
+                b"--BOUNDARY\n"
+                b"Content-Type: text/calendar; charset=utf-8; method=REQUEST\n"
+                b"Content-Transfer-Encoding: base64\n"
+                b"\n" + base64.encodebytes(invitation.to_ical()) + b"--BOUNDARY--\n"
+                b"\n"
+            )
+
+
+def run(path: Path, output: Path, rewrite: bool, workers: int) -> None:  # noqa: FBT001
+    """Anonymize the archive at path into output."""
+    with path.open("rb") as source, output.open("wb") as fp:
+        anonymize_mail(source, fp, rewrite=rewrite, salt=SALT, workers=workers)
+
+
+def main() -> None:
+    """Time and measure anonymizing an archive."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=3, help="Events per invitation")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "invitations.mbox"
+        output = Path(directory) / "output"
+        write_mbox(path, args.messages, args.events)
+        print(
+            f"{args.messages} messages, {args.events} events each, "
+            f"{path.stat().st_size / 1e6:.1f}MB"
+        )
+        for rewrite in (False, True):
+            for workers in args.workers:
+                start = time.perf_counter()
+                run(path, output, rewrite, workers)
+                seconds = time.perf_counter() - start
+                print(
+                    f"  {'messages' if rewrite else 'calendars'}, {workers} workers: "
+                    f"{seconds * 1000:.0f}ms ({args.messages / seconds:.0f} messages/s)"
+                )
+        # Measured apart, as tracing slows the run down
+        tracemalloc.start()
+        run(path, output, rewrite=True, workers=args.workers[-1])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  peak memory: {peak / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark recording, writing and looking up an encrypted mapping.
+
+Measures the overhead of recording pseudonyms while anonymizing, the time
+to write the mapping file, and the time of single lookups in mappings of
+growing size: with the index, a lookup reads O(log n) index entries and
+one record, so its time barely grows with the file.
+Run with ``python benchmarks/bench_mapping.py``.
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from bench_pseudonyms import build_calendar
+
+from icalendar_anonymizer import anonymize
+from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+KEY = bytes(range(32))
+SALT = b"benchmark-salt"
+
+
+def measure(function) -> float:
+    """Return the wall time of function in seconds."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def lookups(path: Path, pseudonyms: list[str]) -> float:
+    """Return the mean time in seconds of looking up each pseudonym in a fresh mapping."""
+    with MappingFile(path, KEY) as mapping:
+        seconds = measure(lambda: [mapping.lookup(pseudonym) for pseudonym in pseudonyms])
+    return seconds / len(pseudonyms)
+
+
+def main() -> None:
+    """Time recording during anonymization and lookups by mapping size."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    cal = build_calendar(args.events)
+    # Warm up caches (regular expressions, interned strings)
+    anonymize(cal, salt=SALT)
+    plain = measure(lambda: anonymize(cal, salt=SALT))
+    print(f"{args.events} events: anonymize {plain * 1000:.0f}ms")
+    for words in (False, True):
+        recorder = MappingRecorder(words=words)
+        recorded = measure(lambda recorder=recorder: anonymize(cal, salt=SALT, mapping=recorder))
+        print(
+            f"  recording{' with words' if words else ''}: {recorded * 1000:.0f}ms "
+            f"({recorded / plain - 1:+.0%}), {len(recorder)} records"
+        )
+
+    print(f"\n{'records':>9} {'write':>9} {'file':>9} {'lookup':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "mapping.bin"
+        for size in args.sizes:
+            recorder = MappingRecorder()
+            for number in range(size):
+                recorder.add("uid", f"uid{number}@anonymous.local", f"event-{number}@example.com")
+            write = measure(lambda recorder=recorder: recorder.write(path, KEY))
+            sample = [f"uid{number}@anonymous.local" for number in range(0, size, size // 1000)]
+            print(
+                f"{size:>9} {write * 1000:>7.0f}ms {path.stat().st_size / 1e6:>7.1f}MB "
+                f"{lookups(path, sample) * 1e6:>7.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark the value memo on repeated and on distinct values.
+
+Anonymizes a recurring series whose overrides repeat the same SUMMARY,
+DESCRIPTION, LOCATION and ATTENDEE values, and a calendar of distinct
+values, with and without the memo.
+Run with ``python benchmarks/bench_memo.py``.
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from bench_pseudonyms import build_calendar
+from icalendar import Calendar, Event, vCalAddress
+
+from icalendar_anonymizer import AnonymizationStats, anonymize
+
+
+def build_series(overrides: int, attendees: int) -> Calendar:
+    """Create a weekly series with many overrides of identical content."""
+    cal = Calendar()
+    cal.add("prodid", "-//Benchmark//EN")
+    cal.add("version", "2.0")
+    start = datetime(2024, 1, 1, 9, 0, 0)
+    for index in range(overrides + 1):
+        event = Event()
+        event.add("uid", "weekly-sync@example.com")
+        event.add("dtstart", start + timedelta(weeks=index))
+        if index:
+            event.add("recurrence-id", start + timedelta(weeks=index))
+        else:
+            event.add("rrule", {"freq": "WEEKLY"})
+        event.add("summary", "Weekly engineering sync")
+        event.add("description", "Agenda: status updates, blockers, demos. " * 5)
+        event.add("location", "Building 4, Room 2.17")
+        for number in range(attendees):
+            attendee = vCalAddress(f"mailto:member{number}@corp.example")
+            attendee.params["cn"] = f"Team Member {number}"
+            attendee.params["role"] = "REQ-PARTICIPANT"
+            attendee.params["partstat"] = "ACCEPTED"
+            event.add("attendee", attendee)
+        cal.add_component(event)
+    return cal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--overrides", type=int, default=2000, help="overrides in the series")
+    parser.add_argument("--attendees", type=int, default=10, help="attendees per event")
+    parser.add_argument("--events", type=int, default=2000, help="events with distinct values")
+    args = parser.parse_args()
+
+    calendars = {
+        "series": build_series(args.overrides, args.attendees),
+        "distinct": build_calendar(args.events),
+    }
+    for name, cal in calendars.items():
+        for memo_size in (0, 4096):
+            stats = AnonymizationStats()
+            start = time.perf_counter()
+            anonymize(cal, salt=b"benchmark", stats=stats, memo_size=memo_size)
+            elapsed = time.perf_counter() - start
+            rate = stats.memo_hit_rate
+            hit_rate = f"{rate:6.1%}" if rate is not None else "     -"
+            print(f"{name:8} memo_size={memo_size:<5} {elapsed:6.2f}s  hit rate {hit_rate}")
+
+
+if __name__ == "__main__":
+    main()
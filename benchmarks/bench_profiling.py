@@ -0,0 +1,60 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark the cost of profiling a calendar while anonymizing it.
+
+Compares anonymizing without an observer, with an observer doing nothing,
+which is the cost of the events, with a
+:class:`~icalendar_anonymizer.profiling.ProfileObserver`, and the parse a
+separate profiling pass over the input would need at the least.
+Run with ``python benchmarks/bench_profiling.py``.
+"""
+
+import argparse
+import time
+
+from bench_pseudonyms import build_calendar
+from icalendar import Calendar
+
+from icalendar_anonymizer import anonymize
+from icalendar_anonymizer.observe import AnonymizationObserver
+from icalendar_anonymizer.profiling import ProfileObserver
+
+SALT = b"benchmark-salt"
+
+
+def main() -> None:
+    """Time anonymization with and without a profile."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    cal = build_calendar(args.events)
+    data = cal.to_ical()
+    runs = {
+        "anonymize": lambda: anonymize(cal, salt=SALT),
+        "with an empty observer": lambda: anonymize(
+            cal, salt=SALT, observer=AnonymizationObserver()
+        ),
+        "with a profile": lambda: anonymize(cal, salt=SALT, observer=ProfileObserver()),
+        "parse for a second pass": lambda: Calendar.from_ical(data),
+    }
+    # Warm up caches (regular expressions, interned strings)
+    anonymize(cal, salt=SALT)
+    # Rounds of all runs, so that changes in machine load affect all alike
+    best = dict.fromkeys(runs, float("inf"))
+    for _ in range(args.repeat):
+        for name, run in runs.items():
+            start = time.process_time()
+            run()
+            best[name] = min(best[name], time.process_time() - start)
+
+    plain = best["anonymize"]
+    print(f"{args.events} events, best CPU time of {args.repeat}")
+    for name, seconds in best.items():
+        print(f"  {name:<24} {seconds * 1000:>7.0f}ms ({seconds / plain:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark sequential pseudonyms against hashes.
+
+Compares run time and output size of ``anonymize()`` with and without
+``pseudonyms=True`` on a generated calendar with a realistic vocabulary.
+Run with ``python benchmarks/bench_pseudonyms.py``.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from icalendar import Calendar, Event, vCalAddress
+
+from icalendar_anonymizer import anonymize
+
+
+def build_calendar(events: int) -> Calendar:
+    """Create a calendar of events sharing a vocabulary and attendees."""
+    rng = random.Random(0)  # noqa: S311
+    words = [f"word{index}" for index in range(2000)]
+    people = [f"person{index}@corp{index % 20}.example" for index in range(200)]
+    cal = Calendar()
+    cal.add("prodid", "-//Benchmark//EN")
+    cal.add("version", "2.0")
+    start = datetime(2024, 1, 1, 9, 0, 0)
+    for index in range(events):
+        event = Event()
+        event.add("uid", f"event-{index}@example.com")
+        event.add("dtstart", start + timedelta(hours=index))
+        event.add("summary", " ".join(rng.choices(words, k=5)))
+        event.add("description", " ".join(rng.choices(words, k=60)))
+        for address in rng.sample(people, 3):
+            attendee = vCalAddress(f"mailto:{address}")
+            attendee.params["cn"] = address.split("@")[0].title()
+            event.add("attendee", attendee)
+        cal.add_component(event)
+    return cal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000, help="number of events")
+    args = parser.parse_args()
+
+    cal = build_calendar(args.events)
+    print(f"input: {args.events} events, {len(cal.to_ical()) / 1e6:.1f} MB")
+
+    for pseudonyms in (False, True):
+        start = time.perf_counter()
+        output = anonymize(cal, salt=b"benchmark", pseudonyms=pseudonyms).to_ical()
+        elapsed = time.perf_counter() - start
+        name = "pseudonyms" if pseudonyms else "hashes"
+        print(f"{name:12} {elapsed:6.2f}s  output {len(output) / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
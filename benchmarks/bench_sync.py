@@ -0,0 +1,103 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark incremental sync of a vdir against the sync of watch mode.
+
+Writes one ``.ics`` file per event, then times :func:`sync_directory` and
+:meth:`DirectoryWatcher.sync` for the first run, a run without changes, a
+run after a few files changed and a run after all files were touched
+(new modification time, same content), as a CalDAV export rewriting the
+tree would do. Run with ``python benchmarks/bench_sync.py``.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from bench_pseudonyms import build_calendar
+from icalendar import Calendar
+
+from icalendar_anonymizer._vdir import default_state_dir, load_or_create_salt
+from icalendar_anonymizer.sync import sync_directory
+from icalendar_anonymizer.watch import DirectoryWatcher, PollingBackend
+
+
+def write_vdir(root: Path, events: int) -> list[Path]:
+    """Write one calendar file per event below root, in subdirectories of 1000."""
+    cal = build_calendar(events)
+    paths = []
+    for index, event in enumerate(cal.subcomponents):
+        item = Calendar()
+        item.add("prodid", "-//Benchmark//EN")
+        item.add("version", "2.0")
+        item.add_component(event)
+        path = root / f"collection{index // 1000}" / f"{event['UID']}.ics"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(item.to_ical())
+        paths.append(path)
+    return paths
+
+
+def change(paths: list[Path], count: int) -> None:
+    """Change the summary of count files."""
+    for path in paths[:count]:
+        path.write_bytes(path.read_bytes().replace(b"SUMMARY:", b"SUMMARY:changed "))
+
+
+def touch(paths: list[Path]) -> None:
+    """Give all files a new modification time."""
+    now = time.time_ns()
+    for path in paths:
+        os.utime(path, ns=(now, now))
+
+
+def main() -> None:
+    """Time both ways of synchronizing for each kind of change."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        paths = write_vdir(root / "source", args.events)
+        print(f"{args.events} files, {args.workers} workers")
+        print(f"{'run':<22} {'ican sync':>10} {'watch sync':>11}")
+
+        watch_destination = root / "watched"
+        watcher = DirectoryWatcher(
+            root / "source",
+            watch_destination,
+            load_or_create_salt(default_state_dir(watch_destination)),
+            workers=args.workers,
+            backend=PollingBackend(root / "source"),
+        )
+
+        def run(name: str) -> None:
+            start = time.perf_counter()
+            result = sync_directory(root / "source", root / "synced", workers=args.workers)
+            synced = time.perf_counter() - start
+            start = time.perf_counter()
+            watcher.sync()
+            watched = time.perf_counter() - start
+            print(
+                f"{name:<22} {synced * 1000:>8.0f}ms {watched * 1000:>9.0f}ms  "
+                f"(updated {result.updated}, touched {result.touched})"
+            )
+
+        run("first")
+        # Outside of the window in which modification times are not trusted
+        time.sleep(2.1)
+        run("unchanged")
+        change(paths, args.changed)
+        run(f"{args.changed} changed")
+        touch(paths)
+        run("all touched")
+        watcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark hashing a very large text value.
+
+Compares time and peak memory of ``hash_text`` and ``hash_text_streaming``.
+Run with ``python benchmarks/bench_text.py``.
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from icalendar_anonymizer._hash import hash_text, hash_text_streaming
+
+
+def measure(function, text: str) -> tuple[float, int]:
+    """Return the run time in seconds and the peak traced memory in bytes.
+
+    Tracing slows down allocations, so time and memory use separate runs.
+    """
+    start = time.perf_counter()
+    function(text, b"benchmark")
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(text, b"benchmark")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=20, help="size of the text value")
+    args = parser.parse_args()
+
+    sentence = "Re: quarterly planning, see the notes below from the thread. "
+    text = sentence * (args.megabytes * 1_000_000 // len(sentence))
+    print(f"text: {len(text) / 1e6:.1f} MB, {len(text.split())} words")
+
+    for function in (hash_text, hash_text_streaming):
+        elapsed, peak = measure(function, text)
+        print(f"{function.__name__:20} {elapsed:6.2f}s  peak {peak / 1e6:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
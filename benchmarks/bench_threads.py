@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark anonymizing many calendars in threads and in processes.
+
+Threads share the parsed calendars with :func:`anonymize_many`. Processes
+receive each calendar pickled and send the anonymized calendar back
+pickled. Run with ``python benchmarks/bench_threads.py`` on the standard
+and on the free-threaded build (``python3.13t``) to compare: with the GIL,
+threads do not scale.
+"""
+
+import argparse
+import os
+import sys
+import sysconfig
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from bench_pseudonyms import build_calendar
+
+from icalendar_anonymizer import anonymize, anonymize_many
+
+SALT = b"benchmark-salt"
+
+
+def measure(function, repeat: int) -> float:
+    """Return the best wall time of function in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_processes(calendars: list, workers: int) -> list:
+    """Anonymize calendars in a pool of processes."""
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(partial(anonymize, salt=SALT), calendars))
+
+
+def main() -> None:
+    """Compare sequential, thread and process anonymization."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calendars", type=int, default=16)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(
+        f"Python {sys.version.split()[0]}, free-threaded build: {free_threaded}, "
+        f"GIL enabled: {gil_enabled}, CPUs: {os.cpu_count()}"
+    )
+    calendars = [build_calendar(args.events) for _ in range(args.calendars)]
+    sequential = measure(lambda: [anonymize(cal, salt=SALT) for cal in calendars], args.repeat)
+    print(f"{args.calendars} calendars of {args.events} events")
+    print(f"{'workers':>8} {'threads':>10} {'speedup':>8} {'processes':>10} {'speedup':>8}")
+    print(f"{'-':>8} {sequential:>9.3f}s {1:>7.2f}x")
+    for workers in args.workers:
+        threads = measure(
+            lambda workers=workers: anonymize_many(calendars, salt=SALT, workers=workers),
+            args.repeat,
+        )
+        processes = measure(lambda workers=workers: run_processes(calendars, workers), args.repeat)
+        print(
+            f"{workers:>8} {threads:>9.3f}s {sequential / threads:>7.2f}x "
+            f"{processes:>9.3f}s {sequential / processes:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
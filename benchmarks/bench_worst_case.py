@@ -0,0 +1,75 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Benchmark anonymizing calendars of pathological shapes as they grow.
+
+For each shape of ``icalendar_anonymizer/tests/perf/shapes.py``, the time
+and the peak traced memory of :func:`anonymize` are measured at growing
+sizes, and the growth exponent between the smallest and the largest size
+is printed: 1 is linear, 2 quadratic. Time and memory are measured in
+separate runs. Run with ``python benchmarks/bench_worst_case.py``.
+"""
+
+import argparse
+import math
+import time
+import tracemalloc
+
+from icalendar import Calendar
+
+from icalendar_anonymizer import anonymize
+from icalendar_anonymizer.tests.perf.shapes import SHAPES
+
+SALT = b"benchmark-salt"
+
+
+def measure(cal: Calendar, repeat: int) -> tuple[float, int]:
+    """Return the best time in seconds and the peak memory in bytes of anonymizing cal."""
+    anonymize(cal, salt=SALT)
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        anonymize(cal, salt=SALT)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    anonymize(cal, salt=SALT)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def exponent(small: float, large: float, growth: float) -> float:
+    """Return the exponent of the growth from small to large."""
+    return math.log(large / small) / math.log(growth)
+
+
+def main() -> None:
+    """Measure each shape at growing sizes."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--units", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--text", default="word")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'shape':<20} {'size':>7} {'bytes':>9} {'time':>10} {'peak':>10}")
+    for name, shape in SHAPES.items():
+        results = []
+        for units in args.units:
+            size = shape.unit * units
+            data = shape.build(size, args.text)
+            seconds, peak = measure(Calendar.from_ical(data), args.repeat)
+            results.append((seconds, peak))
+            print(
+                f"{name:<20} {size:>7} {len(data):>9} {seconds * 1000:>8.1f}ms "
+                f"{peak / 1024:>8.0f}KiB"
+            )
+        growth = args.units[-1] / args.units[0]
+        (first_time, first_peak), (last_time, last_peak) = results[0], results[-1]
+        print(
+            f"{'':<20} exponent: time {exponent(first_time, last_time, growth):.2f}, "
+            f"peak {exponent(first_peak, last_peak, growth):.2f} ({shape.description})"
+        )
+
+
+if __name__ == "__main__":
+    main()
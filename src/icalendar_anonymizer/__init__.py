@@ -7,13 +7,24 @@ This package provides tools to anonymize iCalendar data while preserving
 technical properties for bug reproduction.
 """
 
-from .anonymizer import anonymize
+from ._hash import HashFormat
+from ._stats import AnonymizationStats
+from .anonymizer import anonymize, anonymize_components, anonymize_many
+from .limits import LimitExceeded, Limits
+from .verify import verify_no_leaks
 from .version import __version__, __version_tuple__, version, version_tuple
 
 __all__ = [
+    "AnonymizationStats",
+    "HashFormat",
+    "LimitExceeded",
+    "Limits",
     "__version__",
     "__version_tuple__",
     "anonymize",
+    "anonymize_components",
+    "anonymize_many",
+    "verify_no_leaks",
     "version",
     "version_tuple",
 ]
@@ -8,7 +8,156 @@ removing personal information. Uses SHA-256 for consistent output.
 """
 
 import hashlib
+import io
+import math
 import secrets
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+# Characters encoded per step when hashing large text payloads
+_PAYLOAD_CHUNK_SIZE = 1 << 16
+
+# Characters split into words per step when hashing large text values
+_TEXT_CHUNK_SIZE = 1 << 16
+
+# Length in characters above which text is hashed with hash_text_streaming()
+STREAMING_THRESHOLD = 64 * 1024
+
+# Alphabets of the encodings other than hex. Each character is taken from
+# one byte of the digest: the byte modulo the size of the alphabet.
+_ALPHABETS = {
+    "base32": b"abcdefghijklmnopqrstuvwxyz234567",
+    "base36": b"0123456789abcdefghijklmnopqrstuvwxyz",
+}
+_TRANSLATIONS = {
+    encoding: bytes(alphabet[byte % len(alphabet)] for byte in range(256))
+    for encoding, alphabet in _ALPHABETS.items()
+}
+
+# Bits per character that count for collisions. 256 is not a multiple of
+# 36, so four base36 digits are slightly more likely than the others.
+ENCODINGS = {
+    "hex": 4.0,
+    "base32": 5.0,
+    "base36": 16 - math.log2(4 * 8**2 + 32 * 7**2),
+}
+
+# Bits of the default word and email hashes (16 hex characters) and UIDs (32)
+_TEXT_BITS = 64
+_UID_BITS = 128
+
+
+@dataclass(frozen=True)
+class HashFormat:
+    """Encoding and length of hashed words, email addresses and UIDs.
+
+    ``hex`` uses four bits of the SHA-256 digest per character. ``base32``
+    (``a-z2-7``) and ``base36`` (``0-9a-z``) take one character from each
+    digest byte, which is as fast as hex and carries 5 and about 5.17 bits
+    per character, so hashes of the same strength are about 20% shorter.
+    By the birthday bound, ``k`` distinct values hashed to ``b`` bits collide
+    with probability of about ``k**2 / 2**(b + 1)``, see
+    :func:`collision_probability`. Lengths that are not given default to at
+    least as many bits as the default hex format, 64 bits for words and
+    email parts and 128 bits for UIDs:
+
+    ========  =====================  ===============  =============  ==========================
+    encoding  word and email length  UID length       maximum        words for 1e-6 collision
+    ========  =====================  ===============  =============  ==========================
+    hex       16 (64 bits)           32 (128 bits)    64 (256 bits)  6.1 million
+    base32    13 (65 bits)           26 (130 bits)    32 (160 bits)  8.6 million
+    base36    13 (67.2 bits)         25 (129.2 bits)  32 (165 bits)  18 million
+    ========  =====================  ===============  =============  ==========================
+
+    Args:
+        encoding: One of ``"hex"``, ``"base32"`` or ``"base36"``
+        text_length: Characters per hashed word
+        email_length: Characters per hashed email local part and domain
+        uid_length: Characters per hashed UID, before ``@anonymous.local``
+
+    Raises:
+        ValueError: If the encoding is unknown or a length is not between 1
+                    and the maximum length of the encoding
+
+    Examples:
+        >>> HashFormat("base32").text_length
+        13
+        >>> HashFormat("base36", text_length=8).bits(8) < 42
+        True
+    """
+
+    encoding: str = "hex"
+    text_length: int | None = None
+    email_length: int | None = None
+    uid_length: int | None = None
+
+    def __post_init__(self):
+        if self.encoding not in ENCODINGS:
+            raise ValueError(
+                f"Unknown encoding {self.encoding!r}, expected one of {', '.join(ENCODINGS)}"
+            )
+        # Looked up once, encode() runs for every word
+        object.__setattr__(self, "_translation", _TRANSLATIONS.get(self.encoding))
+        maximum = self.max_length
+        defaults = {
+            "text_length": _TEXT_BITS,
+            "email_length": _TEXT_BITS,
+            "uid_length": _UID_BITS,
+        }
+        for name, bits in defaults.items():
+            length = getattr(self, name)
+            if length is None:
+                # Frozen dataclass: fill in defaults through object.__setattr__
+                object.__setattr__(self, name, math.ceil(bits / ENCODINGS[self.encoding]))
+            elif not 1 <= length <= maximum:
+                raise ValueError(f"{name} must be between 1 and {maximum}, got {length}")
+
+    @property
+    def max_length(self) -> int:
+        """Longest hash the encoding can take from one SHA-256 digest."""
+        return 64 if self.encoding == "hex" else 32
+
+    def bits(self, length: int) -> float:
+        """Return the number of bits of a hash of length characters."""
+        return length * ENCODINGS[self.encoding]
+
+    def encode(self, digest: bytes, length: int) -> str:
+        """Encode the leading bytes of a digest as length characters.
+
+        Args:
+            digest: A SHA-256 digest
+            length: Number of characters
+
+        Returns:
+            The encoded hash
+        """
+        translation = self._translation
+        if translation is None:
+            return digest[: (length + 1) // 2].hex()[:length]
+        return digest[:length].translate(translation).decode("ascii")
+
+
+# Hash format of hash_text(), hash_email() and hash_uid() by default
+DEFAULT_HASH_FORMAT = HashFormat()
+
+
+def collision_probability(count: int, bits: float) -> float:
+    """Estimate the probability that count distinct values share a hash.
+
+    Uses the birthday bound ``1 - exp(-count**2 / 2**(bits + 1))``.
+
+    Args:
+        count: Number of distinct values hashed
+        bits: Bits per hash, see :meth:`HashFormat.bits`
+
+    Returns:
+        The approximate probability of at least one collision
+
+    Examples:
+        >>> round(collision_probability(5_000_000_000, 64), 2)
+        0.49
+    """
+    return -math.expm1(-(count**2) / 2 ** (bits + 1))
 
 
 def generate_salt() -> bytes:
@@ -36,7 +185,7 @@ def _hash_with_salt(data: str, salt: bytes) -> str:
     return h.hexdigest()
 
 
-def hash_text(text: str, salt: bytes) -> str:
+def hash_text(text: str, salt: bytes, hash_format: HashFormat = DEFAULT_HASH_FORMAT) -> str:
     """Hash text while preserving word count.
 
     Each word is hashed separately, maintaining the structure of the text.
@@ -45,57 +194,178 @@ def hash_text(text: str, salt: bytes) -> str:
     Args:
         text: The text to anonymize
         salt: Salt bytes for this anonymization session
+        hash_format: Encoding and length of the hashed words
 
     Returns:
         Anonymized text with same word count
     """
+    return _hash_text(text, hashlib.sha256(salt), hash_format)
+
+
+def _hash_text(text: str, salted, hash_format: HashFormat) -> str:
+    """Hash text word by word with a hash object that already holds the salt."""
     if not text or not text.strip():
         return text
+    # By default 16 hex characters (64 bits) per word to reduce collision probability
+    return " ".join([_hash_word(salted, word, hash_format) for word in text.split()])
+
+
+def hash_text_streaming(
+    text: str,
+    salt: bytes,
+    max_value_bytes: int | None = None,
+    hash_format: HashFormat = DEFAULT_HASH_FORMAT,
+) -> str:
+    """Hash text in chunks without building lists for the whole value.
+
+    Produces exactly the same output as :func:`hash_text`. The text is cut
+    into chunks at whitespace boundaries, and the hashed words of each chunk
+    are written into a single output buffer, so only one chunk's words are
+    held in memory at a time. The salted hash state is computed once and
+    copied for every word. Use this for multi-megabyte values, where
+    :func:`hash_text` would hold the text, the list of words and the list of
+    hashes at the same time.
+
+    Args:
+        text: The text to anonymize
+        salt: Salt bytes for this anonymization session
+        max_value_bytes: Optional limit for the UTF-8 size of text
+        hash_format: Encoding and length of the hashed words
+
+    Returns:
+        Anonymized text with same word count
+
+    Raises:
+        ValueError: If text is larger than max_value_bytes
+
+    Examples:
+        >>> text = "Discuss  the roadmap"
+        >>> hash_text_streaming(text, b"salt") == hash_text(text, b"salt")
+        True
+    """
+    if max_value_bytes is not None and _utf8_size_exceeds(text, max_value_bytes):
+        raise ValueError(f"Value exceeds max_value_bytes ({max_value_bytes} bytes)")
+
+    if not text or text.isspace():
+        return text
+
+    salted = hashlib.sha256(salt)
+    out = io.StringIO()
+    separator = ""
+    for words in word_chunks(text):
+        out.write(separator)
+        out.write(" ".join([_hash_word(salted, word, hash_format) for word in words]))
+        separator = " "
+    return out.getvalue()
+
+
+def word_chunks(text: str) -> Iterator[list[str]]:
+    """Split text into words, a bounded chunk of the text at a time.
+
+    Concatenating the chunks gives ``text.split()``.
+
+    Args:
+        text: The text to split
+
+    Yields:
+        Non-empty lists of words
+
+    Examples:
+        >>> [word for words in word_chunks(" two  words ") for word in words]
+        ['two', 'words']
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + _TEXT_CHUNK_SIZE, length)
+        # Extend the chunk to the end of the word it cuts through
+        while end < length and not text[end].isspace():
+            end += 1
+        words = text[start:end].split()
+        if words:
+            yield words
+        start = end
+
+
+def _hash_word(salted, word: str, hash_format: HashFormat, length: int | None = None) -> str:
+    """Hash a word with a copy of a hash object that already holds the salt.
+
+    Copying the salted state is faster than hashing the salt again.
+    """
+    h = salted.copy()
+    h.update(word.encode("utf-8"))
+    return hash_format.encode(h.digest(), length or hash_format.text_length)
+
 
-    words = text.split()
-    hashed_words = []
+def _utf8_size_exceeds(text: str, limit: int) -> bool:
+    """Check if the UTF-8 encoding of text is longer than limit bytes.
 
-    for word in words:
-        # Hash the word and take first 16 hex characters (64 bits) to reduce collision probability
-        word_hash = _hash_with_salt(word, salt)[:16]
-        hashed_words.append(word_hash)
+    Avoids encoding text when the answer follows from its length: every
+    character takes between one and four bytes.
 
-    return " ".join(hashed_words)
+    Args:
+        text: The text to check
+        limit: Size limit in bytes
+
+    Returns:
+        True if text needs more than limit bytes
+    """
+    if len(text) > limit:
+        return True
+    if len(text) * 4 <= limit or text.isascii():
+        return False
+    return len(text.encode("utf-8")) > limit
 
 
-def hash_email(email: str, salt: bytes) -> str:
+def hash_email(email: str, salt: bytes, hash_format: HashFormat = DEFAULT_HASH_FORMAT) -> str:
     """Hash email while preserving structure (keeps @ and domain-like format).
 
     Args:
         email: The email address to anonymize
         salt: Salt bytes for this anonymization session
+        hash_format: Encoding and length of the hashed parts
 
     Returns:
         Anonymized email with structure preserved
     """
+    return _hash_email(email, hashlib.sha256(salt), hash_format)
+
+
+def _hash_email(email: str, salted, hash_format: HashFormat) -> str:
+    """Hash an email address with a hash object that already holds the salt."""
+    length = hash_format.email_length
+
+    def hash_part(part: str) -> str:
+        return _hash_word(salted, part, hash_format, length)
+
     if not email or "@" not in email:
         # Not a valid email, just hash as text
-        return _hash_with_salt(email, salt)[:16]
+        return hash_part(email)
 
     local, domain = email.rsplit("@", 1)
 
     # Hash the local part
-    local_hash = _hash_with_salt(local, salt)[:16]
+    local_hash = hash_part(local)
 
     # Hash the domain but keep TLD-like structure
     if "." in domain:
         domain_parts = domain.split(".")
         # Hash the main domain, use .local per RFC 6761
-        domain_hash = _hash_with_salt(domain_parts[0], salt)[:16]
+        domain_hash = hash_part(domain_parts[0])
         tld = "local"  # RFC 6761 reserved TLD for local/testing use
         domain_anon = f"{domain_hash}.{tld}"
     else:
-        domain_anon = _hash_with_salt(domain, salt)[:16]
+        domain_anon = hash_part(domain)
 
     return f"{local_hash}@{domain_anon}"
 
 
-def hash_uid(uid: str, salt: bytes, uid_map: dict[str, str]) -> str:
+def hash_uid(
+    uid: str,
+    salt: bytes,
+    uid_map: dict[str, str],
+    hash_format: HashFormat = DEFAULT_HASH_FORMAT,
+) -> str:
     """Hash UID while maintaining uniqueness across the calendar.
 
     Same UID always produces the same hash within a calendar (for recurring
@@ -105,6 +375,7 @@ def hash_uid(uid: str, salt: bytes, uid_map: dict[str, str]) -> str:
         uid: The UID to hash
         salt: Salt bytes for this anonymization session
         uid_map: Dictionary mapping original UIDs to hashed UIDs
+        hash_format: Encoding and length of the hashed UID
 
     Returns:
         Anonymized UID (consistent for same input UID)
@@ -120,19 +391,75 @@ def hash_uid(uid: str, salt: bytes, uid_map: dict[str, str]) -> str:
         >>> uid1 != uid3  # Different UIDs produce different hashes
         True
     """
+    return _hash_uid(uid, hashlib.sha256(salt), uid_map, hash_format)
+
+
+def _hash_uid(uid: str, salted, uid_map: dict[str, str], hash_format: HashFormat) -> str:
+    """Hash a UID with a hash object that already holds the salt."""
     if uid in uid_map:
         return uid_map[uid]
 
     # Hash the UID and create a new unique identifier
-    uid_hash = _hash_with_salt(uid, salt)
+    uid_hash = _hash_word(salted, uid, hash_format, hash_format.uid_length)
 
-    # Format as a UID (take 32 chars and add @anonymous.local)
-    hashed_uid = f"{uid_hash[:32]}@anonymous.local"
+    # Format as a UID (by default 32 hex chars, and add @anonymous.local)
+    hashed_uid = f"{uid_hash}@anonymous.local"
     uid_map[uid] = hashed_uid
 
     return hashed_uid
 
 
+def hash_payload(data: bytes | str, salt: bytes) -> str:
+    """Hash a large payload in one pass.
+
+    Unlike :func:`hash_text`, the payload is not split into words. Text is
+    encoded in chunks, so no full-size encoded copy is made.
+
+    Args:
+        data: The payload (binary data or text)
+        salt: Salt bytes for this anonymization session
+
+    Returns:
+        Hexadecimal hash string (16 characters)
+
+    Examples:
+        >>> hash_payload(b"data", b"salt") == hash_payload("data", b"salt")
+        True
+    """
+    h = hashlib.sha256()
+    h.update(salt)
+    if isinstance(data, str):
+        for start in range(0, len(data), _PAYLOAD_CHUNK_SIZE):
+            h.update(data[start : start + _PAYLOAD_CHUNK_SIZE].encode("utf-8"))
+    else:
+        h.update(data)
+    return h.hexdigest()[:16]
+
+
+def approximate_size(size: int) -> int:
+    """Round a size to two significant digits.
+
+    Placeholders report an approximate size so that exact sizes cannot be
+    used to recognize a particular file.
+
+    Args:
+        size: Size in bytes
+
+    Returns:
+        The size rounded to two significant digits
+
+    Examples:
+        >>> approximate_size(1234567)
+        1200000
+        >>> approximate_size(87)
+        87
+    """
+    digits = len(str(size))
+    if digits <= 2:
+        return size
+    return round(size, 2 - digits)
+
+
 def hash_caladdress_cn(cn: str, salt: bytes) -> str:
     """Hash the CN (Common Name) parameter of ATTENDEE/ORGANIZER.
 
@@ -144,3 +471,45 @@ def hash_caladdress_cn(cn: str, salt: bytes) -> str:
         Anonymized common name preserving word count
     """
     return hash_text(cn, salt)
+
+
+class Hasher:
+    """Anonymize text, email addresses, UIDs and payloads for one run.
+
+    Binds the hash functions of this module to the salt of an anonymization
+    run and keeps its UID map. Subclasses can replace the hashes with other
+    pseudonyms, see :class:`~icalendar_anonymizer._pseudonyms.Pseudonymizer`.
+
+    Args:
+        salt: Salt bytes for this anonymization session
+        hash_format: Encoding and length of the hashes
+    """
+
+    def __init__(self, salt: bytes, hash_format: HashFormat = DEFAULT_HASH_FORMAT):
+        self.salt = salt
+        self.hash_format = hash_format
+        self.uid_map: dict[str, str] = {}
+        # SHA-256 state holding the salt, copied for each hash
+        self._salted = hashlib.sha256(salt)
+
+    def text(self, text: str) -> str:
+        """Anonymize text word by word, see :func:`hash_text`."""
+        if len(text) > STREAMING_THRESHOLD:
+            return hash_text_streaming(text, self.salt, hash_format=self.hash_format)
+        return _hash_text(text, self._salted, self.hash_format)
+
+    def email(self, email: str) -> str:
+        """Anonymize an email address, see :func:`hash_email`."""
+        return _hash_email(email, self._salted, self.hash_format)
+
+    def uid(self, uid: str) -> str:
+        """Anonymize a UID consistently for this run, see :func:`hash_uid`."""
+        return _hash_uid(uid, self._salted, self.uid_map, self.hash_format)
+
+    def cn(self, cn: str) -> str:
+        """Anonymize the common name of an attendee, see :func:`hash_caladdress_cn`."""
+        return self.text(cn)
+
+    def payload(self, data: bytes | str) -> str:
+        """Hash a large payload in one pass, see :func:`hash_payload`."""
+        return hash_payload(data, self.salt)
@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Per-run memo of anonymized property values.
+
+Recurring event overrides and exported series repeat the same SUMMARY,
+LOCATION or ATTENDEE values, with the same parameters, in many components.
+Anonymization is deterministic within a run, so the anonymized value of a
+repeated input can be reused instead of hashing every word again and
+rebuilding the address and its parameters.
+"""
+
+from collections import OrderedDict
+
+from ._stats import AnonymizationStats
+
+# Default number of values kept
+DEFAULT_MEMO_SIZE = 4096
+
+# Longer values are not memoized, which bounds the memory held by the memo
+# to about DEFAULT_MEMO_SIZE * MAX_MEMO_VALUE_LENGTH characters of keys
+MAX_MEMO_VALUE_LENGTH = 1024
+
+
+class ValueMemo:
+    """Least recently used cache of anonymized property values.
+
+    Keys are built from the property name, the value type, the value and its
+    parameters. Cached values are shared between the components of the
+    anonymized calendar, so they must not be modified afterwards.
+
+    Args:
+        maxsize: Number of values kept; 0 disables the memo
+        stats: Statistics receiving the hit and miss counts
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE, stats: AnonymizationStats | None = None):
+        self.maxsize = maxsize
+        self.stats = stats if stats is not None else AnonymizationStats()
+        self._values: OrderedDict[tuple, object] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def key(self, name: str, value) -> tuple | None:
+        """Return the memo key of a property value.
+
+        Args:
+            name: Upper case property name
+            value: The original property value
+
+        Returns:
+            A hashable key, or None if the value is not memoized
+        """
+        if not self.maxsize or not isinstance(value, str) or len(value) > MAX_MEMO_VALUE_LENGTH:
+            return None
+        params = getattr(value, "params", None)
+        # List values (e.g. MEMBER) are not hashable
+        param_items = (
+            tuple(
+                (key, item if isinstance(item, str) else repr(item)) for key, item in params.items()
+            )
+            if params
+            else ()
+        )
+        return (name, type(value), str(value), param_items)
+
+    def get(self, key: tuple):
+        """Return the anonymized value for key, or None if it is not known."""
+        values = self._values
+        value = values.get(key)
+        if value is None:
+            self.stats.memo_misses += 1
+            return None
+        values.move_to_end(key)
+        self.stats.memo_hits += 1
+        return value
+
+    def put(self, key: tuple, value) -> None:
+        """Remember the anonymized value for key, evicting the oldest value."""
+        values = self._values
+        values[key] = value
+        if len(values) > self.maxsize:
+            values.popitem(last=False)
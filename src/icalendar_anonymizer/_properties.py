@@ -6,79 +6,221 @@
 Defines which properties should be preserved vs anonymized based on RFC 5545
 and privacy requirements. Default-deny approach: unknown properties are
 anonymized by default.
+
+The classifications are frozen sets, so that threads can share them safely
+on the free-threaded build of Python.
 """
 
 # Properties that must be preserved exactly (technical/structural data)
-PRESERVED_PROPERTIES = {
-    # Date/time properties
-    "DTSTART",
-    "DTEND",
-    "DUE",
-    "DURATION",
-    "DTSTAMP",
-    "CREATED",
-    "LAST-MODIFIED",
-    # Recurrence properties
-    "RRULE",
-    "RDATE",
-    "EXDATE",
-    "RECURRENCE-ID",
-    # Timezone properties
-    "TZID",
-    "TZOFFSETFROM",
-    "TZOFFSETTO",
-    "TZNAME",
-    "TZURL",
-    # Metadata properties
-    "SEQUENCE",
-    "STATUS",
-    "TRANSP",
-    "CLASS",
-    "PRIORITY",
-    # Structural properties
-    "VERSION",
-    "PRODID",
-    "CALSCALE",
-    "METHOD",
-    # Component identification
-    # Note: ATTACH, URL, and GEO intentionally NOT preserved due to privacy concerns
-    # - ATTACH/URL may contain personal data in paths/queries
-    # - GEO coordinates reveal home/work location
-    # Alarm properties
-    "ACTION",
-    "TRIGGER",
-    "REPEAT",
-    # Freebusy properties
-    "FREEBUSY",
-    "FBTYPE",
-    # Relationship properties
-    "RELATED-TO",
-    "REQUEST-STATUS",
-}
+PRESERVED_PROPERTIES = frozenset(
+    {
+        # Date/time properties
+        "DTSTART",
+        "DTEND",
+        "DUE",
+        "DURATION",
+        "DTSTAMP",
+        "CREATED",
+        "LAST-MODIFIED",
+        # Recurrence properties
+        "RRULE",
+        "RDATE",
+        "EXDATE",
+        "RECURRENCE-ID",
+        # Timezone properties
+        "TZID",
+        "TZOFFSETFROM",
+        "TZOFFSETTO",
+        "TZNAME",
+        "TZURL",
+        # Metadata properties
+        "SEQUENCE",
+        "STATUS",
+        "TRANSP",
+        "CLASS",
+        "PRIORITY",
+        # Structural properties
+        "VERSION",
+        "PRODID",
+        "CALSCALE",
+        "METHOD",
+        # Component identification
+        # Note: ATTACH, URL, and GEO intentionally NOT preserved due to privacy concerns
+        # - ATTACH/URL may contain personal data in paths/queries
+        # - GEO coordinates reveal home/work location
+        # Alarm properties
+        "ACTION",
+        "TRIGGER",
+        "REPEAT",
+        # Freebusy properties
+        "FREEBUSY",
+        "FBTYPE",
+        # Relationship properties
+        "RELATED-TO",
+        "REQUEST-STATUS",
+    }
+)
 
 # Properties that contain personal data and must be anonymized
-ANONYMIZED_PROPERTIES = {
-    # Text fields with personal content
-    "SUMMARY",
-    "DESCRIPTION",
-    "LOCATION",
-    "COMMENT",
-    "CONTACT",
-    "RESOURCES",
-    "CATEGORIES",
-    # Calendar addresses (emails + CN parameters)
-    "ATTENDEE",
-    "ORGANIZER",
-    # Unique identifiers (hashed to preserve uniqueness)
-    "UID",
-}
+ANONYMIZED_PROPERTIES = frozenset(
+    {
+        # Text fields with personal content
+        "SUMMARY",
+        "DESCRIPTION",
+        "LOCATION",
+        "COMMENT",
+        "CONTACT",
+        "RESOURCES",
+        "CATEGORIES",
+        # Calendar addresses (emails + CN parameters)
+        "ATTENDEE",
+        "ORGANIZER",
+        # Unique identifiers (hashed to preserve uniqueness)
+        "UID",
+    }
+)
+
+# Parameters kept when a binary value is replaced by a placeholder
+PLACEHOLDER_PARAMETERS = frozenset(
+    {
+        "FMTTYPE",
+    }
+)
+
+# Parameter added to placeholders, holding the approximate original size
+PLACEHOLDER_SIZE_PARAMETER = "X-ANONYMIZED-SIZE"
 
 # Component types that should be completely preserved (timezone data)
-PRESERVED_COMPONENTS = {
-    "VTIMEZONE",
-    "STANDARD",
-    "DAYLIGHT",
-}
+PRESERVED_COMPONENTS = frozenset(
+    {
+        "VTIMEZONE",
+        "STANDARD",
+        "DAYLIGHT",
+    }
+)
+
+# Reported instead of the names of X- and unregistered components and
+# properties, e.g. X-JANE-DOE-CASE, in profiles and quarantine files
+OTHER_NAME = "(x-name)"
+
+# Components and properties registered for iCalendar, reported by name:
+# RFC 5545, 7808, 7953, 7986, 9073, 9074 and 9253
+STANDARD_COMPONENTS = frozenset(
+    (
+        "VCALENDAR",
+        "VEVENT",
+        "VTODO",
+        "VJOURNAL",
+        "VFREEBUSY",
+        "VTIMEZONE",
+        "STANDARD",
+        "DAYLIGHT",
+        "VALARM",
+        "VAVAILABILITY",
+        "AVAILABLE",
+        "PARTICIPANT",
+        "VLOCATION",
+        "VRESOURCE",
+    )
+)
+STANDARD_PROPERTIES = frozenset(
+    (
+        # RFC 5545, and EXRULE of RFC 2445
+        "CALSCALE",
+        "METHOD",
+        "PRODID",
+        "VERSION",
+        "ATTACH",
+        "CATEGORIES",
+        "CLASS",
+        "COMMENT",
+        "DESCRIPTION",
+        "GEO",
+        "LOCATION",
+        "PERCENT-COMPLETE",
+        "PRIORITY",
+        "RESOURCES",
+        "STATUS",
+        "SUMMARY",
+        "COMPLETED",
+        "DTEND",
+        "DUE",
+        "DTSTART",
+        "DURATION",
+        "FREEBUSY",
+        "TRANSP",
+        "TZID",
+        "TZNAME",
+        "TZOFFSETFROM",
+        "TZOFFSETTO",
+        "TZURL",
+        "ATTENDEE",
+        "CONTACT",
+        "ORGANIZER",
+        "RECURRENCE-ID",
+        "RELATED-TO",
+        "URL",
+        "UID",
+        "EXDATE",
+        "EXRULE",
+        "RDATE",
+        "RRULE",
+        "ACTION",
+        "REPEAT",
+        "TRIGGER",
+        "CREATED",
+        "DTSTAMP",
+        "LAST-MODIFIED",
+        "SEQUENCE",
+        "REQUEST-STATUS",
+        # RFC 7808
+        "TZID-ALIAS-OF",
+        "TZUNTIL",
+        # RFC 7953
+        "BUSYTYPE",
+        # RFC 7986
+        "NAME",
+        "REFRESH-INTERVAL",
+        "SOURCE",
+        "COLOR",
+        "IMAGE",
+        "CONFERENCE",
+        # RFC 9073
+        "LOCATION-TYPE",
+        "PARTICIPANT-TYPE",
+        "RESOURCE-TYPE",
+        "CALENDAR-ADDRESS",
+        "STYLED-DESCRIPTION",
+        "STRUCTURED-DATA",
+        # RFC 9074
+        "ACKNOWLEDGED",
+        "PROXIMITY",
+        # RFC 9253
+        "CONCEPT",
+        "LINK",
+        "REFID",
+    )
+)
+
+# Value data types of the VALUE parameter (RFC 5545, section 3.2.20)
+VALUE_TYPES = frozenset(
+    (
+        "BINARY",
+        "BOOLEAN",
+        "CAL-ADDRESS",
+        "DATE",
+        "DATE-TIME",
+        "DURATION",
+        "FLOAT",
+        "INTEGER",
+        "PERIOD",
+        "RECUR",
+        "TEXT",
+        "TIME",
+        "URI",
+        "UTC-OFFSET",
+    )
+)
 
 
 def should_preserve_property(property_name: str) -> bool:
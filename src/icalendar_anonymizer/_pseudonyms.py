@@ -0,0 +1,84 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Short sequential pseudonyms instead of hashes.
+
+Replaces each distinct word with ``w1``, ``w2``, ..., each email address with
+``person1@example1.local`` and each UID with ``uid1@anonymous.local``, in the
+order in which they are first seen. The output is much smaller than with
+16-character hashes, and each value costs one short keyed BLAKE2b digest.
+"""
+
+import hashlib
+
+from ._hash import Hasher, word_chunks
+
+# Domain of anonymized UIDs, as in hash_uid()
+UID_DOMAIN = "anonymous.local"
+
+
+class Pseudonymizer(Hasher):
+    """Assign sequential pseudonyms from dictionaries built in one pass.
+
+    The dictionaries are keyed on salted digests of the original values,
+    so they never hold the original text, and the pseudonyms themselves
+    carry no information about it. The same value always gets the same
+    pseudonym within a run. Pseudonyms are deterministic for a given input
+    order; the salt only keys the dictionaries.
+
+    Args:
+        salt: Salt bytes for this anonymization session
+
+    Examples:
+        >>> pseudonymizer = Pseudonymizer(b"salt")
+        >>> pseudonymizer.text("Lunch with Jane, then lunch")
+        'w1 w2 w3 w4 w5'
+        >>> pseudonymizer.text("Jane, Lunch")
+        'w3 w1'
+        >>> pseudonymizer.email("jane@example.com")
+        'person1@example1.local'
+        >>> pseudonymizer.uid("1234@example.com")
+        'uid1@anonymous.local'
+    """
+
+    def __init__(self, salt: bytes):
+        super().__init__(salt)
+        # BLAKE2b keys are limited to 64 bytes, salts are not
+        self._key = hashlib.sha256(salt).digest()
+        self._tables: dict[str, dict[bytes, str]] = {}
+
+    def pseudonym(self, prefix: str, value: str) -> str:
+        """Return the pseudonym of a value in the namespace of prefix.
+
+        Args:
+            prefix: Namespace and prefix of the pseudonyms, e.g. ``"w"``
+            value: The original value
+
+        Returns:
+            The prefix followed by the sequence number of value
+        """
+        table = self._tables.setdefault(prefix, {})
+        key = hashlib.blake2b(value.encode("utf-8"), key=self._key, digest_size=16).digest()
+        name = table.get(key)
+        if name is None:
+            name = table[key] = f"{prefix}{len(table) + 1}"
+        return name
+
+    def text(self, text: str) -> str:
+        """Replace each word with its pseudonym, keeping the word count."""
+        if not text or text.isspace():
+            return text
+        return " ".join(
+            " ".join([self.pseudonym("w", word) for word in words]) for words in word_chunks(text)
+        )
+
+    def email(self, email: str) -> str:
+        """Replace the local part and the domain of an address."""
+        if not email or "@" not in email:
+            return self.pseudonym("w", email)
+        local, domain = email.rsplit("@", 1)
+        return f"{self.pseudonym('person', local)}@{self.pseudonym('example', domain)}.local"
+
+    def uid(self, uid: str) -> str:
+        """Replace a UID with a sequential one."""
+        return f"{self.pseudonym('uid', uid)}@{UID_DOMAIN}"
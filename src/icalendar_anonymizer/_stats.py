@@ -0,0 +1,46 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Statistics of an anonymization run."""
+
+from dataclasses import dataclass
+
+
+@dataclass
+class AnonymizationStats:
+    """Counters filled in while a calendar is anonymized.
+
+    Pass an instance as the ``stats`` argument of
+    :func:`~icalendar_anonymizer.anonymize`. Since components are anonymized
+    lazily by :func:`~icalendar_anonymizer.anonymize_components`, the counters
+    are complete once all components have been consumed.
+
+    Attributes:
+        components: Top-level components processed
+        memo_hits: Property values taken from the value memo
+        memo_misses: Property values anonymized and added to the memo
+
+    Examples:
+        >>> stats = AnonymizationStats(memo_hits=3, memo_misses=1)
+        >>> stats.memo_hit_rate
+        0.75
+    """
+
+    components: int = 0
+    memo_hits: int = 0
+    memo_misses: int = 0
+
+    @property
+    def memo_hit_rate(self) -> float | None:
+        """Share of memo lookups that were hits, or None without lookups."""
+        lookups = self.memo_hits + self.memo_misses
+        return self.memo_hits / lookups if lookups else None
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        """Return the statistics as a plain dictionary."""
+        return {
+            "components": self.components,
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses,
+            "memo_hit_rate": self.memo_hit_rate,
+        }
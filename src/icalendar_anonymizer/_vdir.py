@@ -0,0 +1,157 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Helpers for anonymizing directories of calendar files.
+
+A vdir stores one ``.ics`` file per calendar item. These helpers map source
+files to anonymized output files and keep the salt on disk so repeated runs
+produce the same pseudonyms.
+"""
+
+import os
+import tempfile
+from collections.abc import Iterator
+from pathlib import Path
+
+from icalendar import Calendar
+
+from ._hash import _hash_with_salt, generate_salt
+from .anonymizer import anonymize
+
+CALENDAR_SUFFIX = ".ics"
+SALT_FILE_NAME = "salt"
+
+
+def default_state_dir(destination: Path) -> Path:
+    """Return the default state directory for an output directory.
+
+    The state lives next to the output directory, not inside it, so that
+    shipping the anonymized tree never ships the salt.
+
+    Args:
+        destination: The anonymized output directory
+
+    Returns:
+        Path of the form ``<destination>.ican-state``
+    """
+    destination = Path(destination)
+    return destination.with_name(f"{destination.name}.ican-state")
+
+
+def load_or_create_salt(state_dir: Path) -> bytes:
+    """Load the persistent salt, creating it on first use.
+
+    Args:
+        state_dir: Directory holding the salt file
+
+    Returns:
+        The salt bytes
+    """
+    state_dir = Path(state_dir)
+    salt_file = state_dir / SALT_FILE_NAME
+    if salt_file.exists():
+        return bytes.fromhex(salt_file.read_text(encoding="ascii").strip())
+
+    state_dir.mkdir(parents=True, exist_ok=True)
+    salt = generate_salt()
+    # write_atomic creates the file with owner-only permissions
+    write_atomic(salt_file, salt.hex().encode("ascii"))
+    return salt
+
+
+def iter_calendar_files(root: Path) -> Iterator[Path]:
+    """Yield all ``.ics`` files below root, relative to root.
+
+    Hidden files and directories (starting with ``.``) are skipped.
+
+    Args:
+        root: The directory to scan
+
+    Yields:
+        Paths relative to root
+    """
+    root = Path(root)
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.startswith(".") or not filename.endswith(CALENDAR_SUFFIX):
+                continue
+            yield Path(dirpath, filename).relative_to(root)
+
+
+def anonymized_relpath(relpath: Path, salt: bytes) -> Path:
+    """Map a source path to its anonymized output path.
+
+    vdir file names are often the item UID, so every path component is
+    hashed. The mapping is deterministic for a given salt, which lets
+    removed source files be matched to their outputs.
+
+    Args:
+        relpath: Source path relative to the source directory
+        salt: Salt bytes for this anonymization session
+
+    Returns:
+        Output path relative to the output directory
+    """
+    parts = [_hash_with_salt(part, salt)[:32] for part in Path(relpath).parts]
+    parts[-1] += CALENDAR_SUFFIX
+    return Path(*parts)
+
+
+def anonymize_file(source: Path, destination: Path, salt: bytes) -> None:
+    """Anonymize one calendar file and write the result atomically.
+
+    Args:
+        source: Path of the source ``.ics`` file
+        destination: Path of the anonymized output file
+        salt: Salt bytes for this anonymization session
+
+    Raises:
+        ValueError: If the source is not a valid calendar
+        OSError: If reading or writing fails
+    """
+    cal = Calendar.from_ical(Path(source).read_bytes())
+    write_atomic(Path(destination), anonymize(cal, salt=salt).to_ical())
+
+
+def remove_output(destination: Path, root: Path) -> bool:
+    """Remove an output file and any directories it leaves empty.
+
+    Args:
+        destination: Path of the output file
+        root: The output directory, which is never removed
+
+    Returns:
+        True if a file was removed
+    """
+    try:
+        destination.unlink()
+    except FileNotFoundError:
+        return False
+
+    parent = destination.parent
+    while parent != root and root in parent.parents:
+        try:
+            parent.rmdir()
+        except OSError:
+            break
+        parent = parent.parent
+    return True
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write data to path so readers never see a partial file.
+
+    Args:
+        path: Target file path
+        data: Bytes to write
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        Path(tmp_name).replace(path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
@@ -7,21 +7,39 @@ Anonymizes personal data while preserving technical properties needed for
 bug reproduction. Uses deterministic hashing with configurable salt.
 """
 
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import perf_counter
+
 from icalendar import Alarm, Calendar, Event, Journal, Todo
 from icalendar.cal import Component
-from icalendar.prop import vCalAddress
-
-from ._hash import (
-    generate_salt,
-    hash_caladdress_cn,
-    hash_email,
-    hash_text,
-    hash_uid,
-)
+from icalendar.prop import vBinary, vCalAddress, vText
+
+from ._hash import DEFAULT_HASH_FORMAT, Hasher, HashFormat, approximate_size, generate_salt
+from ._memo import DEFAULT_MEMO_SIZE, ValueMemo
 from ._properties import (
+    PLACEHOLDER_PARAMETERS,
+    PLACEHOLDER_SIZE_PARAMETER,
     should_preserve_component,
     should_preserve_property,
 )
+from ._pseudonyms import Pseudonymizer
+from ._stats import AnonymizationStats
+from .limits import Limits, _count_properties, _Counter
+from .mapping import MappingRecorder
+from .observe import (
+    HANDLER_CALADDRESS,
+    HANDLER_PLACEHOLDER,
+    HANDLER_PRESERVE,
+    HANDLER_TEXT,
+    HANDLER_UID,
+    AnonymizationObserver,
+    ComponentEvent,
+    PropertyEvent,
+    value_size,
+)
 
 
 def _should_preserve(prop_name: str, preserve_set: set[str]) -> bool:
@@ -41,6 +59,16 @@ def anonymize(
     cal: Calendar,
     salt: bytes | None = None,
     preserve: set[str] | None = None,
+    placeholders: dict[str, int] | None = None,
+    pseudonyms: bool = False,  # noqa: FBT001
+    hash_format: HashFormat | None = None,
+    stats: AnonymizationStats | None = None,
+    memo_size: int = DEFAULT_MEMO_SIZE,
+    consume: bool = False,  # noqa: FBT001
+    observer: AnonymizationObserver | None = None,
+    uid_map: dict[str, str] | None = None,
+    limits: Limits | None = None,
+    mapping: MappingRecorder | None = None,
 ) -> Calendar:
     """Anonymize an iCalendar object.
 
@@ -56,12 +84,131 @@ def anonymize(
         preserve: Optional set of additional property names to preserve.
                  Case-insensitive. User must ensure these don't contain
                  sensitive data. Example: {"CATEGORIES", "COMMENT"}
+        placeholders: Optional mapping of property names to a length in
+                      characters. Longer values are replaced by a fixed-size
+                      placeholder instead of being hashed word by word.
+                      Case-insensitive. Binary (BASE64) values, such as
+                      inline ATTACH data, are always replaced.
+                      Example: {"DESCRIPTION": 100_000}
+        pseudonyms: Replace words, email addresses and UIDs with short
+                    sequential pseudonyms (``w1``, ``person1@example1.local``,
+                    ``uid1@anonymous.local``) instead of hashes. Smaller and
+                    faster, but pseudonyms depend on the order of the input,
+                    so they are not stable across different calendars.
+        hash_format: Encoding and length of hashed words, email addresses
+                     and UIDs, see :class:`~icalendar_anonymizer.HashFormat`.
+                     Defaults to 16 hex characters per word and 32 per UID.
+        stats: Optional :class:`~icalendar_anonymizer.AnonymizationStats`
+               that receives the counters of this run
+        memo_size: Number of distinct property values whose anonymized
+                   form is kept for reuse when the same value (with the
+                   same parameters) appears again. 0 disables the memo.
+        consume: Detach each top-level component from cal as soon as it
+                 has been anonymized, so that its memory can be freed
+                 while the rest is processed. cal is left without
+                 components. Use this for large calendars that are not
+                 needed afterwards.
+        observer: Optional
+                  :class:`~icalendar_anonymizer.observe.AnonymizationObserver`
+                  told about each component and property, with the time
+                  taken, see :mod:`icalendar_anonymizer.observe`
+        uid_map: Optional mapping of original to anonymized UIDs, filled in
+                 while anonymizing. Pass the same mapping and the same salt
+                 to anonymize several calendars that refer to each other's
+                 UIDs. Cannot be combined with ``pseudonyms``.
+        limits: Optional :class:`~icalendar_anonymizer.limits.Limits` on the
+                number of components and properties and the nesting depth.
+                Each top-level component is checked before it is
+                anonymized. Check untrusted data with
+                :func:`~icalendar_anonymizer.limits.check_ical` before
+                parsing it.
+        mapping: Optional
+                 :class:`~icalendar_anonymizer.mapping.MappingRecorder`
+                 recording each UID, email address and common name with
+                 its pseudonym, for an encrypted reverse lookup, see
+                 :mod:`icalendar_anonymizer.mapping`
 
     Returns:
         New anonymized Calendar object
 
     Raises:
         TypeError: If cal is not a Calendar object or salt is not bytes
+        ValueError: If memo_size is negative or uid_map is combined with
+                    pseudonyms
+        LimitExceeded: If cal exceeds limits
+    """
+    new_cal, components = anonymize_components(
+        cal,
+        salt=salt,
+        preserve=preserve,
+        placeholders=placeholders,
+        pseudonyms=pseudonyms,
+        hash_format=hash_format,
+        stats=stats,
+        memo_size=memo_size,
+        consume=consume,
+        observer=observer,
+        uid_map=uid_map,
+        limits=limits,
+        mapping=mapping,
+    )
+    for component in components:
+        new_cal.add_component(component)
+
+    return new_cal
+
+
+def anonymize_components(
+    cal: Calendar,
+    salt: bytes | None = None,
+    preserve: set[str] | None = None,
+    placeholders: dict[str, int] | None = None,
+    pseudonyms: bool = False,  # noqa: FBT001
+    hash_format: HashFormat | None = None,
+    stats: AnonymizationStats | None = None,
+    memo_size: int = DEFAULT_MEMO_SIZE,
+    consume: bool = False,  # noqa: FBT001
+    observer: AnonymizationObserver | None = None,
+    uid_map: dict[str, str] | None = None,
+    limits: Limits | None = None,
+    mapping: MappingRecorder | None = None,
+) -> tuple[Calendar, Iterator[Component]]:
+    """Anonymize an iCalendar object one top-level component at a time.
+
+    Works like :func:`anonymize`, but does not build the complete anonymized
+    calendar. Serializers can write each component as soon as it has been
+    anonymized, so the anonymized copy never exists in memory as a whole.
+
+    Args:
+        cal: The Calendar object to anonymize
+        salt: Optional salt for hashing. If None, generates random salt.
+        preserve: Optional set of additional property names to preserve.
+        placeholders: Optional mapping of property names to the length above
+                      which values are replaced by a placeholder.
+        pseudonyms: Use sequential pseudonyms instead of hashes.
+        hash_format: Encoding and length of the hashes.
+        stats: Optional statistics receiving the counters of this run.
+        memo_size: Number of anonymized property values kept for reuse.
+        consume: Detach top-level components from cal as they are
+                 anonymized. If the iterator is not exhausted, the
+                 components that were not reached are put back.
+        observer: Optional observer of components and properties.
+        uid_map: Optional mapping of UIDs shared with other runs.
+        limits: Optional limits, checked for each top-level component
+                before it is anonymized.
+        mapping: Optional recorder of pseudonyms and original values.
+
+    Returns:
+        Tuple of the anonymized calendar without subcomponents (holding only
+        calendar-level properties) and an iterator over the anonymized
+        top-level components
+
+    Raises:
+        TypeError: If cal is not a Calendar object or salt is not bytes
+        ValueError: If memo_size is negative or uid_map is combined with
+                    pseudonyms
+        LimitExceeded: If the calendar properties exceed limits. Components
+                       exceeding limits raise it from the iterator.
     """
     if not isinstance(cal, Calendar):
         raise TypeError(f"Expected Calendar, got {type(cal).__name__}")
@@ -74,57 +221,332 @@ def anonymize(
     if preserve is not None and not isinstance(preserve, set):
         raise TypeError(f"preserve must be a set or None, got {type(preserve).__name__}")
 
-    # Normalize preserve set to uppercase
+    if placeholders is not None and not isinstance(placeholders, dict):
+        raise TypeError(f"placeholders must be a dict or None, got {type(placeholders).__name__}")
+
+    if hash_format is None:
+        hash_format = DEFAULT_HASH_FORMAT
+    elif not isinstance(hash_format, HashFormat):
+        raise TypeError(
+            f"hash_format must be a HashFormat or None, got {type(hash_format).__name__}"
+        )
+
+    if stats is not None and not isinstance(stats, AnonymizationStats):
+        raise TypeError(f"stats must be an AnonymizationStats or None, got {type(stats).__name__}")
+
+    if observer is not None and not isinstance(observer, AnonymizationObserver):
+        raise TypeError(
+            f"observer must be an AnonymizationObserver or None, got {type(observer).__name__}"
+        )
+
+    if limits is not None and not isinstance(limits, Limits):
+        raise TypeError(f"limits must be a Limits or None, got {type(limits).__name__}")
+
+    if mapping is not None and not isinstance(mapping, MappingRecorder):
+        raise TypeError(f"mapping must be a MappingRecorder or None, got {type(mapping).__name__}")
+
+    if memo_size < 0:
+        raise ValueError(f"memo_size must not be negative, got {memo_size}")
+
+    if uid_map is not None and pseudonyms:
+        raise ValueError("uid_map cannot be combined with pseudonyms")
+
+    # Normalize preserve set and placeholder names to uppercase
     preserve_upper = {p.upper() for p in preserve} if preserve else set()
+    placeholders_upper = {k.upper(): v for k, v in placeholders.items()} if placeholders else {}
 
-    # UID mapping to maintain uniqueness across calendar
-    uid_map: dict[str, str] = {}
+    # Hashes (or pseudonyms) and the UID map of this run
+    hasher = Pseudonymizer(salt) if pseudonyms else Hasher(salt, hash_format)
+    if uid_map is not None:
+        hasher.uid_map = uid_map
+    if mapping is not None:
+        hasher = mapping.hasher(hasher)
+    memo = ValueMemo(memo_size, stats)
+
+    counter = None
+    if limits is not None:
+        counter = _Counter(limits)
+        counter.add_properties(_count_properties(cal))
 
     # Create new calendar to avoid modifying original
     new_cal = Calendar()
 
     # Copy calendar-level properties (applying same filtering rules)
-    for key, value in cal.property_items():
+    for key, value in _own_properties(cal):
         prop_name = key.upper()
         if _should_preserve(prop_name, preserve_upper):
             new_cal.add(key, value)
         else:
             # Anonymize calendar-level properties too
-            anonymized = _anonymize_property_value(value, salt)
+            anonymized = _anonymize_property_value(value, hasher, placeholders_upper.get(prop_name))
             new_cal.add(key, anonymized)
 
+    components = _consume(cal.subcomponents) if consume else cal.subcomponents
+    return new_cal, _iter_anonymized_components(
+        components, hasher, memo, preserve_upper, placeholders_upper, observer, counter
+    )
+
+
+def anonymize_many(
+    calendars: Iterable[Calendar],
+    salt: bytes | None = None,
+    preserve: set[str] | None = None,
+    placeholders: dict[str, int] | None = None,
+    hash_format: HashFormat | None = None,
+    memo_size: int = DEFAULT_MEMO_SIZE,
+    consume: bool = False,  # noqa: FBT001
+    uid_map: dict[str, str] | None = None,
+    limits: Limits | None = None,
+    workers: int | None = None,
+) -> list[Calendar]:
+    """Anonymize several calendars in a pool of threads.
+
+    All calendars are anonymized with the same salt and UID mapping, so
+    references between them are kept. The calendars are shared with the
+    threads, not copied or pickled. On the free-threaded build of Python the
+    threads run on all cores; with the GIL they take turns, and the result is
+    the same as anonymizing one calendar after the other.
+
+    Args:
+        calendars: The Calendar objects to anonymize
+        salt: Optional salt for hashing. If None, generates one random salt
+              for all calendars.
+        preserve: Optional set of additional property names to preserve.
+        placeholders: Optional mapping of property names to the length above
+                      which values are replaced by a placeholder.
+        hash_format: Encoding and length of the hashes.
+        memo_size: Number of anonymized property values kept for reuse, per
+                   calendar.
+        consume: Detach top-level components from each calendar as they
+                 are anonymized.
+        uid_map: Optional mapping of UIDs shared with other runs.
+        limits: Optional limits, checked for each calendar on its own.
+        workers: Number of threads, by default the number of CPUs. 1
+                 anonymizes the calendars in the calling thread.
+
+    Returns:
+        New anonymized Calendar objects, in the order of calendars
+
+    Raises:
+        TypeError: If a calendar is not a Calendar object or an argument
+                   has the wrong type
+        ValueError: If workers is not positive or memo_size is negative
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+
+    anonymize_one = partial(
+        anonymize,
+        salt=generate_salt() if salt is None else salt,
+        preserve=preserve,
+        placeholders=placeholders,
+        hash_format=hash_format,
+        memo_size=memo_size,
+        consume=consume,
+        # Threads may add the same UID at once, but they add the same value
+        uid_map={} if uid_map is None else uid_map,
+        limits=limits,
+    )
+    calendars = list(calendars)
+    if workers == 1 or len(calendars) < 2:
+        return [anonymize_one(cal) for cal in calendars]
+    with ThreadPoolExecutor(
+        max_workers=min(workers, len(calendars)), thread_name_prefix="ican-anonymize"
+    ) as executor:
+        return list(executor.map(anonymize_one, calendars))
+
+
+def _consume(components: list[Component]) -> Iterator[Component]:
+    """Yield components while detaching them from their list.
+
+    The list is emptied first, so each component is only referenced until
+    the caller moves on to the next one.
+
+    Args:
+        components: The list of components, e.g. ``cal.subcomponents``
+
+    Yields:
+        The components in their original order
+    """
+    # Reversed, so that pop() takes them in order in constant time
+    pending = components[::-1]
+    components.clear()
+    try:
+        while pending:
+            yield pending.pop()
+    finally:
+        # Put back the components that were not reached
+        components.extend(reversed(pending))
+
+
+def _iter_anonymized_components(
+    components: Iterable[Component],
+    hasher: Hasher,
+    memo: ValueMemo,
+    preserve: set[str],
+    placeholders: dict[str, int],
+    observer: AnonymizationObserver | None = None,
+    counter: _Counter | None = None,
+) -> Iterator[Component]:
+    """Yield anonymized copies of top-level components.
+
+    Args:
+        components: The top-level components of the original calendar
+        hasher: Hasher of this run
+        memo: Memo of anonymized values of this run
+        preserve: Set of additional property names to preserve (uppercase)
+        placeholders: Placeholder length thresholds by property name (uppercase)
+        observer: Optional observer of components and properties
+        counter: Optional counter checking the limits of this run
+
+    Yields:
+        Anonymized components in their original order
+    """
     # Process only top-level components (not subcomponents)
-    for component in cal.subcomponents:
+    for component in components:
+        if counter is not None:
+            counter.add_component(component)
+        memo.stats.components += 1
         # Check if this component should be completely preserved
         if should_preserve_component(component.name):
             # VTIMEZONE: preserve entirely
-            new_cal.add_component(component)
+            if observer is not None:
+                observer.component_started(component.name)
+                observer.component_finished(ComponentEvent(component.name, 0.0, preserved=True))
+            yield component
             continue
 
         # Anonymize component
-        new_component = _anonymize_component(component, salt, uid_map, preserve_upper)
-        new_cal.add_component(new_component)
-
-    return new_cal
+        yield _anonymize_component(component, hasher, memo, preserve, placeholders, observer)
 
 
 def _anonymize_component(
     component: Component,
-    salt: bytes,
-    uid_map: dict[str, str],
+    hasher: Hasher,
+    memo: ValueMemo,
     preserve: set[str],
+    placeholders: dict[str, int],
+    observer: AnonymizationObserver | None = None,
 ) -> Component:
     """Anonymize a single component (VEVENT, VTODO, etc.).
 
     Args:
         component: The component to anonymize
-        salt: Salt for hashing
-        uid_map: UID mapping for maintaining uniqueness
+        hasher: Hasher of this run, holding the UID mapping
+        memo: Memo of anonymized values of this run
+        preserve: Set of additional property names to preserve (uppercase)
+        placeholders: Placeholder length thresholds by property name (uppercase)
+        observer: Optional observer of components and properties
+
+    Returns:
+        New anonymized component
+    """
+    if observer is not None:
+        return _observe_component(component, hasher, memo, preserve, placeholders, observer)
+
+    # Subcomponents (e.g., VALARM inside VEVENT) are walked depth first with
+    # a stack instead of recursion, so that deeply nested components cannot
+    # exceed the recursion limit. Each entry holds a component and the copy
+    # of its parent.
+    root = None
+    stack: list[tuple[Component, Component | None]] = [(component, None)]
+    while stack:
+        original, parent = stack.pop()
+        new_component = _empty_copy(original)
+        for key, value in _own_properties(original):
+            new_component.add(
+                key, _anonymize_property(key.upper(), value, hasher, memo, preserve, placeholders)
+            )
+        if parent is None:
+            root = new_component
+        else:
+            parent.add_component(new_component)
+        stack.extend(
+            (subcomponent, new_component) for subcomponent in reversed(original.subcomponents)
+        )
+
+    return root
+
+
+def _observe_component(
+    component: Component,
+    hasher: Hasher,
+    memo: ValueMemo,
+    preserve: set[str],
+    placeholders: dict[str, int],
+    observer: AnonymizationObserver,
+) -> Component:
+    """Anonymize a component like :func:`_anonymize_component`, timing each step.
+
+    Kept apart so that runs without an observer take no timestamps.
+
+    Args:
+        component: The component to anonymize
+        hasher: Hasher of this run, holding the UID mapping
+        memo: Memo of anonymized values of this run
         preserve: Set of additional property names to preserve (uppercase)
+        placeholders: Placeholder length thresholds by property name (uppercase)
+        observer: Observer receiving the events
 
     Returns:
         New anonymized component
     """
+    root = None
+    # Entries hold a component, the copy of its parent and None, or, once
+    # the component was started, the time it was started at
+    stack: list[tuple[Component, Component | None, float | None]] = [(component, None, None)]
+    while stack:
+        original, parent, component_start = stack.pop()
+        if component_start is not None:
+            # All subcomponents are done
+            observer.component_finished(
+                ComponentEvent(original.name, perf_counter() - component_start, preserved=False)
+            )
+            continue
+        observer.component_started(original.name)
+        component_start = perf_counter()
+        new_component = _empty_copy(original)
+
+        for key, value in _own_properties(original):
+            prop_name = key.upper()
+            start = perf_counter()
+            new_value = _anonymize_property(prop_name, value, hasher, memo, preserve, placeholders)
+            elapsed = perf_counter() - start
+            new_component.add(key, new_value)
+            observer.property_anonymized(
+                PropertyEvent(
+                    original.name,
+                    prop_name,
+                    _handler(prop_name, value, preserve, placeholders),
+                    value_size(value),
+                    elapsed,
+                    value,
+                )
+            )
+
+        if parent is None:
+            root = new_component
+        else:
+            parent.add_component(new_component)
+        stack.append((original, None, component_start))
+        stack.extend(
+            (subcomponent, new_component, None) for subcomponent in reversed(original.subcomponents)
+        )
+
+    return root
+
+
+def _empty_copy(component: Component) -> Component:
+    """Create an empty component of the same type.
+
+    Args:
+        component: The original component
+
+    Returns:
+        New component without properties
+    """
     component_types = {
         "VEVENT": Event,
         "VTODO": Todo,
@@ -133,66 +555,206 @@ def _anonymize_component(
     }
 
     component_class = component_types.get(component.name, Component)
-    new_component = component_class()
+    return component_class()
 
-    # Process each property
-    for key, value in component.property_items():
-        prop_name = key.upper()
 
-        # Check if property should be preserved
-        if _should_preserve(prop_name, preserve):
-            # Preserve as-is
-            new_component.add(key, value)
-        elif prop_name == "UID":
-            # Special handling: hash but maintain uniqueness
-            original_uid = str(value)
-            hashed_uid = hash_uid(original_uid, salt, uid_map)
-            new_component.add(key, hashed_uid)
-        elif prop_name in ("ATTENDEE", "ORGANIZER"):
-            # Special handling: anonymize email + CN parameter, preserve others
-            if isinstance(value, vCalAddress):
-                new_value = _anonymize_caladdress(value, salt)
-            else:
-                # Fallback for string values
-                new_value = hash_email(str(value), salt)
-            new_component.add(key, new_value)
-        else:
-            # Default: anonymize (includes SUMMARY, DESCRIPTION, LOCATION,
-            # COMMENT, CONTACT, CATEGORIES, and unknown properties)
-            anonymized_value = _anonymize_property_value(value, salt)
-            new_component.add(key, anonymized_value)
+def _anonymize_property(
+    prop_name: str,
+    value,
+    hasher: Hasher,
+    memo: ValueMemo,
+    preserve: set[str],
+    placeholders: dict[str, int],
+):
+    """Return the value of a property in the anonymized component.
+
+    Args:
+        prop_name: Upper case property name
+        value: The original property value
+        hasher: Hasher of this run, holding the UID mapping
+        memo: Memo of anonymized values of this run
+        preserve: Set of additional property names to preserve (uppercase)
+        placeholders: Placeholder length thresholds by property name (uppercase)
+
+    Returns:
+        The preserved or anonymized value
+    """
+    # Check if property should be preserved
+    if _should_preserve(prop_name, preserve):
+        # Preserve as-is
+        return value
+    if prop_name == "UID":
+        # Special handling: hash but maintain uniqueness
+        return hasher.uid(str(value))
+    # Repeated values (e.g. in recurrence overrides) are anonymized once
+    memo_key = memo.key(prop_name, value)
+    new_value = memo.get(memo_key) if memo_key is not None else None
+    if new_value is None:
+        new_value = _anonymize_value(prop_name, value, hasher, placeholders)
+        if memo_key is not None:
+            memo.put(memo_key, new_value)
+    return new_value
+
+
+def _handler(prop_name: str, value, preserve: set[str], placeholders: dict[str, int]) -> str:
+    """Return how :func:`_anonymize_property` handles a value, for observers.
+
+    Args:
+        prop_name: Upper case property name
+        value: The original property value
+        preserve: Set of additional property names to preserve (uppercase)
+        placeholders: Placeholder length thresholds by property name (uppercase)
+
+    Returns:
+        One of the ``HANDLER_*`` names of :mod:`icalendar_anonymizer.observe`
+    """
+    if _should_preserve(prop_name, preserve):
+        return HANDLER_PRESERVE
+    if prop_name == "UID":
+        return HANDLER_UID
+    if prop_name in ("ATTENDEE", "ORGANIZER"):
+        return HANDLER_CALADDRESS
+    placeholder_length = placeholders.get(prop_name)
+    if (
+        isinstance(value, vBinary)
+        or _is_base64(value)
+        or (
+            placeholder_length is not None
+            and isinstance(value, str)
+            and len(value) > placeholder_length
+        )
+    ):
+        return HANDLER_PLACEHOLDER
+    return HANDLER_TEXT
+
+
+def _anonymize_value(prop_name: str, value, hasher: Hasher, placeholders: dict[str, int]):
+    """Anonymize the value of a property that is not preserved.
+
+    Args:
+        prop_name: Upper case property name, other than UID
+        value: The property value
+        hasher: Hasher of this run
+        placeholders: Placeholder length thresholds by property name (uppercase)
+
+    Returns:
+        Anonymized value
+    """
+    if prop_name in ("ATTENDEE", "ORGANIZER"):
+        # Special handling: anonymize email + CN parameter, preserve others
+        if isinstance(value, vCalAddress):
+            return _anonymize_caladdress(value, hasher)
+        # Fallback for string values
+        return hasher.email(str(value))
+    # Default: anonymize (includes SUMMARY, DESCRIPTION, LOCATION,
+    # COMMENT, CONTACT, CATEGORIES, and unknown properties)
+    return _anonymize_property_value(value, hasher, placeholders.get(prop_name))
 
-    # Process subcomponents (e.g., VALARM inside VEVENT)
-    for subcomponent in component.subcomponents:
-        new_subcomponent = _anonymize_component(subcomponent, salt, uid_map, preserve)
-        new_component.add_component(new_subcomponent)
 
-    return new_component
+def _own_properties(component: Component) -> Iterator[tuple[str, object]]:
+    """Yield the properties of a component, without those of subcomponents.
 
+    ``property_items()`` recurses into subcomponents and includes the
+    BEGIN and END markers by default, which would copy every nested
+    property to the parent and hash each value more than once.
 
-def _anonymize_property_value(value, salt: bytes):
+    Args:
+        component: The component to read
+
+    Yields:
+        Property name and value pairs
+    """
+    for key, value in component.property_items(recursive=False):
+        if key not in ("BEGIN", "END"):
+            yield key, value
+
+
+def _anonymize_property_value(value, hasher: Hasher, placeholder_length: int | None = None):
     """Anonymize a property value.
 
     Args:
         value: The property value to anonymize
-        salt: Salt for hashing
+        hasher: Hasher of this run
+        placeholder_length: Length above which text is replaced by a
+                            placeholder (None: never)
 
     Returns:
         Anonymized value
     """
+    # Binary payloads are never split into words, see _placeholder()
+    if isinstance(value, vBinary) or _is_base64(value):
+        return _placeholder(value, hasher)
+    if (
+        placeholder_length is not None
+        and isinstance(value, str)
+        and len(value) > placeholder_length
+    ):
+        return _placeholder(value, hasher)
+
     # Handle different value types
     if isinstance(value, str):
-        return hash_text(value, salt)
+        return hasher.text(value)
     if isinstance(value, bytes):
-        return hash_text(value.decode("utf-8", errors="replace"), salt).encode("utf-8")
+        return hasher.text(value.decode("utf-8", errors="replace")).encode("utf-8")
     if isinstance(value, list):
         # Handle lists (like CATEGORIES)
-        return [hash_text(str(item), salt) for item in value]
+        return [hasher.text(str(item)) for item in value]
     # For other types, convert to string and hash
-    return hash_text(str(value), salt)
+    return hasher.text(str(value))
+
+
+def _is_base64(value) -> bool:
+    """Check if a value declares ENCODING=BASE64.
+
+    Args:
+        value: A property value
+
+    Returns:
+        True if the value carries base64-encoded data
+    """
+    params = getattr(value, "params", None)
+    return params is not None and str(params.get("ENCODING", "")).upper() == "BASE64"
+
+
+def _placeholder(value, hasher: Hasher) -> vBinary | vText:
+    """Replace a large or binary value with a fixed-size placeholder.
+
+    The payload is hashed in a single pass instead of word by word. The
+    placeholder keeps the declared FMTTYPE and records the approximate
+    original size in the X-ANONYMIZED-SIZE parameter.
+
+    Args:
+        value: The property value to replace
+        hasher: Hasher of this run
+
+    Returns:
+        A vBinary placeholder for binary values, otherwise a vText placeholder
+    """
+    if isinstance(value, vBinary):
+        payload = value.bytes
+        size = len(payload)
+    elif _is_base64(value):
+        payload = str(value)
+        # Decoded size of base64 text
+        size = len(payload) * 3 // 4
+    else:
+        payload = value if isinstance(value, str) else str(value)
+        size = len(payload)
+
+    digest = hasher.payload(payload)
+    params = {
+        key: param_value
+        for key, param_value in getattr(value, "params", {}).items()
+        if key.upper() in PLACEHOLDER_PARAMETERS
+    }
+    params[PLACEHOLDER_SIZE_PARAMETER] = str(approximate_size(size))
+
+    if isinstance(value, vBinary) or _is_base64(value):
+        return vBinary(digest.encode("ascii"), params=params)
+    return vText(digest, params=params)
 
 
-def _anonymize_caladdress(caladdress: vCalAddress, salt: bytes) -> vCalAddress:
+def _anonymize_caladdress(caladdress: vCalAddress, hasher: Hasher) -> vCalAddress:
     """Anonymize ATTENDEE or ORGANIZER (vCalAddress).
 
     Anonymizes the email and CN parameter while preserving mailto: prefix
@@ -200,7 +762,7 @@ def _anonymize_caladdress(caladdress: vCalAddress, salt: bytes) -> vCalAddress:
 
     Args:
         caladdress: The vCalAddress to anonymize
-        salt: Salt for hashing
+        hasher: Hasher of this run
 
     Returns:
         New anonymized vCalAddress
@@ -211,10 +773,10 @@ def _anonymize_caladdress(caladdress: vCalAddress, salt: bytes) -> vCalAddress:
     # Hash the email while preserving mailto: prefix
     if email.startswith("mailto:"):
         email_part = email[7:]  # Remove mailto: prefix
-        hashed_email = hash_email(email_part, salt)
+        hashed_email = hasher.email(email_part)
         new_email = f"mailto:{hashed_email}"
     else:
-        new_email = hash_email(email, salt)
+        new_email = hasher.email(email)
 
     # Create new vCalAddress
     new_caladdress = vCalAddress(new_email)
@@ -223,7 +785,7 @@ def _anonymize_caladdress(caladdress: vCalAddress, salt: bytes) -> vCalAddress:
     for param_key, param_value in caladdress.params.items():
         if param_key.upper() == "CN":
             # Anonymize common name
-            new_caladdress.params[param_key] = hash_caladdress_cn(param_value, salt)
+            new_caladdress.params[param_key] = hasher.cn(param_value)
         else:
             # Preserve other parameters (ROLE, PARTSTAT, RSVP, etc.)
             new_caladdress.params[param_key] = param_value
@@ -7,24 +7,83 @@ Provides the `icalendar-anonymize` and `ican` commands for anonymizing
 iCalendar files from the command line.
 """
 
+import io
+import json
 import sys
-from typing import BinaryIO
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import BinaryIO, TextIO
 
 import click
 from icalendar import Calendar
 
+from ._hash import ENCODINGS, HashFormat
+from ._stats import AnonymizationStats
 from .anonymizer import anonymize
+from .formats import anonymize_to_jcal, anonymize_to_xcal, read_jcal, write_jcal, write_xcal
+from .limits import LimitExceeded, Limits, check_ical, check_lines
+from .mapping import KINDS, MappingFile, MappingRecorder, load_key
+from .profiling import ProfileObserver
+from .quarantine import QuarantinedComponent, parse_tolerant
+from .subset import subset_calendar, subset_ical
+from .verify import verify_no_leaks
 from .version import __version__
 
+# Leaks listed by --verify before the rest is summarized
+_MAX_REPORTED_LEAKS = 20
 
-@click.command(
+# Exit status when the output was written without malformed components
+QUARANTINE_EXIT_CODE = 3
+
+# Accepted formats of --since and --until
+_DATE_FORMATS = ["%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S"]
+
+
+class _DefaultGroup(click.Group):
+    """Click group that runs a default command when no subcommand is given.
+
+    Keeps ``ican input.ics -o output.ics`` working while also providing
+    subcommands such as ``ican watch``.
+    """
+
+    def __init__(self, *args, default_command: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        if not args or args[0] not in self.commands:
+            args = [self.default_command, *args]
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=_DefaultGroup, default_command="anonymize")
+def main() -> None:
+    """Anonymize iCalendar files."""
+
+
+@main.command(
+    "anonymize",
     help=(
         "Anonymize iCalendar files by removing personal data while preserving technical properties."
     ),
     epilog="Examples:\n\n"
     "  icalendar-anonymize input.ics -o output.ics\n"
     "  cat input.ics | icalendar-anonymize > output.ics\n"
-    "  ican -v calendar.ics -o anonymized.ics\n",
+    "  ican -v calendar.ics -o anonymized.ics\n"
+    "  ican --format jcal calendar.ics -o anonymized.json\n"
+    "  ican --verify calendar.ics -o anonymized.ics\n"
+    "  ican --pseudonyms calendar.ics -o anonymized.ics\n"
+    "  ican --tenant acme --master-key-file master.key calendar.ics\n"
+    "  ican --since 2024-01-01 --until 2024-02-01 --only VEVENT calendar.ics\n"
+    "  ican --quarantine quarantine.txt calendar.ics -o anonymized.ics\n"
+    "  ican --mapping-export mapping.bin --mapping-key-file mapping.key calendar.ics\n"
+    "  ican --profile-report profile.json calendar.ics -o anonymized.ics\n\n"
+    "\b\nOther commands:\n"
+    "  ican watch SRC -O DEST    keep an anonymized copy of a directory\n"
+    "  ican sync SRC -O DEST     update an anonymized copy of a directory\n"
+    "  ican mail MAILBOX         anonymize the calendar parts of email\n"
+    "  ican lookup MAPPING ...   find the original values of pseudonyms\n",
 )
 @click.argument(
     "input",
@@ -39,6 +98,129 @@ from .version import __version__
     default="-",
     help="Output file (default: stdout)",
 )
+@click.option(
+    "-f",
+    "--format",
+    "output_format",
+    type=click.Choice(["ics", "jcal", "xcal"], case_sensitive=False),
+    default="ics",
+    show_default=True,
+    help="Output format",
+)
+@click.option(
+    "--since",
+    type=click.DateTime(formats=_DATE_FORMATS),
+    help="Drop components that end before this date or time (UTC)",
+)
+@click.option(
+    "--until",
+    type=click.DateTime(formats=_DATE_FORMATS),
+    help="Drop components that start at or after this date or time (UTC)",
+)
+@click.option(
+    "--only",
+    metavar="NAMES",
+    help="Keep only these component types, comma-separated (e.g. VEVENT,VTODO)",
+)
+@click.option(
+    "--uid",
+    "uids",
+    multiple=True,
+    help="Keep only components with this UID (repeatable)",
+)
+@click.option(
+    "--pseudonyms",
+    is_flag=True,
+    default=False,
+    help="Use short sequential pseudonyms (w1, uid1@anonymous.local) instead of hashes",
+)
+@click.option(
+    "--hash-encoding",
+    type=click.Choice(list(ENCODINGS), case_sensitive=False),
+    default="hex",
+    show_default=True,
+    help="Encoding of hashed words, email addresses and UIDs",
+)
+@click.option(
+    "--hash-length",
+    type=click.IntRange(min=1),
+    help="Characters per hashed word and email part (default: 64 bits' worth)",
+)
+@click.option(
+    "--uid-length",
+    type=click.IntRange(min=1),
+    help="Characters per hashed UID (default: 128 bits' worth)",
+)
+@click.option(
+    "--tenant",
+    help="Hash with the salt of this tenant, derived from --master-key-file",
+)
+@click.option(
+    "--master-key-file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    envvar="ICAN_MASTER_KEY_FILE",
+    help="File holding the master secret of --tenant (env: ICAN_MASTER_KEY_FILE)",
+)
+@click.option(
+    "--quarantine",
+    type=click.File("w", encoding="utf-8", lazy=False),
+    help="Leave out malformed components and write them, redacted, to this file "
+    f"(exit status {QUARANTINE_EXIT_CODE} if there are any)",
+)
+@click.option(
+    "--max-size",
+    type=click.IntRange(min=1),
+    help="Reject input larger than this many bytes",
+)
+@click.option(
+    "--max-line-length",
+    type=click.IntRange(min=1),
+    help="Reject input with a longer content line, in bytes after unfolding",
+)
+@click.option(
+    "--max-components",
+    type=click.IntRange(min=1),
+    help="Reject input with more components",
+)
+@click.option(
+    "--max-properties",
+    type=click.IntRange(min=1),
+    help="Reject input with more properties",
+)
+@click.option(
+    "--max-depth",
+    type=click.IntRange(min=1),
+    help="Reject input with components nested deeper (VEVENT: 1, VALARM in VEVENT: 2)",
+)
+@click.option(
+    "--mapping-export",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Write pseudonyms and their original values to this encrypted file, see 'ican lookup'",
+)
+@click.option(
+    "--mapping-key-file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    envvar="ICAN_MAPPING_KEY_FILE",
+    help="File holding the key of --mapping-export (env: ICAN_MAPPING_KEY_FILE)",
+)
+@click.option(
+    "--mapping-words",
+    is_flag=True,
+    default=False,
+    help="Also write each word of anonymized text to --mapping-export",
+)
+@click.option(
+    "--profile-report",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    help="Write counts and sizes describing the input's structure, without its values, "
+    "to this JSON file",
+)
+@click.option(
+    "--verify",
+    is_flag=True,
+    default=False,
+    help="Check the output for personal data of the input; write nothing if any is found",
+)
 @click.option(
     "-v",
     "--verbose",
@@ -47,17 +229,91 @@ from .version import __version__
     help="Show processing information",
 )
 @click.version_option(version=__version__, prog_name="icalendar-anonymizer")
-def main(input: BinaryIO, output: BinaryIO, verbose: bool) -> None:  # noqa: A002, FBT001
+def anonymize_command(
+    input: BinaryIO,  # noqa: A002
+    output: BinaryIO,
+    output_format: str,
+    since: datetime | None,
+    until: datetime | None,
+    only: str | None,
+    uids: tuple[str, ...],
+    pseudonyms: bool,  # noqa: FBT001
+    hash_encoding: str,
+    hash_length: int | None,
+    uid_length: int | None,
+    tenant: str | None,
+    master_key_file: Path | None,
+    quarantine: TextIO | None,
+    max_size: int | None,
+    max_line_length: int | None,
+    max_components: int | None,
+    max_properties: int | None,
+    max_depth: int | None,
+    mapping_export: Path | None,
+    mapping_key_file: Path | None,
+    mapping_words: bool,  # noqa: FBT001
+    profile_report: Path | None,
+    verify: bool,  # noqa: FBT001
+    verbose: bool,  # noqa: FBT001
+) -> None:
     """Anonymize an iCalendar file.
 
-    Reads an ICS file, anonymizes personal data, and writes the result.
-    Supports stdin/stdout for Unix-style piping.
+    Reads an ICS or jCal file, anonymizes personal data, and writes the
+    result. Supports stdin/stdout for Unix-style piping.
 
     Args:
         input: Input file handle (stdin or file)
         output: Output file handle (stdout or file)
+        output_format: One of "ics", "jcal" or "xcal"
+        since: Drop components ending before this time
+        until: Drop components starting at or after this time
+        only: Comma-separated component names to keep
+        uids: UIDs of components to keep
+        pseudonyms: Whether to use sequential pseudonyms instead of hashes
+        hash_encoding: One of "hex", "base32" or "base36"
+        hash_length: Characters per hashed word and email part
+        uid_length: Characters per hashed UID, before ``@anonymous.local``
+        tenant: Tenant whose salt is used, stable across runs
+        master_key_file: File holding the master secret of the tenants
+        quarantine: File receiving malformed components, which are left out
+                    instead of failing the whole input
+        max_size: Largest accepted input in bytes
+        max_line_length: Longest accepted content line in bytes
+        max_components: Most accepted components
+        max_properties: Most accepted properties
+        max_depth: Deepest accepted nesting of components
+        mapping_export: File receiving the encrypted reverse lookup
+        mapping_key_file: File holding the key of the reverse lookup
+        mapping_words: Whether to add words of text to the reverse lookup
+        profile_report: File receiving the profile of the input
+        verify: Whether to check the output for leaked personal data
         verbose: Whether to show processing information
     """
+    try:
+        hash_format = HashFormat(
+            hash_encoding.lower(),
+            text_length=hash_length,
+            email_length=hash_length,
+            uid_length=uid_length,
+        )
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    salt = None
+    if tenant is not None:
+        salt = _tenant_salt(tenant, master_key_file, pseudonyms)
+
+    limits = Limits(max_size, max_line_length, max_components, max_properties, max_depth)
+    if limits == Limits():
+        limits = None
+
+    mapping = mapping_key = None
+    if mapping_export is not None:
+        mapping_key = _mapping_key(mapping_key_file)
+        mapping = MappingRecorder(words=mapping_words)
+    profile = ProfileObserver() if profile_report is not None else None
+
     try:
         # Get file names for verbose output
         input_name = _get_stream_name(input)
@@ -66,43 +322,143 @@ def main(input: BinaryIO, output: BinaryIO, verbose: bool) -> None:  # noqa: A00
         if verbose:
             click.echo(f"Reading from: {input_name}", err=True)
 
-        # Read ICS data
-        ics_data = input.read()
+        # Read up to the first line that is not blank: jCal documents are
+        # JSON arrays
+        head = _read_head(input)
 
-        if not ics_data:
+        if not head:
             click.echo("Error: Input is empty", err=True)
             sys.exit(1)
 
+        is_jcal = head.lstrip()[:1] == b"["
+        # With --quarantine, iCalendar data is parsed as it is read
+        streamed = quarantine is not None and not is_jcal
+        ics_data = head if streamed else head + input.read()
+
         if verbose:
             click.echo("Parsing calendar...", err=True)
 
         # Parse calendar
+        subset = {
+            "since": since,
+            "until": until,
+            "only": only.split(",") if only else None,
+            "uids": uids or None,
+        }
+        filtered = any(value is not None for value in subset.values())
+        quarantined: list[QuarantinedComponent] = []
         try:
-            cal = Calendar.from_ical(ics_data)
+            if limits is not None and not streamed:
+                # Rejected before parsing; jCal is checked while anonymizing
+                check_ical(ics_data, limits if not is_jcal else Limits(max_size=max_size))
+            if is_jcal:
+                cal = read_jcal(ics_data)
+                if filtered:
+                    cal = subset_calendar(cal, **subset)
+            elif streamed:
+                lines = chain(ics_data.splitlines(keepends=True), input)
+                if limits is not None:
+                    lines = check_lines(lines, limits)
+                # Filter after parsing, so that line numbers refer to the input
+                cal, quarantined = parse_tolerant(lines, quarantine)
+                if filtered:
+                    cal = subset_calendar(cal, **subset)
+            else:
+                if filtered:
+                    # Dropped components are never parsed
+                    ics_data = subset_ical(ics_data, **subset)
+                cal = Calendar.from_ical(ics_data)
+        except LimitExceeded as e:
+            click.echo(f"Error: {e}", err=True)
+            sys.exit(1)
         except ValueError as e:
-            click.echo(f"Error: Invalid ICS file - {e}", err=True)
+            click.echo(f"Error: Invalid {'jCal' if is_jcal else 'ICS'} file - {e}", err=True)
             sys.exit(1)
 
         if verbose:
             click.echo("Anonymizing calendar...", err=True)
+        stats = AnonymizationStats()
+
+        if output_format != "ics" and not verify:
+            if verbose:
+                click.echo(f"Writing {output_format} to: {output_name}", err=True)
+            # Components are anonymized while they are written
+            writer = anonymize_to_jcal if output_format == "jcal" else anonymize_to_xcal
+            _write_text(
+                output,
+                cal,
+                lambda cal, fp: writer(
+                    cal,
+                    fp,
+                    salt=salt,
+                    pseudonyms=pseudonyms,
+                    hash_format=hash_format,
+                    stats=stats,
+                    consume=True,
+                    limits=limits,
+                    mapping=mapping,
+                    observer=profile,
+                ),
+            )
+            if verbose:
+                _echo_stats(stats)
+            _write_mapping(mapping, mapping_export, mapping_key, verbose)
+            _write_profile(profile, profile_report, verbose)
+            if verbose:
+                click.echo("Done.", err=True)
+            _exit_if_quarantined(quarantined, quarantine)
+            return
 
         # Anonymize (uses random salt by default)
         try:
-            anonymized_cal = anonymize(cal)
+            # The original is only needed afterwards to check for leaks
+            anonymized_cal = anonymize(
+                cal,
+                salt=salt,
+                pseudonyms=pseudonyms,
+                hash_format=hash_format,
+                stats=stats,
+                consume=not verify,
+                limits=limits,
+                mapping=mapping,
+                observer=profile,
+            )
         except TypeError as e:
             # This shouldn't happen with valid Calendar object, but catch it anyway
             click.echo(f"Error: Anonymization failed - {e}", err=True)
             sys.exit(1)
 
+        if verbose:
+            _echo_stats(stats)
+
+        if verify:
+            if verbose:
+                click.echo("Checking output for leaks...", err=True)
+            _verify_or_exit(cal, anonymized_cal)
+
         if verbose:
             click.echo(f"Writing to: {output_name}", err=True)
 
         # Write output
-        output.write(anonymized_cal.to_ical())
+        if output_format == "ics":
+            output.write(anonymized_cal.to_ical())
+        else:
+            writer = write_jcal if output_format == "jcal" else write_xcal
+            _write_text(
+                output,
+                anonymized_cal,
+                lambda cal, fp: writer(cal, cal.subcomponents, fp),
+            )
 
+        _write_mapping(mapping, mapping_export, mapping_key, verbose)
+        _write_profile(profile, profile_report, verbose)
         if verbose:
             click.echo("Done.", err=True)
+        _exit_if_quarantined(quarantined, quarantine)
 
+    except LimitExceeded as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
     except OSError as e:
         # Handle file I/O errors (permission denied, disk full, etc.)
         click.echo(f"Error: {e}", err=True)
@@ -121,6 +477,521 @@ def main(input: BinaryIO, output: BinaryIO, verbose: bool) -> None:  # noqa: A00
         sys.exit(1)
 
 
+@main.command(
+    "watch",
+    help="Keep an anonymized copy of a directory of calendar files up to date.",
+    epilog="Example:\n\n  ican watch ~/.calendars/work -O /srv/staging/work\n",
+)
+@click.argument(
+    "source",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "-O",
+    "--output-dir",
+    "destination",
+    required=True,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory receiving the anonymized files",
+)
+@click.option(
+    "--state-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory holding the persistent salt (default: <output-dir>.ican-state)",
+)
+@click.option(
+    "--debounce",
+    type=click.FloatRange(min=0),
+    default=0.5,
+    show_default=True,
+    help="Seconds to wait for further writes before processing a file",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of files anonymized in parallel",
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.01),
+    default=1.0,
+    show_default=True,
+    help="Seconds between checks when polling",
+)
+@click.option(
+    "--polling",
+    is_flag=True,
+    default=False,
+    help="Poll for changes even if inotify is available",
+)
+@click.option(
+    "--once",
+    is_flag=True,
+    default=False,
+    help="Synchronize once and exit instead of watching",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Show processed files and latency statistics",
+)
+def watch_command(
+    source: Path,
+    destination: Path,
+    state_dir: Path | None,
+    debounce: float,
+    workers: int,
+    poll_interval: float,
+    polling: bool,  # noqa: FBT001
+    once: bool,  # noqa: FBT001
+    verbose: bool,  # noqa: FBT001
+) -> None:
+    """Mirror a directory of calendars into an anonymized copy.
+
+    Args:
+        source: Directory with the original calendar files
+        destination: Directory receiving the anonymized files
+        state_dir: Directory holding the persistent salt
+        debounce: Seconds without writes before a file is processed
+        workers: Number of worker threads
+        poll_interval: Seconds between checks when polling
+        polling: Whether to force the polling backend
+        once: Whether to exit after the initial synchronization
+        verbose: Whether to show processing information
+    """
+    from ._vdir import default_state_dir, load_or_create_salt
+    from .watch import DirectoryWatcher, create_backend
+
+    report = (lambda message: click.echo(message, err=True)) if verbose else None
+    try:
+        salt = load_or_create_salt(state_dir or default_state_dir(destination))
+        watcher = DirectoryWatcher(
+            source,
+            destination,
+            salt,
+            debounce=debounce,
+            workers=workers,
+            poll_interval=poll_interval,
+            backend=create_backend(source, polling=polling),
+            report=report,
+        )
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    try:
+        watcher.sync()
+        if not once:
+            if verbose:
+                click.echo(f"Watching {source} ({watcher.backend.name})...", err=True)
+            watcher.run()
+    except KeyboardInterrupt:
+        # Ctrl+C is the normal way to stop watching
+        pass
+    finally:
+        watcher.close()
+
+    if verbose:
+        summary = [
+            f"{key}: {value:.3f}s" if isinstance(value, float) else f"{key}: {value}"
+            for key, value in watcher.stats.as_dict().items()
+            if value is not None
+        ]
+        click.echo(", ".join(summary), err=True)
+
+
+@main.command(
+    "sync",
+    help="Anonymize the new and changed calendar files of a directory since the last run.",
+    epilog="Example:\n\n  ican sync ~/.calendars/work -O /srv/staging/work\n",
+)
+@click.argument(
+    "source",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+)
+@click.option(
+    "-O",
+    "--output-dir",
+    "destination",
+    required=True,
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory receiving the anonymized files",
+)
+@click.option(
+    "--state-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Directory holding the persistent salt and the index (default: <output-dir>.ican-state)",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Number of files anonymized in parallel",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Show the number of updated, touched and removed files",
+)
+def sync_command(
+    source: Path,
+    destination: Path,
+    state_dir: Path | None,
+    workers: int,
+    verbose: bool,  # noqa: FBT001
+) -> None:
+    """Update an anonymized copy of a directory of calendars.
+
+    Exits with status 1 if any file could not be anonymized.
+
+    Args:
+        source: Directory with the original calendar files
+        destination: Directory receiving the anonymized files
+        state_dir: Directory holding the persistent salt and the index
+        workers: Number of worker threads
+        verbose: Whether to show processing information
+    """
+    from .sync import sync_directory
+
+    try:
+        result = sync_directory(source, destination, state_dir, workers=workers)
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    for relpath, error in result.failed.items():
+        click.echo(f"Failed to anonymize {relpath}: {error}", err=True)
+    if verbose:
+        click.echo(
+            f"scanned: {result.scanned}, updated: {result.updated}, touched: {result.touched}, "
+            f"removed: {result.removed}, failed: {len(result.failed)}, "
+            f"seconds: {result.seconds:.3f}",
+            err=True,
+        )
+    if result.failed:
+        sys.exit(1)
+
+
+@main.command(
+    "mail",
+    help="Anonymize the calendar parts of an email message (.eml) or an mbox archive.",
+    epilog="Examples:\n\n"
+    "  ican mail invitation.eml -o invitation.ics\n"
+    "  ican mail --messages bug-reports.mbox -o rewritten.mbox\n",
+)
+@click.argument(
+    "input",
+    type=click.File("rb"),
+    default="-",
+    required=False,
+)
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("wb"),
+    default="-",
+    help="Output file (default: stdout)",
+)
+@click.option(
+    "--messages",
+    is_flag=True,
+    default=False,
+    help="Write the messages with their calendar parts anonymized, instead of the calendars; "
+    "headers and other parts are not anonymized",
+)
+@click.option(
+    "--tenant",
+    help="Hash with the salt of this tenant, derived from --master-key-file",
+)
+@click.option(
+    "--master-key-file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    envvar="ICAN_MASTER_KEY_FILE",
+    help="File holding the master secret of --tenant (env: ICAN_MASTER_KEY_FILE)",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of calendar parts anonymized in parallel (default: number of CPUs)",
+)
+@click.option(
+    "-v",
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Show the number of messages and calendar parts",
+)
+def mail_command(
+    input: BinaryIO,  # noqa: A002
+    output: BinaryIO,
+    messages: bool,  # noqa: FBT001
+    tenant: str | None,
+    master_key_file: Path | None,
+    workers: int | None,
+    verbose: bool,  # noqa: FBT001
+) -> None:
+    """Anonymize the calendar parts of email.
+
+    All parts are anonymized with the same salt, so UIDs and addresses
+    get the same pseudonyms in all messages.
+
+    Args:
+        input: A message or an mbox archive
+        output: Output file handle (stdout or file)
+        messages: Whether to write the messages instead of the calendars
+        tenant: Tenant whose salt is used, stable across runs
+        master_key_file: File holding the master secret of the tenants
+        workers: Number of worker threads
+        verbose: Whether to show processing information
+    """
+    from .mail import anonymize_mail
+
+    salt = None
+    if tenant is not None:
+        salt = _tenant_salt(tenant, master_key_file, pseudonyms=False)
+
+    try:
+        result = anonymize_mail(input, output, rewrite=messages, salt=salt, workers=workers)
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    if verbose:
+        click.echo(
+            f"messages: {result.messages}, calendar parts: {result.parts}, "
+            f"seconds: {result.seconds:.3f}",
+            err=True,
+        )
+    if not result.parts:
+        click.echo("Warning: No calendar parts found", err=True)
+
+
+def _tenant_salt(tenant: str, master_key_file: Path | None, pseudonyms: bool) -> bytes:  # noqa: FBT001
+    """Return the salt of a tenant, or exit with an error.
+
+    Args:
+        tenant: The tenant ID
+        master_key_file: File holding the master secret
+        pseudonyms: Whether pseudonyms were requested, which ignore the salt
+
+    Returns:
+        The salt derived for the tenant
+    """
+    from .tenants import TenantKeyring
+
+    if pseudonyms:
+        click.echo("Error: --tenant cannot be combined with --pseudonyms", err=True)
+        sys.exit(1)
+    if master_key_file is None:
+        click.echo("Error: --tenant requires --master-key-file", err=True)
+        sys.exit(1)
+    try:
+        return TenantKeyring.from_file(master_key_file).anonymizer_for(tenant).salt
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+
+@main.command(
+    "lookup",
+    help="Find the original values of pseudonyms in a mapping written with --mapping-export.",
+    epilog="Example:\n\n  ican lookup mapping.bin --key-file mapping.key 5f3a...@anonymous.local\n",
+)
+@click.argument("mapping", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("pseudonyms", nargs=-1, required=True)
+@click.option(
+    "--key-file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    envvar="ICAN_MAPPING_KEY_FILE",
+    required=True,
+    help="File holding the key of the mapping (env: ICAN_MAPPING_KEY_FILE)",
+)
+@click.option(
+    "--kind",
+    "kinds",
+    type=click.Choice(KINDS, case_sensitive=False),
+    multiple=True,
+    help="Look only for pseudonyms of this kind (repeatable, default: all)",
+)
+def lookup_command(
+    mapping: Path,
+    pseudonyms: tuple[str, ...],
+    key_file: Path,
+    kinds: tuple[str, ...],
+) -> None:
+    """Print the original values of pseudonyms, one tab-separated line each.
+
+    Exits with status 1 if any pseudonym is not found.
+
+    Args:
+        mapping: The mapping file
+        pseudonyms: Pseudonyms to look up
+        key_file: File holding the key of the mapping
+        kinds: Kinds of values to look for
+    """
+    key = _mapping_key(key_file)
+    try:
+        mapping_file = MappingFile(mapping, key)
+    except (OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    missing = 0
+    with mapping_file:
+        for pseudonym in pseudonyms:
+            found = mapping_file.lookup(pseudonym, tuple(kind.lower() for kind in kinds) or KINDS)
+            if not found:
+                click.echo(f"Not found: {pseudonym}", err=True)
+                missing += 1
+            for kind, original in found:
+                click.echo(f"{pseudonym}\t{kind}\t{original}")
+    if missing:
+        sys.exit(1)
+
+
+def _mapping_key(key_file: Path | None) -> bytes:
+    """Return the key of a mapping file, or exit with an error.
+
+    Args:
+        key_file: File holding the key
+
+    Returns:
+        The key
+    """
+    if key_file is None:
+        click.echo("Error: --mapping-export requires --mapping-key-file", err=True)
+        sys.exit(1)
+    try:
+        return load_key(key_file)
+    except (ImportError, OSError, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+
+def _write_mapping(
+    mapping: MappingRecorder | None,
+    path: Path | None,
+    key: bytes | None,
+    verbose: bool,  # noqa: FBT001
+) -> None:
+    """Write the recorded reverse lookup, if requested.
+
+    Args:
+        mapping: Recorder of pseudonyms, None if no mapping was requested
+        path: File receiving the mapping
+        key: Key of the mapping
+        verbose: Whether to show processing information
+    """
+    if mapping is None:
+        return
+    count = mapping.write(path, key)
+    if verbose:
+        click.echo(f"Wrote {count} mappings to: {path}", err=True)
+
+
+def _write_profile(profile: ProfileObserver | None, path: Path, verbose: bool) -> None:  # noqa: FBT001
+    """Write the profile of the input as JSON.
+
+    Args:
+        profile: Observer holding the profile, None if no report was requested
+        path: File receiving the report
+        verbose: Whether to show processing information
+    """
+    if profile is None:
+        return
+    with path.open("w", encoding="utf-8") as fp:
+        json.dump(profile.report(), fp, indent=2)
+        fp.write("\n")
+    if verbose:
+        click.echo(f"Wrote profile to: {path}", err=True)
+
+
+def _echo_stats(stats: AnonymizationStats) -> None:
+    """Show the statistics of an anonymization run on stderr.
+
+    Args:
+        stats: The statistics of the run
+    """
+    lookups = stats.memo_hits + stats.memo_misses
+    hit_rate = f"{stats.memo_hit_rate:.1%}" if lookups else "-"
+    click.echo(
+        f"Components: {stats.components}, memo hit rate: {hit_rate} ({stats.memo_hits}/{lookups})",
+        err=True,
+    )
+
+
+def _exit_if_quarantined(quarantined: list[QuarantinedComponent], quarantine: TextIO) -> None:
+    """Report malformed components that were left out and exit if there are any."""
+    if not quarantined:
+        return
+    click.echo(
+        f"Warning: {len(quarantined)} malformed component(s) left out, "
+        f"see {_get_stream_name(quarantine)}",
+        err=True,
+    )
+    sys.exit(QUARANTINE_EXIT_CODE)
+
+
+def _verify_or_exit(original: Calendar, anonymized: Calendar) -> None:
+    """Exit with an error if the anonymized calendar leaks personal data.
+
+    Args:
+        original: The calendar before anonymization
+        anonymized: The anonymized calendar
+    """
+    leaks = verify_no_leaks(original, anonymized)
+    if not leaks:
+        return
+    for leak in leaks[:_MAX_REPORTED_LEAKS]:
+        click.echo(f"Leak: {leak.token!r} from {leak.source} in line {leak.line}", err=True)
+    if len(leaks) > _MAX_REPORTED_LEAKS:
+        click.echo(f"... and {len(leaks) - _MAX_REPORTED_LEAKS} more", err=True)
+    click.echo(f"Error: Found {len(leaks)} leaked tokens, no output written", err=True)
+    sys.exit(1)
+
+
+def _write_text(output: BinaryIO, cal: Calendar, writer) -> None:
+    """Run a text serializer on a binary output stream.
+
+    Args:
+        output: Binary output stream
+        cal: Calendar to pass to the writer
+        writer: Function taking the calendar and a text stream
+    """
+    text_output = io.TextIOWrapper(output, encoding="utf-8", newline="")
+    try:
+        writer(cal, text_output)
+        text_output.flush()
+    finally:
+        # Keep the underlying stream open for Click
+        text_output.detach()
+
+
+def _read_head(stream: BinaryIO) -> bytes:
+    """Read the lines of a stream up to and including the first that is not blank.
+
+    Args:
+        stream: Binary input stream
+
+    Returns:
+        The lines read, empty at the end of the stream
+    """
+    head = b""
+    while not head.strip():
+        line = stream.readline()
+        if not line:
+            break
+        head += line
+    return head
+
+
 def _get_stream_name(stream: BinaryIO) -> str:
     """Get a human-readable name for a stream.
 
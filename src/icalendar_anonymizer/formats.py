@@ -0,0 +1,291 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""jCal (RFC 7265) and xCal (RFC 6321) input and output.
+
+The writers, including the one for iCalendar, serialize components one at
+a time as they are anonymized, so neither the anonymized calendar nor the
+complete JSON or XML document is ever held in memory at once.
+
+Example:
+    .. code-block:: python
+
+        from icalendar_anonymizer.formats import anonymize_to_jcal
+
+        with open("anonymized.json", "w", encoding="utf-8") as f:
+            anonymize_to_jcal(cal, f)
+"""
+
+import json
+from collections.abc import Iterable
+from typing import BinaryIO, TextIO
+from xml.etree import ElementTree as ET
+
+from icalendar import Calendar
+from icalendar.cal import Component
+
+from ._hash import HashFormat
+from ._memo import DEFAULT_MEMO_SIZE
+from ._stats import AnonymizationStats
+from .anonymizer import anonymize_components
+from .limits import Limits
+from .mapping import MappingRecorder
+from .observe import AnonymizationObserver
+
+XCAL_NAMESPACE = "urn:ietf:params:xml:ns:icalendar-2.0"
+
+# Parameters whose xCal value type is not "text" (RFC 6321, section 3.5)
+_XCAL_PARAMETER_TYPES = {
+    "altrep": "uri",
+    "delegated-from": "cal-address",
+    "delegated-to": "cal-address",
+    "dir": "uri",
+    "member": "cal-address",
+    "sent-by": "cal-address",
+}
+
+# Structured values and the xCal element names of their parts
+_XCAL_STRUCTURED = {
+    "geo": ("latitude", "longitude"),
+    "request-status": ("code", "description", "data"),
+}
+
+
+def read_jcal(data: str | bytes) -> Calendar:
+    """Parse a jCal document.
+
+    Args:
+        data: The jCal JSON text
+
+    Returns:
+        The parsed Calendar
+
+    Raises:
+        ValueError: If data is not valid jCal
+    """
+    # json.JSONDecodeError and icalendar's JCalParsingError are ValueErrors
+    cal = Calendar.from_jcal(json.loads(data))
+    if cal.name != "VCALENDAR":
+        raise ValueError(f"Expected vcalendar, got {cal.name.lower()}")
+    return cal
+
+
+def write_ical(calendar: Calendar, components: Iterable[Component], fp: BinaryIO) -> None:
+    """Write a calendar as iCalendar, one component at a time.
+
+    The output is the same as that of ``to_ical()`` on the complete calendar.
+
+    Args:
+        calendar: Calendar holding the calendar-level properties
+        components: Top-level components, written in order as they are produced
+        fp: Binary stream receiving the iCalendar data
+    """
+    end = b"END:VCALENDAR\r\n"
+    header = calendar.to_ical()
+    fp.write(header[: -len(end)])
+    fp.writelines(component.to_ical() for component in components)
+    fp.write(end)
+
+
+def write_jcal(calendar: Calendar, components: Iterable[Component], fp: TextIO) -> None:
+    """Write a calendar as jCal, one component at a time.
+
+    Args:
+        calendar: Calendar holding the calendar-level properties
+        components: Top-level components, written in order as they are produced
+        fp: Text stream receiving the JSON document
+    """
+    header = calendar.to_jcal()
+    fp.write('["vcalendar",')
+    fp.write(json.dumps(header[1], ensure_ascii=False))
+    fp.write(",[")
+    separator = ""
+    for component in components:
+        fp.write(separator)
+        fp.write(json.dumps(component.to_jcal(), ensure_ascii=False))
+        separator = ","
+    fp.write("]]\n")
+
+
+def write_xcal(calendar: Calendar, components: Iterable[Component], fp: TextIO) -> None:
+    """Write a calendar as xCal, one component at a time.
+
+    Args:
+        calendar: Calendar holding the calendar-level properties
+        components: Top-level components, written in order as they are produced
+        fp: Text stream receiving the XML document
+    """
+    properties = ET.Element("properties")
+    for jcal_property in calendar.to_jcal()[1]:
+        properties.append(_xcal_property(jcal_property))
+
+    fp.write('<?xml version="1.0" encoding="utf-8"?>\n')
+    fp.write(f'<icalendar xmlns="{XCAL_NAMESPACE}"><vcalendar>')
+    fp.write(ET.tostring(properties, encoding="unicode"))
+    fp.write("<components>")
+    fp.writelines(
+        ET.tostring(_xcal_component(component.to_jcal()), encoding="unicode")
+        for component in components
+    )
+    fp.write("</components></vcalendar></icalendar>\n")
+
+
+def anonymize_to_jcal(
+    cal: Calendar,
+    fp: TextIO,
+    salt: bytes | None = None,
+    preserve: set[str] | None = None,
+    pseudonyms: bool = False,  # noqa: FBT001
+    hash_format: HashFormat | None = None,
+    stats: AnonymizationStats | None = None,
+    memo_size: int = DEFAULT_MEMO_SIZE,
+    consume: bool = False,  # noqa: FBT001
+    observer: AnonymizationObserver | None = None,
+    limits: Limits | None = None,
+    mapping: MappingRecorder | None = None,
+) -> None:
+    """Anonymize a calendar and write it as jCal.
+
+    Args:
+        cal: The Calendar object to anonymize
+        fp: Text stream receiving the JSON document
+        salt: Optional salt for hashing, see :func:`~icalendar_anonymizer.anonymize`
+        preserve: Optional set of additional property names to preserve
+        pseudonyms: Use sequential pseudonyms instead of hashes
+        hash_format: Encoding and length of the hashes
+        stats: Optional statistics receiving the counters of this run
+        memo_size: Number of anonymized property values kept for reuse
+        consume: Detach components from cal as they are written, see
+                 :func:`~icalendar_anonymizer.anonymize`
+        observer: Optional observer of components and properties, see
+                  :mod:`icalendar_anonymizer.observe`
+        limits: Optional limits on the calendar, see
+                :mod:`icalendar_anonymizer.limits`
+        mapping: Optional recorder of pseudonyms and original values, see
+                 :mod:`icalendar_anonymizer.mapping`
+    """
+    write_jcal(
+        *anonymize_components(
+            cal,
+            salt=salt,
+            preserve=preserve,
+            pseudonyms=pseudonyms,
+            hash_format=hash_format,
+            stats=stats,
+            memo_size=memo_size,
+            consume=consume,
+            observer=observer,
+            limits=limits,
+            mapping=mapping,
+        ),
+        fp,
+    )
+
+
+def anonymize_to_xcal(
+    cal: Calendar,
+    fp: TextIO,
+    salt: bytes | None = None,
+    preserve: set[str] | None = None,
+    pseudonyms: bool = False,  # noqa: FBT001
+    hash_format: HashFormat | None = None,
+    stats: AnonymizationStats | None = None,
+    memo_size: int = DEFAULT_MEMO_SIZE,
+    consume: bool = False,  # noqa: FBT001
+    observer: AnonymizationObserver | None = None,
+    limits: Limits | None = None,
+    mapping: MappingRecorder | None = None,
+) -> None:
+    """Anonymize a calendar and write it as xCal.
+
+    Args:
+        cal: The Calendar object to anonymize
+        fp: Text stream receiving the XML document
+        salt: Optional salt for hashing, see :func:`~icalendar_anonymizer.anonymize`
+        preserve: Optional set of additional property names to preserve
+        pseudonyms: Use sequential pseudonyms instead of hashes
+        hash_format: Encoding and length of the hashes
+        stats: Optional statistics receiving the counters of this run
+        memo_size: Number of anonymized property values kept for reuse
+        consume: Detach components from cal as they are written, see
+                 :func:`~icalendar_anonymizer.anonymize`
+        observer: Optional observer of components and properties, see
+                  :mod:`icalendar_anonymizer.observe`
+        limits: Optional limits on the calendar, see
+                :mod:`icalendar_anonymizer.limits`
+        mapping: Optional recorder of pseudonyms and original values, see
+                 :mod:`icalendar_anonymizer.mapping`
+    """
+    write_xcal(
+        *anonymize_components(
+            cal,
+            salt=salt,
+            preserve=preserve,
+            pseudonyms=pseudonyms,
+            hash_format=hash_format,
+            stats=stats,
+            memo_size=memo_size,
+            consume=consume,
+            observer=observer,
+            limits=limits,
+            mapping=mapping,
+        ),
+        fp,
+    )
+
+
+def _xcal_component(jcal_component: list) -> ET.Element:
+    name, jcal_properties, jcal_subcomponents = jcal_component
+    element = ET.Element(name)
+    if jcal_properties:
+        properties = ET.SubElement(element, "properties")
+        for jcal_property in jcal_properties:
+            properties.append(_xcal_property(jcal_property))
+    if jcal_subcomponents:
+        components = ET.SubElement(element, "components")
+        for jcal_subcomponent in jcal_subcomponents:
+            components.append(_xcal_component(jcal_subcomponent))
+    return element
+
+
+def _xcal_property(jcal_property: list) -> ET.Element:
+    name, parameters, value_type, *values = jcal_property
+    element = ET.Element(name)
+    if parameters:
+        parameters_element = ET.SubElement(element, "parameters")
+        for parameter_name, parameter_value in parameters.items():
+            parameter = ET.SubElement(parameters_element, parameter_name)
+            parameter_type = _XCAL_PARAMETER_TYPES.get(parameter_name, "text")
+            items = parameter_value if isinstance(parameter_value, list) else [parameter_value]
+            for item in items:
+                ET.SubElement(parameter, parameter_type).text = str(item)
+    for value in values:
+        if name in _XCAL_STRUCTURED and isinstance(value, list):
+            # The parts are children of the property element, as in RFC 6321
+            for part_name, part in zip(_XCAL_STRUCTURED[name], value, strict=False):
+                ET.SubElement(element, part_name).text = str(part)
+        else:
+            element.append(_xcal_value(value_type, value))
+    return element
+
+
+def _xcal_value(value_type: str, value) -> ET.Element:
+    element = ET.Element(value_type)
+    if value_type == "recur":
+        for rule_part, rule_value in value.items():
+            items = rule_value if isinstance(rule_value, list) else [rule_value]
+            for item in items:
+                ET.SubElement(element, rule_part).text = str(item)
+    elif value_type == "period":
+        start, end = value
+        ET.SubElement(element, "start").text = start
+        end_name = "duration" if end.lstrip("+-").startswith("P") else "end"
+        ET.SubElement(element, end_name).text = end
+    elif isinstance(value, bool):
+        element.text = "true" if value else "false"
+    elif isinstance(value, list):
+        # Structured text values such as N or ADR-like X- properties
+        element.text = ";".join(str(part) for part in value)
+    else:
+        element.text = str(value)
+    return element
@@ -0,0 +1,250 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Limits on the size and shape of untrusted calendars.
+
+A calendar with millions of tiny properties, deeply nested components or a
+single gigantic folded line costs a lot of CPU time and memory to parse,
+long before anything fails. :func:`check_ical` scans the raw data in one
+pass and rejects it at the first line that exceeds a limit, before it is
+parsed. Calendars that were parsed elsewhere are checked by
+:func:`~icalendar_anonymizer.anonymize` with its ``limits`` argument, one
+top-level component at a time before it is anonymized.
+
+Example:
+    .. code-block:: python
+
+        from icalendar import Calendar
+        from icalendar_anonymizer import anonymize
+        from icalendar_anonymizer.limits import Limits, check_ical
+
+        limits = Limits(max_size=10_000_000, max_properties=100_000)
+        check_ical(data, limits)
+        anonymized = anonymize(Calendar.from_ical(data), limits=limits)
+"""
+
+import io
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from itertools import repeat
+
+from icalendar.cal import Component
+
+
+class LimitExceeded(ValueError):  # noqa: N818
+    """Raised when a calendar exceeds a limit.
+
+    Args:
+        message: Description of the exceeded limit
+        limit: Name of the exceeded attribute of :class:`Limits`
+        maximum: Value of the limit
+        line: Number of the line of the raw data where the limit was
+              exceeded, starting at 1, or None for a parsed calendar
+    """
+
+    def __init__(self, message: str, limit: str, maximum: int, line: int | None = None):
+        super().__init__(message)
+        self.limit = limit
+        self.maximum = maximum
+        self.line = line
+
+
+@dataclass(frozen=True)
+class Limits:
+    """Limits on a calendar. None disables a limit.
+
+    Components and properties of the ``VCALENDAR`` itself are not counted:
+    a ``VEVENT`` has depth 1, a ``VALARM`` inside of it depth 2.
+
+    Attributes:
+        max_size: Bytes of raw data
+        max_line_length: Bytes of a content line of raw data, after
+                         unfolding
+        max_components: Components, including nested components
+        max_properties: Properties, including those of nested components
+                        and of the calendar
+        max_depth: Nesting depth of components
+    """
+
+    max_size: int | None = None
+    max_line_length: int | None = None
+    max_components: int | None = None
+    max_properties: int | None = None
+    max_depth: int | None = None
+
+
+def check_ical(data: bytes, limits: Limits) -> None:
+    r"""Check raw iCalendar data against limits without parsing it.
+
+    Args:
+        data: iCalendar data
+        limits: The limits
+
+    Raises:
+        LimitExceeded: At the first line exceeding a limit
+
+    Examples:
+        >>> data = b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nBEGIN:VALARM\r\n"
+        >>> check_ical(data, Limits(max_depth=1))
+        Traceback (most recent call last):
+        ...
+        icalendar_anonymizer.limits.LimitExceeded: Components are nested deeper than 1 (line 3)
+    """
+    if limits.max_size is not None and len(data) > limits.max_size:
+        raise LimitExceeded(
+            f"Input exceeds the size limit of {limits.max_size} bytes",
+            "max_size",
+            limits.max_size,
+        )
+    # Lines are split as they are scanned, so that the scan stops at the
+    # first line exceeding a limit without first copying all of them
+    _Scanner(limits).scan(map(bytes.rstrip, io.BytesIO(data), repeat(b"\r\n")))
+
+
+def check_lines(lines: Iterable[bytes], limits: Limits) -> Iterator[bytes]:
+    """Pass lines of raw iCalendar data through, checking them against limits.
+
+    Use this to check data while it is read, such as a file opened in
+    binary mode.
+
+    Args:
+        lines: Lines of iCalendar data
+        limits: The limits
+
+    Yields:
+        The lines, unchanged
+
+    Raises:
+        LimitExceeded: At the first line exceeding a limit
+    """
+    scanner = _Scanner(limits)
+    max_size = limits.max_size
+    size = 0
+    for line in lines:
+        if max_size is not None:
+            size += len(line)
+            if size > max_size:
+                raise LimitExceeded(
+                    f"Input exceeds the size limit of {max_size} bytes{_at(scanner.number + 1)}",
+                    "max_size",
+                    max_size,
+                    scanner.number + 1,
+                )
+        scanner.scan((line.rstrip(b"\r\n"),))
+        yield line
+
+
+class _Scanner:
+    """Count the lines, components and properties of raw data."""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.number = 0
+        self.components = 0
+        self.properties = 0
+        self.depth = 0
+        self.length = 0
+
+    def scan(self, lines: Iterable[bytes]) -> None:
+        """Check lines without their line breaks."""
+        limits = self.limits
+        # Disabled limits are never exceeded
+        max_line_length = _or_max(limits.max_line_length)
+        max_components = _or_max(limits.max_components)
+        max_properties = _or_max(limits.max_properties)
+        max_depth = _or_max(limits.max_depth)
+        number, components, properties = self.number, self.components, self.properties
+        depth, length = self.depth, self.length
+        for line in lines:
+            number += 1
+            first = line[:1]
+            if first in (b" ", b"\t"):
+                # Folded continuation, without the leading white space
+                length += len(line) - 1
+            elif not first:
+                length = 0
+                continue
+            else:
+                length = len(line)
+                # Only BEGIN and END lines are looked at more closely
+                marker = line[:6].upper() if first in b"BbEe" else b""
+                if marker == b"BEGIN:":
+                    if line[6:].strip().upper() != b"VCALENDAR":
+                        components += 1
+                        depth += 1
+                        if components > max_components:
+                            raise _too_many("components", max_components, number)
+                        if depth > max_depth:
+                            raise _too_deep(max_depth, number)
+                elif marker[:4] == b"END:":
+                    depth = max(depth - 1, 0)
+                else:
+                    properties += 1
+                    if properties > max_properties:
+                        raise _too_many("properties", max_properties, number)
+            if length > max_line_length:
+                raise LimitExceeded(
+                    f"Content line exceeds the limit of {max_line_length} bytes{_at(number)}",
+                    "max_line_length",
+                    max_line_length,
+                    number,
+                )
+        self.number, self.components, self.properties = number, components, properties
+        self.depth, self.length = depth, length
+
+
+class _Counter:
+    """Count the components and properties of a parsed calendar."""
+
+    def __init__(self, limits: Limits):
+        self.limits = limits
+        self.components = 0
+        self.properties = 0
+
+    def add_properties(self, count: int) -> None:
+        self.properties += count
+        maximum = self.limits.max_properties
+        if maximum is not None and self.properties > maximum:
+            raise _too_many("properties", maximum)
+
+    def add_component(self, component: Component) -> None:
+        """Count a top-level component and its subcomponents, before anonymizing it."""
+        limits = self.limits
+        # A stack instead of recursion, for components nested deeper than
+        # the recursion limit
+        stack = [(component, 1)]
+        while stack:
+            component, depth = stack.pop()
+            self.components += 1
+            if limits.max_components is not None and self.components > limits.max_components:
+                raise _too_many("components", limits.max_components)
+            if limits.max_depth is not None and depth > limits.max_depth:
+                raise _too_deep(limits.max_depth)
+            self.add_properties(_count_properties(component))
+            stack.extend((subcomponent, depth + 1) for subcomponent in component.subcomponents)
+
+
+def _count_properties(component: Component) -> int:
+    # Properties that occur more than once are kept in a list
+    return sum(len(value) if isinstance(value, list) else 1 for value in component.values())
+
+
+def _too_many(what: str, maximum: int, line: int | None = None) -> LimitExceeded:
+    return LimitExceeded(
+        f"Calendar has more than {maximum} {what}{_at(line)}", f"max_{what}", maximum, line
+    )
+
+
+def _too_deep(maximum: int, line: int | None = None) -> LimitExceeded:
+    return LimitExceeded(
+        f"Components are nested deeper than {maximum}{_at(line)}", "max_depth", maximum, line
+    )
+
+
+def _or_max(limit: int | None) -> int:
+    return sys.maxsize if limit is None else limit
+
+
+def _at(line: int | None) -> str:
+    return f" (line {line})" if line is not None else ""
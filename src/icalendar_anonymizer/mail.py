@@ -0,0 +1,312 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Anonymize the calendar parts of email messages.
+
+Reads a single message (``.eml``) or an mbox archive as a stream, one
+message at a time, and anonymizes every calendar part: ``text/calendar``
+and ``application/ics`` parts, and attachments named ``*.ics``, including
+those of forwarded messages. All parts are anonymized with the same salt
+and UID mapping, so an invitation and its updates keep matching UIDs.
+
+Calendar parts are anonymized in a pool of threads while the following
+messages are read. Only a window of messages is held in memory, and the
+output is written in the order of the input. It holds either the
+anonymized calendars, one after the other, or the messages with their
+calendar parts anonymized.
+
+Rewritten messages keep their headers and all other parts as they are.
+Invitations usually repeat the summary, description and attendees in
+their text part, and addresses are in the headers, so rewritten messages
+are not anonymous; use them to reproduce issues of mail clients only.
+
+Example:
+    .. code-block:: python
+
+        from icalendar_anonymizer.mail import anonymize_mail
+
+        with open("invitations.mbox", "rb") as source, open("out.ics", "wb") as output:
+            result = anonymize_mail(source, output)
+        print(result.messages, result.parts)
+"""
+
+import base64
+import email
+import io
+import os
+import quopri
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from email.generator import BytesGenerator
+from email.message import Message
+from functools import partial
+from typing import BinaryIO
+
+from icalendar import Calendar
+
+from ._hash import HashFormat, generate_salt
+from ._memo import DEFAULT_MEMO_SIZE
+from .anonymizer import anonymize
+from .limits import Limits
+
+# Content types of calendar parts, besides attachments named *.ics
+CALENDAR_CONTENT_TYPES = frozenset(("text/calendar", "application/ics"))
+
+_MBOX_SEPARATOR = b"From "
+
+
+@dataclass
+class MailResult:
+    """Outcome of :func:`anonymize_mail`.
+
+    Attributes:
+        messages: Messages read
+        parts: Calendar parts anonymized
+        seconds: Wall time of the run
+    """
+
+    messages: int = 0
+    parts: int = 0
+    seconds: float = 0.0
+
+
+def iter_messages(source: BinaryIO) -> Iterator[tuple[bytes | None, bytes]]:
+    """Yield the messages of an mbox archive or a single message.
+
+    Input starting with a ``From`` line is read as mbox, one message at a
+    time; any other input is a single message. In mbox archives, a
+    ``From`` line starts a message only after a blank line, so that
+    unescaped lines starting with ``From`` in a body do not split it.
+
+    Args:
+        source: Binary stream of the input
+
+    Yields:
+        The ``From`` line of each message, None for a single message, and
+        the message as bytes
+    """
+    first = source.readline()
+    if not first.startswith(_MBOX_SEPARATOR):
+        yield None, first + source.read()
+        return
+    separator, lines = first, []
+    for line in source:
+        if line.startswith(_MBOX_SEPARATOR) and lines and lines[-1] in (b"\n", b"\r\n"):
+            yield separator, b"".join(lines)
+            separator, lines = line, []
+        else:
+            lines.append(line)
+    yield separator, b"".join(lines)
+
+
+def calendar_parts(message: Message) -> list[Message]:
+    """Return the calendar parts of a message, in document order.
+
+    Args:
+        message: A parsed message
+
+    Returns:
+        Parts of the types in :data:`CALENDAR_CONTENT_TYPES` and
+        attachments named ``*.ics``
+    """
+    parts = []
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        filename = part.get_filename() or ""
+        if part.get_content_type() in CALENDAR_CONTENT_TYPES or filename.lower().endswith(".ics"):
+            parts.append(part)
+    return parts
+
+
+def anonymize_mail(
+    source: BinaryIO,
+    output: BinaryIO,
+    rewrite: bool = False,  # noqa: FBT001
+    salt: bytes | None = None,
+    preserve: set[str] | None = None,
+    placeholders: dict[str, int] | None = None,
+    hash_format: HashFormat | None = None,
+    memo_size: int = DEFAULT_MEMO_SIZE,
+    uid_map: dict[str, str] | None = None,
+    limits: Limits | None = None,
+    workers: int | None = None,
+) -> MailResult:
+    """Anonymize the calendar parts of a message or an mbox archive.
+
+    Args:
+        source: Binary stream of a message or an mbox archive
+        output: Binary stream receiving the anonymized calendars, or the
+                messages if rewrite is true
+        rewrite: Write the messages, in the format of the input, with their
+                 calendar parts replaced by the anonymized calendars. Other
+                 parts and the headers are not anonymized.
+        salt: Optional salt for hashing. If None, generates one random salt
+              for all parts.
+        preserve: Optional set of additional property names to preserve.
+        placeholders: Optional mapping of property names to the length above
+                      which values are replaced by a placeholder.
+        hash_format: Encoding and length of the hashes.
+        memo_size: Number of anonymized property values kept for reuse, per
+                   calendar.
+        uid_map: Optional mapping of UIDs shared with other runs.
+        limits: Optional limits, checked for each calendar part on its own.
+        workers: Number of threads, by default the number of CPUs
+
+    Returns:
+        Counters of the run
+
+    Raises:
+        ValueError: If workers is not positive, or a calendar part is
+                    invalid or exceeds the limits; the message is named
+        OSError: If the input cannot be read or the output written
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    elif workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+    started = time.perf_counter()
+
+    anonymize_one = partial(
+        anonymize,
+        salt=generate_salt() if salt is None else salt,
+        preserve=preserve,
+        placeholders=placeholders,
+        hash_format=hash_format,
+        memo_size=memo_size,
+        consume=True,
+        # Threads may add the same UID at once, but they add the same value
+        uid_map={} if uid_map is None else uid_map,
+        limits=limits,
+    )
+    result = MailResult()
+    # Messages whose parts are being anonymized; later messages are read
+    # meanwhile, up to a few per thread
+    window = 4 * workers
+    pending: deque[tuple[int, bytes | None, bytes, Message, list[Message], list[Future]]] = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ican-mail") as executor:
+        try:
+            for separator, data in iter_messages(source):
+                result.messages += 1
+                message = email.message_from_bytes(data)
+                parts = calendar_parts(message)
+                futures = [
+                    executor.submit(_anonymize_part, _decode(part), anonymize_one) for part in parts
+                ]
+                result.parts += len(parts)
+                pending.append((result.messages, separator, data, message, parts, futures))
+                if len(pending) > window:
+                    _write(output, rewrite, *pending.popleft())
+            while pending:
+                _write(output, rewrite, *pending.popleft())
+        except BaseException:
+            # Parts of later messages are not needed anymore
+            executor.shutdown(cancel_futures=True)
+            raise
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _decode(part: Message) -> str:
+    """Return the text of a calendar part, decoded with its charset."""
+    data = part.get_payload(decode=True) or b""
+    try:
+        return data.decode(part.get_content_charset() or "utf-8", errors="replace")
+    except LookupError:
+        # Unknown charset
+        return data.decode("utf-8", errors="replace")
+
+
+def _anonymize_part(text: str, anonymize_one: Callable[[Calendar], Calendar]) -> bytes:
+    """Anonymize the calendars of a part.
+
+    Args:
+        text: The text of the part
+        anonymize_one: Function anonymizing a calendar with the options of the run
+
+    Returns:
+        The anonymized calendars, one after the other, encoded as UTF-8
+    """
+    return b"".join(anonymize_one(cal).to_ical() for cal in Calendar.from_ical(text, multiple=True))
+
+
+def _write(
+    output: BinaryIO,
+    rewrite: bool,  # noqa: FBT001
+    number: int,
+    separator: bytes | None,
+    data: bytes,
+    message: Message,
+    parts: list[Message],
+    futures: list[Future],
+) -> None:
+    """Write the anonymized calendars or the rewritten message, once its parts are done.
+
+    Args:
+        output: Binary stream receiving the output
+        rewrite: Whether to write the message instead of its calendars
+        number: Number of the message in the input, from 1
+        separator: The ``From`` line of the message in an mbox archive
+        data: The original message
+        message: The parsed message
+        parts: The calendar parts of the message
+        futures: The anonymization of each part
+
+    Raises:
+        ValueError: If a calendar part is invalid or exceeds the limits
+    """
+    try:
+        calendars = [future.result() for future in futures]
+    except ValueError as e:
+        raise ValueError(f"Message {number}: {e}") from e
+    if not rewrite:
+        output.writelines(calendars)
+        return
+    if separator is not None:
+        output.write(separator)
+    if not parts:
+        # Left byte for byte as it was
+        output.write(data)
+        return
+    for part, calendar in zip(parts, calendars, strict=True):
+        _replace_payload(part, calendar)
+    linesep = b"\r\n" if b"\r\n" in data[:1024] else b"\n"
+    # Without a maximum line length, headers are written as they were folded
+    policy = message.policy.clone(linesep=linesep.decode(), max_line_length=0)
+    flattened = io.BytesIO()
+    BytesGenerator(flattened, mangle_from_=separator is not None, policy=policy).flatten(message)
+    output.write(flattened.getvalue())
+    if separator is not None and not flattened.getvalue().endswith(linesep * 2):
+        # Blank line before the next From line
+        output.write(linesep if flattened.getvalue().endswith(linesep) else linesep * 2)
+
+
+def _replace_payload(part: Message, calendar: bytes) -> None:
+    """Replace the payload of a part, in its transfer encoding.
+
+    Args:
+        part: A calendar part
+        calendar: The anonymized calendar, encoded as UTF-8
+    """
+    encoding = part.get("Content-Transfer-Encoding", "7bit").strip().lower()
+    if encoding == "base64":
+        payload = base64.encodebytes(calendar).decode("ascii")
+    elif encoding == "quoted-printable":
+        payload = quopri.encodestring(calendar).decode("ascii")
+    else:
+        if encoding == "7bit" and not calendar.isascii():
+            del part["Content-Transfer-Encoding"]
+            part["Content-Transfer-Encoding"] = "8bit"
+        payload = calendar.decode("ascii", errors="surrogateescape")
+    original = part.get_payload()
+    if isinstance(original, str) and not original.endswith("\n"):
+        # The line break before a boundary belongs to the boundary
+        payload = payload.removesuffix("\n").removesuffix("\r")
+    charset = part.get_param("charset")
+    if isinstance(charset, str) and charset.lower() != "utf-8":
+        # Moves the header to the end of the part's headers
+        part.set_param("charset", "utf-8")
+    part.set_payload(payload)
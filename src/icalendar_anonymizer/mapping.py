@@ -0,0 +1,356 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Encrypted reverse lookup from pseudonyms to original values.
+
+Opt-in export of the pseudonyms of an anonymization run and the values
+they replace, so that a UID or an email address from a bug report can be
+taken back to the original by whoever holds the key. UIDs, email
+addresses and common names (CN) are recorded, words of text optionally.
+
+The mapping file is sorted and indexed, and read through a memory map:
+a lookup is a binary search over the index and decrypts a single record,
+however large the file is. Pseudonyms are stored as keyed digests and
+original values are encrypted with AES-GCM, so the file reveals nothing
+but the number of records without the key. Encryption needs the
+``mapping`` extra: ``pip install icalendar-anonymizer[mapping]``.
+
+Layout of a mapping file, integers little-endian::
+
+    header   MAGIC, number of records (8 bytes), key check (16 bytes)
+    records  nonce (12 bytes) and encrypted original values, separated by NUL
+    index    per record, sorted by digest: digest (16 bytes),
+             offset (8 bytes) and size (4 bytes) of the record
+
+Example:
+    .. code-block:: python
+
+        from pathlib import Path
+
+        from icalendar_anonymizer import anonymize
+        from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+        key = Path("mapping.key").read_bytes()
+        recorder = MappingRecorder()
+        anonymized = anonymize(cal, mapping=recorder)
+        recorder.write("mapping.bin", key)
+
+        with MappingFile("mapping.bin", key) as mapping:
+            mapping.lookup("5f3a...@anonymous.local")
+"""
+
+import hmac
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Self
+
+from ._hash import Hasher
+
+# Kinds of recorded values, in the order in which lookups try them
+KINDS = ("uid", "email", "cn", "word")
+
+# Shortest accepted key in bytes
+MIN_KEY_SIZE = 16
+
+MAGIC = b"ICANMAP1"
+
+_HEADER = struct.Struct("<8sQ16s")
+_INDEX_ENTRY = struct.Struct("<16sQI")
+_DIGEST_SIZE = 16
+_NONCE_SIZE = 12
+
+# Contexts of the keys derived from the supplied key
+_INDEX_INFO = b"icalendar-anonymizer mapping index v1"
+_ENCRYPTION_INFO = b"icalendar-anonymizer mapping encryption v1"
+
+
+class MappingRecorder:
+    """Collect the pseudonyms of anonymization runs and their original values.
+
+    Pass it as ``mapping`` to :func:`~icalendar_anonymizer.anonymize`; the
+    same recorder can collect several runs. Originals are kept in memory
+    in plain text until :meth:`write` encrypts them.
+
+    Args:
+        words: Also record each word of anonymized text
+
+    Examples:
+        >>> recorder = MappingRecorder()
+        >>> recorder.add("uid", "uid1@anonymous.local", "1234@example.com")
+        >>> recorder.add("uid", "uid1@anonymous.local", "1234@example.com")
+        >>> len(recorder)
+        1
+    """
+
+    def __init__(self, words: bool = False):  # noqa: FBT001
+        self.words = words
+        self._entries: dict[tuple[str, str], list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, kind: str, pseudonym: str, original: str) -> None:
+        """Record that pseudonym replaces original.
+
+        A pseudonym replacing several originals, e.g. a short hash with a
+        collision, keeps all of them.
+
+        Args:
+            kind: One of :data:`KINDS`
+            pseudonym: The anonymized value
+            original: The original value
+        """
+        originals = self._entries.setdefault((kind, pseudonym), [])
+        if original not in originals:
+            originals.append(original)
+
+    def add_words(self, text: str, anonymized: str) -> None:
+        """Record the pseudonym of each word of a text.
+
+        Args:
+            text: The original text
+            anonymized: The text anonymized word by word
+        """
+        pseudonyms = anonymized.split()
+        words = text.split()
+        if len(pseudonyms) != len(words):
+            # Not anonymized word by word
+            return
+        entries = self._entries
+        for pseudonym, word in zip(pseudonyms, words, strict=True):
+            originals = entries.get(("word", pseudonym))
+            if originals is None:
+                entries["word", pseudonym] = [word]
+            elif word not in originals:
+                originals.append(word)
+
+    def hasher(self, hasher: Hasher) -> Hasher:
+        """Return a hasher recording the values anonymized by hasher.
+
+        Args:
+            hasher: Hasher of an anonymization run
+
+        Returns:
+            Hasher with the same results
+        """
+        return _RecordingHasher(hasher, self)
+
+    def write(self, path: str | Path, key: bytes) -> int:
+        """Write the recorded values to an encrypted mapping file.
+
+        The file is created readable and writable by its owner only.
+
+        Args:
+            path: File to create or replace
+            key: Secret key of at least :data:`MIN_KEY_SIZE` bytes
+
+        Returns:
+            The number of records
+
+        Raises:
+            ImportError: If the ``cryptography`` package is not installed
+            ValueError: If the key is too short
+        """
+        _check_key(key)
+        index_key, cipher = _derive(key)
+        records = sorted(
+            (_digest(index_key, kind, pseudonym), originals)
+            for (kind, pseudonym), originals in self._entries.items()
+        )
+        index = []
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(_HEADER.pack(MAGIC, len(records), _key_check(index_key)))
+            offset = _HEADER.size
+            for digest, originals in records:
+                nonce = os.urandom(_NONCE_SIZE)
+                # iCalendar values cannot contain NUL
+                plaintext = "\0".join(originals).encode("utf-8")
+                record = nonce + cipher.encrypt(nonce, plaintext, digest)
+                fp.write(record)
+                index.append(_INDEX_ENTRY.pack(digest, offset, len(record)))
+                offset += len(record)
+            fp.write(b"".join(index))
+        return len(records)
+
+
+class MappingFile:
+    """Look pseudonyms up in a mapping file written by :class:`MappingRecorder`.
+
+    The file is memory-mapped, not read: each lookup touches O(log n) index
+    entries and one record. Use it as a context manager, or call
+    :meth:`close`.
+
+    Args:
+        path: The mapping file
+        key: The key the file was written with
+
+    Raises:
+        ImportError: If the ``cryptography`` package is not installed
+        ValueError: If the file is not a mapping file or the key is wrong
+    """
+
+    def __init__(self, path: str | Path, key: bytes):
+        _check_key(key)
+        self._index_key, self._cipher = _derive(key)
+        with Path(path).open("rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f"{path} is not a mapping file")
+            self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, key_check = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or size < _HEADER.size + count * _INDEX_ENTRY.size:
+            self.close()
+            raise ValueError(f"{path} is not a mapping file")
+        if not hmac.compare_digest(key_check, _key_check(self._index_key)):
+            self.close()
+            raise ValueError(f"Wrong key for {path}")
+        self._count = count
+        self._index_start = size - count * _INDEX_ENTRY.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+    def lookup(self, pseudonym: str, kinds: tuple[str, ...] = KINDS) -> list[tuple[str, str]]:
+        """Return the original values a pseudonym replaces.
+
+        A ``mailto:`` prefix of an email address is ignored.
+
+        Args:
+            pseudonym: The anonymized value
+            kinds: Kinds of values to look for, see :data:`KINDS`
+
+        Returns:
+            Pairs of kind and original value, empty if the pseudonym is unknown
+        """
+        found = []
+        for kind in kinds:
+            value = pseudonym
+            if kind == "email" and value[:7].lower() == "mailto:":
+                value = value[7:]
+            digest = _digest(self._index_key, kind, value)
+            entry = self._find(digest)
+            if entry is None:
+                continue
+            offset, size = entry
+            record = self._map[offset : offset + size]
+            plaintext = self._cipher.decrypt(record[:_NONCE_SIZE], record[_NONCE_SIZE:], digest)
+            found.extend((kind, original) for original in plaintext.decode("utf-8").split("\0"))
+        return found
+
+    def _find(self, digest: bytes) -> tuple[int, int] | None:
+        """Binary search of the index for digest, returning offset and size of its record."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            position = self._index_start + middle * _INDEX_ENTRY.size
+            current = self._map[position : position + _DIGEST_SIZE]
+            if current < digest:
+                low = middle + 1
+            elif current > digest:
+                high = middle
+            else:
+                _, offset, size = _INDEX_ENTRY.unpack_from(self._map, position)
+                return offset, size
+        return None
+
+
+def load_key(path: str | Path) -> bytes:
+    """Read the key of a mapping file.
+
+    Args:
+        path: File holding the raw key
+
+    Returns:
+        The key
+
+    Raises:
+        ImportError: If the ``cryptography`` package is not installed
+        ValueError: If the key is too short
+    """
+    key = Path(path).read_bytes()
+    _check_key(key)
+    # Fail before anonymizing if the mapping could not be written
+    _derive(key)
+    return key
+
+
+class _RecordingHasher(Hasher):
+    """Hasher delegating to another one and recording its results."""
+
+    def __init__(self, hasher: Hasher, recorder: MappingRecorder):
+        self.salt = hasher.salt
+        self.hash_format = hasher.hash_format
+        self.uid_map = hasher.uid_map
+        self._hasher = hasher
+        self._recorder = recorder
+
+    def text(self, text: str) -> str:
+        anonymized = self._hasher.text(text)
+        if self._recorder.words:
+            self._recorder.add_words(text, anonymized)
+        return anonymized
+
+    def email(self, email: str) -> str:
+        anonymized = self._hasher.email(email)
+        self._recorder.add("email", anonymized, email)
+        return anonymized
+
+    def uid(self, uid: str) -> str:
+        anonymized = self._hasher.uid(uid)
+        self._recorder.add("uid", anonymized, uid)
+        return anonymized
+
+    def cn(self, cn: str) -> str:
+        anonymized = self._hasher.cn(cn)
+        self._recorder.add("cn", anonymized, cn)
+        if self._recorder.words:
+            self._recorder.add_words(cn, anonymized)
+        return anonymized
+
+    def payload(self, data: bytes | str) -> str:
+        return self._hasher.payload(data)
+
+
+def _check_key(key: bytes) -> None:
+    if not isinstance(key, bytes):
+        raise TypeError(f"key must be bytes, got {type(key).__name__}")
+    if len(key) < MIN_KEY_SIZE:
+        raise ValueError(f"key must be at least {MIN_KEY_SIZE} bytes")
+
+
+def _derive(key: bytes):
+    """Return the index key and the cipher derived from the supplied key."""
+    try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    except ImportError as e:
+        raise ImportError(
+            "Encrypted mappings require the mapping extra: "
+            "pip install icalendar-anonymizer[mapping]"
+        ) from e
+    # Imported here, tenants imports the anonymizer
+    from .tenants import _EXTRACT_SALT, _hkdf
+
+    index_key = _hkdf(key, _EXTRACT_SALT, _INDEX_INFO, 32)
+    return index_key, AESGCM(_hkdf(key, _EXTRACT_SALT, _ENCRYPTION_INFO, 32))
+
+
+def _digest(index_key: bytes, kind: str, pseudonym: str) -> bytes:
+    message = f"{kind}\0{pseudonym}".encode()
+    return hmac.digest(index_key, message, "sha256")[:_DIGEST_SIZE]
+
+
+def _key_check(index_key: bytes) -> bytes:
+    return hmac.digest(index_key, MAGIC, "sha256")[:_DIGEST_SIZE]
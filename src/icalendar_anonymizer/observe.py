@@ -0,0 +1,243 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Observe where anonymization spends its time.
+
+Pass an observer as the ``observer`` argument of
+:func:`~icalendar_anonymizer.anonymize`. It is told when each component
+starts and ends, and how each property was handled, with the size of the
+original value and the time it took. Without an observer, nothing is timed
+or measured.
+
+Example:
+    .. code-block:: python
+
+        from icalendar_anonymizer import anonymize
+        from icalendar_anonymizer.observe import StatsObserver
+
+        observer = StatsObserver()
+        anonymize(cal, observer=observer)
+        for (component, name, handler), timing in observer.top(5):
+            print(f"{component} {name} ({handler}): {timing.total_time:.3f}s")
+"""
+
+from dataclasses import dataclass, field
+
+from icalendar import vBinary
+
+# How a property was handled
+HANDLER_PRESERVE = "preserve"
+HANDLER_UID = "uid"
+HANDLER_CALADDRESS = "caladdress"
+HANDLER_PLACEHOLDER = "placeholder"
+HANDLER_TEXT = "text"
+
+
+@dataclass(frozen=True)
+class PropertyEvent:
+    """A property of a component has been handled.
+
+    Attributes:
+        component: Name of the component holding the property, e.g. ``"VEVENT"``
+        name: Upper case property name
+        handler: How the value was handled: ``"preserve"``, ``"uid"``,
+                 ``"caladdress"``, ``"placeholder"`` or ``"text"``
+        size: Size of the original value in characters (bytes for binary values)
+        elapsed: Time taken in seconds
+        value: The original value. It may hold personal data: observers
+               may inspect it, but must not report it.
+    """
+
+    component: str
+    name: str
+    handler: str
+    size: int
+    elapsed: float
+    value: object = field(default=None, repr=False, compare=False)
+
+
+@dataclass(frozen=True)
+class ComponentEvent:
+    """A component, including its subcomponents, has been handled.
+
+    Attributes:
+        name: Component name, e.g. ``"VEVENT"``
+        elapsed: Time taken in seconds, including subcomponents
+        preserved: True if the component was copied unchanged (VTIMEZONE)
+    """
+
+    name: str
+    elapsed: float
+    preserved: bool
+
+
+class AnonymizationObserver:
+    """Base class of observers; all methods do nothing.
+
+    Subclasses override the methods they need. Events arrive in document
+    order: ``component_started()``, then the events of the component's
+    properties and subcomponents, then ``component_finished()``.
+    """
+
+    def component_started(self, name: str) -> None:
+        """Called before a component is handled."""
+
+    def component_finished(self, event: ComponentEvent) -> None:
+        """Called after a component and its subcomponents have been handled."""
+
+    def property_anonymized(self, event: PropertyEvent) -> None:
+        """Called after a property has been handled."""
+
+
+@dataclass
+class Timing:
+    """Aggregated count, time and size of a group of events.
+
+    Attributes:
+        count: Number of events
+        total_time: Sum of the elapsed times in seconds
+        total_size: Sum of the value sizes
+    """
+
+    count: int = 0
+    total_time: float = 0.0
+    total_size: int = 0
+
+    def as_dict(self) -> dict[str, float | int]:
+        """Return the timing as a plain dictionary."""
+        return {
+            "count": self.count,
+            "total_time": self.total_time,
+            "total_size": self.total_size,
+        }
+
+
+class StatsObserver(AnonymizationObserver):
+    """Aggregate events by component and property.
+
+    Attributes:
+        properties: Timing by component name, property name and handler
+        components: Timing by component name; sizes are not recorded
+
+    Examples:
+        >>> from icalendar import Calendar, Event
+        >>> from icalendar_anonymizer import anonymize
+        >>> cal = Calendar()
+        >>> event = Event()
+        >>> event.add("uid", "1234@example.com")
+        >>> event.add("summary", "Dentist appointment")
+        >>> cal.add_component(event)
+        >>> observer = StatsObserver()
+        >>> _ = anonymize(cal, observer=observer)
+        >>> sorted(observer.properties)
+        [('VEVENT', 'SUMMARY', 'text'), ('VEVENT', 'UID', 'uid')]
+        >>> observer.properties["VEVENT", "SUMMARY", "text"].total_size
+        19
+        >>> observer.components["VEVENT"].count
+        1
+    """
+
+    def __init__(self):
+        self.properties: dict[tuple[str, str, str], Timing] = {}
+        self.components: dict[str, Timing] = {}
+
+    def component_finished(self, event: ComponentEvent) -> None:
+        """Add the component to the timing of its name."""
+        timing = self.components.get(event.name)
+        if timing is None:
+            timing = self.components[event.name] = Timing()
+        timing.count += 1
+        timing.total_time += event.elapsed
+
+    def property_anonymized(self, event: PropertyEvent) -> None:
+        """Add the property to the timing of its component, name and handler."""
+        key = (event.component, event.name, event.handler)
+        timing = self.properties.get(key)
+        if timing is None:
+            timing = self.properties[key] = Timing()
+        timing.count += 1
+        timing.total_time += event.elapsed
+        timing.total_size += event.size
+
+    def top(self, count: int = 10) -> list[tuple[tuple[str, str, str], Timing]]:
+        """Return the properties that took the most time.
+
+        Args:
+            count: Number of entries returned
+
+        Returns:
+            Pairs of (component, property, handler) and their timing, slowest first
+        """
+        return sorted(self.properties.items(), key=lambda item: -item[1].total_time)[:count]
+
+    def as_dict(self) -> dict[str, dict[str, dict[str, float | int]]]:
+        """Return the aggregated timings as plain, JSON serializable dictionaries."""
+        return {
+            "components": {name: timing.as_dict() for name, timing in self.components.items()},
+            "properties": {
+                " ".join(key): timing.as_dict() for key, timing in self.properties.items()
+            },
+        }
+
+
+class SpanObserver(AnonymizationObserver):
+    """Report components as tracing spans and properties as span events.
+
+    Works with an OpenTelemetry tracer, or any object with a compatible
+    ``start_as_current_span()`` method, without importing OpenTelemetry.
+    Each component becomes a span named after it, nested in the current
+    span, and each property an event of that span with the handler, size
+    and elapsed time as attributes.
+
+    Args:
+        tracer: A tracer, e.g. ``opentelemetry.trace.get_tracer(__name__)``
+        prefix: Prefix of span names and attribute keys
+    """
+
+    def __init__(self, tracer, prefix: str = "icalendar_anonymizer"):
+        self.tracer = tracer
+        self.prefix = prefix
+        self._open: list[tuple[object, object]] = []
+
+    def component_started(self, name: str) -> None:
+        """Open and activate a span for the component."""
+        context = self.tracer.start_as_current_span(f"{self.prefix}.{name.lower()}")
+        span = context.__enter__()
+        self._open.append((context, span))
+
+    def component_finished(self, event: ComponentEvent) -> None:
+        """Record the component's attributes and end its span."""
+        context, span = self._open.pop()
+        span.set_attribute(f"{self.prefix}.component", event.name)
+        span.set_attribute(f"{self.prefix}.preserved", event.preserved)
+        context.__exit__(None, None, None)
+
+    def property_anonymized(self, event: PropertyEvent) -> None:
+        """Add the property as an event of the current component's span."""
+        _, span = self._open[-1]
+        span.add_event(
+            event.name,
+            attributes={
+                f"{self.prefix}.handler": event.handler,
+                f"{self.prefix}.size": event.size,
+                f"{self.prefix}.elapsed": event.elapsed,
+            },
+        )
+
+
+def value_size(value) -> int:
+    """Return the size of a property value.
+
+    Args:
+        value: The original property value
+
+    Returns:
+        Length in characters, in bytes for binary values, summed over lists
+    """
+    if isinstance(value, str | bytes):
+        return len(value)
+    if isinstance(value, vBinary):
+        return len(value.bytes)
+    if isinstance(value, list):
+        return sum(value_size(item) for item in value)
+    return len(str(value))
@@ -0,0 +1,281 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Profile the structure of calendars while they are anonymized.
+
+:class:`ProfileObserver` collects what a calendar is made of, in the same
+pass that anonymizes it: components by type, properties by component,
+recurrence rules and overrides, time zones, value sizes and the largest
+components. The report holds counts, names defined by the standards and
+sizes only, never values, so it can be shared with the anonymized
+calendar to explain why it is slow or large. Names of X- and other
+components and properties that are not registered are counted as
+``"(x-name)"``, as they may hold personal data.
+
+Example:
+    .. code-block:: python
+
+        import json
+
+        from icalendar_anonymizer import anonymize
+        from icalendar_anonymizer.profiling import ProfileObserver
+
+        profile = ProfileObserver()
+        anonymized_cal = anonymize(cal, observer=profile)
+        print(json.dumps(profile.report(), indent=2))
+"""
+
+import heapq
+from collections import Counter
+from datetime import date, datetime
+from functools import cache
+
+from icalendar import vRecur
+
+from ._properties import OTHER_NAME, STANDARD_COMPONENTS, STANDARD_PROPERTIES
+from .observe import AnonymizationObserver, ComponentEvent, PropertyEvent
+
+# Upper bounds of the buckets of value sizes and overrides per series
+SIZE_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+OVERRIDE_BUCKETS = (1, 2, 5, 10, 50, 100)
+
+# Reported instead of time zone names that are not well-known, as custom
+# names may hold personal data
+OTHER_TIMEZONE = "(other)"
+
+# Properties whose values are counted by their recurrence pattern
+_RULES = frozenset(("RRULE", "EXRULE"))
+
+
+class _Frame:
+    """State of a component whose events are not finished yet."""
+
+    __slots__ = ("index", "override", "properties", "size", "subcomponents", "uid")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.size = 0
+        self.properties = 0
+        self.subcomponents = 0
+        self.uid = None
+        self.override = False
+
+
+class ProfileObserver(AnonymizationObserver):
+    """Collect a profile of the calendars passing through anonymization.
+
+    One observer can be passed to several runs; the report covers all of
+    them, and positions of top-level components count on from one run to
+    the next.
+
+    Args:
+        largest: Number of largest top-level components reported
+
+    Examples:
+        >>> from datetime import datetime
+        >>> from icalendar import Calendar, Event
+        >>> from icalendar_anonymizer import anonymize
+        >>> cal = Calendar()
+        >>> event = Event()
+        >>> event.add("uid", "1234@example.com")
+        >>> event.add("summary", "Dentist appointment")
+        >>> event.add("rrule", {"freq": "weekly", "byday": ["MO", "TH"]})
+        >>> cal.add_component(event)
+        >>> profile = ProfileObserver()
+        >>> _ = anonymize(cal, observer=profile)
+        >>> report = profile.report()
+        >>> report["components"]
+        {'VEVENT': 1}
+        >>> report["recurrence"]["patterns"]
+        {'FREQ=WEEKLY;BYDAY': 1}
+        >>> report["value_sizes"]["SUMMARY"]
+        {'<=64': 1}
+    """
+
+    def __init__(self, largest: int = 10):
+        self.largest = largest
+        self.components: Counter[str] = Counter()
+        self.properties: dict[str, Counter[str]] = {}
+        self.value_sizes: dict[str, Counter[str]] = {}
+        self.frequencies: Counter[str] = Counter()
+        self.patterns: Counter[str] = Counter()
+        self.timezones: Counter[str] = Counter()
+        self.times: Counter[str] = Counter()
+        # Overrides by UID of their series; the UIDs are never reported
+        self._overrides: Counter[str] = Counter()
+        self._largest: list[tuple[int, int, str, int, int]] = []
+        self._stack: list[_Frame] = []
+        self._top_level = 0
+
+    def component_started(self, name: str) -> None:  # noqa: ARG002
+        """Open the component's frame."""
+        if not self._stack:
+            self._top_level += 1
+        self._stack.append(_Frame(self._top_level - 1))
+
+    def component_finished(self, event: ComponentEvent) -> None:
+        """Count the component, and add it to its parent or the largest ones."""
+        frame = self._stack.pop()
+        name = event.name if event.name in STANDARD_COMPONENTS else OTHER_NAME
+        self.components[name] += 1
+        if frame.override and frame.uid is not None:
+            self._overrides[frame.uid] += 1
+        if self._stack:
+            parent = self._stack[-1]
+            parent.size += frame.size
+            parent.subcomponents += frame.subcomponents + 1
+        elif not event.preserved and self.largest > 0:
+            # Ties go to the earlier component
+            entry = (frame.size, -frame.index, name, frame.properties, frame.subcomponents)
+            if len(self._largest) < self.largest:
+                heapq.heappush(self._largest, entry)
+            elif entry > self._largest[0]:
+                heapq.heapreplace(self._largest, entry)
+
+    def property_anonymized(self, event: PropertyEvent) -> None:
+        """Count the property, its value size and what its value refers to."""
+        name = event.name
+        reported = name if name in STANDARD_PROPERTIES else OTHER_NAME
+        component = event.component if event.component in STANDARD_COMPONENTS else OTHER_NAME
+        properties = self.properties.get(component)
+        if properties is None:
+            properties = self.properties[component] = Counter()
+        properties[reported] += 1
+        sizes = self.value_sizes.get(reported)
+        if sizes is None:
+            sizes = self.value_sizes[reported] = Counter()
+        sizes[_bucket(event.size, SIZE_BUCKETS)] += 1
+
+        frame = self._stack[-1]
+        frame.size += event.size
+        frame.properties += 1
+        value = event.value
+        if name == "UID":
+            frame.uid = str(value)
+        elif name == "RECURRENCE-ID":
+            frame.override = True
+        if name in _RULES:
+            for rule in value if isinstance(value, list) else (value,):
+                if isinstance(rule, vRecur):
+                    self._add_rule(rule)
+        else:
+            for item in value if isinstance(value, list) else (value,):
+                dts = getattr(item, "dts", None)
+                for time in dts if dts is not None else (item,):
+                    if hasattr(time, "dt"):
+                        self._add_time(time)
+
+    def _add_rule(self, rule: vRecur) -> None:
+        """Count the frequency and the parts of a recurrence rule."""
+        frequency = rule.get("FREQ")
+        if isinstance(frequency, list):
+            # Parsed rules hold lists, rules built in code may not
+            frequency = frequency[0] if frequency else None
+        frequency = str(frequency).upper() if frequency is not None else "(none)"
+        parts = sorted(key.upper() for key in rule if key.upper() != "FREQ")
+        self.frequencies[frequency] += 1
+        self.patterns[";".join([f"FREQ={frequency}", *parts])] += 1
+
+    def _add_time(self, time) -> None:
+        """Count a date or time by kind, and its time zone."""
+        value = time.dt
+        if isinstance(value, tuple):
+            # Period: start and end or duration
+            value = value[0]
+        if isinstance(value, datetime):
+            tzid = time.params.get("TZID")
+            if tzid is None and value.tzinfo is not None:
+                tzid = getattr(value.tzinfo, "key", None) or value.tzname()
+            if tzid is None:
+                self.times["floating"] += 1
+            elif tzid.upper() in ("UTC", "Z", "ETC/UTC"):
+                self.times["utc"] += 1
+            else:
+                self.times["zoned"] += 1
+                self.timezones[tzid] += 1
+        elif isinstance(value, date):
+            self.times["date"] += 1
+
+    def report(self) -> dict:
+        """Return the profile as plain, JSON serializable dictionaries.
+
+        Counts are sorted from most to least frequent. Time zones other
+        than those of the IANA database and Windows are counted as
+        ``"(other)"``, components and properties other than those in
+        :data:`STANDARD_COMPONENTS` and :data:`STANDARD_PROPERTIES` as
+        ``"(x-name)"``. Top-level components are identified by their
+        position in the calendar, starting at 0, which is the same in the
+        anonymized calendar. Sizes are in characters of the original values.
+
+        Returns:
+            Dictionary with the keys ``components``, ``properties``,
+            ``value_sizes``, ``recurrence``, ``times``, ``timezones`` and
+            ``largest_components``
+        """
+        known = _known_timezones()
+        timezones: Counter[str] = Counter()
+        for tzid, count in self.timezones.items():
+            timezones[tzid if tzid in known else OTHER_TIMEZONE] += count
+        overrides = Counter(_bucket(count, OVERRIDE_BUCKETS) for count in self._overrides.values())
+        return {
+            "components": _sorted(self.components),
+            "properties": {
+                component: _sorted(counts) for component, counts in self.properties.items()
+            },
+            "value_sizes": {
+                name: _sorted_buckets(counts, SIZE_BUCKETS)
+                for name, counts in sorted(self.value_sizes.items())
+            },
+            "recurrence": {
+                "rules": sum(self.frequencies.values()),
+                "frequencies": _sorted(self.frequencies),
+                "patterns": _sorted(self.patterns),
+                "overrides": sum(self._overrides.values()),
+                "series_with_overrides": len(self._overrides),
+                "max_overrides_per_series": max(self._overrides.values(), default=0),
+                "overrides_per_series": _sorted_buckets(overrides, OVERRIDE_BUCKETS),
+            },
+            "times": _sorted(self.times),
+            "timezones": _sorted(timezones),
+            "largest_components": [
+                {
+                    "index": -negative_index,
+                    "name": name,
+                    "size": size,
+                    "properties": properties,
+                    "subcomponents": subcomponents,
+                }
+                for size, negative_index, name, properties, subcomponents in sorted(
+                    self._largest, reverse=True
+                )
+            ],
+        }
+
+
+def _bucket(value: int, bounds: tuple[int, ...]) -> str:
+    """Return the label of the bucket of value, e.g. ``"<=64"`` or ``">65536"``."""
+    for bound in bounds:
+        if value <= bound:
+            return f"<={bound}"
+    return f">{bounds[-1]}"
+
+
+def _sorted(counts: Counter[str]) -> dict[str, int]:
+    """Return counts as a dictionary, most frequent first, ties by name."""
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def _sorted_buckets(counts: Counter[str], bounds: tuple[int, ...]) -> dict[str, int]:
+    """Return bucket counts as a dictionary, in the order of the buckets."""
+    labels = [f"<={bound}" for bound in bounds] + [f">{bounds[-1]}"]
+    return {label: counts[label] for label in labels if label in counts}
+
+
+@cache
+def _known_timezones() -> frozenset[str]:
+    """Return the time zone names reported as they are."""
+    import zoneinfo
+
+    from icalendar.timezone.windows_to_olson import WINDOWS_TO_OLSON
+
+    return frozenset(zoneinfo.available_timezones()) | frozenset(WINDOWS_TO_OLSON)
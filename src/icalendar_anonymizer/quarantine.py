@@ -0,0 +1,279 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Parse iCalendar data with malformed components.
+
+:func:`parse_tolerant` reads iCalendar data one line at a time, splits it
+into top-level components and parses each on its own. A malformed component
+does not fail the whole file: it is left out of the calendar and written,
+redacted, to a quarantine file with its line numbers, so that it can be
+fixed in the original and anonymized on its own.
+
+A component is malformed if it cannot be parsed, has no ``END`` line, or
+has lines that icalendar could not parse and would drop. Lines between
+components that are not content lines are quarantined on their own.
+
+Quarantined components are redacted as a whole: a property that fails to
+parse may hold anything, whatever its name. Values are replaced by
+``REDACTED``, parameters other than ``VALUE`` are left out, and lines that
+cannot be split into name and value are replaced as a whole. Names of X-
+and unregistered components and properties are replaced by
+``"(x-name)"``, in the redacted lines and in the reasons.
+
+Example:
+    .. code-block:: python
+
+        from icalendar_anonymizer import anonymize
+        from icalendar_anonymizer.quarantine import parse_tolerant
+
+        with open("calendar.ics", "rb") as f, open("quarantine.txt", "w") as q:
+            cal, quarantined = parse_tolerant(f, q)
+        anonymized = anonymize(cal)
+"""
+
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TextIO
+
+from icalendar import Calendar
+from icalendar.cal import Component
+
+from ._properties import OTHER_NAME, STANDARD_COMPONENTS, STANDARD_PROPERTIES, VALUE_TYPES
+from .subset import _CONTENT_LINE, _content_lines, _split_content_line
+
+# Replacement of values and unparsable lines in the quarantine file
+REDACTED = "REDACTED"
+
+# Components that are only allowed at the top level. Their BEGIN line inside
+# another component means that the END line of that component is missing.
+_TOP_LEVEL_COMPONENTS = frozenset(
+    {"VEVENT", "VTODO", "VJOURNAL", "VFREEBUSY", "VTIMEZONE", "VAVAILABILITY"}
+)
+
+# Name of a property or component (RFC 5545, section 3.1)
+_NAME = re.compile(r"[A-Z0-9-]+")
+
+# VALUE parameter of a content line, quoted or not
+_VALUE_PARAMETER = re.compile(r';VALUE=(?:"([^"]*)"|([^;:]*))', re.IGNORECASE)
+
+
+@dataclass
+class QuarantinedComponent:
+    """A malformed part of the input that was left out.
+
+    Attributes:
+        name: Name of the component, or ``"LINE"`` for a single content line
+              outside of components
+        first_line: Number of its first line in the input, starting at 1
+        last_line: Number of its last line in the input
+        reason: Why it was left out. Does not contain data of the input
+                other than registered component and property names.
+    """
+
+    name: str
+    first_line: int
+    last_line: int
+    reason: str
+
+
+def parse_tolerant(
+    lines: Iterable[bytes], quarantine: TextIO | None = None
+) -> tuple[Calendar, list[QuarantinedComponent]]:
+    r"""Parse iCalendar data, leaving out malformed components.
+
+    Args:
+        lines: Lines of iCalendar data, such as a file opened in binary mode
+        quarantine: Optional text file receiving the redacted malformed
+                    components as they are found
+
+    Returns:
+        Tuple of the calendar with all well-formed components, in their
+        original order, and the malformed components that were left out
+
+    Raises:
+        ValueError: If the data is not a VCALENDAR or its calendar
+                    properties cannot be parsed
+
+    Examples:
+        >>> data = (
+        ...     b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        ...     b"BEGIN:VEVENT\r\nUID:one\r\nSUMMARY Lunch\r\nEND:VEVENT\r\n"
+        ...     b"BEGIN:VEVENT\r\nUID:two\r\nEND:VEVENT\r\n"
+        ...     b"END:VCALENDAR\r\n"
+        ... )
+        >>> cal, quarantined = parse_tolerant(data.splitlines(keepends=True))
+        >>> [str(event["UID"]) for event in cal.walk("VEVENT")]
+        ['two']
+        >>> quarantined
+        [QuarantinedComponent(name='VEVENT', first_line=3, last_line=6, reason='unparsable lines')]
+    """
+    parser = _TolerantParser(quarantine)
+    for line in lines:
+        parser.feed(line)
+    return parser.finish()
+
+
+class _TolerantParser:
+    """Split lines into top-level components and parse them one by one."""
+
+    def __init__(self, quarantine: TextIO | None):
+        self.quarantine = quarantine
+        self.quarantined: list[QuarantinedComponent] = []
+        self.components: list[Component] = []
+        self.calendar_lines: list[bytes] = []
+        self.seen_calendar = False
+        self.number = 0
+        # Component being read, its name, first line and nesting depth
+        self.block: list[bytes] | None = None
+        self.block_name = ""
+        self.block_start = 0
+        self.depth = 0
+        # Where continuation lines go
+        self.target: list[bytes] = self.calendar_lines
+
+    def feed(self, line: bytes) -> None:
+        self.number += 1
+        if line[:1] in (b" ", b"\t"):
+            # Folded continuation of the previous line
+            self.target.append(line)
+            return
+        name, value = _name_and_value(line)
+        if self.block is not None:
+            if name == "BEGIN" and value in _TOP_LEVEL_COMPONENTS:
+                self._end_block(self.number - 1, f"missing END:{self.block_name}")
+            elif name == "END" and value == "VCALENDAR":
+                self._end_block(self.number - 1, f"missing END:{self.block_name}")
+                return
+            else:
+                self._read_block_line(name, line)
+                return
+        if name == "BEGIN" and value != "VCALENDAR":
+            self.block = self.target = [line]
+            self.block_name = value if value in STANDARD_COMPONENTS else OTHER_NAME
+            self.block_start = self.number
+            self.depth = 1
+        elif name in ("BEGIN", "END") and value == "VCALENDAR":
+            self.seen_calendar = True
+            self.target = self.calendar_lines
+        elif not line.strip():
+            pass
+        elif _is_content_line(line) and name != "END":
+            self.calendar_lines.append(line)
+            self.target = self.calendar_lines
+        else:
+            reason = "END without BEGIN" if name == "END" else "unparsable line"
+            self._quarantine_lines("LINE", [line], self.number, self.number, reason)
+            # The line is redacted as a whole, including its continuation lines
+            self.target = []
+
+    def finish(self) -> tuple[Calendar, list[QuarantinedComponent]]:
+        if self.block is not None:
+            self._end_block(self.number, f"missing END:{self.block_name}")
+        if not self.seen_calendar:
+            raise ValueError("Input is not a VCALENDAR")
+        cal = Calendar.from_ical(
+            b"BEGIN:VCALENDAR\r\n" + b"".join(self.calendar_lines) + b"END:VCALENDAR\r\n"
+        )
+        cal.subcomponents.extend(self.components)
+        return cal, self.quarantined
+
+    def _read_block_line(self, name: str, line: bytes) -> None:
+        self.block.append(line)
+        if name == "BEGIN":
+            self.depth += 1
+        elif name == "END":
+            self.depth -= 1
+            if self.depth == 0:
+                self._end_block(self.number, None)
+
+    def _end_block(self, last_line: int, reason: str | None) -> None:
+        """Parse the component just read, or quarantine it with reason."""
+        lines, self.block = self.block, None
+        self.target = self.calendar_lines
+        if reason is None:
+            component, reason = _parse_component(b"".join(lines))
+            if component is not None:
+                self.components.append(component)
+                return
+        self._quarantine_lines(self.block_name, lines, self.block_start, last_line, reason)
+
+    def _quarantine_lines(
+        self, name: str, lines: list[bytes], first_line: int, last_line: int, reason: str
+    ) -> None:
+        entry = QuarantinedComponent(name, first_line, last_line, reason)
+        self.quarantined.append(entry)
+        if self.quarantine is None:
+            return
+        self.quarantine.write(f"# {name} at lines {first_line}-{last_line}: {reason}\n")
+        self.quarantine.writelines(_redact(lines))
+
+
+def _name_and_value(line: bytes) -> tuple[str, str]:
+    """Return the upper case name and value of a line, for BEGIN and END."""
+    name, _, value = line.partition(b":")
+    return (
+        name.strip().upper().decode("ascii", errors="replace"),
+        value.strip().upper().decode("ascii", errors="replace"),
+    )
+
+
+def _is_content_line(line: bytes) -> bool:
+    text = line.decode("utf-8", errors="replace").rstrip("\r\n")
+    match = _CONTENT_LINE.match(text)
+    return match is not None and _NAME.fullmatch(match.group(1).upper()) is not None
+
+
+def _parse_component(data: bytes) -> tuple[Component | None, str]:
+    """Parse a component, or return why it is malformed."""
+    try:
+        component = Component.from_ical(data)
+    except ValueError:
+        return None, "unparsable component"
+    # icalendar drops lines it cannot parse and records them as errors
+    names = {name for part in component.walk() for name, _ in part.errors}
+    if names:
+        properties = sorted(
+            {
+                name.upper() if name.upper() in STANDARD_PROPERTIES else OTHER_NAME
+                for name in names
+                if name is not None
+            }
+        )
+        reason = ", ".join(
+            ([f"malformed {', '.join(properties)}"] if properties else [])
+            + (["unparsable lines"] if None in names else [])
+        )
+        return None, reason
+    return component, ""
+
+
+def _redact(lines: list[bytes]) -> list[str]:
+    """Redact the lines of a malformed component."""
+    text = b"".join(lines).decode("utf-8", errors="replace")
+    redacted = []
+    for _, logical in _content_lines(text):
+        if _CONTENT_LINE.match(logical) is None:
+            redacted.append(f"{REDACTED}\n")
+            continue
+        name, params, value = _split_content_line(logical)
+        if _NAME.fullmatch(name) is None:
+            redacted.append(f"{REDACTED}\n")
+        elif name in ("BEGIN", "END"):
+            component = value.strip().upper()
+            redacted.append(
+                f"{name}:{component if component in STANDARD_COMPONENTS else OTHER_NAME}\n"
+            )
+        else:
+            name = name if name in STANDARD_PROPERTIES else OTHER_NAME
+            redacted.append(f"{name}{_value_type(params)}:{REDACTED}\n")
+    return redacted
+
+
+def _value_type(params: str) -> str:
+    """Return the VALUE parameter of a line if it names a standard value type."""
+    match = _VALUE_PARAMETER.search(params)
+    if match is None:
+        return ""
+    value_type = (match.group(1) or match.group(2)).strip().upper()
+    return f";VALUE={value_type}" if value_type in VALUE_TYPES else ""
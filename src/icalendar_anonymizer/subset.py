@@ -0,0 +1,391 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Reduce a calendar to a time window, component types or UIDs.
+
+Reproducing a bug rarely needs years of events. :func:`subset_ical` works on
+the raw iCalendar data: it splits the data into top-level components and
+reads only the few properties needed for filtering, so components that are
+dropped are never parsed, anonymized or hashed.
+
+The subset stays consistent:
+
+- ``VTIMEZONE`` components referenced by a ``TZID`` parameter of a kept
+  component are kept, all others are dropped.
+- If an override (a component with ``RECURRENCE-ID``) is kept, the recurrence
+  master with the same ``UID`` is kept as well.
+- Components without a start, such as undated ``VTODO`` components, are
+  kept by a time window, since they cannot be placed outside of it.
+
+Example:
+    .. code-block:: python
+
+        from datetime import date
+
+        from icalendar import Calendar
+        from icalendar_anonymizer import anonymize
+        from icalendar_anonymizer.subset import subset_ical
+
+        with open("calendar.ics", "rb") as f:
+            data = subset_ical(f.read(), since=date(2024, 1, 1), only={"VEVENT"})
+        anonymized = anonymize(Calendar.from_ical(data))
+"""
+
+import contextlib
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime, time, timedelta
+
+from icalendar import Calendar, vDDDTypes, vDuration
+from icalendar.cal import Component
+
+# Properties read from the raw data of each top-level component
+_FILTER_PROPERTIES = {
+    "DTEND",
+    "DTSTART",
+    "DUE",
+    "DURATION",
+    "RDATE",
+    "RECURRENCE-ID",
+    "RRULE",
+    "TZID",
+    "UID",
+}
+
+# Name, parameters (with leading ";") and value of a content line. Parameter
+# values may be quoted and then contain ";" and ":".
+_CONTENT_LINE = re.compile(r'([^;:]*)((?:;(?:[^":]|"[^"]*")*)?):(.*)', re.DOTALL)
+
+# TZID parameter of a content line, quoted or not
+_TZID_PARAMETER = re.compile(r';TZID=(?:"([^"]*)"|([^;:]*))', re.IGNORECASE)
+
+# End of a recurrence rule
+_RRULE_UNTIL = re.compile(r"(?:^|;)UNTIL=([0-9TZ]+)", re.IGNORECASE)
+
+
+@dataclass
+class _Item:
+    """What filtering needs to know about one top-level component."""
+
+    name: str
+    uid: str | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+    duration: timedelta | None = None
+    recurrence_id: datetime | None = None
+    rrule: bool = False
+    # None if the rule is unbounded or bounded by COUNT
+    rrule_until: datetime | None = None
+    rdate: bool = False
+    # TZID parameters used, or the TZID of a VTIMEZONE
+    tzids: set[str] = field(default_factory=set)
+
+    def in_window(self, since: datetime | None, until: datetime | None) -> bool:
+        """Check if the component may occur in the window.
+
+        Overrides also count if the occurrence they replace is in the window.
+        """
+        if self.start is None or self._overlaps(since, until):
+            return True
+        rid = self.recurrence_id
+        return (
+            rid is not None and (since is None or rid >= since) and (until is None or rid < until)
+        )
+
+    def _overlaps(self, since: datetime | None, until: datetime | None) -> bool:
+        if until is not None and self.start >= until:
+            return False
+        if since is None or self.start >= since:
+            return True
+        if self.rdate or (self.rrule and self.rrule_until is None):
+            return True
+        if self.rrule:
+            return self.rrule_until >= since
+        if self.end is not None:
+            end = self.end
+        elif self.duration is not None:
+            end = self.start + self.duration
+        else:
+            end = self.start
+        return end > since
+
+
+def subset_ical(
+    data: bytes,
+    since: date | datetime | None = None,
+    until: date | datetime | None = None,
+    only: Iterable[str] | None = None,
+    uids: Iterable[str] | None = None,
+) -> bytes:
+    r"""Keep only the top-level components that match all given filters.
+
+    Args:
+        data: iCalendar data
+        since: Drop components that end before this time
+        until: Drop components that start at or after this time
+        only: Component names to keep, e.g. ``{"VEVENT", "VTODO"}``
+        uids: UIDs to keep, including all overrides of these UIDs
+
+    Returns:
+        iCalendar data with the calendar properties and the selected
+        components in their original order
+
+    Examples:
+        >>> from datetime import date
+        >>> data = (
+        ...     b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        ...     b"BEGIN:VEVENT\r\nUID:old\r\nDTSTART:20100101T100000Z\r\nEND:VEVENT\r\n"
+        ...     b"BEGIN:VEVENT\r\nUID:new\r\nDTSTART:20240101T100000Z\r\nEND:VEVENT\r\n"
+        ...     b"END:VCALENDAR\r\n"
+        ... )
+        >>> subset_ical(data, since=date(2020, 1, 1)).splitlines()[2:5]
+        [b'BEGIN:VEVENT', b'UID:new', b'DTSTART:20240101T100000Z']
+    """
+    text = data.decode("utf-8", errors="surrogateescape")
+    header, blocks, footer = _split_components(text)
+    keep = _select([item for item, _ in blocks], since, until, only, uids)
+
+    out = header
+    for (_, lines), kept in zip(blocks, keep, strict=True):
+        if kept:
+            out.extend(lines)
+    out.extend(footer)
+    return "".join(out).encode("utf-8", errors="surrogateescape")
+
+
+def subset_calendar(
+    cal: Calendar,
+    since: date | datetime | None = None,
+    until: date | datetime | None = None,
+    only: Iterable[str] | None = None,
+    uids: Iterable[str] | None = None,
+) -> Calendar:
+    """Keep only the top-level components that match all given filters.
+
+    Works like :func:`subset_ical` on an already parsed calendar. The
+    components of the result are shared with cal, not copied.
+
+    Args:
+        cal: The calendar to filter
+        since: Drop components that end before this time
+        until: Drop components that start at or after this time
+        only: Component names to keep, e.g. ``{"VEVENT", "VTODO"}``
+        uids: UIDs to keep, including all overrides of these UIDs
+
+    Returns:
+        A new calendar with the calendar properties and the selected
+        components
+
+    Raises:
+        TypeError: If cal is not a Calendar
+    """
+    if not isinstance(cal, Calendar):
+        raise TypeError(f"Expected Calendar, got {type(cal).__name__}")
+
+    components = cal.subcomponents
+    keep = _select([_item_from_component(c) for c in components], since, until, only, uids)
+    result = Calendar()
+    for key, value in cal.property_items(recursive=False):
+        if key not in ("BEGIN", "END"):
+            result.add(key, value)
+    for component, kept in zip(components, keep, strict=True):
+        if kept:
+            result.add_component(component)
+    return result
+
+
+def _select(
+    items: list[_Item],
+    since: date | datetime | None,
+    until: date | datetime | None,
+    only: Iterable[str] | None,
+    uids: Iterable[str] | None,
+) -> list[bool]:
+    """Decide which items to keep, including referenced timezones and masters."""
+    since_utc = _as_utc(since) if since is not None else None
+    until_utc = _as_utc(until) if until is not None else None
+    names = {name.upper() for name in only} if only is not None else None
+    uid_set = set(uids) if uids is not None else None
+
+    keep = [
+        item.name != "VTIMEZONE"
+        and (names is None or item.name in names)
+        and (uid_set is None or item.uid in uid_set)
+        and item.in_window(since_utc, until_utc)
+        for item in items
+    ]
+
+    # Recurrence masters of kept overrides
+    overridden = {
+        (item.name, item.uid)
+        for item, kept in zip(items, keep, strict=True)
+        if kept and item.recurrence_id is not None
+    }
+    for index, item in enumerate(items):
+        if item.recurrence_id is None and (item.name, item.uid) in overridden:
+            keep[index] = True
+
+    # Timezones referenced by kept components
+    tzids = set().union(*(item.tzids for item, kept in zip(items, keep, strict=True) if kept))
+    for index, item in enumerate(items):
+        if item.name == "VTIMEZONE":
+            keep[index] = (names is not None and "VTIMEZONE" in names) or bool(item.tzids & tzids)
+    return keep
+
+
+def _split_components(
+    text: str,
+) -> tuple[list[str], list[tuple[_Item, list[str]]], list[str]]:
+    """Split raw data into top-level components.
+
+    Returns:
+        Lines before the first component, each component with its lines,
+        and lines after the last component
+    """
+    header: list[str] = []
+    footer: list[str] = []
+    blocks: list[tuple[_Item, list[str]]] = []
+    depth = 0
+    lines: list[str] = []
+    item: _Item | None = None
+    seen_component = False
+    for raw, logical in _content_lines(text):
+        name, params, value = _split_content_line(logical)
+        if name == "BEGIN":
+            depth += 1
+            if depth == 2:
+                item = _Item(value.strip().upper())
+                lines = []
+                seen_component = True
+        if item is None:
+            (footer if seen_component else header).append(raw)
+            if name == "END":
+                depth -= 1
+            continue
+
+        lines.append(raw)
+        tzid = _TZID_PARAMETER.search(params) if params else None
+        if tzid:
+            item.tzids.add(tzid.group(1) if tzid.group(1) is not None else tzid.group(2))
+        if depth == 2 and name in _FILTER_PROPERTIES:
+            _read_property(item, name, value, tzid)
+        if name == "END":
+            depth -= 1
+            if depth == 1:
+                blocks.append((item, lines))
+                item = None
+    return header, blocks, footer
+
+
+def _content_lines(text: str) -> Iterator[tuple[str, str]]:
+    """Yield raw (folded, with line break) and unfolded content lines."""
+    raw: list[str] = []
+    for line in text.splitlines(keepends=True):
+        if line[:1] in (" ", "\t") and raw:
+            raw.append(line)
+            continue
+        if raw:
+            yield _join(raw)
+        raw = [line]
+    if raw:
+        yield _join(raw)
+
+
+def _join(raw: list[str]) -> tuple[str, str]:
+    if len(raw) == 1:
+        return raw[0], raw[0].rstrip("\r\n")
+    unfolded = raw[0].rstrip("\r\n") + "".join(line[1:].rstrip("\r\n") for line in raw[1:])
+    return "".join(raw), unfolded
+
+
+def _split_content_line(line: str) -> tuple[str, str, str]:
+    """Split a content line into upper case name, parameters and value."""
+    match = _CONTENT_LINE.match(line)
+    if match is None:
+        return line.strip().upper(), "", ""
+    name, params, value = match.groups()
+    return name.strip().upper(), params, value
+
+
+def _read_property(item: _Item, name: str, value: str, tzid: re.Match | None) -> None:
+    value = value.strip()
+    if name == "UID":
+        item.uid = value
+    elif name == "TZID":
+        item.tzids.add(value)
+    elif name == "RRULE":
+        item.rrule = True
+        until = _RRULE_UNTIL.search(value)
+        item.rrule_until = _parse_time(until.group(1), None) if until else None
+    elif name == "RDATE":
+        item.rdate = True
+    elif name == "DURATION":
+        with contextlib.suppress(ValueError):
+            item.duration = vDuration.from_ical(value)
+    else:
+        timezone = (tzid.group(1) or tzid.group(2)) if tzid else None
+        parsed = _parse_time(value.split(",")[0], timezone)
+        if name == "DTSTART":
+            item.start = parsed
+        elif name == "RECURRENCE-ID":
+            item.recurrence_id = parsed
+        else:
+            # DTEND or DUE
+            item.end = parsed
+
+
+def _item_from_component(component: Component) -> _Item:
+    item = _Item(component.name)
+    item.uid = str(component["UID"]) if "UID" in component else None
+    for name in ("DTSTART", "DTEND", "DUE", "RECURRENCE-ID"):
+        value = component.get(name)
+        if value is None or not hasattr(value, "dt"):
+            continue
+        moment = _as_utc(value.dt)
+        if name == "DTSTART":
+            item.start = moment
+        elif name == "RECURRENCE-ID":
+            item.recurrence_id = moment
+        else:
+            item.end = moment
+    if "DURATION" in component:
+        item.duration = component["DURATION"].dt
+    item.rdate = "RDATE" in component
+    if "RRULE" in component:
+        item.rrule = True
+        until = component["RRULE"].get("UNTIL")
+        if isinstance(until, list):
+            until = until[0] if until else None
+        item.rrule_until = _as_utc(until) if until is not None else None
+    for sub in component.walk():
+        for _, value in sub.property_items(recursive=False):
+            params = getattr(value, "params", None)
+            if params and "TZID" in params:
+                item.tzids.add(str(params["TZID"]))
+        if sub.name == "VTIMEZONE" and "TZID" in sub:
+            item.tzids.add(str(sub["TZID"]))
+    return item
+
+
+def _parse_time(value: str, timezone: str | None) -> datetime | None:
+    try:
+        moment = (
+            vDDDTypes.from_ical(value, timezone=timezone)
+            if timezone
+            else vDDDTypes.from_ical(value)
+        )
+    except ValueError:
+        return None
+    if isinstance(moment, timedelta | tuple):
+        return None
+    return _as_utc(moment)
+
+
+def _as_utc(moment: date | datetime) -> datetime:
+    """Convert to an aware UTC datetime; dates and floating times count as UTC."""
+    if not isinstance(moment, datetime):
+        moment = datetime.combine(moment, time())
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=UTC)
+    return moment.astimezone(UTC)
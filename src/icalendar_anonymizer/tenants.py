@@ -0,0 +1,261 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Salts for many tenants, derived from one master secret.
+
+Each tenant gets its own salt, derived with HKDF-SHA256 (RFC 5869) from a
+master secret and the tenant ID. The same tenant always gets the same salt,
+so its pseudonyms are stable across runs, while the salts of different
+tenants are unrelated, so their pseudonyms cannot be linked. Only the master
+secret needs to be kept, and it never leaves the keyring.
+
+Example:
+    .. code-block:: python
+
+        from icalendar_anonymizer.tenants import TenantKeyring
+
+        keyring = TenantKeyring.from_file("master.key")
+        anonymized = keyring.anonymizer_for("acme").anonymize(cal)
+"""
+
+import hmac
+import secrets
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from icalendar import Calendar, Component
+
+from ._hash import DEFAULT_HASH_FORMAT, HashFormat
+from .anonymizer import anonymize, anonymize_components
+
+# Shortest accepted master secret in bytes
+MIN_SECRET_SIZE = 16
+
+# Tenants whose anonymizers are kept by default
+DEFAULT_CACHE_SIZE = 1024
+
+# Context of the derived salts, changed if the derivation ever changes
+_SALT_INFO = b"icalendar-anonymizer tenant salt v1"
+
+# HKDF extract salt, fixed so that the same secret always gives the same keys
+_EXTRACT_SALT = b"icalendar-anonymizer"
+
+
+def generate_master_secret() -> bytes:
+    """Generate a random master secret.
+
+    Returns:
+        32 bytes of random data
+    """
+    return secrets.token_bytes(32)
+
+
+def derive_salt(master_secret: bytes, tenant: str, length: int = 32) -> bytes:
+    """Derive the salt of a tenant with HKDF-SHA256.
+
+    Args:
+        master_secret: The master secret, at least 16 bytes
+        tenant: The tenant ID
+        length: Bytes of salt, at most 8160
+
+    Returns:
+        The salt of the tenant
+
+    Raises:
+        ValueError: If the secret is too short, the tenant ID is empty or
+                    length is out of range
+
+    Examples:
+        >>> secret = bytes(32)
+        >>> derive_salt(secret, "acme") == derive_salt(secret, "acme")
+        True
+        >>> derive_salt(secret, "acme") == derive_salt(secret, "globex")
+        False
+    """
+    _check_secret(master_secret)
+    if not tenant:
+        raise ValueError("tenant must not be empty")
+    return _hkdf(
+        master_secret, _EXTRACT_SALT, _SALT_INFO + b"\x00" + tenant.encode("utf-8"), length
+    )
+
+
+def _hkdf(key_material: bytes, salt: bytes, info: bytes, length: int) -> bytes:
+    """HKDF-SHA256 extract and expand, see RFC 5869."""
+    if not 1 <= length <= 255 * 32:
+        raise ValueError(f"length must be between 1 and {255 * 32}, got {length}")
+    key = hmac.digest(salt, key_material, "sha256")
+    blocks = []
+    block = b""
+    for counter in range(1, -(-length // 32) + 1):
+        block = hmac.digest(key, block + info + bytes([counter]), "sha256")
+        blocks.append(block)
+    return b"".join(blocks)[:length]
+
+
+def _check_secret(master_secret: bytes) -> None:
+    if not isinstance(master_secret, bytes):
+        raise TypeError(f"master_secret must be bytes, got {type(master_secret).__name__}")
+    if len(master_secret) < MIN_SECRET_SIZE:
+        raise ValueError(f"master_secret must be at least {MIN_SECRET_SIZE} bytes")
+
+
+class TenantAnonymizer:
+    """Anonymize calendars of one tenant.
+
+    Holds the derived salt and the options of the keyring, checked and
+    normalized once. Create it with :meth:`TenantKeyring.anonymizer_for`.
+
+    Args:
+        tenant: The tenant ID
+        salt: The salt of the tenant
+        preserve: Additional properties to preserve
+        placeholders: Lengths above which properties are replaced
+        hash_format: Encoding and length of the hashes
+    """
+
+    def __init__(
+        self,
+        tenant: str,
+        salt: bytes,
+        preserve: set[str] | None = None,
+        placeholders: dict[str, int] | None = None,
+        hash_format: HashFormat = DEFAULT_HASH_FORMAT,
+    ):
+        self.tenant = tenant
+        self.salt = salt
+        self.preserve = {name.upper() for name in preserve} if preserve else None
+        self.placeholders = (
+            {name.upper(): length for name, length in placeholders.items()}
+            if placeholders
+            else None
+        )
+        self.hash_format = hash_format
+
+    def __repr__(self) -> str:
+        # The salt is not shown
+        return f"{type(self).__name__}({self.tenant!r})"
+
+    def anonymize(self, cal: Calendar, **options) -> Calendar:
+        """Anonymize a calendar with the salt of the tenant.
+
+        Args:
+            cal: The Calendar object to anonymize
+            **options: Further arguments of :func:`~icalendar_anonymizer.anonymize`,
+                       such as ``stats`` or ``consume``
+
+        Returns:
+            New anonymized Calendar object
+        """
+        return anonymize(cal, **self._options(options))
+
+    def anonymize_components(
+        self, cal: Calendar, **options
+    ) -> tuple[Calendar, Iterator[Component]]:
+        """Anonymize a calendar one top-level component at a time.
+
+        See :func:`~icalendar_anonymizer.anonymize_components`.
+        """
+        return anonymize_components(cal, **self._options(options))
+
+    def _options(self, options: dict) -> dict:
+        if "salt" in options or "pseudonyms" in options:
+            # Pseudonyms depend on the input order, so they are not stable per tenant
+            raise TypeError("salt and pseudonyms are determined by the tenant")
+        return {
+            "salt": self.salt,
+            "preserve": self.preserve,
+            "placeholders": self.placeholders,
+            "hash_format": self.hash_format,
+            **options,
+        }
+
+
+class TenantKeyring:
+    """Derive and cache the anonymizers of tenants.
+
+    Anonymizers are kept for the most recently used tenants, so that the
+    salt is derived once per tenant instead of once per calendar. The
+    keyring may be shared between threads.
+
+    Args:
+        master_secret: The master secret, at least 16 bytes
+        preserve: Additional properties to preserve for all tenants
+        placeholders: Lengths above which properties are replaced for all
+                      tenants, see :func:`~icalendar_anonymizer.anonymize`
+        hash_format: Encoding and length of the hashes for all tenants
+        cache_size: Number of tenants whose anonymizers are kept
+
+    Raises:
+        ValueError: If the secret is too short or cache_size is not positive
+    """
+
+    def __init__(
+        self,
+        master_secret: bytes,
+        preserve: set[str] | None = None,
+        placeholders: dict[str, int] | None = None,
+        hash_format: HashFormat | None = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        _check_secret(master_secret)
+        if cache_size < 1:
+            raise ValueError(f"cache_size must be positive, got {cache_size}")
+        self._master_secret = master_secret
+        self.preserve = preserve
+        self.placeholders = placeholders
+        self.hash_format = hash_format if hash_format is not None else DEFAULT_HASH_FORMAT
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, TenantAnonymizer] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str | Path, **options) -> "TenantKeyring":
+        """Create a keyring with the master secret stored in a file.
+
+        Args:
+            path: File holding the raw master secret
+            **options: Further arguments of :class:`TenantKeyring`
+
+        Returns:
+            The keyring
+        """
+        return cls(Path(path).read_bytes(), **options)
+
+    def __repr__(self) -> str:
+        # The master secret is not shown
+        return f"{type(self).__name__}(cache_size={self.cache_size})"
+
+    def anonymizer_for(self, tenant: str) -> TenantAnonymizer:
+        """Return the anonymizer of a tenant.
+
+        Args:
+            tenant: The tenant ID
+
+        Returns:
+            The anonymizer, the same object while the tenant is cached
+
+        Raises:
+            ValueError: If the tenant ID is empty
+        """
+        with self._lock:
+            anonymizer = self._cache.get(tenant)
+            if anonymizer is not None:
+                self._cache.move_to_end(tenant)
+                return anonymizer
+        anonymizer = TenantAnonymizer(
+            tenant,
+            derive_salt(self._master_secret, tenant),
+            self.preserve,
+            self.placeholders,
+            self.hash_format,
+        )
+        with self._lock:
+            # Another thread may have derived it meanwhile, keep the first
+            anonymizer = self._cache.setdefault(tenant, anonymizer)
+            self._cache.move_to_end(tenant)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return anonymizer
@@ -182,6 +182,16 @@ def test_verbose_doesnt_corrupt_stdout(cli_runner, sample_ics, tmp_path):
     assert output_cal is not None
 
 
+def test_verbose_shows_memo_hit_rate(cli_runner, sample_ics):
+    """Test that verbose mode reports the value memo hit rate."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["-v"], input=sample_ics)
+
+    assert result.exit_code == 0
+    assert "Components: 1, memo hit rate:" in result.stderr
+
+
 # Error Handling Tests
 
 
@@ -310,3 +320,624 @@ def test_output_to_file(cli_runner, sample_ics, tmp_path):
     # Verify output file is valid ICS
     output_cal = Calendar.from_ical(output_file.read_bytes())
     assert output_cal is not None
+
+
+# Watch Command Tests
+
+
+def test_watch_once(cli_runner, sample_ics, tmp_path):
+    """Test that watch --once synchronizes the directory and exits."""
+    from icalendar_anonymizer.cli import main
+
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "test-event-uid@example.com.ics").write_bytes(sample_ics)
+    destination = tmp_path / "dest"
+
+    result = cli_runner.invoke(
+        main, ["watch", str(source), "-O", str(destination), "--once", "--polling", "-v"]
+    )
+
+    assert result.exit_code == 0
+    outputs = list(destination.glob("*.ics"))
+    assert len(outputs) == 1
+    assert b"Secret Meeting" not in outputs[0].read_bytes()
+    assert (tmp_path / "dest.ican-state" / "salt").exists()
+    assert "updated: 1" in result.output
+
+
+def test_sync(cli_runner, sample_ics, tmp_path):
+    """Test that sync anonymizes new files and skips them on the next run."""
+    from icalendar_anonymizer.cli import main
+
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "test-event-uid@example.com.ics").write_bytes(sample_ics)
+    destination = tmp_path / "dest"
+
+    result = cli_runner.invoke(main, ["sync", str(source), "-O", str(destination), "-v"])
+    assert result.exit_code == 0
+    outputs = list(destination.glob("*.ics"))
+    assert len(outputs) == 1
+    assert b"Secret Meeting" not in outputs[0].read_bytes()
+    assert "updated: 1" in result.output
+    assert (tmp_path / "dest.ican-state" / "index").exists()
+
+    (source / "test-event-uid@example.com.ics").unlink()
+    result = cli_runner.invoke(main, ["sync", str(source), "-O", str(destination), "-v"])
+    assert result.exit_code == 0
+    assert "removed: 1" in result.output
+    assert list(destination.glob("*.ics")) == []
+
+
+def test_sync_reports_failures(cli_runner, tmp_path):
+    """Test that sync exits with 1 if a file cannot be anonymized."""
+    from icalendar_anonymizer.cli import main
+
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "broken.ics").write_bytes(b"not a calendar")
+
+    result = cli_runner.invoke(main, ["sync", str(source), "-O", str(tmp_path / "dest")])
+    assert result.exit_code == 1
+    assert "Failed to anonymize broken.ics" in result.output
+
+
+def test_default_command_still_accepts_input_file(cli_runner, sample_ics, tmp_path):
+    """Test that the anonymize command is used when no subcommand is given."""
+    from icalendar_anonymizer.cli import main
+
+    input_file = tmp_path / "input.ics"
+    input_file.write_bytes(sample_ics)
+
+    assert cli_runner.invoke(main, [str(input_file)]).exit_code == 0
+    assert cli_runner.invoke(main, ["anonymize", str(input_file)]).exit_code == 0
+
+
+# Format Tests
+
+
+def test_jcal_output(cli_runner, sample_ics):
+    """Test that --format jcal writes anonymized jCal."""
+    import json
+
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--format", "jcal"], input=sample_ics)
+
+    assert result.exit_code == 0
+    cal = Calendar.from_jcal(json.loads(result.output_bytes))
+    event = next(iter(cal.walk("VEVENT")))
+    assert event["summary"] != "Secret Meeting"
+    assert event["dtstart"].dt == datetime(2024, 1, 15, 14, 0, 0)
+
+
+def test_xcal_output(cli_runner, sample_ics):
+    """Test that --format xcal writes well-formed xCal."""
+    from xml.etree import ElementTree as ET
+
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--format", "xcal"], input=sample_ics)
+
+    assert result.exit_code == 0
+    assert b"Secret Meeting" not in result.output_bytes
+    root = ET.fromstring(result.output_bytes)  # noqa: S314
+    assert root.tag == "{urn:ietf:params:xml:ns:icalendar-2.0}icalendar"
+
+
+def test_jcal_input(cli_runner, sample_ics):
+    """Test that jCal input is detected and anonymized."""
+    import json
+
+    from icalendar_anonymizer.cli import main
+
+    jcal = json.dumps(Calendar.from_ical(sample_ics).to_jcal()).encode()
+    result = cli_runner.invoke(main, input=jcal)
+
+    assert result.exit_code == 0
+    event = next(iter(Calendar.from_ical(result.output_bytes).walk("VEVENT")))
+    assert event["summary"] != "Secret Meeting"
+
+
+def test_invalid_jcal_input(cli_runner):
+    """Test error handling for invalid jCal input."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, input=b'["vcalendar"]')
+
+    assert result.exit_code == 1
+    assert "Error: Invalid jCal" in result.output
+
+
+# Verify Tests
+
+
+def test_verify_passes_for_anonymized_output(cli_runner, sample_ics):
+    """Test that --verify writes the output when nothing leaked."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--verify", "--format", "jcal"], input=sample_ics)
+
+    assert result.exit_code == 0
+    assert b"Secret Meeting" not in result.output_bytes
+    assert b"vcalendar" in result.output_bytes
+
+
+def test_verify_fails_on_leak(cli_runner, sample_ics, tmp_path):
+    """Test that --verify reports leaks and writes nothing."""
+    from icalendar_anonymizer.cli import main
+
+    # RELATED-TO is preserved and copies the UID verbatim
+    leaky = sample_ics.replace(
+        b"END:VEVENT", b"RELATED-TO:test-event-uid@example.com\r\nEND:VEVENT"
+    )
+    output_file = tmp_path / "output.ics"
+    result = cli_runner.invoke(main, ["--verify", "-", "-o", str(output_file)], input=leaky)
+
+    assert result.exit_code == 1
+    assert "'test-event-uid@example.com' from VEVENT UID" in result.output
+    assert "no output written" in result.output
+    assert not output_file.exists()
+
+
+# Pseudonym Tests
+
+
+@pytest.mark.parametrize("output_format", ["ics", "jcal"])
+def test_pseudonyms_option(cli_runner, sample_ics, output_format):
+    """Test that --pseudonyms replaces values with sequential pseudonyms."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--pseudonyms", "--format", output_format], input=sample_ics)
+
+    assert result.exit_code == 0
+    assert b"Secret Meeting" not in result.output_bytes
+    assert b"uid1@anonymous.local" in result.output_bytes
+
+
+# Hash Format Tests
+
+
+def test_hash_encoding_option(cli_runner, sample_ics):
+    """Test that --hash-encoding and --hash-length shorten the hashes."""
+    from icalendar import Calendar
+
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(
+        main, ["--hash-encoding", "base36", "--hash-length", "10"], input=sample_ics
+    )
+
+    assert result.exit_code == 0
+    event = next(iter(Calendar.from_ical(result.output_bytes).walk("VEVENT")))
+    assert [len(word) for word in str(event["summary"]).split()] == [10, 10]
+    assert len(str(event["uid"])) == len("@anonymous.local") + 25
+
+
+def test_hash_length_too_long(cli_runner, sample_ics):
+    """Test that a hash length beyond the encoding's maximum is an error."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(
+        main, ["--hash-encoding", "base32", "--hash-length", "40"], input=sample_ics
+    )
+
+    assert result.exit_code == 1
+    assert "text_length must be between 1 and 32" in result.output
+
+
+def test_uid_length_option(cli_runner, sample_ics):
+    """Test that --uid-length sets the length of hashed UIDs only."""
+    from icalendar import Calendar
+
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--uid-length", "12"], input=sample_ics)
+
+    assert result.exit_code == 0
+    event = next(iter(Calendar.from_ical(result.output_bytes).walk("VEVENT")))
+    uid, domain = str(event["uid"]).split("@")
+    assert len(uid) == 12
+    assert domain == "anonymous.local"
+    assert [len(word) for word in str(event["summary"]).split()] == [16, 16]
+
+
+def test_uid_length_too_long(cli_runner, sample_ics):
+    """Test that a UID length beyond the encoding's maximum is an error."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--uid-length", "65"], input=sample_ics)
+
+    assert result.exit_code == 1
+    assert "uid_length must be between 1 and 64" in result.output
+
+
+# Subset Tests
+
+
+def test_since_until_filters_components(cli_runner):
+    """Test that --since and --until drop components outside the window."""
+    from icalendar_anonymizer.cli import main
+
+    cal = Calendar()
+    for uid, start in (("old", datetime(2010, 1, 1)), ("new", datetime(2024, 1, 15))):
+        event = Event()
+        event.add("uid", uid)
+        event.add("dtstart", start)
+        cal.add_component(event)
+
+    result = cli_runner.invoke(
+        main, ["--since", "2024-01-01", "--until", "2024-02-01T00:00"], input=cal.to_ical()
+    )
+
+    assert result.exit_code == 0
+    events = list(Calendar.from_ical(result.output_bytes).walk("VEVENT"))
+    assert [e["dtstart"].dt for e in events] == [datetime(2024, 1, 15)]
+
+
+def test_only_and_uid_filters(cli_runner, sample_ics):
+    """Test that --only and --uid select components."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--only", "VTODO,VJOURNAL"], input=sample_ics)
+    assert result.exit_code == 0
+    assert b"BEGIN:VEVENT" not in result.output_bytes
+
+    result = cli_runner.invoke(main, ["--uid", "test-event-uid@example.com"], input=sample_ics)
+    assert result.exit_code == 0
+    assert b"BEGIN:VEVENT" in result.output_bytes
+
+
+# Tenant Tests
+
+
+def test_tenant_is_stable(cli_runner, sample_ics, tmp_path):
+    """Test that --tenant gives the same output across runs and other output per tenant."""
+    from icalendar_anonymizer.cli import main
+
+    key_file = tmp_path / "master.key"
+    key_file.write_bytes(bytes(range(32)))
+
+    def run(tenant):
+        result = cli_runner.invoke(
+            main, ["--tenant", tenant, "--master-key-file", str(key_file)], input=sample_ics
+        )
+        assert result.exit_code == 0
+        return result.output_bytes
+
+    assert run("acme") == run("acme")
+    assert run("acme") != run("globex")
+
+
+def test_tenant_requires_master_key(cli_runner, sample_ics, monkeypatch):
+    """Test that --tenant without a master secret fails."""
+    from icalendar_anonymizer.cli import main
+
+    monkeypatch.delenv("ICAN_MASTER_KEY_FILE", raising=False)
+    result = cli_runner.invoke(main, ["--tenant", "acme"], input=sample_ics)
+    assert result.exit_code == 1
+    assert "--master-key-file" in result.output
+
+
+def test_tenant_master_key_too_short(cli_runner, sample_ics, tmp_path):
+    """Test that a short master secret is rejected."""
+    from icalendar_anonymizer.cli import main
+
+    key_file = tmp_path / "master.key"
+    key_file.write_bytes(b"short")
+    result = cli_runner.invoke(
+        main, ["--tenant", "acme", "--master-key-file", str(key_file)], input=sample_ics
+    )
+    assert result.exit_code == 1
+    assert "at least 16 bytes" in result.output
+
+
+# Quarantine Tests
+
+
+def test_quarantine_malformed_component(cli_runner, sample_ics, tmp_path):
+    """Test that --quarantine leaves out malformed components and exits with 3."""
+    from icalendar_anonymizer.cli import QUARANTINE_EXIT_CODE, main
+
+    malformed = b"BEGIN:VEVENT\r\nUID:broken\r\nSUMMARY Secret\r\nEND:VEVENT\r\n"
+    data = sample_ics.replace(b"END:VCALENDAR", malformed + b"END:VCALENDAR")
+    quarantine = tmp_path / "quarantine.txt"
+    output = tmp_path / "output.ics"
+    result = cli_runner.invoke(
+        main, ["--quarantine", str(quarantine), "-o", str(output)], input=data
+    )
+    assert result.exit_code == QUARANTINE_EXIT_CODE
+    assert "1 malformed component(s) left out" in result.output
+    assert len(Calendar.from_ical(output.read_bytes()).walk("VEVENT")) == 1
+    report = quarantine.read_text()
+    assert report.startswith("# VEVENT at lines")
+    assert "Secret" not in report
+
+
+def test_quarantine_without_malformed_components(cli_runner, sample_ics, tmp_path):
+    """Test that --quarantine exits with 0 and leaves an empty file for valid input."""
+    from icalendar_anonymizer.cli import main
+
+    quarantine = tmp_path / "quarantine.txt"
+    result = cli_runner.invoke(
+        main, ["--quarantine", str(quarantine), "--format", "jcal"], input=sample_ics
+    )
+    assert result.exit_code == 0
+    assert quarantine.read_text() == ""
+
+
+def test_quarantine_reads_input_as_stream(cli_runner, sample_ics, tmp_path):
+    """Test that streamed input keeps its line numbers and is checked against limits."""
+    from icalendar_anonymizer.cli import QUARANTINE_EXIT_CODE, main
+
+    malformed = b"BEGIN:VEVENT\r\nUID:broken\r\nSUMMARY Secret\r\nEND:VEVENT\r\n"
+    data = sample_ics.replace(b"END:VCALENDAR", malformed + b"END:VCALENDAR")
+    quarantine = tmp_path / "quarantine.txt"
+    reports = []
+    for prefix in (b"", b"\r\n\r\n"):
+        result = cli_runner.invoke(main, ["--quarantine", str(quarantine)], input=prefix + data)
+        assert result.exit_code == QUARANTINE_EXIT_CODE
+        reports.append(quarantine.read_text().splitlines()[0])
+    first_line = data.count(b"\n") - 4
+    assert reports == [
+        f"# VEVENT at lines {first_line}-{first_line + 3}: unparsable lines",
+        f"# VEVENT at lines {first_line + 2}-{first_line + 5}: unparsable lines",
+    ]
+
+    result = cli_runner.invoke(
+        main, ["--quarantine", str(quarantine), "--max-properties", "2"], input=data
+    )
+    assert result.exit_code == 1
+    assert "more than 2 properties" in result.output
+
+
+def test_malformed_input_fails_without_quarantine(cli_runner, sample_ics):
+    """Test that a malformed component fails the whole input by default."""
+    from icalendar_anonymizer.cli import main
+
+    data = sample_ics.replace(b"END:VCALENDAR", b"END:VEVENT\r\nEND:VCALENDAR")
+    result = cli_runner.invoke(main, [], input=data)
+    assert result.exit_code == 1
+    assert "Invalid ICS file" in result.output
+
+
+# Limits Tests
+
+
+def test_limits_within(cli_runner, sample_ics):
+    """Test that input within the limits is anonymized."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(
+        main, ["--max-components", "1", "--max-depth", "1", "--max-size", "10000"], input=sample_ics
+    )
+    assert result.exit_code == 0
+    assert "Secret Meeting" not in result.output
+
+
+@pytest.mark.parametrize(
+    ("option", "value", "message"),
+    [
+        ("--max-size", "10", "Input exceeds the size limit of 10 bytes"),
+        ("--max-line-length", "20", "Content line exceeds the limit of 20 bytes (line 3)"),
+        ("--max-properties", "5", "Calendar has more than 5 properties (line 8)"),
+    ],
+)
+def test_limit_exceeded(cli_runner, sample_ics, option, value, message):
+    """Test that input exceeding a limit is rejected before it is parsed."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, [option, value], input=sample_ics)
+    assert result.exit_code == 1
+    assert f"Error: {message}" in result.output
+
+
+def test_limit_exceeded_in_jcal(cli_runner, sample_ics):
+    """Test that parsed jCal input is checked while it is anonymized."""
+    import json
+
+    from icalendar_anonymizer.cli import main
+
+    jcal = json.dumps(Calendar.from_ical(sample_ics).to_jcal()).encode()
+    result = cli_runner.invoke(main, ["--max-components", "1"], input=jcal)
+    assert result.exit_code == 0
+    result = cli_runner.invoke(main, ["--max-properties", "3"], input=jcal)
+    assert result.exit_code == 1
+    assert "Error: Calendar has more than 3 properties" in result.output
+
+
+def test_invalid_limit(cli_runner, sample_ics):
+    """Test that limits must be positive."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["--max-depth", "0"], input=sample_ics)
+    assert result.exit_code == 2
+
+
+# Mapping Tests
+
+
+def test_mapping_export_and_lookup(cli_runner, sample_ics, tmp_path):
+    """Test that pseudonyms of the output are found with ican lookup."""
+    from icalendar_anonymizer.cli import main
+
+    key_file = tmp_path / "mapping.key"
+    key_file.write_bytes(bytes(range(32)))
+    mapping = tmp_path / "mapping.bin"
+    result = cli_runner.invoke(
+        main,
+        [
+            "--mapping-export",
+            str(mapping),
+            "--mapping-key-file",
+            str(key_file),
+            "--mapping-words",
+        ],
+        input=sample_ics,
+    )
+    assert result.exit_code == 0
+    assert b"test-event-uid@example.com" not in mapping.read_bytes()
+
+    event = Calendar.from_ical(result.output_bytes).walk("VEVENT")[0]
+    uid = str(event["UID"])
+    word = str(event["SUMMARY"]).split()[0]
+    result = cli_runner.invoke(
+        main, ["lookup", str(mapping), "--key-file", str(key_file), uid, word]
+    )
+    assert result.exit_code == 0
+    assert result.output == f"{uid}\tuid\ttest-event-uid@example.com\n{word}\tword\tSecret\n"
+
+
+def test_mapping_export_with_jcal_output(cli_runner, sample_ics, tmp_path):
+    """Test that the mapping is written when components are anonymized while written."""
+    import json
+
+    from icalendar_anonymizer.cli import main
+
+    key_file = tmp_path / "mapping.key"
+    key_file.write_bytes(bytes(range(32)))
+    mapping = tmp_path / "mapping.bin"
+    result = cli_runner.invoke(
+        main,
+        ["-f", "jcal", "--mapping-export", str(mapping), "--mapping-key-file", str(key_file)],
+        input=sample_ics,
+    )
+    assert result.exit_code == 0
+    uid = Calendar.from_jcal(json.loads(result.output)).walk("VEVENT")[0]["UID"]
+    result = cli_runner.invoke(main, ["lookup", str(mapping), "--key-file", str(key_file), uid])
+    assert result.exit_code == 0
+    assert "test-event-uid@example.com" in result.output
+
+
+def test_lookup_not_found(cli_runner, sample_ics, tmp_path):
+    """Test that ican lookup fails for unknown pseudonyms."""
+    from icalendar_anonymizer.cli import main
+
+    key_file = tmp_path / "mapping.key"
+    key_file.write_bytes(bytes(range(32)))
+    mapping = tmp_path / "mapping.bin"
+    cli_runner.invoke(
+        main,
+        ["--mapping-export", str(mapping), "--mapping-key-file", str(key_file)],
+        input=sample_ics,
+    )
+    result = cli_runner.invoke(
+        main, ["lookup", str(mapping), "--key-file", str(key_file), "--kind", "uid", "unknown"]
+    )
+    assert result.exit_code == 1
+    assert "Not found: unknown" in result.output
+
+
+def test_lookup_wrong_key(cli_runner, sample_ics, tmp_path):
+    """Test that ican lookup rejects another key."""
+    from icalendar_anonymizer.cli import main
+
+    key_file = tmp_path / "mapping.key"
+    key_file.write_bytes(bytes(range(32)))
+    other_key_file = tmp_path / "other.key"
+    other_key_file.write_bytes(bytes(32))
+    mapping = tmp_path / "mapping.bin"
+    cli_runner.invoke(
+        main,
+        ["--mapping-export", str(mapping), "--mapping-key-file", str(key_file)],
+        input=sample_ics,
+    )
+    result = cli_runner.invoke(
+        main, ["lookup", str(mapping), "--key-file", str(other_key_file), "anything"]
+    )
+    assert result.exit_code == 1
+    assert "Error: Wrong key" in result.output
+
+
+def test_mapping_export_requires_key(cli_runner, sample_ics, tmp_path, monkeypatch):
+    """Test that --mapping-export without a key fails before anonymizing."""
+    from icalendar_anonymizer.cli import main
+
+    monkeypatch.delenv("ICAN_MAPPING_KEY_FILE", raising=False)
+    mapping = tmp_path / "mapping.bin"
+    result = cli_runner.invoke(main, ["--mapping-export", str(mapping)], input=sample_ics)
+    assert result.exit_code == 1
+    assert "--mapping-key-file" in result.output
+    assert not mapping.exists()
+
+
+# Profile Tests
+
+
+@pytest.mark.parametrize("output_format", ["ics", "jcal"])
+def test_profile_report(cli_runner, sample_ics, tmp_path, output_format):
+    """Test that --profile-report writes the profile without values."""
+    import json
+
+    from icalendar_anonymizer.cli import main
+
+    report = tmp_path / "profile.json"
+    result = cli_runner.invoke(
+        main, ["-f", output_format, "--profile-report", str(report)], input=sample_ics
+    )
+    assert result.exit_code == 0
+    assert b"Secret" not in result.output_bytes
+    data = report.read_text(encoding="utf-8")
+    assert json.loads(data)["components"] == {"VEVENT": 1}
+    for value in ("Secret", "Confidential", "Private", "test-event-uid"):
+        assert value not in data
+
+
+# Mail Tests
+
+
+def _mbox(sample_ics, count):
+    """Create an mbox archive of count messages with sample_ics as calendar part."""
+    message = (
+        b"Subject: Invitation\n"
+        b"MIME-Version: 1.0\n"
+        b"Content-Type: text/calendar; method=REQUEST\n"
+        b"\n" + sample_ics.replace(b"\r\n", b"\n") + b"\n"
+    )
+    return b"".join(
+        b"From jane@example.com Mon Jan 15 14:00:00 2024\n" + message for _ in range(count)
+    )
+
+
+def test_mail_writes_calendars(cli_runner, sample_ics):
+    """Test that ican mail writes the anonymized calendars of an mbox archive."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["mail", "-v", "--workers", "2"], input=_mbox(sample_ics, 3))
+    assert result.exit_code == 0
+    calendars = Calendar.from_ical(result.stdout_bytes, multiple=True)
+    assert len(calendars) == 3
+    assert len({str(cal.walk("VEVENT")[0]["UID"]) for cal in calendars}) == 1
+    assert b"Secret" not in result.stdout_bytes
+    assert "messages: 3, calendar parts: 3" in result.stderr
+
+
+def test_mail_rewrites_messages(cli_runner, sample_ics):
+    """Test that ican mail --messages keeps the headers of the messages."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["mail", "--messages"], input=_mbox(sample_ics, 2))
+    assert result.exit_code == 0
+    assert result.output_bytes.count(b"Subject: Invitation\n") == 2
+    assert b"Secret" not in result.output_bytes
+
+
+def test_mail_without_calendars(cli_runner):
+    """Test that ican mail warns if no calendar part is found."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(main, ["mail"], input=b"Subject: Hello\n\nNo invitation\n")
+    assert result.exit_code == 0
+    assert "No calendar parts found" in result.stderr
+
+
+def test_mail_invalid_calendar(cli_runner):
+    """Test that ican mail fails on invalid calendar parts."""
+    from icalendar_anonymizer.cli import main
+
+    result = cli_runner.invoke(
+        main, ["mail"], input=b"Content-Type: text/calendar\n\nnot a calendar\n"
+    )
+    assert result.exit_code == 1
+    assert "Error: Message 1" in result.stderr
@@ -503,6 +503,54 @@ def test_empty_calendar():
     assert len(list(anon_cal.walk())) > 0  # At least VCALENDAR component
 
 
+def test_nested_properties_stay_in_their_component():
+    """Properties of subcomponents are not copied to the parent."""
+    from icalendar import Alarm
+
+    from icalendar_anonymizer import anonymize
+
+    cal = Calendar()
+    cal.add("version", "2.0")
+    event = Event()
+    event.add("summary", "Lunch")
+    alarm = Alarm()
+    alarm.add("action", "DISPLAY")
+    event.add_component(alarm)
+    cal.add_component(event)
+
+    anon_cal = anonymize(cal)
+    anon_event = anon_cal.subcomponents[0]
+
+    assert list(anon_cal.keys()) == ["VERSION"]
+    assert list(anon_event.keys()) == ["SUMMARY"]
+    assert list(anon_event.subcomponents[0].keys()) == ["ACTION"]
+    assert anon_cal.to_ical().count(b"BEGIN:") == 3
+
+
+def test_components_nested_deeper_than_recursion_limit():
+    """Components nested deeper than the recursion limit are anonymized."""
+    import sys
+
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.observe import StatsObserver
+
+    depth = sys.getrecursionlimit() * 2
+    data = (
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:deep@example.com\r\n"
+        + "BEGIN:VALARM\r\nDESCRIPTION:Secret\r\n" * depth
+        + "END:VALARM\r\n" * depth
+        + "END:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    cal = Calendar.from_ical(data)
+
+    output = anonymize(cal, salt=b"salt").to_ical()
+    observer = StatsObserver()
+    assert anonymize(cal, salt=b"salt", observer=observer).to_ical() == output
+    assert output.count(b"BEGIN:VALARM") == depth
+    assert b"Secret" not in output
+    assert observer.components["VALARM"].count == depth
+
+
 def test_calendar_with_only_vtimezone():
     """Calendar with only VTIMEZONE should work."""
     from icalendar.cal import Timezone, TimezoneStandard
@@ -730,3 +778,131 @@ def test_preserve_type_validation_rejects_tuple():
 
     with pytest.raises(TypeError, match="preserve must be a set or None, got tuple"):
         anonymize(cal, preserve=("LOCATION",))
+
+
+# Placeholder Tests
+
+
+@pytest.fixture
+def event_with_attachment():
+    """Create event with an inline binary attachment."""
+    import base64
+
+    payload = base64.b64encode(b"Secret contract!" * 1000).decode("ascii")
+    ics = (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nBEGIN:VEVENT\r\nUID:attach@example.com\r\n"
+        "ATTACH;FMTTYPE=application/pdf;ENCODING=BASE64;VALUE=BINARY;X-FILENAME=secret.pdf:"
+        + payload
+        + "\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+    return Calendar.from_ical(ics)
+
+
+def test_binary_attachment_replaced_by_placeholder(event_with_attachment):
+    """Binary ATTACH values become a small placeholder keeping FMTTYPE."""
+    from icalendar.prop import vBinary
+
+    from icalendar_anonymizer import anonymize
+
+    original = next(iter(event_with_attachment.walk("VEVENT")))["attach"]
+    anon_cal = anonymize(event_with_attachment)
+    attach = next(iter(anon_cal.walk("VEVENT")))["attach"]
+
+    assert isinstance(attach, vBinary)
+    assert attach.bytes != original.bytes
+    assert len(attach.bytes) == 16
+    assert attach.params["FMTTYPE"] == "application/pdf"
+    assert attach.params["X-ANONYMIZED-SIZE"] == "16000"
+    assert "X-FILENAME" not in attach.params
+
+
+def test_binary_placeholder_roundtrips(event_with_attachment):
+    """Placeholders serialize to valid iCalendar."""
+    from icalendar_anonymizer import anonymize
+
+    anon_cal = anonymize(event_with_attachment, salt=b"salt")
+    reparsed = Calendar.from_ical(anon_cal.to_ical())
+    attach = next(iter(reparsed.walk("VEVENT")))["attach"]
+
+    assert attach.params["ENCODING"] == "BASE64"
+    assert anonymize(event_with_attachment, salt=b"salt").to_ical() == anon_cal.to_ical()
+
+
+def test_text_placeholder_for_configured_property(simple_event):
+    """Text longer than the configured length is replaced by a placeholder."""
+    from icalendar_anonymizer import anonymize
+
+    anon_cal = anonymize(simple_event, placeholders={"description": 10})
+    event = next(iter(anon_cal.walk("VEVENT")))
+
+    assert len(str(event["description"])) == 16
+    assert event["description"].params["X-ANONYMIZED-SIZE"] == "36"
+    # Other properties are still hashed word by word
+    assert len(str(event["summary"]).split()) == 2
+
+
+def test_text_below_placeholder_length_is_hashed(simple_event):
+    """Text shorter than the configured length keeps its word structure."""
+    from icalendar_anonymizer import anonymize
+
+    anon_cal = anonymize(simple_event, placeholders={"DESCRIPTION": 1000})
+    event = next(iter(anon_cal.walk("VEVENT")))
+
+    assert len(str(event["description"]).split()) == 5
+
+
+def test_placeholders_type_validation(simple_event):
+    """placeholders must be a dict."""
+    from icalendar_anonymizer import anonymize
+
+    with pytest.raises(TypeError, match="placeholders must be a dict or None, got set"):
+        anonymize(simple_event, placeholders={"DESCRIPTION"})
+
+
+# Hash Format Tests
+
+
+def test_anonymize_hash_format(simple_event):
+    """anonymize() encodes hashes in the requested format."""
+    from icalendar_anonymizer import HashFormat, anonymize
+
+    hex_cal = anonymize(simple_event, salt=b"salt")
+    base36_cal = anonymize(simple_event, salt=b"salt", hash_format=HashFormat("base36"))
+
+    hex_event = next(iter(hex_cal.walk("VEVENT")))
+    base36_event = next(iter(base36_cal.walk("VEVENT")))
+    assert len(base36_cal.to_ical()) < len(hex_cal.to_ical())
+    assert len(str(base36_event["uid"])) < len(str(hex_event["uid"]))
+    assert len(str(base36_event["summary"]).split()) == len(str(hex_event["summary"]).split())
+
+
+def test_anonymize_rejects_invalid_hash_format(simple_event):
+    """hash_format must be a HashFormat."""
+    from icalendar_anonymizer import anonymize
+
+    with pytest.raises(TypeError, match="hash_format"):
+        anonymize(simple_event, hash_format="base36")
+
+
+# Shared UID Map Tests
+
+
+def test_uid_map_is_shared_between_calendars(simple_event):
+    """A shared uid_map collects the UIDs of all calendars."""
+    from icalendar_anonymizer import anonymize
+
+    uid_map = {}
+    first = anonymize(simple_event, salt=b"shared", uid_map=uid_map)
+    second = anonymize(simple_event, salt=b"shared", uid_map=uid_map)
+
+    anonymized_uid = str(first.walk("VEVENT")[0]["UID"])
+    assert uid_map == {"original-uid-12345@example.com": anonymized_uid}
+    assert str(second.walk("VEVENT")[0]["UID"]) == anonymized_uid
+
+
+def test_uid_map_rejects_pseudonyms(simple_event):
+    """Sequential pseudonyms are per run, so they cannot share a uid_map."""
+    from icalendar_anonymizer import anonymize
+
+    with pytest.raises(ValueError, match="uid_map"):
+        anonymize(simple_event, pseudonyms=True, uid_map={})
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for anonymizing while consuming the original calendar."""
+
+import gc
+import io
+import tracemalloc
+
+import pytest
+from icalendar import Calendar
+
+SALT = b"consume-test-salt"
+
+
+def _calendar_ics(events: int) -> bytes:
+    """Create a calendar with distinct events, as parsed from a file."""
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Test//Test//EN"]
+    for index in range(events):
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:event-{index}@example.com",
+            "DTSTART:20240101T090000Z",
+            f"SUMMARY:Meeting number {index} about the project",
+            "DESCRIPTION:" + " ".join(f"word{index}x{word}" for word in range(40)),
+            f"ATTENDEE;CN=Person {index}:mailto:person{index}@example.com",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(lines) + "\r\n").encode()
+
+
+@pytest.fixture(scope="module")
+def large_ics():
+    """Serialized calendar with 300 events."""
+    return _calendar_ics(300)
+
+
+def test_consume_gives_same_output():
+    """Consuming mode produces the same calendar and empties the original."""
+    from icalendar_anonymizer import anonymize
+
+    data = _calendar_ics(5)
+    expected = anonymize(Calendar.from_ical(data), salt=SALT).to_ical()
+    cal = Calendar.from_ical(data)
+
+    result = anonymize(cal, salt=SALT, consume=True)
+
+    assert result.to_ical() == expected
+    assert cal.subcomponents == []
+    assert cal["VERSION"] == "2.0"
+
+
+def test_consume_detaches_before_next_component():
+    """Each original component is detached before the next is anonymized."""
+    from icalendar_anonymizer import anonymize_components
+
+    cal = Calendar.from_ical(_calendar_ics(3))
+    originals = list(cal.subcomponents)
+    _, components = anonymize_components(cal, salt=SALT, consume=True)
+
+    next(components)
+    assert originals[0] not in cal.subcomponents
+
+
+def test_consume_puts_back_unprocessed_components():
+    """Components that were not reached are restored in their order."""
+    from icalendar_anonymizer import anonymize_components
+
+    cal = Calendar.from_ical(_calendar_ics(4))
+    originals = list(cal.subcomponents)
+    _, components = anonymize_components(cal, salt=SALT, consume=True)
+
+    next(components)
+    next(components)
+    components.close()
+
+    assert cal.subcomponents == originals[2:]
+
+
+def _peak_above_start(data: bytes, function) -> tuple[int, int, int]:
+    """Return the tree size, the peak and the retained memory of a run."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        cal = Calendar.from_ical(data)
+        tree, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = function(cal)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del cal, result
+    return tree, peak, current
+
+
+def test_consume_peak_memory_is_one_tree(large_ics):
+    """Peak memory stays at about one tree plus one component."""
+    from icalendar_anonymizer import anonymize
+
+    # The value memo is bounded but not small, leave it out of the measurement
+    tree, peak, new_tree = _peak_above_start(
+        large_ics, lambda cal: anonymize(cal, salt=SALT, memo_size=0, consume=True)
+    )
+    _, plain_peak, _ = _peak_above_start(
+        large_ics, lambda cal: anonymize(cal, salt=SALT, memo_size=0)
+    )
+
+    # new_tree is what remains: the anonymized tree without the original
+    assert peak < new_tree + tree // 4
+    assert plain_peak > tree + new_tree - tree // 4
+
+
+def test_consume_streaming_peak_memory(large_ics):
+    """Writing jCal while consuming never holds much more than one tree."""
+    from icalendar_anonymizer.formats import anonymize_to_jcal
+
+    out = io.StringIO()
+    tree, peak, _ = _peak_above_start(
+        large_ics,
+        lambda cal: anonymize_to_jcal(cal, out, salt=SALT, memo_size=0, consume=True),
+    )
+
+    # The output buffer grows while the original tree shrinks
+    assert peak < tree + tree // 4
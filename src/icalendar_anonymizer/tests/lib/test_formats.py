@@ -0,0 +1,161 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for jCal and xCal input and output."""
+
+import io
+import json
+from datetime import datetime
+from xml.etree import ElementTree as ET
+
+import pytest
+from icalendar import Alarm, Calendar, Event, vCalAddress
+
+SALT = b"formats-test-salt"
+NS = {"x": "urn:ietf:params:xml:ns:icalendar-2.0"}
+
+
+@pytest.fixture
+def calendar():
+    """Create a calendar with an event, an attendee and an alarm."""
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Test//EN")
+    cal.add("version", "2.0")
+    event = Event()
+    event.add("uid", "event-1@example.com")
+    event.add("summary", "Team Meeting")
+    event.add("dtstart", datetime(2024, 1, 15, 14, 0, 0))
+    event.add("rrule", {"freq": "WEEKLY", "byday": ["MO", "WE"]})
+    attendee = vCalAddress("mailto:jane.smith@example.com")
+    attendee.params["cn"] = "Jane Smith"
+    attendee.params["role"] = "REQ-PARTICIPANT"
+    event.add("attendee", attendee)
+    alarm = Alarm()
+    alarm.add("action", "DISPLAY")
+    alarm.add("description", "Reminder")
+    event.add_component(alarm)
+    cal.add_component(event)
+    return cal
+
+
+def test_jcal_matches_anonymize(calendar):
+    """jCal output contains the same data as anonymize()."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.formats import anonymize_to_jcal
+
+    out = io.StringIO()
+    anonymize_to_jcal(calendar, out, salt=SALT)
+
+    assert json.loads(out.getvalue()) == anonymize(calendar, salt=SALT).to_jcal()
+
+
+def test_jcal_hides_personal_data(calendar):
+    """Personal data does not appear in jCal output."""
+    from icalendar_anonymizer.formats import anonymize_to_jcal
+
+    out = io.StringIO()
+    anonymize_to_jcal(calendar, out)
+
+    for secret in ("Team Meeting", "Jane Smith", "jane.smith", "Reminder", "event-1"):
+        assert secret not in out.getvalue()
+    assert "REQ-PARTICIPANT" in out.getvalue()
+
+
+def test_jcal_is_written_incrementally():
+    """Each component is written before the next one is produced."""
+    from icalendar_anonymizer.formats import write_jcal
+
+    out = io.StringIO()
+    events = [Event(), Event()]
+    events[0].add("summary", "first")
+    events[1].add("summary", "second")
+
+    def components():
+        yield events[0]
+        assert "first" in out.getvalue()
+        yield events[1]
+
+    write_jcal(Calendar(), components(), out)
+
+    assert [c[1][0][3] for c in json.loads(out.getvalue())[2]] == ["first", "second"]
+
+
+def test_ical_writer_matches_to_ical(calendar):
+    """Writing components one at a time gives the output of to_ical()."""
+    from icalendar_anonymizer import anonymize, anonymize_components
+    from icalendar_anonymizer.formats import write_ical
+
+    out = io.BytesIO()
+    write_ical(*anonymize_components(calendar, salt=SALT), out)
+
+    assert out.getvalue() == anonymize(calendar, salt=SALT).to_ical()
+
+
+def test_read_jcal_roundtrip(calendar):
+    """jCal input parses to the same calendar."""
+    from icalendar_anonymizer.formats import read_jcal
+
+    parsed = read_jcal(json.dumps(calendar.to_jcal()))
+
+    assert parsed.to_ical() == calendar.to_ical()
+
+
+@pytest.mark.parametrize(
+    "data",
+    ["not json", '["vevent", [], []]', '["vcalendar"]'],
+)
+def test_read_jcal_rejects_invalid_input(data):
+    """Invalid jCal raises ValueError."""
+    from icalendar_anonymizer.formats import read_jcal
+
+    with pytest.raises(ValueError):
+        read_jcal(data)
+
+
+def test_xcal_structure(calendar):
+    """xCal output follows the RFC 6321 element layout."""
+    from icalendar_anonymizer.formats import anonymize_to_xcal
+
+    out = io.StringIO()
+    anonymize_to_xcal(calendar, out, salt=SALT)
+    root = ET.fromstring(out.getvalue())  # noqa: S314
+
+    assert root.tag == "{urn:ietf:params:xml:ns:icalendar-2.0}icalendar"
+    version = root.find("x:vcalendar/x:properties/x:version/x:text", NS)
+    assert version.text == "2.0"
+
+    event = root.find("x:vcalendar/x:components/x:vevent", NS)
+    assert event.find("x:properties/x:dtstart/x:date-time", NS).text == "2024-01-15T14:00:00"
+    recur = event.find("x:properties/x:rrule/x:recur", NS)
+    assert recur.find("x:freq", NS).text == "WEEKLY"
+    assert [e.text for e in recur.findall("x:byday", NS)] == ["MO", "WE"]
+
+    attendee = event.find("x:properties/x:attendee", NS)
+    assert attendee.find("x:parameters/x:role/x:text", NS).text == "REQ-PARTICIPANT"
+    assert attendee.find("x:parameters/x:cn/x:text", NS).text != "Jane Smith"
+    assert "jane.smith" not in attendee.find("x:cal-address", NS).text
+
+    alarm = event.find("x:components/x:valarm", NS)
+    assert alarm.find("x:properties/x:action/x:text", NS).text == "DISPLAY"
+
+
+def test_xcal_structured_values(calendar):
+    """GEO and REQUEST-STATUS parts are children of their property element."""
+    from icalendar_anonymizer.formats import anonymize_to_xcal
+
+    event = calendar.walk("VEVENT")[0]
+    event.add("geo", (37.386013, -122.082932))
+    event.add("request-status", "2.0;Success")
+    out = io.StringIO()
+    # GEO is written as it is only when preserved
+    anonymize_to_xcal(calendar, out, salt=SALT, preserve={"GEO"})
+    properties = ET.fromstring(out.getvalue()).find(  # noqa: S314
+        "x:vcalendar/x:components/x:vevent/x:properties", NS
+    )
+
+    geo = properties.find("x:geo", NS)
+    assert [child.tag.split("}")[1] for child in geo] == ["latitude", "longitude"]
+    assert geo.find("x:latitude", NS).text == "37.386013"
+    status = properties.find("x:request-status", NS)
+    assert [child.tag.split("}")[1] for child in status] == ["code", "description"]
+    assert status.find("x:code", NS).text == "2.0"
@@ -0,0 +1,175 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the hashing helpers."""
+
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+SALT = b"hash-test-salt"
+
+
+@given(st.text())
+def test_streaming_matches_hash_text(text):
+    """hash_text_streaming gives exactly the output of hash_text."""
+    from icalendar_anonymizer._hash import hash_text, hash_text_streaming
+
+    assert hash_text_streaming(text, SALT) == hash_text(text, SALT)
+
+
+@pytest.mark.parametrize("text", ["", "   ", "\t\n", "one", " leading and trailing \r\n"])
+def test_streaming_edge_cases(text):
+    """Empty, blank and padded text behave like hash_text."""
+    from icalendar_anonymizer._hash import hash_text, hash_text_streaming
+
+    assert hash_text_streaming(text, SALT) == hash_text(text, SALT)
+
+
+@pytest.mark.parametrize(
+    ("text", "limit", "exceeds"),
+    [
+        ("abcd", 4, False),
+        ("abcde", 4, True),
+        ("ää", 4, False),
+        ("äää", 5, True),
+        ("🎉", 4, False),
+    ],
+)
+def test_streaming_max_value_bytes(text, limit, exceeds):
+    """max_value_bytes limits the UTF-8 size of the value."""
+    from icalendar_anonymizer._hash import hash_text_streaming
+
+    if exceeds:
+        with pytest.raises(ValueError, match="max_value_bytes"):
+            hash_text_streaming(text, SALT, max_value_bytes=limit)
+    else:
+        assert hash_text_streaming(text, SALT, max_value_bytes=limit)
+
+
+def test_large_values_use_streaming(monkeypatch):
+    """anonymize() hashes values above the threshold with the streaming hasher."""
+    from datetime import datetime
+
+    from icalendar import Calendar, Event
+
+    from icalendar_anonymizer import _hash, anonymize
+    from icalendar_anonymizer._hash import hash_text
+
+    monkeypatch.setattr(_hash, "STREAMING_THRESHOLD", 100)
+    calls = []
+    original = _hash.hash_text_streaming
+
+    def spy(text, salt, **kwargs):
+        calls.append(len(text))
+        return original(text, salt, **kwargs)
+
+    monkeypatch.setattr(_hash, "hash_text_streaming", spy)
+
+    description = "Forwarded message from the thread " * 20
+    cal = Calendar()
+    event = Event()
+    event.add("summary", "Short")
+    event.add("description", description)
+    event.add("dtstart", datetime(2024, 1, 15, 14, 0, 0))
+    cal.add_component(event)
+
+    anon_event = next(iter(anonymize(cal, salt=SALT).walk("VEVENT")))
+
+    assert calls == [len(description)]
+    assert str(anon_event["description"]) == hash_text(description, SALT)
+
+
+# Hash Format Tests
+
+
+@pytest.mark.parametrize(
+    ("encoding", "alphabet", "text_length", "uid_length"),
+    [
+        ("hex", "0123456789abcdef", 16, 32),
+        ("base32", "abcdefghijklmnopqrstuvwxyz234567", 13, 26),
+        ("base36", "0123456789abcdefghijklmnopqrstuvwxyz", 13, 25),
+    ],
+)
+def test_hash_format_defaults(encoding, alphabet, text_length, uid_length):
+    """Default lengths keep at least 64 bits per word and 128 per UID."""
+    from icalendar_anonymizer._hash import HashFormat, hash_email, hash_text, hash_uid
+
+    hash_format = HashFormat(encoding)
+    words = hash_text("alpha beta", SALT, hash_format).split()
+    uid = hash_uid("event@example.com", SALT, {}, hash_format)
+    local, domain = hash_email("jane@example.com", SALT, hash_format).split("@")
+
+    assert hash_format.bits(hash_format.text_length) >= 64
+    assert hash_format.bits(hash_format.uid_length) >= 128
+    assert [len(word) for word in words] == [text_length, text_length]
+    assert len(local) == text_length
+    assert domain.endswith(".local")
+    assert uid == f"{uid[:uid_length]}@anonymous.local"
+    assert set("".join(words) + uid[:uid_length]) <= set(alphabet)
+
+
+def test_hash_format_default_is_unchanged():
+    """The default format gives the historical 16 hex characters per word."""
+    import hashlib
+
+    from icalendar_anonymizer._hash import HashFormat, hash_text
+
+    expected = hashlib.sha256(SALT + b"word").hexdigest()[:16]
+
+    assert hash_text("word", SALT) == expected
+    assert hash_text("word", SALT, HashFormat("hex")) == expected
+
+
+@pytest.mark.parametrize("encoding", ["hex", "base32", "base36"])
+def test_hash_format_lengths(encoding):
+    """Custom lengths apply to words, email parts and UIDs."""
+    from icalendar_anonymizer._hash import HashFormat, hash_email, hash_text, hash_uid
+
+    hash_format = HashFormat(encoding, text_length=7, email_length=5, uid_length=9)
+
+    assert len(hash_text("word", SALT, hash_format)) == 7
+    assert (
+        hash_email("a@b.com", SALT, hash_format).split("@")[0]
+        == hash_email("a@c.org", SALT, hash_format).split("@")[0]
+    )
+    assert len(hash_email("a@b.com", SALT, hash_format)) == len("12345@12345.local")
+    assert len(hash_uid("uid", SALT, {}, hash_format)) == len("123456789@anonymous.local")
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"encoding": "base64"},
+        {"encoding": "hex", "text_length": 0},
+        {"encoding": "hex", "uid_length": 65},
+        {"encoding": "base32", "email_length": 33},
+    ],
+)
+def test_hash_format_rejects_invalid(kwargs):
+    """Unknown encodings and impossible lengths raise ValueError."""
+    from icalendar_anonymizer._hash import HashFormat
+
+    with pytest.raises(ValueError):
+        HashFormat(**kwargs)
+
+
+@given(st.text())
+def test_streaming_matches_hash_text_base36(text):
+    """hash_text_streaming honours the hash format like hash_text."""
+    from icalendar_anonymizer._hash import HashFormat, hash_text, hash_text_streaming
+
+    hash_format = HashFormat("base36", text_length=10)
+
+    assert hash_text_streaming(text, SALT, hash_format=hash_format) == hash_text(
+        text, SALT, hash_format
+    )
+
+
+def test_collision_probability():
+    """The birthday bound is about 1/2 at 2**32 values for 64 bits."""
+    from icalendar_anonymizer._hash import collision_probability
+
+    assert collision_probability(0, 64) == 0
+    assert 0.39 < collision_probability(2**32, 64) < 0.4
+    assert collision_probability(10**6, 128) < 1e-20
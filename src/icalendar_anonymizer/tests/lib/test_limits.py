@@ -0,0 +1,187 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for limits on the size and shape of calendars."""
+
+import io
+
+import pytest
+from icalendar import Calendar
+
+ICS = (
+    b"BEGIN:VCALENDAR\r\n"
+    b"VERSION:2.0\r\n"
+    b"PRODID:-//Test//Test//EN\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:event-1@example.com\r\n"
+    b"SUMMARY:Team Meeting\r\n"
+    b" continued\r\n"
+    b"BEGIN:VALARM\r\n"
+    b"ACTION:DISPLAY\r\n"
+    b"END:VALARM\r\n"
+    b"END:VEVENT\r\n"
+    b"BEGIN:VTODO\r\n"
+    b"UID:todo-1@example.com\r\n"
+    b"END:VTODO\r\n"
+    b"END:VCALENDAR\r\n"
+)
+
+# Limits ICS is just within: 3 components, 6 properties, depth 2
+WITHIN = {
+    "max_size": len(ICS),
+    "max_line_length": len(b"SUMMARY:Team Meetingcontinued"),
+    "max_components": 3,
+    "max_properties": 6,
+    "max_depth": 2,
+}
+
+
+# Raw Data Tests
+
+
+def test_calendar_within_limits():
+    """A calendar within all limits passes."""
+    from icalendar_anonymizer.limits import Limits, check_ical
+
+    check_ical(ICS, Limits(**WITHIN))
+
+
+def test_no_limits():
+    """Without limits, nothing is rejected."""
+    from icalendar_anonymizer.limits import Limits, check_ical
+
+    check_ical(ICS * 100, Limits())
+
+
+@pytest.mark.parametrize(
+    ("limit", "line", "message"),
+    [
+        ("max_size", None, "Input exceeds the size limit of"),
+        ("max_line_length", 7, "Content line exceeds the limit of"),
+        ("max_components", 12, "Calendar has more than 2 components"),
+        ("max_properties", 13, "Calendar has more than 5 properties"),
+        ("max_depth", 8, "Components are nested deeper than 1"),
+    ],
+)
+def test_limit_exceeded(limit, line, message):
+    """Each limit is reported with the line it was exceeded at."""
+    from icalendar_anonymizer.limits import LimitExceeded, Limits, check_ical
+
+    limits = Limits(**{**WITHIN, limit: WITHIN[limit] - 1})
+    with pytest.raises(LimitExceeded, match=message) as info:
+        check_ical(ICS, limits)
+    assert info.value.limit == limit
+    assert info.value.maximum == WITHIN[limit] - 1
+    assert info.value.line == line
+    if line is not None:
+        assert str(info.value).endswith(f"(line {line})")
+
+
+def test_limit_exceeded_is_value_error():
+    """Code catching ValueError for invalid calendars also catches limits."""
+    from icalendar_anonymizer.limits import Limits, check_ical
+
+    with pytest.raises(ValueError, match="nested deeper"):
+        check_ical(ICS, Limits(max_depth=1))
+
+
+def test_check_ical_stops_without_splitting_all_lines():
+    """An early limit is found without allocating a copy of every line."""
+    import tracemalloc
+
+    from icalendar_anonymizer.limits import LimitExceeded, Limits, check_ical
+
+    data = b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\n" + b"X:\r\n" * 1_000_000
+    tracemalloc.start()
+    try:
+        with pytest.raises(LimitExceeded, match="nested deeper") as info:
+            check_ical(data, Limits(max_depth=0))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert info.value.line == 2
+    assert peak < len(data) // 10
+
+
+def test_begin_and_end_are_case_insensitive():
+    """Components are counted whatever the case of BEGIN and END."""
+    from icalendar_anonymizer.limits import LimitExceeded, Limits, check_ical
+
+    data = ICS.replace(b"BEGIN:VALARM", b"begin:valarm").replace(b"END:VALARM", b"End:VAlarm")
+    check_ical(data, Limits(max_depth=2, max_properties=6))
+    with pytest.raises(LimitExceeded, match="nested deeper"):
+        check_ical(data, Limits(max_depth=1))
+
+
+def test_check_lines_streams_data():
+    """check_lines passes lines through and counts across them."""
+    from icalendar_anonymizer.limits import LimitExceeded, Limits, check_lines
+
+    assert b"".join(check_lines(io.BytesIO(ICS), Limits(**WITHIN))) == ICS
+
+    lines = check_lines(io.BytesIO(ICS), Limits(max_size=40))
+    assert next(lines) == b"BEGIN:VCALENDAR\r\n"
+    with pytest.raises(LimitExceeded, match="size limit of 40 bytes") as info:
+        list(lines)
+    assert info.value.line == 3
+
+
+def test_check_lines_matches_check_ical():
+    """Streaming and checking all data at once report the same line."""
+    from icalendar_anonymizer.limits import LimitExceeded, Limits, check_ical, check_lines
+
+    limits = Limits(max_properties=4)
+    with pytest.raises(LimitExceeded) as at_once:
+        check_ical(ICS, limits)
+    with pytest.raises(LimitExceeded) as streamed:
+        list(check_lines(io.BytesIO(ICS), limits))
+    assert str(at_once.value) == str(streamed.value)
+
+
+# Parsed Calendar Tests
+
+
+def test_anonymize_within_limits():
+    """anonymize accepts a calendar within the limits."""
+    from icalendar_anonymizer import Limits, anonymize
+
+    limits = Limits(max_components=3, max_properties=6, max_depth=2)
+    anonymized = anonymize(Calendar.from_ical(ICS), limits=limits)
+    assert len(anonymized.subcomponents) == 2
+
+
+@pytest.mark.parametrize(
+    ("limit", "message"),
+    [
+        ("max_components", "more than 2 components"),
+        ("max_properties", "more than 5 properties"),
+        ("max_depth", "nested deeper than 1"),
+    ],
+)
+def test_anonymize_limit_exceeded(limit, message):
+    """anonymize rejects a parsed calendar exceeding a limit, without a line."""
+    from icalendar_anonymizer import LimitExceeded, Limits, anonymize
+
+    limits = Limits(**{limit: WITHIN[limit] - 1})
+    with pytest.raises(LimitExceeded, match=message) as info:
+        anonymize(Calendar.from_ical(ICS), limits=limits)
+    assert info.value.line is None
+
+
+def test_anonymize_components_checks_lazily():
+    """Components are counted as they are anonymized."""
+    from icalendar_anonymizer import LimitExceeded, Limits
+    from icalendar_anonymizer.anonymizer import anonymize_components
+
+    _, components = anonymize_components(Calendar.from_ical(ICS), limits=Limits(max_components=2))
+    assert next(components).name == "VEVENT"
+    with pytest.raises(LimitExceeded):
+        next(components)
+
+
+def test_anonymize_rejects_invalid_limits():
+    """limits must be a Limits instance."""
+    from icalendar_anonymizer import anonymize
+
+    with pytest.raises(TypeError, match="limits"):
+        anonymize(Calendar.from_ical(ICS), limits={"max_depth": 1})
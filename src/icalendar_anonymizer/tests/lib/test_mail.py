@@ -0,0 +1,243 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for anonymizing the calendar parts of email."""
+
+import base64
+import email
+import io
+import mailbox
+
+import pytest
+from icalendar import Calendar
+
+SALT = b"mail-test-salt"
+
+
+def make_ics(uid: str, summary: str) -> str:
+    return (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//Test//Test//EN\r\n"
+        "METHOD:REQUEST\r\n"
+        "BEGIN:VEVENT\r\n"
+        f"UID:{uid}\r\n"
+        "DTSTART:20240115T140000Z\r\n"
+        f"SUMMARY:{summary}\r\n"
+        "ATTENDEE;CN=Jane Doe:mailto:jane@example.com\r\n"
+        "END:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+
+
+def make_invitation(uid: str, summary: str, encoding: str = "base64") -> bytes:
+    """Create an invitation with a text part and a calendar part."""
+    ics = make_ics(uid, summary)
+    payload = base64.encodebytes(ics.encode()).decode("ascii") if encoding == "base64" else ics
+    return (
+        "From: Jane Doe <jane@example.com>\r\n"
+        f"Subject: Invitation: {summary}\r\n"
+        "MIME-Version: 1.0\r\n"
+        'Content-Type: multipart/alternative; boundary="BOUNDARY"\r\n'
+        "\r\n"
+        "--BOUNDARY\r\n"
+        "Content-Type: text/plain; charset=utf-8\r\n"
+        "\r\n"
+        "You have been invited.\r\n"
+        "--BOUNDARY\r\n"
+        "Content-Type: text/calendar; charset=utf-8; method=REQUEST\r\n"
+        f"Content-Transfer-Encoding: {encoding}\r\n"
+        "\r\n"
+        f"{payload}"
+        "--BOUNDARY--\r\n"
+    ).encode()
+
+
+def make_mbox(*messages: bytes) -> bytes:
+    """Join messages into an mbox archive with LF line endings."""
+    return b"".join(
+        b"From jane@example.com Mon Jan 15 14:00:00 2024\n"
+        + message.replace(b"\r\n", b"\n")
+        + b"\n"
+        for message in messages
+    )
+
+
+def run(data: bytes, **options) -> bytes:
+    from icalendar_anonymizer.mail import anonymize_mail
+
+    output = io.BytesIO()
+    anonymize_mail(io.BytesIO(data), output, salt=SALT, **options)
+    return output.getvalue()
+
+
+# Reading Tests
+
+
+def test_iter_messages_of_mbox():
+    """Messages of an mbox archive are split at From lines after blank lines."""
+    from icalendar_anonymizer.mail import iter_messages
+
+    data = make_mbox(
+        b"Subject: one\n\nbody\n", b"Subject: two\n\nHello\nFrom here, not a new message\n"
+    )
+    messages = list(iter_messages(io.BytesIO(data)))
+    assert [separator[:5] for separator, _ in messages] == [b"From ", b"From "]
+    assert [email.message_from_bytes(message)["Subject"] for _, message in messages] == [
+        "one",
+        "two",
+    ]
+
+
+def test_iter_messages_of_single_message():
+    """Input without a From line is one message."""
+    from icalendar_anonymizer.mail import iter_messages
+
+    message = make_invitation("event-1@example.com", "Lunch")
+    assert list(iter_messages(io.BytesIO(message))) == [(None, message)]
+
+
+def test_calendar_parts_of_forwarded_message():
+    """Calendar parts of attached messages and .ics attachments are found."""
+    from icalendar_anonymizer.mail import calendar_parts
+
+    forwarded = (
+        b"Subject: Fwd: Invitation\r\n"
+        b"MIME-Version: 1.0\r\n"
+        b'Content-Type: multipart/mixed; boundary="OUTER"\r\n'
+        b"\r\n"
+        b"--OUTER\r\n"
+        b"Content-Type: message/rfc822\r\n"
+        b"\r\n" + make_invitation("event-1@example.com", "Lunch") + b"--OUTER\r\n"
+        b"Content-Type: application/octet-stream\r\n"
+        b'Content-Disposition: attachment; filename="invite.ics"\r\n'
+        b"\r\n" + make_ics("event-2@example.com", "Dinner").encode() + b"--OUTER--\r\n"
+    )
+    parts = calendar_parts(email.message_from_bytes(forwarded))
+    assert [part.get_content_type() for part in parts] == [
+        "text/calendar",
+        "application/octet-stream",
+    ]
+
+
+# Anonymization Tests
+
+
+def test_calendars_are_written():
+    """The anonymized calendars of all messages are written in order."""
+    data = make_mbox(
+        make_invitation("event-1@example.com", "Lunch"),
+        b"Subject: no calendar\n\nHello\n",
+        make_invitation("event-2@example.com", "Dinner", encoding="8bit"),
+    )
+    output = run(data, workers=2)
+    calendars = Calendar.from_ical(output, multiple=True)
+    assert len(calendars) == 2
+    for value in (b"example.com", b"Lunch", b"Dinner", b"Jane"):
+        assert value not in output
+    assert str(calendars[0].walk("VEVENT")[0]["UID"]) != str(calendars[1].walk("VEVENT")[0]["UID"])
+
+
+def test_shared_salt_across_messages():
+    """An invitation and its update get the same UID and attendee."""
+    data = make_mbox(
+        make_invitation("event-1@example.com", "Lunch"),
+        make_invitation("event-1@example.com", "Lunch, moved", encoding="quoted-printable"),
+    )
+    first, second = (cal.walk("VEVENT")[0] for cal in Calendar.from_ical(run(data), multiple=True))
+    assert first["UID"] == second["UID"]
+    assert first["ATTENDEE"] == second["ATTENDEE"]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_output_does_not_depend_on_workers(workers):
+    """Parts are written in the order of the input with any number of threads."""
+    data = make_mbox(
+        *(
+            make_invitation(f"event-{number}@example.com", f"Meeting {number}")
+            for number in range(20)
+        )
+    )
+    assert run(data, workers=workers) == run(data, workers=1)
+
+
+@pytest.mark.parametrize("encoding", ["base64", "quoted-printable", "8bit"])
+def test_messages_are_rewritten(encoding):
+    """Only the calendar parts change, in their transfer encoding."""
+    invitation = make_invitation("event-1@example.com", "Lunch", encoding=encoding)
+    output = run(invitation, rewrite=True)
+
+    message = email.message_from_bytes(output)
+    assert message["Subject"] == "Invitation: Lunch"
+    text, calendar = message.get_payload()
+    assert text.get_payload() == "You have been invited."
+    assert calendar["Content-Transfer-Encoding"] == encoding
+    anonymized = calendar.get_payload(decode=True)
+    assert b"Lunch" not in anonymized
+    assert b"example.com" not in anonymized
+    assert Calendar.from_ical(anonymized).walk("VEVENT")[0]["DTSTART"].to_ical() == (
+        b"20240115T140000Z"
+    )
+    # Everything before the calendar part is unchanged
+    assert (
+        output.split(b"Content-Type: text/calendar")[0]
+        == invitation.split(b"Content-Type: text/calendar")[0]
+    )
+
+
+def test_mbox_is_rewritten():
+    """Rewritten mbox archives can be read, and messages without calendars are unchanged."""
+    from icalendar_anonymizer.mail import iter_messages
+
+    plain = b"Subject: no calendar\n\n>From the body\n"
+    data = make_mbox(make_invitation("event-1@example.com", "Lunch"), plain)
+    output = run(data, rewrite=True)
+
+    assert plain in output
+    messages = [
+        email.message_from_bytes(message) for _, message in iter_messages(io.BytesIO(output))
+    ]
+    assert [message["Subject"] for message in messages] == ["Invitation: Lunch", "no calendar"]
+    assert b"Lunch" not in messages[0].get_payload()[1].get_payload(decode=True)
+
+
+def test_rewritten_mbox_is_read_by_mailbox(tmp_path):
+    """The standard library reads all messages of a rewritten archive."""
+    data = make_mbox(
+        make_invitation("event-1@example.com", "Lunch"),
+        make_invitation("event-2@example.com", "Dinner"),
+    )
+    path = tmp_path / "rewritten.mbox"
+    path.write_bytes(run(data, rewrite=True))
+    box = mailbox.mbox(path)
+    assert [message["Subject"] for message in box] == ["Invitation: Lunch", "Invitation: Dinner"]
+    box.close()
+
+
+def test_invalid_calendar_names_message():
+    """An invalid calendar part fails the run, naming the message."""
+    from icalendar_anonymizer.mail import anonymize_mail
+
+    data = make_mbox(
+        make_invitation("event-1@example.com", "Lunch"),
+        b"Content-Type: text/calendar\n\nnot a calendar\n",
+    )
+    with pytest.raises(ValueError, match="Message 2"):
+        anonymize_mail(io.BytesIO(data), io.BytesIO(), salt=SALT)
+
+
+def test_invalid_workers():
+    """Workers must be positive."""
+    from icalendar_anonymizer.mail import anonymize_mail
+
+    with pytest.raises(ValueError, match="workers must be positive"):
+        anonymize_mail(io.BytesIO(b""), io.BytesIO(), workers=0)
+
+
+def test_result_counts():
+    """Messages and calendar parts are counted."""
+    from icalendar_anonymizer.mail import anonymize_mail
+
+    data = make_mbox(make_invitation("event-1@example.com", "Lunch"), b"Subject: x\n\nHello\n")
+    result = anonymize_mail(io.BytesIO(data), io.BytesIO(), salt=SALT)
+    assert (result.messages, result.parts) == (2, 1)
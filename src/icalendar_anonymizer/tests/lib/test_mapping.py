@@ -0,0 +1,195 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the encrypted reverse lookup of pseudonyms."""
+
+import pytest
+from icalendar import Calendar
+
+KEY = bytes(range(32))
+
+ICS = (
+    b"BEGIN:VCALENDAR\r\n"
+    b"VERSION:2.0\r\n"
+    b"PRODID:-//Test//Test//EN\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:event-1@example.com\r\n"
+    b"DTSTART:20240115T140000Z\r\n"
+    b"SUMMARY:Lunch with Jane\r\n"
+    b"ATTENDEE;CN=Jane Doe;ROLE=REQ-PARTICIPANT:mailto:jane@example.com\r\n"
+    b"ORGANIZER;CN=Bob:mailto:bob@example.com\r\n"
+    b"END:VEVENT\r\n"
+    b"END:VCALENDAR\r\n"
+)
+
+
+def _anonymize(recorder, **options):
+    from icalendar_anonymizer import anonymize
+
+    anonymized = anonymize(Calendar.from_ical(ICS), salt=b"salt", mapping=recorder, **options)
+    return anonymized.walk("VEVENT")[0]
+
+
+# Recording Tests
+
+
+@pytest.mark.parametrize("pseudonyms", [False, True])
+def test_records_uids_emails_and_common_names(tmp_path, pseudonyms):
+    """UIDs, email addresses and common names of the output map to the originals."""
+    from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+    recorder = MappingRecorder()
+    event = _anonymize(recorder, pseudonyms=pseudonyms)
+    assert recorder.write(tmp_path / "mapping.bin", KEY) == len(recorder) == 5
+
+    attendee = event["ATTENDEE"]
+    with MappingFile(tmp_path / "mapping.bin", KEY) as mapping:
+        assert len(mapping) == 5
+        assert mapping.lookup(str(event["UID"])) == [("uid", "event-1@example.com")]
+        assert mapping.lookup(str(attendee)) == [("email", "jane@example.com")]
+        assert mapping.lookup(attendee.params["CN"]) == [("cn", "Jane Doe")]
+        assert mapping.lookup(str(event["ORGANIZER"]).removeprefix("mailto:")) == [
+            ("email", "bob@example.com")
+        ]
+        # Words are only recorded on request
+        assert mapping.lookup(str(event["SUMMARY"]).split()[0]) == []
+
+
+def test_records_words(tmp_path):
+    """With words, each word of text maps to the original word."""
+    from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+    recorder = MappingRecorder(words=True)
+    event = _anonymize(recorder)
+    recorder.write(tmp_path / "mapping.bin", KEY)
+
+    summary = str(event["SUMMARY"]).split()
+    with MappingFile(tmp_path / "mapping.bin", KEY) as mapping:
+        assert [mapping.lookup(word, kinds=("word",)) for word in summary] == [
+            [("word", "Lunch")],
+            [("word", "with")],
+            [("word", "Jane")],
+        ]
+        # The first word of the CN is the same word as in the summary
+        cn = event["ATTENDEE"].params["CN"]
+        assert mapping.lookup(cn.split()[0]) == [("word", "Jane")]
+        assert mapping.lookup(cn, kinds=("cn", "word")) == [("cn", "Jane Doe")]
+
+
+def test_output_is_unchanged():
+    """Recording does not change the anonymized calendar."""
+    from icalendar_anonymizer.mapping import MappingRecorder
+
+    recorded = _anonymize(MappingRecorder(words=True))
+    assert recorded.to_ical() == _anonymize(None).to_ical()
+
+
+def test_collisions_keep_all_originals(tmp_path):
+    """A pseudonym replacing several originals maps to all of them."""
+    from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+    recorder = MappingRecorder()
+    recorder.add("word", "a", "first")
+    recorder.add("word", "a", "second")
+    recorder.add("word", "a", "first")
+    recorder.write(tmp_path / "mapping.bin", KEY)
+    with MappingFile(tmp_path / "mapping.bin", KEY) as mapping:
+        assert mapping.lookup("a") == [("word", "first"), ("word", "second")]
+
+
+def test_mapping_type_is_checked():
+    """Only a MappingRecorder is accepted as mapping."""
+    from icalendar_anonymizer import anonymize
+
+    with pytest.raises(TypeError, match="mapping must be a MappingRecorder"):
+        anonymize(Calendar.from_ical(ICS), mapping={})
+
+
+# File Tests
+
+
+def test_lookup_in_large_file(tmp_path):
+    """Every record of a file with many records is found by binary search."""
+    from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+    recorder = MappingRecorder()
+    for number in range(2000):
+        recorder.add("uid", f"uid{number}@anonymous.local", f"event-{number}@example.com")
+    recorder.write(tmp_path / "mapping.bin", KEY)
+    with MappingFile(tmp_path / "mapping.bin", KEY) as mapping:
+        for number in range(2000):
+            assert mapping.lookup(f"uid{number}@anonymous.local") == [
+                ("uid", f"event-{number}@example.com")
+            ]
+        assert mapping.lookup("uid2000@anonymous.local") == []
+
+
+def test_file_is_encrypted_and_private(tmp_path):
+    """Neither pseudonyms nor originals are stored in plain text."""
+    from icalendar_anonymizer.mapping import MappingRecorder
+
+    recorder = MappingRecorder(words=True)
+    event = _anonymize(recorder)
+    path = tmp_path / "mapping.bin"
+    recorder.write(path, KEY)
+    data = path.read_bytes()
+    for value in (b"event-1", b"jane", b"Jane", b"Lunch", str(event["UID"]).encode()):
+        assert value not in data
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+def test_empty_mapping(tmp_path):
+    """A mapping without records can be written and read."""
+    from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+    assert MappingRecorder().write(tmp_path / "mapping.bin", KEY) == 0
+    with MappingFile(tmp_path / "mapping.bin", KEY) as mapping:
+        assert len(mapping) == 0
+        assert mapping.lookup("anything") == []
+
+
+def test_wrong_key(tmp_path):
+    """A file cannot be opened with another key."""
+    from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+    MappingRecorder().write(tmp_path / "mapping.bin", KEY)
+    with pytest.raises(ValueError, match="Wrong key"):
+        MappingFile(tmp_path / "mapping.bin", bytes(32))
+
+
+@pytest.mark.parametrize("data", [b"", b"not a mapping file at all, not at all"])
+def test_not_a_mapping_file(tmp_path, data):
+    """Other files are rejected."""
+    from icalendar_anonymizer.mapping import MappingFile
+
+    path = tmp_path / "other.bin"
+    path.write_bytes(data)
+    with pytest.raises(ValueError, match="not a mapping file"):
+        MappingFile(path, KEY)
+
+
+def test_tampered_record(tmp_path):
+    """A modified record fails to decrypt."""
+    from cryptography.exceptions import InvalidTag
+
+    from icalendar_anonymizer.mapping import MappingFile, MappingRecorder
+
+    recorder = MappingRecorder()
+    recorder.add("uid", "uid1@anonymous.local", "event-1@example.com")
+    path = tmp_path / "mapping.bin"
+    recorder.write(path, KEY)
+    data = bytearray(path.read_bytes())
+    # The last byte of the only record, before the index
+    data[-29] ^= 1
+    path.write_bytes(bytes(data))
+    with MappingFile(path, KEY) as mapping, pytest.raises(InvalidTag):
+        mapping.lookup("uid1@anonymous.local")
+
+
+@pytest.mark.parametrize(("key", "error"), [(b"short", ValueError), ("text" * 8, TypeError)])
+def test_invalid_key(tmp_path, key, error):
+    """Keys must be bytes of at least MIN_KEY_SIZE."""
+    from icalendar_anonymizer.mapping import MappingRecorder
+
+    with pytest.raises(error):
+        MappingRecorder().write(tmp_path / "mapping.bin", key)
@@ -0,0 +1,123 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the per-run value memo and anonymization statistics."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from icalendar import Calendar, Event, vCalAddress
+
+SALT = b"memo-test-salt"
+
+
+def _attendee(partstat: str) -> vCalAddress:
+    attendee = vCalAddress("mailto:jane@example.com")
+    attendee.params["cn"] = "Jane Doe"
+    attendee.params["partstat"] = partstat
+    return attendee
+
+
+@pytest.fixture
+def series():
+    """Create a recurring event with overrides repeating its values."""
+    cal = Calendar()
+    start = datetime(2024, 1, 1, 9, 0, 0)
+    for index in range(4):
+        event = Event()
+        event.add("uid", "series@example.com")
+        event.add("dtstart", start + timedelta(weeks=index))
+        if index:
+            event.add("recurrence-id", start + timedelta(weeks=index))
+        event.add("summary", "Weekly sync")
+        event.add("location", "Room 1")
+        event.add("attendee", _attendee("DECLINED" if index == 3 else "ACCEPTED"))
+        cal.add_component(event)
+    return cal
+
+
+# Memo Tests
+
+
+def test_memo_gives_same_output(series):
+    """The memo does not change the anonymized calendar."""
+    from icalendar_anonymizer import anonymize
+
+    with_memo = anonymize(series, salt=SALT)
+    without_memo = anonymize(series, salt=SALT, memo_size=0)
+
+    assert with_memo.to_ical() == without_memo.to_ical()
+
+
+def test_memo_counts_hits(series):
+    """Repeated values are hits, the statistics count them."""
+    from icalendar_anonymizer import AnonymizationStats, anonymize
+
+    stats = AnonymizationStats()
+    anonymize(series, salt=SALT, stats=stats)
+
+    # SUMMARY, LOCATION and two distinct ATTENDEE values are anonymized once
+    assert stats.components == 4
+    assert stats.memo_misses == 4
+    assert stats.memo_hits == 8
+    assert stats.memo_hit_rate == pytest.approx(8 / 12)
+
+
+def test_memo_keeps_parameters_apart(series):
+    """Values with different parameters are anonymized separately."""
+    from icalendar_anonymizer import anonymize
+
+    events = list(anonymize(series, salt=SALT).walk("VEVENT"))
+
+    assert events[0]["attendee"] is events[1]["attendee"]
+    assert events[3]["attendee"].params["PARTSTAT"] == "DECLINED"
+    assert events[0]["attendee"].params["PARTSTAT"] == "ACCEPTED"
+    assert str(events[3]["attendee"]) == str(events[0]["attendee"])
+
+
+def test_memo_disabled(series):
+    """memo_size=0 makes no lookups."""
+    from icalendar_anonymizer import AnonymizationStats, anonymize
+
+    stats = AnonymizationStats()
+    anonymize(series, salt=SALT, stats=stats, memo_size=0)
+
+    assert stats.memo_hits == stats.memo_misses == 0
+    assert stats.memo_hit_rate is None
+
+
+def test_memo_evicts_least_recently_used():
+    """The memo never holds more than maxsize values."""
+    from icalendar_anonymizer._memo import ValueMemo
+
+    memo = ValueMemo(maxsize=2)
+    keys = [memo.key("SUMMARY", text) for text in ("a", "b", "c")]
+    memo.put(keys[0], "A")
+    memo.put(keys[1], "B")
+    assert memo.get(keys[0]) == "A"
+    memo.put(keys[2], "C")
+
+    assert len(memo) == 2
+    assert memo.get(keys[1]) is None
+    assert memo.get(keys[0]) == "A"
+
+
+def test_memo_skips_long_values():
+    """Values above MAX_MEMO_VALUE_LENGTH are not memoized."""
+    from icalendar_anonymizer._memo import MAX_MEMO_VALUE_LENGTH, ValueMemo
+
+    memo = ValueMemo()
+
+    assert memo.key("DESCRIPTION", "x" * MAX_MEMO_VALUE_LENGTH) is not None
+    assert memo.key("DESCRIPTION", "x" * (MAX_MEMO_VALUE_LENGTH + 1)) is None
+    assert memo.key("CATEGORIES", ["a", "b"]) is None
+
+
+def test_invalid_memo_arguments(series):
+    """Negative memo sizes and wrong stats types are rejected."""
+    from icalendar_anonymizer import anonymize
+
+    with pytest.raises(ValueError, match="memo_size"):
+        anonymize(series, memo_size=-1)
+    with pytest.raises(TypeError, match="stats"):
+        anonymize(series, stats={})
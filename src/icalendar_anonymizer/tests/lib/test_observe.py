@@ -0,0 +1,245 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for observers of anonymization."""
+
+import io
+from datetime import datetime
+
+import pytest
+from icalendar import Alarm, Calendar, Event, Timezone, vCalAddress
+
+SALT = b"observe-test-salt"
+
+
+@pytest.fixture
+def calendar():
+    """Create a calendar with a timezone, an event with an alarm and an attendee."""
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Test//EN")
+    timezone = Timezone()
+    timezone.add("tzid", "Europe/Berlin")
+    cal.add_component(timezone)
+    event = Event()
+    event.add("uid", "event-1@example.com")
+    event.add("summary", "Team Meeting")
+    event.add("dtstart", datetime(2024, 1, 15, 14, 0, 0))
+    attendee = vCalAddress("mailto:jane.smith@example.com")
+    attendee.params["cn"] = "Jane Smith"
+    event.add("attendee", attendee)
+    event.add("attach", b"binary data", parameters={"encoding": "BASE64", "value": "BINARY"})
+    alarm = Alarm()
+    alarm.add("action", "DISPLAY")
+    alarm.add("description", "Reminder")
+    event.add_component(alarm)
+    cal.add_component(event)
+    return cal
+
+
+def _recording_observer():
+    """Create an observer recording all events in order."""
+    from icalendar_anonymizer.observe import AnonymizationObserver
+
+    class RecordingObserver(AnonymizationObserver):
+        def __init__(self):
+            self.events = []
+
+        def component_started(self, name):
+            self.events.append(("start", name))
+
+        def component_finished(self, event):
+            self.events.append(("end", event.name, event.preserved))
+
+        def property_anonymized(self, event):
+            self.events.append(("property", event.component, event.name, event.handler))
+
+    return RecordingObserver()
+
+
+class FakeSpan:
+    """Span recording its attributes and events."""
+
+    def __init__(self, name, spans):
+        self.name = name
+        self.attributes = {}
+        self.events = []
+        self.ended = False
+        self.parent = spans[-1] if spans else None
+        self._spans = spans
+
+    def __enter__(self):
+        self._spans.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self._spans.pop()
+        self.ended = True
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def add_event(self, name, attributes=None):
+        self.events.append((name, attributes))
+
+
+class FakeTracer:
+    """Tracer keeping a stack of current spans, like OpenTelemetry."""
+
+    def __init__(self):
+        self.current = []
+        self.spans = []
+
+    def start_as_current_span(self, name):
+        span = FakeSpan(name, self.current)
+        self.spans.append(span)
+        return span
+
+
+# Event Tests
+
+
+def test_events_in_document_order(calendar):
+    """Observers see components and properties in document order."""
+    # icalendar orders the properties of a component canonically
+    from icalendar_anonymizer import anonymize
+
+    observer = _recording_observer()
+    anonymize(calendar, salt=SALT, observer=observer)
+
+    assert observer.events == [
+        ("start", "VTIMEZONE"),
+        ("end", "VTIMEZONE", True),
+        ("start", "VEVENT"),
+        ("property", "VEVENT", "SUMMARY", "text"),
+        ("property", "VEVENT", "DTSTART", "preserve"),
+        ("property", "VEVENT", "UID", "uid"),
+        ("property", "VEVENT", "ATTACH", "placeholder"),
+        ("property", "VEVENT", "ATTENDEE", "caladdress"),
+        ("start", "VALARM"),
+        ("property", "VALARM", "ACTION", "preserve"),
+        ("property", "VALARM", "DESCRIPTION", "text"),
+        ("end", "VALARM", False),
+        ("end", "VEVENT", False),
+    ]
+
+
+def test_observer_does_not_change_output(calendar):
+    """Anonymized output is the same with and without an observer."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.observe import StatsObserver
+
+    observed = anonymize(calendar, salt=SALT, observer=StatsObserver())
+
+    assert observed.to_ical() == anonymize(calendar, salt=SALT).to_ical()
+
+
+def test_placeholder_and_preserve_handlers(calendar):
+    """Placeholder thresholds and the preserve set are reported as such."""
+    from icalendar_anonymizer import anonymize
+
+    observer = _recording_observer()
+    anonymize(
+        calendar,
+        salt=SALT,
+        preserve={"summary"},
+        placeholders={"description": 3},
+        observer=observer,
+    )
+
+    assert ("property", "VEVENT", "SUMMARY", "preserve") in observer.events
+    assert ("property", "VALARM", "DESCRIPTION", "placeholder") in observer.events
+
+
+def test_invalid_observer_raises_type_error(calendar):
+    """Observers must derive from AnonymizationObserver."""
+    from icalendar_anonymizer import anonymize
+
+    with pytest.raises(TypeError, match="observer must be an AnonymizationObserver"):
+        anonymize(calendar, observer=object())
+
+
+def test_jcal_writer_passes_observer(calendar):
+    """The jCal writer reports to the observer as well."""
+    from icalendar_anonymizer.formats import anonymize_to_jcal
+    from icalendar_anonymizer.observe import StatsObserver
+
+    observer = StatsObserver()
+    anonymize_to_jcal(calendar, io.StringIO(), salt=SALT, observer=observer)
+
+    assert observer.components["VEVENT"].count == 1
+
+
+# Aggregator Tests
+
+
+def test_stats_observer_aggregates(calendar):
+    """StatsObserver sums counts, sizes and times by property and handler."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.observe import StatsObserver
+
+    second = Calendar.from_ical(calendar.to_ical())
+    second.subcomponents.extend(Calendar.from_ical(calendar.to_ical()).walk("VEVENT"))
+    observer = StatsObserver()
+    anonymize(second, salt=SALT, observer=observer)
+
+    summary = observer.properties["VEVENT", "SUMMARY", "text"]
+    assert summary.count == 2
+    assert summary.total_size == 2 * len("Team Meeting")
+    assert summary.total_time >= 0
+    assert observer.properties["VEVENT", "ATTACH", "placeholder"].total_size == 2 * len(
+        b"binary data"
+    )
+    assert observer.components["VEVENT"].count == 2
+    assert observer.components["VALARM"].count == 2
+    assert observer.components["VTIMEZONE"].count == 1
+
+
+def test_stats_observer_top_and_dict():
+    """top() sorts by time, as_dict() uses plain keys."""
+    from icalendar_anonymizer.observe import PropertyEvent, StatsObserver
+
+    observer = StatsObserver()
+    observer.property_anonymized(PropertyEvent("VEVENT", "SUMMARY", "text", 10, 0.5))
+    observer.property_anonymized(PropertyEvent("VEVENT", "UID", "uid", 5, 0.1))
+    observer.property_anonymized(PropertyEvent("VEVENT", "SUMMARY", "text", 20, 0.25))
+
+    assert [key for key, _ in observer.top(1)] == [("VEVENT", "SUMMARY", "text")]
+    assert observer.as_dict()["properties"]["VEVENT SUMMARY text"] == {
+        "count": 2,
+        "total_time": 0.75,
+        "total_size": 30,
+    }
+
+
+# Span Adapter Tests
+
+
+def test_span_observer_nests_spans(calendar):
+    """Components become nested spans, properties become span events."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.observe import SpanObserver
+
+    tracer = FakeTracer()
+    anonymize(calendar, salt=SALT, observer=SpanObserver(tracer))
+
+    names = [span.name for span in tracer.spans]
+    assert names == [
+        "icalendar_anonymizer.vtimezone",
+        "icalendar_anonymizer.vevent",
+        "icalendar_anonymizer.valarm",
+    ]
+    timezone, event, alarm = tracer.spans
+    assert all(span.ended for span in tracer.spans)
+    assert alarm.parent is event
+    assert timezone.attributes["icalendar_anonymizer.preserved"] is True
+    assert [name for name, _ in event.events] == [
+        "SUMMARY",
+        "DTSTART",
+        "UID",
+        "ATTACH",
+        "ATTENDEE",
+    ]
+    summary_attributes = event.events[0][1]
+    assert summary_attributes["icalendar_anonymizer.handler"] == "text"
+    assert summary_attributes["icalendar_anonymizer.size"] == len("Team Meeting")
+    assert tracer.current == []
@@ -0,0 +1,186 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the profile of calendars collected while anonymizing."""
+
+import json
+
+import pytest
+from icalendar import Calendar
+
+ICS = (
+    b"BEGIN:VCALENDAR\r\n"
+    b"VERSION:2.0\r\n"
+    b"PRODID:-//Test//Test//EN\r\n"
+    b"BEGIN:VTIMEZONE\r\n"
+    b"TZID:Europe/Berlin\r\n"
+    b"BEGIN:STANDARD\r\n"
+    b"DTSTART:19701025T030000\r\n"
+    b"TZOFFSETFROM:+0200\r\n"
+    b"TZOFFSETTO:+0100\r\n"
+    b"END:STANDARD\r\n"
+    b"END:VTIMEZONE\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:series-1@example.com\r\n"
+    b"DTSTART;TZID=Europe/Berlin:20240115T140000\r\n"
+    b"RRULE:FREQ=WEEKLY;BYDAY=MO;COUNT=10\r\n"
+    b"EXDATE;TZID=Europe/Berlin:20240122T140000,20240129T140000\r\n"
+    b"SUMMARY:Weekly sync with Jane\r\n"
+    b"DESCRIPTION:Agenda at https://example.com/private/agenda\r\n"
+    b"BEGIN:VALARM\r\n"
+    b"ACTION:DISPLAY\r\n"
+    b"TRIGGER:-PT15M\r\n"
+    b"DESCRIPTION:Reminder\r\n"
+    b"END:VALARM\r\n"
+    b"END:VEVENT\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:series-1@example.com\r\n"
+    b"RECURRENCE-ID;TZID=Europe/Berlin:20240205T140000\r\n"
+    b"DTSTART;TZID=Jane's home:20240205T150000\r\n"
+    b"SUMMARY:Weekly sync with Jane, moved\r\n"
+    b"END:VEVENT\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:series-1@example.com\r\n"
+    b"RECURRENCE-ID;TZID=Europe/Berlin:20240212T140000\r\n"
+    b"DTSTART:20240212T130000Z\r\n"
+    b"END:VEVENT\r\n"
+    b"BEGIN:VTODO\r\n"
+    b"UID:todo-1@example.com\r\n"
+    b"DUE;VALUE=DATE:20240301\r\n"
+    b"DTSTART:20240215T090000\r\n"
+    b"RRULE:FREQ=MONTHLY;INTERVAL=2\r\n"
+    b"END:VTODO\r\n"
+    b"END:VCALENDAR\r\n"
+)
+
+
+@pytest.fixture
+def report():
+    """Anonymize the calendar with a profile observer and return its report."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.profiling import ProfileObserver
+
+    profile = ProfileObserver(largest=2)
+    anonymize(Calendar.from_ical(ICS), salt=b"salt", observer=profile)
+    return profile.report()
+
+
+# Profile Tests
+
+
+def test_components_and_properties(report):
+    """Components are counted by type, properties by component type."""
+    assert report["components"] == {"VEVENT": 3, "VALARM": 1, "VTIMEZONE": 1, "VTODO": 1}
+    assert report["properties"]["VEVENT"]["UID"] == 3
+    assert report["properties"]["VEVENT"]["RECURRENCE-ID"] == 2
+    assert report["properties"]["VALARM"] == {"ACTION": 1, "DESCRIPTION": 1, "TRIGGER": 1}
+    # Properties of preserved components are not visited
+    assert "VTIMEZONE" not in report["properties"]
+
+
+def test_recurrence(report):
+    """Rules are counted by frequency and parts, overrides by series."""
+    assert report["recurrence"] == {
+        "rules": 2,
+        "frequencies": {"MONTHLY": 1, "WEEKLY": 1},
+        "patterns": {"FREQ=MONTHLY;INTERVAL": 1, "FREQ=WEEKLY;BYDAY;COUNT": 1},
+        "overrides": 2,
+        "series_with_overrides": 1,
+        "max_overrides_per_series": 2,
+        "overrides_per_series": {"<=2": 1},
+    }
+
+
+def test_times_and_timezones(report):
+    """Dates and times are counted by kind; custom time zone names are hidden."""
+    assert report["times"] == {"zoned": 6, "date": 1, "floating": 1, "utc": 1}
+    assert report["timezones"] == {"Europe/Berlin": 5, "(other)": 1}
+
+
+def test_value_sizes(report):
+    """Value sizes are counted in buckets by property."""
+    assert report["value_sizes"]["SUMMARY"] == {"<=64": 2}
+    assert report["value_sizes"]["DESCRIPTION"] == {"<=16": 1, "<=64": 1}
+
+
+def test_largest_components(report):
+    """The largest top-level components are identified by their position."""
+    largest = report["largest_components"]
+    assert [(entry["index"], entry["name"]) for entry in largest] == [(1, "VEVENT"), (2, "VEVENT")]
+    assert largest[0]["properties"] == 6
+    assert largest[0]["subcomponents"] == 1
+    assert largest[0]["size"] > largest[1]["size"]
+
+
+def test_report_has_no_values(report):
+    """No value of the calendar appears in the report."""
+    data = json.dumps(report)
+    for value in ("example.com", "Jane", "Weekly", "agenda", "Reminder", "2024"):
+        assert value not in data
+
+
+def test_nonstandard_names_are_hidden():
+    """Names of X- and unregistered components and properties are not reported."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.profiling import ProfileObserver
+
+    ics = ICS.replace(
+        b"END:VTODO\r\n",
+        b"X-ALICE-HIV-STATUS:positive\r\n"
+        b"BEGIN:X-JOHN-SMITH-CASE\r\n"
+        b"X-JOHN-SMITH-DIAGNOSIS:private\r\n"
+        b"SUMMARY:Case notes\r\n"
+        b"END:X-JOHN-SMITH-CASE\r\n"
+        b"END:VTODO\r\n",
+    )
+    profile = ProfileObserver()
+    anonymize(Calendar.from_ical(ics), salt=b"salt", observer=profile)
+    report = profile.report()
+
+    assert report["components"]["(x-name)"] == 1
+    assert report["properties"]["VTODO"]["(x-name)"] == 1
+    assert report["properties"]["(x-name)"] == {"(x-name)": 1, "SUMMARY": 1}
+    assert report["value_sizes"]["(x-name)"] == {"<=16": 2}
+    data = json.dumps(report)
+    for name in ("ALICE", "HIV", "JOHN", "SMITH"):
+        assert name not in data
+
+
+def test_observer_does_not_change_output():
+    """The anonymized calendar is the same with and without a profile."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.profiling import ProfileObserver
+
+    cal = Calendar.from_ical(ICS)
+    profiled = anonymize(cal, salt=b"salt", observer=ProfileObserver())
+    assert profiled.to_ical() == anonymize(cal, salt=b"salt").to_ical()
+
+
+def test_profile_of_several_runs():
+    """One observer adds up the calendars of several runs."""
+    from icalendar_anonymizer import anonymize
+    from icalendar_anonymizer.profiling import ProfileObserver
+
+    profile = ProfileObserver()
+    for _ in range(2):
+        anonymize(Calendar.from_ical(ICS), observer=profile)
+    report = profile.report()
+    assert report["components"]["VEVENT"] == 6
+    assert report["recurrence"]["max_overrides_per_series"] == 4
+    # Positions count on from one run to the next
+    assert sorted(entry["index"] for entry in report["largest_components"]) == [
+        *range(1, 5),
+        *range(6, 10),
+    ]
+
+
+def test_jcal_writer_profile():
+    """Components anonymized while they are written are profiled the same way."""
+    import io
+
+    from icalendar_anonymizer.formats import anonymize_to_jcal
+    from icalendar_anonymizer.profiling import ProfileObserver
+
+    profile = ProfileObserver()
+    anonymize_to_jcal(Calendar.from_ical(ICS), io.StringIO(), observer=profile)
+    assert profile.report()["recurrence"]["overrides"] == 2
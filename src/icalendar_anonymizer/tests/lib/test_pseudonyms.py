@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for sequential pseudonym mode."""
+
+from datetime import datetime
+
+import pytest
+from icalendar import Calendar, Event, vCalAddress
+
+SALT = b"pseudonym-test-salt"
+
+
+@pytest.fixture
+def calendar():
+    """Create a calendar with related events and attendees."""
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Test//EN")
+    cal.add("version", "2.0")
+    for index, summary in enumerate(["Team Meeting", "Meeting notes review"]):
+        event = Event()
+        event.add("uid", f"event-{index}@example.com")
+        event.add("summary", summary)
+        event.add("dtstart", datetime(2024, 1, 15 + index, 14, 0, 0))
+        attendee = vCalAddress("mailto:jane.smith@example.com")
+        attendee.params["cn"] = "Jane Smith"
+        event.add("attendee", attendee)
+        cal.add_component(event)
+    override = Event()
+    override.add("uid", "event-0@example.com")
+    override.add("recurrence-id", datetime(2024, 1, 15, 14, 0, 0))
+    override.add("summary", "Team Meeting moved")
+    cal.add_component(override)
+    return cal
+
+
+def _events(cal):
+    return list(cal.walk("VEVENT"))
+
+
+# Pseudonymizer Tests
+
+
+def test_pseudonymizer_reuses_pseudonyms():
+    """The same value gets the same pseudonym, new values get the next one."""
+    from icalendar_anonymizer._pseudonyms import Pseudonymizer
+
+    pseudonymizer = Pseudonymizer(SALT)
+
+    assert pseudonymizer.text("alpha beta alpha") == "w1 w2 w1"
+    assert pseudonymizer.text("gamma beta") == "w3 w2"
+    assert pseudonymizer.uid("a") == pseudonymizer.uid("a") == "uid1@anonymous.local"
+    assert pseudonymizer.uid("b") == "uid2@anonymous.local"
+
+
+def test_pseudonymizer_email_shares_domains():
+    """Addresses in the same domain share the domain pseudonym."""
+    from icalendar_anonymizer._pseudonyms import Pseudonymizer
+
+    pseudonymizer = Pseudonymizer(SALT)
+
+    assert pseudonymizer.email("jane@corp.com") == "person1@example1.local"
+    assert pseudonymizer.email("john@corp.com") == "person2@example1.local"
+    assert pseudonymizer.email("jane@home.org") == "person1@example2.local"
+
+
+def test_pseudonymizer_keeps_whitespace_only_text():
+    """Empty and whitespace-only text is returned unchanged."""
+    from icalendar_anonymizer._pseudonyms import Pseudonymizer
+
+    pseudonymizer = Pseudonymizer(SALT)
+
+    assert pseudonymizer.text("") == ""
+    assert pseudonymizer.text("   ") == "   "
+
+
+def test_pseudonymizer_tables_hold_no_plaintext():
+    """The dictionaries are keyed on digests, not on the original values."""
+    from icalendar_anonymizer._pseudonyms import Pseudonymizer
+
+    pseudonymizer = Pseudonymizer(SALT)
+    pseudonymizer.text("Confidential merger talks")
+    pseudonymizer.email("ceo@corp.com")
+
+    dump = repr(pseudonymizer.__dict__)
+    for secret in ("Confidential", "merger", "ceo", "corp.com"):
+        assert secret not in dump
+        assert secret.encode() not in b"".join(
+            key for table in pseudonymizer._tables.values() for key in table
+        )
+
+
+# anonymize() Tests
+
+
+def test_pseudonyms_replace_personal_data(calendar):
+    """Pseudonym mode hides personal data and keeps structure."""
+    from icalendar_anonymizer import anonymize
+
+    result = anonymize(calendar, salt=SALT, pseudonyms=True)
+    ical = result.to_ical().decode()
+
+    for secret in ("Team", "Meeting", "Jane", "jane.smith", "example.com", "event-0"):
+        assert secret not in ical
+    events = _events(result)
+    assert str(events[0]["summary"]) == "w1 w2"
+    assert str(events[1]["summary"]) == "w2 w5 w6"
+    assert str(events[0]["attendee"]) == "mailto:person1@example1.local"
+    assert events[0]["attendee"].params["CN"] == "w3 w4"
+    assert events[0]["dtstart"].dt == datetime(2024, 1, 15, 14, 0, 0)
+
+
+def test_pseudonyms_keep_uid_relationships(calendar):
+    """A recurrence override keeps the UID of its master event."""
+    from icalendar_anonymizer import anonymize
+
+    events = _events(anonymize(calendar, salt=SALT, pseudonyms=True))
+
+    assert str(events[0]["uid"]) == "uid1@anonymous.local"
+    assert str(events[1]["uid"]) == "uid2@anonymous.local"
+    assert events[2]["uid"] == events[0]["uid"]
+
+
+def test_pseudonyms_are_deterministic(calendar):
+    """The same input gives the same output, whatever the salt."""
+    from icalendar_anonymizer import anonymize
+
+    first = anonymize(calendar, salt=SALT, pseudonyms=True)
+    second = anonymize(calendar, pseudonyms=True)
+
+    assert first.to_ical() == second.to_ical()
+
+
+def test_pseudonyms_are_smaller_than_hashes(calendar):
+    """Pseudonym output is smaller than hashed output."""
+    from icalendar_anonymizer import anonymize
+
+    hashed = anonymize(calendar, salt=SALT).to_ical()
+    pseudonymized = anonymize(calendar, salt=SALT, pseudonyms=True).to_ical()
+
+    assert len(pseudonymized) < len(hashed)
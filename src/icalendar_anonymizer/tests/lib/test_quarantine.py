@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for parsing calendars with malformed components."""
+
+import io
+
+import pytest
+
+GOOD = "BEGIN:VEVENT\r\nUID:good-{}@example.com\r\nSUMMARY:Fine\r\nEND:VEVENT\r\n"
+
+
+def _data(*parts: str) -> bytes:
+    body = "".join(part + GOOD.format(number) for number, part in enumerate(parts))
+    return (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Test//Test//EN\r\n"
+        f"{GOOD.format('first')}{body}END:VCALENDAR\r\n"
+    ).encode()
+
+
+def _parse(data: bytes):
+    from icalendar_anonymizer.quarantine import parse_tolerant
+
+    quarantine = io.StringIO()
+    cal, quarantined = parse_tolerant(io.BytesIO(data), quarantine)
+    return cal, quarantined, quarantine.getvalue()
+
+
+# Parsing Tests
+
+
+def test_well_formed_calendar():
+    """A well-formed calendar is parsed completely."""
+    from icalendar import Calendar
+
+    data = _data("", "")
+    cal, quarantined, text = _parse(data)
+    assert quarantined == []
+    assert text == ""
+    assert cal.to_ical() == Calendar.from_ical(data).to_ical()
+
+
+@pytest.mark.parametrize(
+    ("malformed", "lines", "reason"),
+    [
+        ("BEGIN:VEVENT\r\nUID:x\r\nSUMMARY Secret\r\nEND:VEVENT\r\n", (8, 11), "unparsable lines"),
+        ("BEGIN:VEVENT\r\nUID:x\r\nDTSTART:2024XX01\r\nEND:VEVENT\r\n", (8, 11), "DTSTART"),
+        ("BEGIN:VEVENT\r\nUID:x\r\nSUMMARY:Secret\r\n", (8, 10), "missing END:VEVENT"),
+        ("BEGIN:VTODO\r\nBEGIN:VALARM\r\nEND:VTODO\r\n", (8, 10), "missing END:VTODO"),
+        ("END:VEVENT\r\n", (8, 8), "END without BEGIN"),
+        ("\x01Secret garbage\r\n continued\r\n", (8, 8), "unparsable line"),
+    ],
+)
+def test_malformed_component_is_left_out(malformed, lines, reason):
+    """Malformed parts are quarantined, the components around them are kept."""
+    cal, quarantined, text = _parse(_data(malformed))
+    uids = [str(event["UID"]) for event in cal.walk("VEVENT")]
+    assert uids == ["good-first@example.com", "good-0@example.com"]
+    assert len(quarantined) == 1
+    assert (quarantined[0].first_line, quarantined[0].last_line) == lines
+    assert reason in quarantined[0].reason
+    assert text.startswith(f"# {quarantined[0].name} at lines {lines[0]}-{lines[1]}: ")
+    assert "Secret" not in text
+
+
+def test_missing_end_before_calendar_end():
+    """A component cut off by the end of the calendar is quarantined."""
+    data = b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nBEGIN:VEVENT\r\nUID:x\r\nEND:VCALENDAR\r\n"
+    cal, quarantined, _ = _parse(data)
+    assert cal.subcomponents == []
+    assert str(cal["VERSION"]) == "2.0"
+    assert (quarantined[0].first_line, quarantined[0].last_line) == (3, 4)
+
+
+def test_redaction():
+    """All values and parameters but standard value types are redacted."""
+    _, _, text = _parse(
+        _data(
+            "BEGIN:VEVENT\r\n"
+            "UID:secret@example.com\r\n"
+            "DTSTART;TZID=Europe/Berlin:20240115T140000\r\n"
+            "DUE;VALUE=DATE:20240116\r\n"
+            "ATTENDEE;CN=Jane Secret:mailto:jane@example.com\r\n"
+            "DESCRIPTION:Secret\r\n  folded secret\r\n"
+            "X-BROKEN\r\n"
+            "END:VEVENT\r\n"
+        )
+    )
+    assert text.splitlines()[1:] == [
+        "BEGIN:VEVENT",
+        "UID:REDACTED",
+        "DTSTART:REDACTED",
+        "DUE;VALUE=DATE:REDACTED",
+        "ATTENDEE:REDACTED",
+        "DESCRIPTION:REDACTED",
+        "REDACTED",
+        "END:VEVENT",
+    ]
+
+
+def test_redaction_of_malformed_preserved_properties():
+    """Values of preserved properties that fail to parse are not copied."""
+    _, quarantined, text = _parse(
+        _data(
+            "BEGIN:X-JANE-SMITH-CASE\r\n"
+            "UID:x\r\n"
+            "DTSTART:Call Jane Smith at 555-1234\r\n"
+            "DTSTART;X-NOTE=jane.smith@corp.com;VALUE=X-JANE:20240115T140000\r\n"
+            "X-JANE-SMITH-PHONE:555-1234\r\n"
+            "END:X-JANE-SMITH-CASE\r\n"
+        )
+    )
+    assert len(quarantined) == 1
+    assert text.splitlines()[1:] == [
+        "BEGIN:(x-name)",
+        "UID:REDACTED",
+        "DTSTART:REDACTED",
+        "DTSTART:REDACTED",
+        "(x-name):REDACTED",
+        "END:(x-name)",
+    ]
+    for token in ("Jane", "JANE", "Smith", "SMITH", "555-1234", "jane.smith", "corp.com"):
+        assert token not in text
+        assert token not in repr(quarantined)
+
+
+def test_not_a_calendar():
+    """Data without a VCALENDAR is rejected."""
+    from icalendar_anonymizer.quarantine import parse_tolerant
+
+    with pytest.raises(ValueError, match="VCALENDAR"):
+        parse_tolerant([b"BEGIN:VEVENT\r\n", b"END:VEVENT\r\n"])
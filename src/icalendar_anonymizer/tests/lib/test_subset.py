@@ -0,0 +1,196 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for time-window, component-type and UID subsetting."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from icalendar import Calendar, Event, Timezone, TimezoneStandard, Todo
+from icalendar.timezone import tzp
+
+
+def make_event(uid, start, **properties):
+    event = Event()
+    event.add("uid", uid)
+    event.add("summary", uid)
+    event.add("dtstart", start)
+    for name, value in properties.items():
+        event.add(name.replace("_", "-"), value)
+    return event
+
+
+def make_timezone(tzid):
+    timezone = Timezone()
+    timezone.add("tzid", tzid)
+    standard = TimezoneStandard()
+    standard.add("dtstart", datetime(1970, 1, 1))
+    standard.add("tzoffsetfrom", timedelta(hours=1))
+    standard.add("tzoffsetto", timedelta(hours=1))
+    timezone.add_component(standard)
+    return timezone
+
+
+@pytest.fixture
+def calendar():
+    """Create a calendar spanning several years with timezones and overrides."""
+    berlin = tzp.timezone("Europe/Berlin")
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Test//EN")
+    cal.add("version", "2.0")
+    cal.add_component(make_timezone("Europe/Berlin"))
+    cal.add_component(make_timezone("America/New_York"))
+    cal.add_component(make_event("old", datetime(2010, 3, 1, 9, 0)))
+    cal.add_component(
+        make_event(
+            "berlin", datetime(2024, 1, 10, 9, 0, tzinfo=berlin), duration=timedelta(hours=1)
+        )
+    )
+    cal.add_component(make_event("long", date(2023, 12, 20), dtend=date(2024, 1, 5)))
+    cal.add_component(make_event("weekly", datetime(2015, 1, 5, 8, 0), rrule={"freq": "WEEKLY"}))
+    cal.add_component(
+        make_event(
+            "ended", datetime(2015, 1, 5, 8, 0), rrule={"freq": "DAILY", "until": date(2016, 1, 1)}
+        )
+    )
+    cal.add_component(
+        make_event(
+            "weekly", datetime(2024, 1, 16, 10, 0), recurrence_id=datetime(2024, 1, 15, 8, 0)
+        )
+    )
+    cal.add_component(make_event("master", datetime(2012, 1, 1, 8, 0), rrule={"freq": "YEARLY"}))
+    cal.add_component(
+        make_event("moved", datetime(2024, 1, 20, 8, 0), recurrence_id=datetime(2013, 5, 1, 8, 0))
+    )
+    cal.add_component(make_event("moved", datetime(2013, 1, 1, 8, 0), rrule={"freq": "MONTHLY"}))
+    todo = Todo()
+    todo.add("uid", "undated")
+    cal.add_component(todo)
+    return cal
+
+
+def kept(data):
+    cal = Calendar.from_ical(data)
+    return [
+        (c.name, str(c.get("uid", c.get("tzid"))), "RECURRENCE-ID" in c) for c in cal.subcomponents
+    ]
+
+
+# Time Window Tests
+
+
+def test_window_keeps_overlapping_components(calendar):
+    """Components overlapping the window, and their dependencies, are kept."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    data = subset_ical(calendar.to_ical(), since=date(2024, 1, 1), until=date(2024, 2, 1))
+
+    assert kept(data) == [
+        ("VTIMEZONE", "Europe/Berlin", False),
+        ("VEVENT", "berlin", False),
+        ("VEVENT", "long", False),
+        ("VEVENT", "weekly", False),
+        ("VEVENT", "weekly", True),
+        ("VEVENT", "master", False),
+        ("VEVENT", "moved", True),
+        ("VEVENT", "moved", False),
+        ("VTODO", "undated", False),
+    ]
+
+
+def test_until_is_exclusive(calendar):
+    """A component starting at until is dropped."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    data = subset_ical(calendar.to_ical(), until=datetime(2010, 3, 1, 9, 0))
+
+    assert ("VEVENT", "old", False) not in kept(data)
+    data = subset_ical(calendar.to_ical(), until=datetime(2010, 3, 1, 9, 1))
+    assert ("VEVENT", "old", False) in kept(data)
+
+
+def test_timezone_offset_is_respected(calendar):
+    """Times with TZID are compared in UTC."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    # 09:00 in Berlin is 08:00 UTC
+    data = subset_ical(calendar.to_ical(), since=datetime(2024, 1, 10, 8, 30), only={"VEVENT"})
+
+    assert ("VEVENT", "berlin", False) in kept(data)
+    data = subset_ical(calendar.to_ical(), since=datetime(2024, 1, 10, 9, 30), only={"VEVENT"})
+    assert ("VEVENT", "berlin", False) not in kept(data)
+
+
+# Type and UID Tests
+
+
+def test_only_component_types(calendar):
+    """Only the given component types are kept."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    data = subset_ical(calendar.to_ical(), only={"vtodo"})
+
+    assert kept(data) == [("VTODO", "undated", False)]
+
+
+def test_uid_keeps_all_instances(calendar):
+    """All components with a selected UID are kept."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    data = subset_ical(calendar.to_ical(), uids={"weekly"})
+
+    assert kept(data) == [("VEVENT", "weekly", False), ("VEVENT", "weekly", True)]
+
+
+def test_filters_are_combined(calendar):
+    """A component must match all filters."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    data = subset_ical(calendar.to_ical(), since=date(2020, 1, 1), uids={"old", "berlin"})
+
+    assert kept(data) == [("VTIMEZONE", "Europe/Berlin", False), ("VEVENT", "berlin", False)]
+
+
+# Raw Data Tests
+
+
+def test_dropped_components_are_not_parsed():
+    """Broken components outside the window do not cause errors."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    data = (
+        b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        b"BEGIN:VEVENT\r\nUID:old\r\nDTSTART:20100101T100000Z\r\nGEO:broken\r\nEND:VEVENT\r\n"
+        b"BEGIN:VEVENT\r\nUID:new\r\nDTSTART:20240101T100000Z\r\nEND:VEVENT\r\n"
+        b"END:VCALENDAR\r\n"
+    )
+
+    assert kept(subset_ical(data, since=date(2020, 1, 1))) == [("VEVENT", "new", False)]
+
+
+def test_folded_lines_and_quoted_tzid_are_read():
+    """Folded properties and quoted TZID parameters are understood."""
+    from icalendar_anonymizer.subset import subset_ical
+
+    data = (
+        b"BEGIN:VCALENDAR\r\n"
+        b"BEGIN:VTIMEZONE\r\nTZID:Custom; Zone\r\nEND:VTIMEZONE\r\n"
+        b"BEGIN:VEVENT\r\nUID:a\r\n"
+        b'DTSTART;TZID="Custom; Zone":202401\r\n 01T100000\r\nEND:VEVENT\r\n'
+        b"END:VCALENDAR\r\n"
+    )
+    result = subset_ical(data, since=date(2023, 12, 31))
+
+    assert result.count(b"BEGIN:") == 3
+    assert subset_ical(data, since=date(2024, 1, 2)).count(b"BEGIN:") == 1
+
+
+def test_subset_calendar_matches_subset_ical(calendar):
+    """Filtering a parsed calendar selects the same components."""
+    from icalendar_anonymizer.subset import subset_calendar, subset_ical
+
+    options = {"since": date(2024, 1, 1), "until": date(2024, 2, 1)}
+    result = subset_calendar(calendar, **options)
+
+    assert kept(result.to_ical()) == kept(subset_ical(calendar.to_ical(), **options))
+    assert result["prodid"] == "-//Test//Test//EN"
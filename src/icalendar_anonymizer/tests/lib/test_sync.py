@@ -0,0 +1,230 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for incremental directory sync."""
+
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from icalendar import Calendar, Event
+
+
+def make_ics(uid: str, summary: str) -> bytes:
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Test//EN")
+    cal.add("version", "2.0")
+    event = Event()
+    event.add("uid", uid)
+    event.add("summary", summary)
+    event.add("dtstart", datetime(2024, 1, 15, 14, 0, 0))
+    cal.add_component(event)
+    return cal.to_ical()
+
+
+@pytest.fixture
+def vdir(tmp_path):
+    """Create a source vdir with two events, one in a subdirectory."""
+    source = tmp_path / "source"
+    (source / "work").mkdir(parents=True)
+    (source / "event-1@example.com.ics").write_bytes(make_ics("event-1@example.com", "Lunch"))
+    (source / "work" / "event-2@example.com.ics").write_bytes(
+        make_ics("event-2@example.com", "Dinner")
+    )
+    return source
+
+
+@pytest.fixture
+def no_racy_window(monkeypatch):
+    """Trust modification times however recent they are."""
+    monkeypatch.setattr("icalendar_anonymizer.sync.RACY_WINDOW_NS", 0)
+
+
+def read_outputs(destination):
+    return {p.relative_to(destination): p.read_bytes() for p in destination.rglob("*.ics")}
+
+
+def touch(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+# Sync Tests
+
+
+def test_first_sync_anonymizes_all_files(vdir, tmp_path):
+    """The first run anonymizes every file and writes the index."""
+    from icalendar_anonymizer.sync import INDEX_FILE_NAME, sync_directory
+
+    result = sync_directory(vdir, tmp_path / "dest")
+
+    assert (result.scanned, result.updated, result.touched, result.removed) == (2, 2, 0, 0)
+    outputs = read_outputs(tmp_path / "dest")
+    assert len(outputs) == 2
+    for relpath, data in outputs.items():
+        assert "example.com" not in str(relpath)
+        assert b"Lunch" not in data
+        assert b"Dinner" not in data
+    assert (tmp_path / "dest.ican-state" / INDEX_FILE_NAME).exists()
+
+
+@pytest.mark.usefixtures("no_racy_window")
+def test_unchanged_files_are_skipped(vdir, tmp_path):
+    """Files of the same size and time are not read again."""
+    from icalendar_anonymizer.sync import sync_directory
+
+    sync_directory(vdir, tmp_path / "dest")
+    source = vdir / "event-1@example.com.ics"
+    mtime_ns = source.stat().st_mtime_ns
+    # Same size and time, other content: only detected by reading the file
+    source.write_bytes(source.read_bytes().replace(b"Lunch", b"Lurch"))
+    touch(source, mtime_ns)
+
+    result = sync_directory(vdir, tmp_path / "dest")
+    assert (result.scanned, result.updated, result.touched) == (2, 0, 0)
+
+
+def test_racy_files_are_hashed_again(vdir, tmp_path):
+    """Files modified shortly before the index was written are read again."""
+    from icalendar_anonymizer.sync import sync_directory
+
+    sync_directory(vdir, tmp_path / "dest")
+    before = read_outputs(tmp_path / "dest")
+    source = vdir / "event-1@example.com.ics"
+    mtime_ns = source.stat().st_mtime_ns
+    source.write_bytes(source.read_bytes().replace(b"Lunch", b"Lurch"))
+    touch(source, mtime_ns)
+
+    result = sync_directory(vdir, tmp_path / "dest")
+    assert (result.updated, result.touched) == (1, 0)
+    after = read_outputs(tmp_path / "dest")
+    assert sum(before[path] != after[path] for path in before) == 1
+
+
+@pytest.mark.usefixtures("no_racy_window")
+def test_changed_file_is_anonymized_again(vdir, tmp_path):
+    """Only the changed file is anonymized again, with the same UID."""
+    from icalendar_anonymizer.sync import sync_directory
+
+    sync_directory(vdir, tmp_path / "dest")
+    before = read_outputs(tmp_path / "dest")
+    (vdir / "event-1@example.com.ics").write_bytes(make_ics("event-1@example.com", "Brunch"))
+
+    result = sync_directory(vdir, tmp_path / "dest")
+    assert (result.updated, result.touched) == (1, 0)
+    after = read_outputs(tmp_path / "dest")
+    changed = [path for path in before if before[path] != after[path]]
+    assert len(changed) == 1
+    old_event = Calendar.from_ical(before[changed[0]]).walk("VEVENT")[0]
+    new_event = Calendar.from_ical(after[changed[0]]).walk("VEVENT")[0]
+    assert old_event["UID"] == new_event["UID"]
+    assert old_event["SUMMARY"] != new_event["SUMMARY"]
+
+
+@pytest.mark.usefixtures("no_racy_window")
+def test_touched_file_is_not_anonymized_again(vdir, tmp_path):
+    """A file with a new time but the same content is only hashed."""
+    from icalendar_anonymizer.sync import sync_directory
+
+    sync_directory(vdir, tmp_path / "dest")
+    output = next((tmp_path / "dest").rglob("*.ics"))
+    output_mtime_ns = output.stat().st_mtime_ns
+    for path in vdir.rglob("*.ics"):
+        touch(path, path.stat().st_mtime_ns + 10**9)
+
+    result = sync_directory(vdir, tmp_path / "dest")
+    assert (result.updated, result.touched) == (0, 2)
+    assert output.stat().st_mtime_ns == output_mtime_ns
+    # The index holds the new times
+    assert sync_directory(vdir, tmp_path / "dest").touched == 0
+
+
+def test_removed_file_removes_output(vdir, tmp_path):
+    """Outputs of removed files are removed, with their empty directories."""
+    from icalendar_anonymizer.sync import sync_directory
+
+    sync_directory(vdir, tmp_path / "dest")
+    (vdir / "work" / "event-2@example.com.ics").unlink()
+
+    result = sync_directory(vdir, tmp_path / "dest")
+    assert (result.scanned, result.removed) == (1, 1)
+    assert len(read_outputs(tmp_path / "dest")) == 1
+    assert [path for path in (tmp_path / "dest").iterdir() if path.is_dir()] == []
+
+
+def test_invalid_file_keeps_last_output(vdir, tmp_path):
+    """A file that fails keeps its last output and is tried again."""
+    from icalendar_anonymizer.sync import sync_directory
+
+    sync_directory(vdir, tmp_path / "dest")
+    before = read_outputs(tmp_path / "dest")
+    (vdir / "event-1@example.com.ics").write_bytes(b"not a calendar")
+
+    result = sync_directory(vdir, tmp_path / "dest")
+    assert list(result.failed) == [Path("event-1@example.com.ics")]
+    assert read_outputs(tmp_path / "dest") == before
+    assert sync_directory(vdir, tmp_path / "dest").failed
+
+
+@pytest.mark.usefixtures("no_racy_window")
+def test_missing_destination_is_rebuilt(vdir, tmp_path):
+    """Without the destination, all files are anonymized again."""
+    import shutil
+
+    from icalendar_anonymizer.sync import sync_directory
+
+    sync_directory(vdir, tmp_path / "dest")
+    before = read_outputs(tmp_path / "dest")
+    shutil.rmtree(tmp_path / "dest")
+
+    assert sync_directory(vdir, tmp_path / "dest").updated == 2
+    assert read_outputs(tmp_path / "dest") == before
+
+
+def test_same_salt_gives_same_output_as_watch(vdir, tmp_path):
+    """Sync and watch share the salt in the state directory and the output paths."""
+    from icalendar_anonymizer.sync import sync_directory
+    from icalendar_anonymizer.watch import DirectoryWatcher, PollingBackend
+
+    sync_directory(vdir, tmp_path / "synced", state_dir=tmp_path / "state")
+    salt = (tmp_path / "state" / "salt").read_text(encoding="ascii")
+    watcher = DirectoryWatcher(
+        vdir, tmp_path / "watched", bytes.fromhex(salt), backend=PollingBackend(vdir)
+    )
+    watcher.sync()
+    watcher.close()
+    assert read_outputs(tmp_path / "synced") == read_outputs(tmp_path / "watched")
+
+
+# Index Tests
+
+
+def test_index_round_trip(tmp_path):
+    """Entries are read back as written."""
+    from icalendar_anonymizer.sync import IndexEntry, read_index, write_index
+
+    entries = {
+        "a.ics": IndexEntry(10, 1_700_000_000_000_000_000, bytes(16)),
+        "dir/ä b.ics": IndexEntry(0, 1, bytes(range(16))),
+    }
+    write_index(tmp_path / "index", entries)
+    read, written_ns = read_index(tmp_path / "index")
+    assert read == entries
+    assert written_ns > 0
+
+
+@pytest.mark.parametrize("data", [b"", b"something else", b"ICANIDX1" + bytes(8) + bytes(20)])
+def test_invalid_index(tmp_path, data):
+    """Files that are not an index, or truncated, are rejected."""
+    from icalendar_anonymizer.sync import read_index
+
+    (tmp_path / "index").write_bytes(data)
+    with pytest.raises(ValueError, match=r"index|truncated"):
+        read_index(tmp_path / "index")
+
+
+def test_missing_index_is_empty(tmp_path):
+    """Without an index, there are no entries."""
+    from icalendar_anonymizer.sync import read_index
+
+    assert read_index(tmp_path / "index") == ({}, 0)
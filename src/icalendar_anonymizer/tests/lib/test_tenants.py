@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for salts derived per tenant."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from icalendar import Calendar
+
+SECRET = bytes(range(32))
+
+ICS = (
+    b"BEGIN:VCALENDAR\r\n"
+    b"VERSION:2.0\r\n"
+    b"PRODID:-//Test//Test//EN\r\n"
+    b"BEGIN:VEVENT\r\n"
+    b"UID:event-1@example.com\r\n"
+    b"DTSTART:20240115T140000Z\r\n"
+    b"SUMMARY:Team Meeting\r\n"
+    b"COMMENT:Kept\r\n"
+    b"END:VEVENT\r\n"
+    b"END:VCALENDAR\r\n"
+)
+
+
+# Key Derivation Tests
+
+
+def test_hkdf_rfc5869_vector():
+    """HKDF matches test case 1 of RFC 5869."""
+    from icalendar_anonymizer.tenants import _hkdf
+
+    okm = _hkdf(
+        bytes.fromhex("0b" * 22),
+        bytes.fromhex("000102030405060708090a0b0c"),
+        bytes.fromhex("f0f1f2f3f4f5f6f7f8f9"),
+        42,
+    )
+    assert okm.hex() == (
+        "3cb25f25faacd57a90434f64d0362f2a2d2d0a90cf1a5a4c5db02d56ecc4c5bf34007208d5b887185865"
+    )
+
+
+def test_salts_differ_per_tenant_and_secret():
+    """Salts depend on the tenant and on the master secret."""
+    from icalendar_anonymizer.tenants import derive_salt
+
+    salt = derive_salt(SECRET, "acme")
+    assert len(salt) == 32
+    assert salt == derive_salt(SECRET, "acme")
+    assert salt != derive_salt(SECRET, "acme2")
+    assert salt != derive_salt(bytes(32), "acme")
+    assert len(derive_salt(SECRET, "acme", 100)) == 100
+
+
+@pytest.mark.parametrize(
+    ("secret", "tenant", "error"),
+    [
+        (b"short", "acme", ValueError),
+        ("x" * 32, "acme", TypeError),
+        (SECRET, "", ValueError),
+    ],
+)
+def test_invalid_derivation(secret, tenant, error):
+    """Short or non-bytes secrets and empty tenants are rejected."""
+    from icalendar_anonymizer.tenants import derive_salt
+
+    with pytest.raises(error):
+        derive_salt(secret, tenant)
+
+
+# Keyring Tests
+
+
+def test_anonymizer_is_cached():
+    """The anonymizer of a tenant is derived once and evicted least recently used."""
+    from icalendar_anonymizer.tenants import TenantKeyring
+
+    keyring = TenantKeyring(SECRET, cache_size=2)
+    acme = keyring.anonymizer_for("acme")
+    assert keyring.anonymizer_for("acme") is acme
+    keyring.anonymizer_for("globex")
+    keyring.anonymizer_for("acme")
+    keyring.anonymizer_for("initech")
+    # globex was used least recently
+    assert keyring.anonymizer_for("acme") is acme
+    assert list(keyring._cache) == ["initech", "acme"]
+
+
+def test_anonymizer_is_shared_between_threads():
+    """Threads asking for the same tenant get the same anonymizer."""
+    from icalendar_anonymizer.tenants import TenantKeyring
+
+    keyring = TenantKeyring(SECRET)
+    with ThreadPoolExecutor(8) as executor:
+        anonymizers = set(executor.map(lambda _: id(keyring.anonymizer_for("acme")), range(64)))
+    assert len(anonymizers) == 1
+
+
+def test_tenant_output_is_stable_and_unlinkable():
+    """Runs for one tenant agree, runs for two tenants share no hashes."""
+    from icalendar_anonymizer.tenants import TenantKeyring
+
+    def summary(keyring, tenant):
+        cal = keyring.anonymizer_for(tenant).anonymize(Calendar.from_ical(ICS))
+        event = cal.walk("VEVENT")[0]
+        assert event["COMMENT"] == "Kept"
+        return f"{event['SUMMARY']} {event['UID']}"
+
+    keyring = TenantKeyring(SECRET, preserve={"comment"})
+    acme = summary(keyring, "acme")
+    # A new keyring with the same secret, as in a later run
+    assert acme == summary(TenantKeyring(SECRET, preserve={"comment"}), "acme")
+    assert not set(acme.split()) & set(summary(keyring, "globex").split())
+
+
+def test_salt_cannot_be_replaced():
+    """The salt of a tenant cannot be overridden per call."""
+    from icalendar_anonymizer.tenants import TenantKeyring
+
+    anonymizer = TenantKeyring(SECRET).anonymizer_for("acme")
+    with pytest.raises(TypeError):
+        anonymizer.anonymize(Calendar.from_ical(ICS), salt=b"other")
+    with pytest.raises(TypeError):
+        anonymizer.anonymize(Calendar.from_ical(ICS), pseudonyms=True)
+
+
+def test_secret_is_not_shown(tmp_path):
+    """Neither the master secret nor salts appear in representations."""
+    from icalendar_anonymizer.tenants import TenantKeyring
+
+    path = tmp_path / "master.key"
+    path.write_bytes(SECRET)
+    keyring = TenantKeyring.from_file(path)
+    anonymizer = keyring.anonymizer_for("acme")
+    assert repr(anonymizer) == "TenantAnonymizer('acme')"
+    assert SECRET.hex() not in repr(keyring)
+    assert repr(anonymizer.salt) not in repr(anonymizer)
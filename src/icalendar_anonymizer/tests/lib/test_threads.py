@@ -0,0 +1,112 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for anonymizing calendars in threads."""
+
+import subprocess
+import sys
+import sysconfig
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from icalendar import Calendar
+
+SALT = b"thread-test-salt"
+
+
+def _calendar(number: int) -> Calendar:
+    events = "".join(
+        "BEGIN:VEVENT\r\n"
+        f"UID:event-{number}-{index}@example.com\r\n"
+        "DTSTART:20240115T140000Z\r\n"
+        f"SUMMARY:Meeting {index} of team {number}\r\n"
+        f"ATTENDEE;CN=Person {index}:mailto:person{index}@example.com\r\n"
+        "END:VEVENT\r\n"
+        for index in range(20)
+    )
+    # Every calendar has an override of the same shared event
+    events += "BEGIN:VEVENT\r\nUID:shared@example.com\r\nDTSTART:20240115T140000Z\r\nEND:VEVENT\r\n"
+    return Calendar.from_ical(
+        f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Test//Test//EN\r\n{events}END:VCALENDAR\r\n"
+    )
+
+
+# anonymize_many Tests
+
+
+@pytest.mark.parametrize("workers", [1, 4, None])
+def test_same_output_as_sequential(workers):
+    """Threads produce the same calendars, in order, as one after the other."""
+    from icalendar_anonymizer import anonymize, anonymize_many
+
+    expected = [anonymize(_calendar(number), salt=SALT).to_ical() for number in range(8)]
+    calendars = [_calendar(number) for number in range(8)]
+    result = anonymize_many(calendars, salt=SALT, workers=workers)
+    assert [cal.to_ical() for cal in result] == expected
+
+
+def test_shared_uid_map():
+    """All calendars share one salt and UID mapping."""
+    from icalendar_anonymizer import anonymize_many
+
+    uid_map = {}
+    result = anonymize_many([_calendar(number) for number in range(8)], uid_map=uid_map, workers=4)
+    shared = uid_map["shared@example.com"]
+    assert all(shared in {str(event["UID"]) for event in cal.walk("VEVENT")} for cal in result)
+    assert len(uid_map) == 8 * 20 + 1
+
+
+def test_consume():
+    """Calendars may be consumed while they are anonymized in threads."""
+    from icalendar_anonymizer import anonymize_many
+
+    calendars = [_calendar(number) for number in range(4)]
+    result = anonymize_many(calendars, salt=SALT, consume=True, workers=2)
+    assert all(not cal.subcomponents for cal in calendars)
+    assert all(len(cal.walk("VEVENT")) == 21 for cal in result)
+
+
+def test_invalid_workers():
+    """At least one worker is needed."""
+    from icalendar_anonymizer import anonymize_many
+
+    with pytest.raises(ValueError, match="workers"):
+        anonymize_many([_calendar(0)], workers=0)
+
+
+def test_errors_are_raised():
+    """An invalid calendar fails the whole call."""
+    from icalendar_anonymizer import anonymize_many
+
+    with pytest.raises(TypeError, match="Calendar"):
+        anonymize_many([_calendar(0), "not a calendar"], workers=2)
+
+
+# Shared State Tests
+
+
+def test_concurrent_anonymize():
+    """Separate calls of anonymize in threads do not interfere."""
+    from icalendar_anonymizer import anonymize
+
+    expected = anonymize(_calendar(0), salt=SALT).to_ical()
+    with ThreadPoolExecutor(8) as executor:
+        results = list(
+            executor.map(lambda _: anonymize(_calendar(0), salt=SALT).to_ical(), range(64))
+        )
+    assert results == [expected] * 64
+
+
+@pytest.mark.skipif(
+    not sysconfig.get_config_var("Py_GIL_DISABLED"), reason="needs free-threaded Python"
+)
+def test_gil_stays_disabled():
+    """Importing the library does not enable the GIL again."""
+    result = subprocess.run(
+        [sys.executable, "-c", "import icalendar_anonymizer, sys; print(sys._is_gil_enabled())"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
+    assert "GIL" not in result.stderr
@@ -0,0 +1,151 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the leak scanner."""
+
+from datetime import datetime
+
+import pytest
+from icalendar import Calendar, Event, vCalAddress
+
+
+@pytest.fixture
+def calendar():
+    """Create a calendar with personal data in text, addresses and parameters."""
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Test//EN")
+    cal.add("version", "2.0")
+    event = Event()
+    event.add("uid", "event-1@example.com")
+    event.add("summary", "Quarterly review with Jane")
+    event.add("description", "Bring the budget, please.")
+    event.add("status", "CONFIRMED")
+    event.add("dtstart", datetime(2024, 1, 15, 14, 0, 0))
+    event.add("x-custom-note", "Parking at Rosenweg")
+    attendee = vCalAddress("mailto:jane.smith@example.com")
+    attendee.params["cn"] = "Jane Smith"
+    attendee.params["role"] = "REQ-PARTICIPANT"
+    event.add("attendee", attendee)
+    cal.add_component(event)
+    return cal
+
+
+# Token Collection Tests
+
+
+def test_collects_tokens_from_personal_properties(calendar):
+    """Words, addresses and CN values are collected with their origin."""
+    from icalendar_anonymizer.verify import collect_pii_tokens
+
+    tokens = collect_pii_tokens(calendar)
+
+    assert tokens["Quarterly"] == "VEVENT SUMMARY"
+    assert tokens["budget"] == "VEVENT DESCRIPTION"
+    assert tokens["please"] == "VEVENT DESCRIPTION"
+    assert tokens["Rosenweg"] == "VEVENT X-CUSTOM-NOTE"
+    assert tokens["jane.smith@example.com"] == "VEVENT ATTENDEE"
+    assert tokens["jane.smith"] == "VEVENT ATTENDEE"
+    assert tokens["Smith"] == "VEVENT ATTENDEE;CN"
+    assert tokens["event-1@example.com"] == "VEVENT UID"
+
+
+def test_skips_short_tokens_and_vocabulary(calendar):
+    """Short words and words expected in the output are not collected."""
+    from icalendar_anonymizer.verify import collect_pii_tokens
+
+    calendar.subcomponents[0]["summary"] = "CONFIRMED VEVENT and Bob"
+    tokens = collect_pii_tokens(calendar)
+
+    for word in ("CONFIRMED", "VEVENT", "and", "Bob", "REQ-PARTICIPANT", "2024"):
+        assert word not in tokens
+    assert "and" in collect_pii_tokens(calendar, min_token_length=3)
+
+
+# Leak Detection Tests
+
+
+def test_anonymized_output_has_no_leaks(calendar):
+    """Default anonymization leaves no collected token in the output."""
+    from icalendar_anonymizer import anonymize, verify_no_leaks
+
+    assert verify_no_leaks(calendar, anonymize(calendar)) == []
+
+
+def test_preserved_property_is_reported(calendar):
+    """Tokens kept through preserve are reported with their origin."""
+    from icalendar_anonymizer import anonymize, verify_no_leaks
+
+    leaks = verify_no_leaks(calendar, anonymize(calendar, preserve={"SUMMARY"}))
+
+    assert [leak.token for leak in leaks] == ["Quarterly", "review", "with", "Jane"]
+    assert {leak.source for leak in leaks} == {"VEVENT SUMMARY"}
+    ical = anonymize(calendar, preserve={"SUMMARY"}).to_ical().decode().splitlines()
+    assert ical[leaks[0].line - 1].startswith("SUMMARY:")
+
+
+def test_serialized_output_is_scanned(calendar):
+    """Leaks are found in ICS bytes and in jCal text, across folded lines."""
+    import json
+
+    from icalendar_anonymizer import anonymize, verify_no_leaks
+
+    calendar.subcomponents[0]["location"] = "at " * 30 + "Rosenweg"
+    anonymized = anonymize(calendar, preserve={"LOCATION"})
+
+    assert b"\r\n " in anonymized.to_ical()
+    assert [leak.token for leak in verify_no_leaks(calendar, anonymized.to_ical())] == ["Rosenweg"]
+    jcal = json.dumps(anonymized.to_jcal())
+    assert [leak.token for leak in verify_no_leaks(calendar, jcal)] == ["Rosenweg"]
+
+
+def test_address_in_preserved_property_is_reported(calendar):
+    """An address copied into a preserved property is found as a whole."""
+    from icalendar_anonymizer import anonymize, verify_no_leaks
+
+    calendar.subcomponents[0].add("related-to", "event-1@example.com")
+    leaks = verify_no_leaks(calendar, anonymize(calendar))
+
+    assert [leak.token for leak in leaks] == ["event-1@example.com", "example.com"]
+
+
+def test_rejects_non_calendar():
+    """Original must be a Calendar."""
+    from icalendar_anonymizer import verify_no_leaks
+
+    with pytest.raises(TypeError, match="Expected Calendar"):
+        verify_no_leaks("BEGIN:VCALENDAR", "")
+
+
+# Scanner Tests
+
+
+@pytest.mark.parametrize(
+    ("tokens", "text", "expected"),
+    [
+        (
+            ["he", "she", "hers", "his"],
+            "she his hers ushers",
+            [(0, "she"), (4, "his"), (8, "hers")],
+        ),
+        (["Jane"], "Janet Jane_Doe xJane Jane.", [(21, "Jane")]),
+        (["a.b", "b"], "a.b", [(0, "a.b"), (2, "b")]),
+        (["Jane"], "", []),
+    ],
+)
+def test_scanner_matches_whole_words(tokens, text, expected):
+    """The automaton reports overlapping matches at word boundaries only."""
+    from icalendar_anonymizer.verify import TokenScanner
+
+    assert list(TokenScanner(tokens).scan(text)) == expected
+
+
+def test_scanner_handles_many_tokens():
+    """Many tokens with shared prefixes and suffixes are matched correctly."""
+    from icalendar_anonymizer.verify import TokenScanner
+
+    tokens = [f"name{i}" for i in range(5000)] + [f"{i}suffix" for i in range(5000)]
+    scanner = TokenScanner(tokens)
+    text = "name4999 name5000 42suffix suffix"
+
+    assert len(scanner) == 10000
+    assert [token for _, token in scanner.scan(text)] == ["name4999", "42suffix"]
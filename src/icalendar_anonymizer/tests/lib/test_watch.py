@@ -0,0 +1,156 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for directory watch mode."""
+
+import threading
+from datetime import datetime
+
+import pytest
+from icalendar import Calendar, Event
+
+
+def make_ics(uid: str, summary: str) -> bytes:
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Test//EN")
+    cal.add("version", "2.0")
+    event = Event()
+    event.add("uid", uid)
+    event.add("summary", summary)
+    event.add("dtstart", datetime(2024, 1, 15, 14, 0, 0))
+    cal.add_component(event)
+    return cal.to_ical()
+
+
+@pytest.fixture
+def vdir(tmp_path):
+    """Create a source vdir with two events."""
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "event-1@example.com.ics").write_bytes(make_ics("event-1@example.com", "Lunch"))
+    (source / "event-2@example.com.ics").write_bytes(make_ics("event-2@example.com", "Dinner"))
+    return source
+
+
+@pytest.fixture
+def watcher(vdir, tmp_path):
+    """Create a watcher using the polling backend."""
+    from icalendar_anonymizer.watch import DirectoryWatcher, PollingBackend
+
+    w = DirectoryWatcher(
+        vdir,
+        tmp_path / "dest",
+        b"watch-test-salt",
+        debounce=0.05,
+        poll_interval=0.05,
+        backend=PollingBackend(vdir),
+    )
+    yield w
+    w.close()
+
+
+def read_outputs(destination):
+    return {p.name: Calendar.from_ical(p.read_bytes()) for p in destination.rglob("*.ics")}
+
+
+def test_sync_anonymizes_all_files(watcher):
+    """Initial sync writes one anonymized file per source file."""
+    watcher.sync()
+
+    outputs = read_outputs(watcher.destination)
+    assert len(outputs) == 2
+    for name, cal in outputs.items():
+        assert "example.com" not in name
+        event = next(iter(cal.walk("VEVENT")))
+        assert event["summary"] not in ("Lunch", "Dinner")
+    assert watcher.stats.updated == 2
+
+
+def test_sync_skips_up_to_date_outputs(watcher):
+    """A second sync does not rewrite unchanged files."""
+    watcher.sync()
+    watcher.sync()
+
+    assert watcher.stats.updated == 2
+
+
+def test_sync_removes_orphaned_outputs(watcher, vdir):
+    """Outputs without a source file are removed."""
+    watcher.sync()
+    (vdir / "event-1@example.com.ics").unlink()
+    watcher.sync()
+
+    assert len(read_outputs(watcher.destination)) == 1
+    assert watcher.stats.removed == 1
+
+
+def test_uids_stable_across_watchers(vdir, tmp_path):
+    """The same salt produces the same output for separate runs."""
+    from icalendar_anonymizer.watch import DirectoryWatcher, PollingBackend
+
+    results = []
+    for name in ("first", "second"):
+        w = DirectoryWatcher(vdir, tmp_path / name, b"same-salt", backend=PollingBackend(vdir))
+        w.sync()
+        w.close()
+        results.append({p.name: p.read_bytes() for p in (tmp_path / name).iterdir()})
+
+    assert results[0] == results[1]
+
+
+def test_process_handles_modification_and_removal(watcher, vdir):
+    """Processing changed paths rewrites or deletes the matching output."""
+    from concurrent.futures import wait
+    from pathlib import Path
+
+    watcher.sync()
+    relpath = Path("event-1@example.com.ics")
+    before = watcher.output_path(relpath).read_bytes()
+
+    (vdir / relpath).write_bytes(make_ics("event-1@example.com", "Breakfast"))
+    wait(watcher.process({relpath}))
+    assert watcher.output_path(relpath).read_bytes() != before
+
+    (vdir / relpath).unlink()
+    wait(watcher.process({relpath}))
+    assert not watcher.output_path(relpath).exists()
+    assert watcher.stats.latency_percentile(50) is not None
+
+
+def test_invalid_file_is_counted_as_failure(watcher, vdir):
+    """Invalid calendars do not stop the watcher."""
+    (vdir / "broken.ics").write_bytes(b"not a calendar")
+    watcher.sync()
+
+    assert watcher.stats.failed == 1
+    assert watcher.stats.updated == 2
+
+
+def test_run_picks_up_new_files(watcher, vdir):
+    """The watch loop anonymizes files created while it runs."""
+    import time
+
+    watcher.sync()
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.run, args=(stop,))
+    thread.start()
+    try:
+        (vdir / "event-3@example.com.ics").write_bytes(make_ics("event-3@example.com", "Tea"))
+        deadline = time.monotonic() + 5
+        while watcher.stats.updated < 3 and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert watcher.stats.updated == 3
+    assert len(read_outputs(watcher.destination)) == 3
+
+
+def test_salt_is_persisted(tmp_path):
+    """The state directory keeps the salt between runs."""
+    from icalendar_anonymizer._vdir import default_state_dir, load_or_create_salt
+
+    state_dir = default_state_dir(tmp_path / "dest")
+    assert state_dir == tmp_path / "dest.ican-state"
+    assert load_or_create_salt(state_dir) == load_or_create_salt(state_dir)
@@ -7,7 +7,17 @@ import doctest
 
 import icalendar_anonymizer._hash
 import icalendar_anonymizer._properties
+import icalendar_anonymizer._pseudonyms
+import icalendar_anonymizer._stats
 import icalendar_anonymizer.anonymizer
+import icalendar_anonymizer.limits
+import icalendar_anonymizer.mapping
+import icalendar_anonymizer.observe
+import icalendar_anonymizer.profiling
+import icalendar_anonymizer.quarantine
+import icalendar_anonymizer.subset
+import icalendar_anonymizer.tenants
+import icalendar_anonymizer.verify
 
 
 def test_hash_doctests():
@@ -22,7 +32,77 @@ def test_properties_doctests():
     assert results.failed == 0, f"Doctest failures in _properties: {results.failed}"
 
 
+def test_pseudonyms_doctests():
+    """Run doctests for _pseudonyms module."""
+    results = doctest.testmod(icalendar_anonymizer._pseudonyms)
+    assert results.failed == 0, f"Doctest failures in _pseudonyms: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_stats_doctests():
+    """Run doctests for _stats module."""
+    results = doctest.testmod(icalendar_anonymizer._stats)
+    assert results.failed == 0, f"Doctest failures in _stats: {results.failed}"
+    assert results.attempted > 0
+
+
 def test_anonymizer_doctests():
     """Run doctests for anonymizer module."""
     results = doctest.testmod(icalendar_anonymizer.anonymizer)
     assert results.failed == 0, f"Doctest failures in anonymizer: {results.failed}"
+
+
+def test_observe_doctests():
+    """Run doctests for observe module."""
+    results = doctest.testmod(icalendar_anonymizer.observe)
+    assert results.failed == 0, f"Doctest failures in observe: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_limits_doctests():
+    """Run doctests for limits module."""
+    results = doctest.testmod(icalendar_anonymizer.limits)
+    assert results.failed == 0, f"Doctest failures in limits: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_quarantine_doctests():
+    """Run doctests for quarantine module."""
+    results = doctest.testmod(icalendar_anonymizer.quarantine)
+    assert results.failed == 0, f"Doctest failures in quarantine: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_subset_doctests():
+    """Run doctests for subset module."""
+    results = doctest.testmod(icalendar_anonymizer.subset)
+    assert results.failed == 0, f"Doctest failures in subset: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_mapping_doctests():
+    """Run doctests for mapping module."""
+    results = doctest.testmod(icalendar_anonymizer.mapping)
+    assert results.failed == 0, f"Doctest failures in mapping: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_profiling_doctests():
+    """Run doctests for profiling module."""
+    results = doctest.testmod(icalendar_anonymizer.profiling)
+    assert results.failed == 0, f"Doctest failures in profiling: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_tenants_doctests():
+    """Run doctests for tenants module."""
+    results = doctest.testmod(icalendar_anonymizer.tenants)
+    assert results.failed == 0, f"Doctest failures in tenants: {results.failed}"
+    assert results.attempted > 0
+
+
+def test_verify_doctests():
+    """Run doctests for verify module."""
+    results = doctest.testmod(icalendar_anonymizer.verify)
+    assert results.failed == 0, f"Doctest failures in verify: {results.failed}"
+    assert results.attempted > 0
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Calendars of pathological shapes, growing with a size.
+
+Each shape builds raw iCalendar data in which one dimension grows with
+``size``, and repeats ``text`` in the values, so that hypothesis can vary
+both. Used by ``test_scaling.py`` and ``benchmarks/bench_worst_case.py``.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from icalendar import Calendar, Event
+
+HEADER = "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Test//Shapes//EN\r\n"
+FOOTER = "END:VCALENDAR\r\n"
+
+
+@dataclass(frozen=True)
+class Shape:
+    """A calendar shape.
+
+    Attributes:
+        build: Function building the data from a size and a text
+        unit: Size at which anonymizing takes a few milliseconds
+        description: What grows with the size
+    """
+
+    build: Callable[[int, str], bytes]
+    unit: int
+    description: str
+
+
+def _event(body: str) -> bytes:
+    return f"{HEADER}BEGIN:VEVENT\r\nUID:shape@example.com\r\n{body}END:VEVENT\r\n{FOOTER}".encode()
+
+
+def nested_alarms(size: int, text: str) -> bytes:
+    """Nest size alarms in an event."""
+    alarm = f"BEGIN:VALARM\r\nACTION:DISPLAY\r\nDESCRIPTION:{text}\r\n"
+    return _event(alarm * size + "END:VALARM\r\n" * size)
+
+
+def attendee_parameters(size: int, text: str) -> bytes:
+    """Give one attendee size parameters."""
+    parameters = "".join(f";X-P{number}={text}" for number in range(size))
+    return _event(f'ATTENDEE;CN="{text}"{parameters}:mailto:{text}@example.com\r\n')
+
+
+def long_common_name(size: int, text: str) -> bytes:
+    """Give one attendee a common name of size words."""
+    return _event(f'ATTENDEE;CN="{" ".join([text] * size)}":mailto:someone@example.com\r\n')
+
+
+def folded_description(size: int, text: str) -> bytes:
+    """Fold a description of size different words over many lines."""
+    cal = Calendar.from_ical(_event(""))
+    cal.subcomponents[0].add("description", " ".join(f"{text}{number}" for number in range(size)))
+    return cal.to_ical()
+
+
+def many_categories(size: int, text: str) -> bytes:
+    """List size categories in one property."""
+    return _event(f"CATEGORIES:{','.join(f'{text}{number}' for number in range(size))}\r\n")
+
+
+def many_attendees(size: int, text: str) -> bytes:
+    """Invite size different attendees to one event."""
+    return _event(
+        "".join(
+            f"ATTENDEE;CN={text} {number}:mailto:{text}{number}@example.com\r\n"
+            for number in range(size)
+        )
+    )
+
+
+def unique_uids(size: int, text: str) -> bytes:
+    """Chain size events with unique UIDs, each related to the previous one."""
+    events = "".join(
+        f"BEGIN:VEVENT\r\nUID:{text}-{number}@example.com\r\n"
+        f"RELATED-TO:{text}-{number - 1}@example.com\r\nSUMMARY:{text}\r\nEND:VEVENT\r\n"
+        for number in range(size)
+    )
+    return f"{HEADER}{events}{FOOTER}".encode()
+
+
+SHAPES = {
+    "nested_alarms": Shape(nested_alarms, 50, "nesting depth of alarms"),
+    "attendee_parameters": Shape(attendee_parameters, 1000, "parameters of one attendee"),
+    "long_common_name": Shape(long_common_name, 1000, "words of one common name"),
+    "folded_description": Shape(folded_description, 1000, "words of one folded line"),
+    "many_categories": Shape(many_categories, 400, "values of one property"),
+    "many_attendees": Shape(many_attendees, 100, "attendees of one event"),
+    "unique_uids": Shape(unique_uids, 50, "events with unique UIDs"),
+}
+
+
+def ordinary(size: int) -> bytes:
+    """Build an ordinary calendar of size events, the reference for costs."""
+    cal = Calendar.from_ical(f"{HEADER}{FOOTER}")
+    for number in range(size):
+        event = Event()
+        event.add("uid", f"event-{number}@example.com")
+        event.add("summary", f"Planning session {number % 25}")
+        event.add("description", f"Notes for item {number}: " + "agenda item " * 10)
+        event.add("location", f"Room {number % 7}")
+        event.add("attendee", f"mailto:person{number % 40}@example.com", parameters={"CN": "Jo"})
+        cal.add_component(event)
+    return cal.to_ical()
@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Memory and allocation regression gate.
+
+Each scenario runs on a fixed synthetic input under tracemalloc and
+records two numbers:
+
+- ``peak``: the highest traced memory above the start, in bytes, which
+  grows with short-lived lists, strings and objects that pile up
+- ``blocks``: the memory blocks allocated by the run and still alive at
+  its end, which grows with every extra object kept per property
+
+Both are compared with the baseline of the running Python version in
+``allocations.json``. A scenario fails if it exceeds the baseline by more
+than ``TOLERANCE``. The lines that allocated the most memory still alive
+at the end of the run are shown in the failure message and printed with
+``pytest -s``; tracemalloc cannot attribute the peak itself. After an intended change,
+record new baselines with::
+
+    ICAN_UPDATE_BASELINES=1 pytest src/icalendar_anonymizer/tests/perf
+"""
+
+import gc
+import json
+import os
+import sys
+import tracemalloc
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from icalendar import Alarm, Calendar, Event, vCalAddress
+
+BASELINES = Path(__file__).with_name("allocations.json")
+
+# Allowed growth over the baseline, relative and absolute
+TOLERANCE = 0.10
+MIN_SLACK = {"peak": 16 * 1024, "blocks": 50}
+
+# Number of allocation sites shown for a scenario
+TOP_SITES = 10
+
+SALT = b"allocation-baseline-salt"
+
+PYTHON = f"{sys.version_info.major}.{sys.version_info.minor}"
+UPDATE = os.environ.get("ICAN_UPDATE_BASELINES") == "1"
+
+
+def _calendar(events: int = 200) -> Calendar:
+    """Create a calendar with attendees, alarms and a recurring series."""
+    cal = Calendar()
+    cal.add("prodid", "-//Test//Allocations//EN")
+    cal.add("version", "2.0")
+    start = datetime(2024, 1, 1, 9, 0, 0)
+    for index in range(events):
+        event = Event()
+        # Every fourth event is an override of a weekly series
+        if index % 4:
+            event.add("uid", f"event-{index}@example.com")
+        else:
+            event.add("uid", "weekly@example.com")
+            event.add("recurrence-id", start + timedelta(weeks=index))
+        event.add("dtstart", start + timedelta(hours=index))
+        event.add("dtend", start + timedelta(hours=index, minutes=30))
+        event.add("summary", f"Planning session {index % 25}")
+        event.add("description", f"Notes for item {index}: " + "agenda item " * 20)
+        event.add("location", f"Room {index % 7}")
+        event.add("categories", ["Work", f"Project {index % 5}"])
+        for number in range(3):
+            attendee = vCalAddress(f"mailto:person{(index + number) % 40}@example.com")
+            attendee.params["cn"] = f"Person {(index + number) % 40}"
+            attendee.params["role"] = "REQ-PARTICIPANT"
+            event.add("attendee", attendee)
+        alarm = Alarm()
+        alarm.add("action", "DISPLAY")
+        alarm.add("description", "Reminder")
+        alarm.add("trigger", timedelta(minutes=-15))
+        event.add_component(alarm)
+        cal.add_component(event)
+    return cal
+
+
+def _scenario_anonymize() -> Callable[[], object]:
+    from icalendar_anonymizer import anonymize
+
+    cal = _calendar()
+    return lambda: anonymize(cal, salt=SALT)
+
+
+def _scenario_hash_text() -> Callable[[], object]:
+    from icalendar_anonymizer._hash import hash_text
+
+    text = "Forwarded message from the planning thread, see below. " * 4000
+    return lambda: hash_text(text, SALT)
+
+
+def _scenario_cli_roundtrip() -> Callable[[], object]:
+    from click.testing import CliRunner
+
+    from icalendar_anonymizer.cli import main
+
+    data = _calendar().to_ical()
+    runner = CliRunner()
+    return lambda: runner.invoke(main, [], input=data).output_bytes
+
+
+SCENARIOS = {
+    "anonymize": _scenario_anonymize,
+    "hash_text": _scenario_hash_text,
+    "cli_roundtrip": _scenario_cli_roundtrip,
+}
+
+
+def _measure(run: Callable[[], object]) -> tuple[dict[str, int], tracemalloc.Snapshot]:
+    """Run a scenario under tracemalloc.
+
+    Args:
+        run: The scenario
+
+    Returns:
+        The measurements and a snapshot of the blocks still alive at the end
+    """
+    # Warm up caches (regular expressions, imports, interned strings)
+    run()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    del result
+    snapshot = snapshot.filter_traces(
+        [tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__)]
+    )
+    return {"peak": peak, "blocks": len(snapshot.traces)}, snapshot
+
+
+def _top_sites(snapshot: tracemalloc.Snapshot) -> str:
+    """Format the lines whose allocations hold the most memory."""
+    lines = []
+    for stat in snapshot.statistics("lineno")[:TOP_SITES]:
+        frame = stat.traceback[0]
+        lines.append(
+            f"  {stat.size / 1024:8.1f} KiB {stat.count:6} blocks  {frame.filename}:{frame.lineno}"
+        )
+    return "\n".join(lines)
+
+
+def _load_baselines() -> dict:
+    if BASELINES.exists():
+        return json.loads(BASELINES.read_text(encoding="utf-8"))
+    return {}
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+def test_allocations_within_baseline(scenario):
+    """Peak memory and retained blocks do not regress beyond TOLERANCE."""
+    measured, snapshot = _measure(SCENARIOS[scenario]())
+    sites = _top_sites(snapshot)
+    print(f"\n{scenario} on Python {PYTHON}: {measured}\n{sites}")
+
+    baselines = _load_baselines()
+    if UPDATE:
+        baselines.setdefault(PYTHON, {})[scenario] = measured
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return
+
+    baseline = baselines.get(PYTHON, {}).get(scenario)
+    if baseline is None:
+        pytest.skip(f"No allocation baseline for {scenario} on Python {PYTHON}")
+
+    for metric, value in measured.items():
+        limit = baseline[metric] + max(baseline[metric] * TOLERANCE, MIN_SLACK[metric])
+        assert value <= limit, (
+            f"{scenario}: {metric} {value} exceeds baseline {baseline[metric]} "
+            f"by more than {TOLERANCE:.0%}\nTop allocation sites still alive:\n{sites}"
+        )
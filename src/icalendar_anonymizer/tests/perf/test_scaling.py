@@ -0,0 +1,178 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Search for inputs whose anonymization cost grows super-linearly.
+
+Hypothesis varies the size and the text of each shape in ``shapes.py``
+and checks that anonymizing ``GROWTH`` times the input takes at most
+``GROWTH ** MAX_EXPONENT`` times the time and peak memory. Time and
+memory are measured in separate runs, since tracing allocations slows
+deep call stacks down far more than shallow ones.
+
+Inputs found this way are kept in ``corpus.json`` with ceilings that do
+not depend on the machine:
+
+- ``max_time_ratio``: time per input byte, relative to an ordinary
+  calendar anonymized in the same run
+- ``max_peak_ratio``: peak traced memory per input byte
+
+Search longer with ``ICAN_SCALING_EXAMPLES=200``. A failure prints the
+corpus entry of the input. After an intended change, record new ceilings
+with::
+
+    ICAN_UPDATE_BASELINES=1 pytest src/icalendar_anonymizer/tests/perf
+"""
+
+import gc
+import json
+import math
+import os
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from hypothesis import HealthCheck, Phase, given, settings
+from hypothesis import strategies as st
+from icalendar import Calendar
+
+from .shapes import SHAPES, ordinary
+
+CORPUS = Path(__file__).with_name("corpus.json")
+
+# Factor by which the input grows, and the largest accepted exponent of
+# the growth of the cost: 1 is linear, 2 quadratic
+GROWTH = 4
+MAX_EXPONENT = 1.5
+
+# Timed runs of which the fastest counts
+REPEAT = 3
+
+# Shortest time of a timed run in seconds: small inputs are anonymized
+# several times per run, like timeit's autorange
+MIN_RUN_TIME = 0.02
+
+# Ceilings recorded over the measured ratios
+HEADROOM = {"time": 3.0, "peak": 1.5}
+
+SALT = b"scaling-salt"
+
+EXAMPLES = int(os.environ.get("ICAN_SCALING_EXAMPLES", "2"))
+UPDATE = os.environ.get("ICAN_UPDATE_BASELINES") == "1"
+
+# Text repeated in the values, with characters outside of ASCII
+TEXT = st.text(alphabet="abcxyzAZ09äéß漢", min_size=1, max_size=12)
+
+
+def _cost(data: bytes) -> tuple[float, int]:
+    """Anonymize data, returning the best CPU time per anonymization in seconds and the peak memory in bytes.
+
+    CPU time leaves out the time other processes take on a busy machine.
+    """
+    from icalendar_anonymizer import anonymize
+
+    cal = Calendar.from_ical(data)
+    try:
+        # Warm up caches (regular expressions, imports, interned strings)
+        anonymize(cal, salt=SALT)
+    except RecursionError:
+        recursed = True
+    else:
+        recursed = False
+    if recursed:
+        # Outside of the except block: pytest takes minutes to format the
+        # traceback of the RecursionError
+        pytest.fail("Anonymizing exceeds the recursion limit", pytrace=False)
+    best = math.inf
+    # Like timeit: collections of the whole heap, e.g. of earlier tests,
+    # would be timed with the input
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(REPEAT):
+            loops = 0
+            start = time.process_time()
+            while (elapsed := time.process_time() - start) < MIN_RUN_TIME or not loops:
+                anonymize(cal, salt=SALT)
+                loops += 1
+            best = min(best, elapsed / loops)
+    finally:
+        gc.enable()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        anonymize(cal, salt=SALT)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def _corpus_entry(shape: str, size: int, text: str) -> dict[str, object]:
+    return {"shape": shape, "size": size, "text": text}
+
+
+@pytest.fixture(scope="module")
+def reference() -> float:
+    """Time per byte of anonymizing an ordinary calendar on this machine."""
+    data = ordinary(200)
+    seconds, _ = _cost(data)
+    return seconds / len(data)
+
+
+# Growth Tests
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+@settings(
+    max_examples=EXAMPLES,
+    deadline=None,
+    derandomize=True,
+    database=None,
+    # Each run is timed, shrinking would take long for little gain
+    phases=[Phase.explicit, Phase.generate],
+    suppress_health_check=[HealthCheck.too_slow],
+)
+@given(units=st.integers(min_value=1, max_value=3), text=TEXT)
+def test_cost_grows_linearly(shape, units, text):
+    """Anonymizing GROWTH times the input costs at most GROWTH ** MAX_EXPONENT times as much."""
+    size = SHAPES[shape].unit * units
+    small = _cost(SHAPES[shape].build(size, text))
+    large = _cost(SHAPES[shape].build(size * GROWTH, text))
+    for metric, before, after in zip(("time", "peak"), small, large, strict=True):
+        assert after <= before * GROWTH**MAX_EXPONENT, (
+            f"{metric} of {shape} grows from {before:.4g} to {after:.4g} for {GROWTH} times "
+            f"the {SHAPES[shape].description}. Add it to {CORPUS.name}:\n"
+            + json.dumps(_corpus_entry(shape, size * GROWTH, text))
+        )
+
+
+# Corpus Tests
+
+
+def _load_corpus() -> list[dict]:
+    return json.loads(CORPUS.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("entry", _load_corpus(), ids=lambda entry: entry["id"])
+def test_corpus_within_ceilings(entry, reference):
+    """Inputs found before stay within their time and memory ceilings."""
+    data = SHAPES[entry["shape"]].build(entry["size"], entry["text"])
+    seconds, peak = _cost(data)
+    measured = {"time": seconds / len(data) / reference, "peak": peak / len(data)}
+    print(f"\n{entry['id']}: {len(data)} bytes, {seconds * 1000:.1f} ms, {peak} bytes peak")
+
+    if UPDATE:
+        corpus = _load_corpus()
+        for recorded in corpus:
+            if recorded["id"] == entry["id"]:
+                for metric, ratio in measured.items():
+                    recorded[f"max_{metric}_ratio"] = round(ratio * HEADROOM[metric], 1)
+        CORPUS.write_text(json.dumps(corpus, indent=2) + "\n", encoding="utf-8")
+        return
+
+    for metric, ratio in measured.items():
+        ceiling = entry[f"max_{metric}_ratio"]
+        assert ratio <= ceiling, (
+            f"{entry['id']}: {metric} ratio {ratio:.2f} exceeds the ceiling {ceiling}"
+        )
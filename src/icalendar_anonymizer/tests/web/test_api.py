@@ -3,18 +3,201 @@
 
 """Tests for FastAPI web service.
 
-TODO: Implement tests when web API is added (Issue #4).
-
-These tests should cover:
-- POST /anonymize endpoint
-- File upload handling
-- Response format validation
-- Error handling for invalid calendars
-- Rate limiting (Issue #18)
+TODO: Cover GET /fetch when it is added.
+Rate limiting (Issue #18) is covered in test_ratelimit.py.
 
 See https://github.com/mergecal/icalendar-anonymizer/issues/4
 """
 
+import pytest
+from icalendar import Calendar
+
+ICS = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//Test//Test//EN\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:event-1@example.com\r\n"
+    "DTSTART:20240115T140000Z\r\n"
+    "SUMMARY:Team Meeting\r\n"
+    "ATTENDEE;CN=Jane Smith:mailto:jane.smith@example.com\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client of a fresh application."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    app = create_app(Metrics(tmp_path), WorkerPool(2))
+    with TestClient(app) as client:
+        yield client
+
+
+def _assert_anonymized(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    assert 'filename="anonymized.ics"' in response.headers["content-disposition"]
+    for secret in ("Team Meeting", "Jane Smith", "jane.smith", "event-1"):
+        assert secret not in response.text
+    event = Calendar.from_ical(response.content).walk("VEVENT")[0]
+    assert event.to_ical().count(b"DTSTART:20240115T140000Z") == 1
+
+
+# POST /anonymize Tests
+
+
+def test_anonymize_json(client):
+    """JSON input is anonymized."""
+    _assert_anonymized(client.post("/anonymize", json={"ics": ICS}))
+
+
+@pytest.mark.parametrize(
+    ("ics", "detail"),
+    [
+        ("", "Input is empty"),
+        ("   ", "Input is empty"),
+        ("not a calendar", "Invalid ICS format"),
+        ("BEGIN:VEVENT\r\nEND:VEVENT\r\n", "Expected BEGIN:VCALENDAR"),
+    ],
+)
+def test_anonymize_json_rejects_invalid_input(client, ics, detail):
+    """Empty and invalid input is a bad request."""
+    response = client.post("/anonymize", json={"ics": ics})
+
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
+
+
+def test_anonymize_json_requires_ics(client):
+    """A body without ics fails validation."""
+    assert client.post("/anonymize", json={}).status_code == 422
+
+
+# POST /upload Tests
+
+
+def test_upload(client):
+    """Uploaded files are anonymized."""
+    response = client.post("/upload", files={"file": ("calendar.ics", ICS, "text/calendar")})
+
+    _assert_anonymized(response)
+
+
+def test_upload_rejects_non_utf8(client):
+    """Files that are not UTF-8 are a bad request."""
+    data = ICS.replace("Team Meeting", "Caf\xe9").encode("latin-1")
+
+    response = client.post("/upload", files={"file": ("calendar.ics", data, "text/calendar")})
+
+    assert response.status_code == 400
+    assert "UTF-8" in response.json()["detail"]
+
+
+def test_upload_rejects_large_files(client, monkeypatch):
+    """Files above the size limit are rejected."""
+    from icalendar_anonymizer.webapp import main
+
+    monkeypatch.setattr(main, "MAX_INPUT_SIZE", 100)
+
+    response = client.post("/upload", files={"file": ("calendar.ics", ICS, "text/calendar")})
+
+    assert response.status_code == 413
+
+
+# Limits Tests
+
+
+@pytest.fixture
+def limited_client(tmp_path):
+    """Create a test client of an application with tight limits."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.limits import Limits
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    limits = Limits(max_properties=6, max_depth=1)
+    with TestClient(create_app(Metrics(tmp_path), WorkerPool(2), limits=limits)) as client:
+        yield client
+
+
+def test_calendar_within_limits(limited_client):
+    """A calendar within the limits is anonymized."""
+    response = limited_client.post("/anonymize", json={"ics": ICS})
+    _assert_anonymized(response)
+
+
+def test_calendar_exceeding_limits(limited_client):
+    """A calendar exceeding a limit is rejected with the line it exceeds it at."""
+    ics = ICS.replace("END:VEVENT", "X-EXTRA:1\r\nEND:VEVENT")
+    response = limited_client.post("/anonymize", json={"ics": ics})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Calendar has more than 6 properties (line 9)"
+    assert 'ican_errors_total{type="limit"} 1' in limited_client.get("/metrics").text
+
+
+def test_limits_from_environment(monkeypatch):
+    """Limits are read from the environment, 0 disables a limit."""
+    from icalendar_anonymizer.webapp.main import DEFAULT_LIMITS, limits_from_environment
+
+    assert limits_from_environment() == DEFAULT_LIMITS
+    monkeypatch.setenv("ICAN_MAX_DEPTH", "3")
+    monkeypatch.setenv("ICAN_MAX_PROPERTIES", "0")
+    limits = limits_from_environment()
+    assert limits.max_depth == 3
+    assert limits.max_properties is None
+    assert limits.max_components == DEFAULT_LIMITS.max_components
+
+
+# Tenant Tests
+
+
+@pytest.fixture
+def tenant_client(tmp_path):
+    """Create a test client of an application with a tenant keyring."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.tenants import TenantKeyring
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    app = create_app(Metrics(tmp_path), WorkerPool(2), keyring=TenantKeyring(bytes(range(32))))
+    with TestClient(app) as client:
+        yield client
+
+
+def test_tenant_output_is_stable(tenant_client):
+    """Requests of one tenant get the same pseudonyms, other tenants others."""
+
+    def anonymize(tenant):
+        response = tenant_client.post("/anonymize", json={"ics": ICS}, headers={"X-Tenant": tenant})
+        assert response.status_code == 200
+        return response.text
+
+    assert anonymize("acme") == anonymize("acme")
+    assert anonymize("acme") != anonymize("globex")
+    # Without a tenant, the salt is random
+    first = tenant_client.post("/anonymize", json={"ics": ICS}).text
+    assert first != tenant_client.post("/anonymize", json={"ics": ICS}).text
+
+
+def test_tenant_without_keyring(client):
+    """Naming a tenant fails if the server has no keyring."""
+    response = client.post("/anonymize", json={"ics": ICS}, headers={"X-Tenant": "acme"})
+    assert response.status_code == 400
+    assert "X-Tenant" in response.json()["detail"]
+
 
-def test_placeholder():
-    """Placeholder test until Issue #4 is implemented."""
+def test_empty_tenant(tenant_client):
+    """An empty tenant ID is rejected."""
+    response = tenant_client.post("/anonymize", json={"ics": ICS}, headers={"X-Tenant": ""})
+    assert response.status_code == 400
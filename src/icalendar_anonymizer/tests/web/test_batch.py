@@ -0,0 +1,258 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the batch endpoint of the web service."""
+
+import email
+import io
+import zipfile
+
+import pytest
+from icalendar import Calendar
+
+from .test_api import ICS
+
+# A second calendar with another event of the same UID as in ICS
+RELATED_ICS = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//Test//Test//EN\r\n"
+    "BEGIN:VEVENT\r\n"
+    "UID:event-1@example.com\r\n"
+    "RECURRENCE-ID:20240122T140000Z\r\n"
+    "DTSTART:20240122T150000Z\r\n"
+    "SUMMARY:Team Meeting moved\r\n"
+    "END:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client of a fresh application."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    with TestClient(create_app(Metrics(tmp_path), WorkerPool(2))) as client:
+        yield client
+
+
+def _upload(*contents: bytes | str) -> list[tuple[str, tuple[str, bytes | str, str]]]:
+    return [
+        ("files", (f"upload-{number}.ics", content, "text/calendar"))
+        for number, content in enumerate(contents)
+    ]
+
+
+def _zip(members: dict[str, str]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def _unzip(data: bytes) -> dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        return {name: archive.read(name) for name in archive.namelist()}
+
+
+# Batch Tests
+
+
+def test_batch_returns_zip(client):
+    """Each calendar is anonymized into a numbered zip entry."""
+    response = client.post("/anonymize/batch", files=_upload(ICS, RELATED_ICS))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    results = _unzip(response.content)
+    assert sorted(results) == ["calendar-1.ics", "calendar-2.ics"]
+    for data in results.values():
+        assert b"Team Meeting" not in data
+        assert b"example.com" not in data
+        Calendar.from_ical(data)
+
+
+def test_batch_shares_uids(client):
+    """UIDs are anonymized consistently across the calendars of a batch."""
+    response = client.post("/anonymize/batch", files=_upload(ICS, RELATED_ICS))
+    other = client.post("/anonymize/batch", files=_upload(ICS))
+
+    results = _unzip(response.content)
+    event = Calendar.from_ical(results["calendar-1.ics"]).walk("VEVENT")[0]
+    override = Calendar.from_ical(results["calendar-2.ics"]).walk("VEVENT")[0]
+    other_event = Calendar.from_ical(_unzip(other.content)["calendar-1.ics"]).walk("VEVENT")[0]
+    assert str(event["UID"]) == str(override["UID"])
+    # Each batch has its own salt
+    assert str(event["UID"]) != str(other_event["UID"])
+
+
+def test_batch_expands_zip_upload(client):
+    """Uploaded zip archives contribute each of their members."""
+    archive = _zip({"a.ics": ICS, "folder/b.ics": RELATED_ICS})
+
+    response = client.post(
+        "/anonymize/batch",
+        files=[("files", ("calendars.zip", archive, "application/zip")), *_upload(ICS)],
+    )
+
+    assert sorted(_unzip(response.content)) == [
+        "calendar-1.ics",
+        "calendar-2.ics",
+        "calendar-3.ics",
+    ]
+
+
+def test_batch_reports_invalid_calendars_per_entry(client):
+    """An invalid calendar becomes an error entry, the others succeed."""
+    response = client.post("/anonymize/batch", files=_upload(ICS, "not a calendar"))
+
+    results = _unzip(response.content)
+    assert sorted(results) == ["calendar-1.ics", "calendar-2.error.txt"]
+    assert b"Invalid ICS format" in results["calendar-2.error.txt"]
+    metrics = client.get("/metrics").text
+    assert 'ican_errors_total{type="invalid_ics"} 1' in metrics
+
+
+def test_batch_multipart_output(client):
+    """With output=multipart, results are parts of a multipart/mixed body."""
+    response = client.post("/anonymize/batch?output=multipart", files=_upload(ICS, RELATED_ICS))
+
+    assert response.headers["content-type"].startswith("multipart/mixed; boundary=")
+    message = email.message_from_bytes(
+        b"Content-Type: "
+        + response.headers["content-type"].encode()
+        + b"\r\n\r\n"
+        + response.content
+    )
+    parts = {part.get_filename(): part.get_payload(decode=True) for part in message.get_payload()}
+    assert sorted(parts) == ["calendar-1.ics", "calendar-2.ics"]
+    assert all(Calendar.from_ical(data).name == "VCALENDAR" for data in parts.values())
+
+
+@pytest.mark.parametrize(
+    ("files", "status_code"),
+    [
+        ([("files", ("broken.zip", b"PK\x03\x04broken", "application/zip"))], 400),
+        ([("files", ("empty.zip", _zip({}), "application/zip"))], 400),
+    ],
+)
+def test_batch_rejects_invalid_archives(client, files, status_code):
+    """Broken and empty archives are rejected before anything is streamed."""
+    response = client.post("/anonymize/batch", files=files)
+
+    assert response.status_code == status_code
+
+
+def test_batch_is_read_in_worker_thread(client, monkeypatch):
+    """Archives are read and decompressed outside of the event loop."""
+    import threading
+
+    from icalendar_anonymizer.webapp import main
+
+    threads = []
+    original = main.read_batch
+
+    def read_batch(*args):
+        threads.append(threading.current_thread().name)
+        return original(*args)
+
+    monkeypatch.setattr(main, "read_batch", read_batch)
+    response = client.post("/anonymize/batch", files=_upload(_zip({"a.ics": ICS})))
+
+    assert response.status_code == 200
+    assert len(threads) == 1
+    assert threads[0].startswith("ican-worker")
+
+
+def test_batch_limits():
+    """Oversized calendars and batches are rejected."""
+    from icalendar_anonymizer.webapp.batch import BatchError, read_batch
+
+    with pytest.raises(BatchError, match="size limit") as error:
+        read_batch([io.BytesIO(_zip({"a.ics": ICS}))], max_file_size=10)
+    assert error.value.status_code == 413
+    with pytest.raises(BatchError, match="limit of 1 calendars"):
+        read_batch([io.BytesIO(b"a"), io.BytesIO(b"b")], max_file_size=10, max_files=1)
+    with pytest.raises(BatchError, match="size limit of 3 bytes"):
+        read_batch([io.BytesIO(b"ab"), io.BytesIO(b"cd")], max_file_size=10, max_size=3)
+
+
+# Worker Pool Tests
+
+
+def test_map_unordered_yields_as_completed():
+    """Results arrive as tasks complete, exceptions are yielded, not raised."""
+    import asyncio
+    import threading
+
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    pool = WorkerPool(2, queue_size=0)
+    release = threading.Event()
+
+    def work(item):
+        if item == "slow":
+            # Only finishes once the first result has been received
+            release.wait(5)
+        if item == "fail":
+            raise ValueError(item)
+        return item
+
+    async def collect():
+        results = []
+        async for index, result in pool.map_unordered(work, ["slow", "fast", "fail"]):
+            results.append((index, result if isinstance(result, str) else repr(result)))
+            release.set()
+        return results
+
+    results = asyncio.run(collect())
+    pool.shutdown()
+
+    assert results[0] == (1, "fast")
+    assert sorted(results) == [(0, "slow"), (1, "fast"), (2, "ValueError('fail')")]
+
+
+def test_map_unordered_stopped_early_keeps_running_tasks():
+    """Tasks still running when the caller stops hold their place until they finish."""
+    import asyncio
+    import threading
+
+    from icalendar_anonymizer.webapp.pool import PoolSaturatedError, WorkerPool
+
+    pool = WorkerPool(1, queue_size=0)
+    started = threading.Event()
+    release = threading.Event()
+    states = []
+
+    def work(item):
+        started.set()
+        release.wait(5)
+        return item
+
+    async def consume():
+        async for _ in pool.map_unordered(work, ["slow"]):
+            pass
+
+    async def main():
+        # Like a client disconnecting while its batch is anonymized
+        task = asyncio.ensure_future(consume())
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        states.append((pool.busy, pool.saturated))
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(work, "rejected")
+        release.set()
+        # Waits for the running task
+        await asyncio.to_thread(pool.shutdown)
+        states.append((pool.busy, pool.saturated))
+
+    asyncio.run(main())
+
+    assert states == [(1, True), (0, False)]
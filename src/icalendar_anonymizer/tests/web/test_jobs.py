@@ -0,0 +1,250 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the asynchronous job API of the web service."""
+
+import time
+
+import pytest
+from icalendar import Calendar
+
+from .test_api import ICS
+
+
+class Clock:
+    """Clock that only advances when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Create a clock for the job store."""
+    return Clock()
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    """Create a job store spooling to a temporary directory."""
+    from icalendar_anonymizer.webapp.jobs import JobStore
+
+    return JobStore(tmp_path / "jobs", ttl=60, max_jobs=3, clock=clock)
+
+
+@pytest.fixture
+def client(tmp_path, store):
+    """Create a test client of a fresh application."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    with TestClient(create_app(Metrics(tmp_path / "metrics"), WorkerPool(2), store)) as client:
+        yield client
+
+
+def _submit(client, content: bytes | str = ICS):
+    return client.post("/jobs", files={"file": ("calendar.ics", content, "text/calendar")})
+
+
+def _wait(client, job_id: str) -> dict:
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def _large_calendar(events: int) -> str:
+    body = "".join(
+        "BEGIN:VEVENT\r\n"
+        f"UID:event-{number}@example.com\r\n"
+        "DTSTART:20240115T140000Z\r\n"
+        f"SUMMARY:Meeting {number}\r\n"
+        "END:VEVENT\r\n"
+        for number in range(events)
+    )
+    return f"BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Test//Test//EN\r\n{body}END:VCALENDAR\r\n"
+
+
+# POST /jobs Tests
+
+
+def test_job_is_accepted(client):
+    """A job is queued and can be found at its Location."""
+    response = _submit(client)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in ("queued", "running", "done")
+    assert response.headers["location"] == f"/jobs/{job['id']}"
+
+
+def test_empty_job_is_rejected(client, store):
+    """An empty upload is rejected and leaves no job behind."""
+    response = _submit(client, b"")
+    assert response.status_code == 400
+    assert store.jobs == {}
+
+
+def test_upload_is_spooled_outside_of_event_loop(client, monkeypatch):
+    """Uploads are written to disk in a thread, not on the event loop."""
+    import asyncio
+
+    from icalendar_anonymizer.webapp import main
+
+    loops = []
+    original = main._copy_upload
+
+    def copy_upload(*args):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            loops.append(False)
+        else:
+            loops.append(True)
+        return original(*args)
+
+    monkeypatch.setattr(main, "_copy_upload", copy_upload)
+    assert _submit(client).status_code == 202
+    assert loops == [False]
+
+
+def test_job_limit(client, store):
+    """Jobs beyond max_jobs are rejected with Retry-After, not as a saturated pool."""
+    from .test_metrics import _samples
+
+    for _ in range(store.max_jobs):
+        assert _submit(client).status_code == 202
+    response = _submit(client)
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.json()["detail"].startswith("Too many jobs")
+    samples = _samples(client.get("/metrics").text)
+    assert samples["ican_job_rejections_total"] == 1
+    assert samples['ican_errors_total{type="job_limit"}'] == 1
+    assert "ican_pool_rejections_total" not in samples
+
+
+# GET /jobs/{id} Tests
+
+
+def test_job_progress(client):
+    """A finished job reports all components as processed."""
+    job = _wait(client, _submit(client, _large_calendar(50)).json()["id"])
+    assert job["status"] == "done"
+    assert job["components_done"] == job["components_total"] == 50
+
+
+def test_invalid_calendar_fails(client):
+    """A job of an invalid calendar fails with a message."""
+    job = _wait(client, _submit(client, b"BEGIN:VEVENT\r\nEND:VEVENT\r\n").json()["id"])
+    assert job["status"] == "failed"
+    assert "VCALENDAR" in job["error"]
+    response = client.get(f"/jobs/{job['id']}/result")
+    assert response.status_code == 422
+
+
+def test_job_exceeding_limits_fails(tmp_path, clock):
+    """A job of a calendar exceeding a limit fails with the line it exceeds it at."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.limits import Limits
+    from icalendar_anonymizer.webapp.jobs import JobStore
+    from icalendar_anonymizer.webapp.main import create_app
+
+    store = JobStore(tmp_path / "jobs", clock=clock, limits=Limits(max_line_length=30))
+    with TestClient(create_app(jobs=store)) as client:
+        job = _wait(client, _submit(client).json()["id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "Content line exceeds the limit of 30 bytes (line 8)"
+
+
+def test_unknown_job(client):
+    """Unknown jobs are not found."""
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.get("/jobs/unknown/result").status_code == 404
+
+
+# GET /jobs/{id}/result Tests
+
+
+def test_job_result(client):
+    """The result is the anonymized calendar."""
+    job_id = _wait(client, _submit(client).json()["id"])["id"]
+    response = client.get(f"/jobs/{job_id}/result")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    assert 'filename="anonymized.ics"' in response.headers["content-disposition"]
+    for secret in ("Team Meeting", "Jane Smith", "jane.smith", "event-1"):
+        assert secret not in response.text
+    assert len(Calendar.from_ical(response.content).walk("VEVENT")) == 1
+
+
+def test_result_of_unfinished_job(store):
+    """The result of a queued job is not available yet."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.main import create_app
+
+    job = store.create()
+    with TestClient(create_app(jobs=store)) as client:
+        response = client.get(f"/jobs/{job.id}/result")
+    assert response.status_code == 409
+
+
+# Expiry Tests
+
+
+def test_finished_jobs_expire(client, store, clock):
+    """Finished jobs and their files are removed after the TTL."""
+    job_id = _wait(client, _submit(client).json()["id"])["id"]
+    directory = store.jobs[job_id].directory
+    assert not store.jobs[job_id].input_path.exists()
+    clock.now += 59
+    assert client.get(f"/jobs/{job_id}").status_code == 200
+    clock.now += 1
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+    assert not directory.exists()
+
+
+def test_jobs_expire_on_idle_server(tmp_path, clock):
+    """Expired jobs are removed while no request looks them up."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.jobs import JobStore
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    store = JobStore(tmp_path / "jobs", ttl=60, clock=clock, expiry_interval=0.01)
+    with TestClient(create_app(Metrics(tmp_path / "metrics"), WorkerPool(2), store)) as client:
+        job_id = _wait(client, _submit(client).json()["id"])["id"]
+        directory = store.jobs[job_id].directory
+        clock.now += 60
+        deadline = time.monotonic() + 5
+        while store.jobs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Before the store is closed with the application
+        assert store.jobs == {}
+        assert not directory.exists()
+
+
+def test_close_removes_temporary_directory():
+    """The default spool directory is removed when the store is closed."""
+    from icalendar_anonymizer.webapp.jobs import JobStore
+
+    store = JobStore()
+    assert store.directory is None
+    job = store.create()
+    directory = store.directory
+    assert job.directory.is_dir()
+    store.close()
+    assert not directory.exists()
+    assert store.jobs == {}
@@ -0,0 +1,217 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for the metrics of the web service."""
+
+import asyncio
+import json
+import os
+import re
+
+import pytest
+
+from .test_api import ICS
+
+
+def _samples(text: str) -> dict[str, float]:
+    """Parse the samples of a Prometheus text exposition."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Create a test client of a fresh application sharing tmp_path."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    app = create_app(Metrics(tmp_path, flush_interval=0), WorkerPool(2))
+    with TestClient(app) as client:
+        yield client
+
+
+# Endpoint Tests
+
+
+def test_metrics_after_requests(client):
+    """Requests are reported with phases, bytes, components and errors."""
+    response = client.post("/anonymize", json={"ics": ICS})
+    client.post("/anonymize", json={"ics": "not a calendar"})
+
+    metrics = client.get("/metrics")
+
+    assert metrics.status_code == 200
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(metrics.text)
+    assert samples['ican_requests_total{endpoint="/anonymize",status="200"}'] == 1
+    assert samples['ican_requests_total{endpoint="/anonymize",status="400"}'] == 1
+    assert samples['ican_request_duration_seconds_count{endpoint="/anonymize"}'] == 2
+    for phase in ("parse", "anonymize", "serialize"):
+        assert samples[f'ican_phase_duration_seconds_count{{phase="{phase}"}}'] >= 1
+        assert samples[f'ican_phase_duration_seconds_bucket{{phase="{phase}",le="+Inf"}}'] >= 1
+    assert samples["ican_input_bytes_total"] == len(ICS) + len("not a calendar")
+    assert samples["ican_output_bytes_total"] == len(response.content)
+    assert samples["ican_components_total"] == 1
+    assert 0 <= samples["ican_memo_hit_ratio"] <= 1
+    assert samples['ican_errors_total{type="invalid_ics"}'] == 1
+    assert samples["ican_pool_queue_depth"] == 0
+    assert "# TYPE ican_phase_duration_seconds histogram" in metrics.text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Bucket counts include all smaller buckets."""
+    from icalendar_anonymizer.webapp.metrics import Metrics
+
+    metrics = Metrics()
+    for value in (0.001, 0.02, 0.02, 100):
+        metrics.observe("ican_request_duration_seconds", value, endpoint="/x")
+
+    samples = _samples(metrics.render())
+    bucket = 'ican_request_duration_seconds_bucket{{endpoint="/x",le="{}"}}'
+    assert samples[bucket.format("0.005")] == 1
+    assert samples[bucket.format("0.025")] == 3
+    assert samples[bucket.format("30")] == 3
+    assert samples[bucket.format("+Inf")] == 4
+    assert samples['ican_request_duration_seconds_sum{endpoint="/x"}'] == pytest.approx(100.041)
+
+
+def test_label_values_are_escaped():
+    """Quotes and backslashes in label values are escaped."""
+    from icalendar_anonymizer.webapp.metrics import Metrics
+
+    metrics = Metrics()
+    metrics.inc("ican_errors_total", type='a"b\\c')
+
+    assert 'ican_errors_total{type="a\\"b\\\\c"} 1' in metrics.render()
+
+
+# Multiprocess Tests
+
+
+def test_workers_are_added_up(tmp_path):
+    """Snapshots of other workers are added to the counters and gauges."""
+    from icalendar_anonymizer.webapp.metrics import Metrics
+
+    metrics = Metrics(tmp_path)
+    metrics.inc("ican_components_total", 2)
+    metrics.set("ican_pool_queue_depth", 1)
+    metrics.observe("ican_phase_duration_seconds", 0.02, phase="parse")
+    other = Metrics(tmp_path)
+    other.inc("ican_components_total", 3)
+    other.set("ican_pool_queue_depth", 4)
+    other.observe("ican_phase_duration_seconds", 0.02, phase="parse")
+    # A running process (the parent) wrote this snapshot
+    (tmp_path / f"metrics-{os.getppid()}.json").write_text(json.dumps(other.snapshot()))
+
+    samples = _samples(metrics.render())
+
+    assert samples["ican_components_total"] == 5
+    assert samples["ican_pool_queue_depth"] == 5
+    assert samples['ican_phase_duration_seconds_count{phase="parse"}'] == 2
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Liveness of workers is not checked on Windows")
+def test_gauges_of_exited_workers_are_dropped(tmp_path):
+    """Counters of exited workers are kept, their gauges are not."""
+    from icalendar_anonymizer.webapp.metrics import Metrics
+
+    other = Metrics()
+    other.inc("ican_components_total", 3)
+    other.set("ican_pool_queue_depth", 4)
+    # No process has this PID: PIDs are below 2**22 on Linux
+    (tmp_path / "metrics-99999999.json").write_text(json.dumps(other.snapshot()))
+
+    samples = _samples(Metrics(tmp_path).render())
+
+    assert samples["ican_components_total"] == 3
+    assert "ican_pool_queue_depth" not in samples
+
+
+def test_flush_is_throttled(tmp_path):
+    """Snapshots are written at most once per flush interval."""
+    from icalendar_anonymizer.webapp.metrics import Metrics
+
+    metrics = Metrics(tmp_path, flush_interval=3600)
+    path = tmp_path / f"metrics-{os.getpid()}.json"
+    metrics.inc("ican_components_total")
+    metrics.flush()
+    metrics.inc("ican_components_total")
+    metrics.flush()
+
+    assert json.loads(path.read_text())["counters"] == [["ican_components_total", {}, 1]]
+    metrics.flush(force=True)
+    assert json.loads(path.read_text())["counters"] == [["ican_components_total", {}, 2]]
+
+
+# Worker Pool Tests
+
+
+def test_saturated_pool_rejects_with_retry_after(tmp_path):
+    """A full pool answers 503 with Retry-After and counts the rejection."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+
+    pool = WorkerPool(1, queue_size=0)
+    # Occupy the only slot
+    pool._pending = 1
+    with TestClient(create_app(Metrics(tmp_path), pool)) as client:
+        response = client.post("/anonymize", json={"ics": ICS})
+        samples = _samples(client.get("/metrics").text)
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert samples["ican_pool_rejections_total"] == 1
+    assert samples['ican_errors_total{type="saturated"}'] == 1
+    assert samples["ican_pool_busy_workers"] == 1
+
+
+def test_pool_reports_queue_depth():
+    """Tasks beyond the number of workers are counted as queued."""
+    from icalendar_anonymizer.webapp.pool import PoolSaturatedError, WorkerPool
+
+    pool = WorkerPool(1, queue_size=1)
+    depths = []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        def block():
+            loop.call_soon_threadsafe(started.set)
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+
+        first = asyncio.ensure_future(pool.run(block))
+        await started.wait()
+        second = asyncio.ensure_future(pool.run(lambda: None))
+        await asyncio.sleep(0)
+        depths.append((pool.busy, pool.queue_depth))
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(lambda: None)
+        release.set()
+        await asyncio.gather(first, second)
+        depths.append((pool.busy, pool.queue_depth))
+
+    asyncio.run(main())
+    pool.shutdown()
+
+    assert depths == [(1, 1), (0, 0)]
+
+
+def test_metric_names_are_valid():
+    """All metric names follow the Prometheus naming rules."""
+    from icalendar_anonymizer.webapp.metrics import METRICS
+
+    for name, (metric_type, _) in METRICS.items():
+        assert re.fullmatch(r"ican_[a-z_]+", name)
+        assert name.endswith("_total") == (metric_type == "counter")
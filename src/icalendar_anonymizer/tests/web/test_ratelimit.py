@@ -0,0 +1,312 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Tests for rate limiting of the web service."""
+
+import asyncio
+
+import pytest
+
+from .test_api import ICS
+from .test_jobs import Clock
+
+
+@pytest.fixture
+def clock():
+    """Create a clock for the limiter."""
+    return Clock()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    """Create each backend."""
+    from icalendar_anonymizer.webapp.ratelimit import MemoryBackend, SQLiteBackend
+
+    if request.param == "memory":
+        return MemoryBackend()
+    return SQLiteBackend(tmp_path / "limits.sqlite")
+
+
+def _limiter(backend, clock, **limits):
+    from icalendar_anonymizer.webapp.ratelimit import RateLimiter, RateLimits
+
+    return RateLimiter(RateLimits(**limits), backend, clock)
+
+
+# Token Bucket Tests
+
+
+def test_requests_are_limited(backend, clock):
+    """A burst of requests is admitted, then the client waits for a token."""
+    from icalendar_anonymizer.webapp.ratelimit import RateLimitExceeded
+
+    limiter = _limiter(backend, clock, requests=2.0, burst=2.0, concurrency=None)
+    for _ in range(4):
+        limiter.admit("client").release()
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.admit("client")
+    assert error.value.reason == "requests"
+    assert error.value.retry_after == pytest.approx(0.5)
+    assert error.value.retry_after_header == "1"
+    # Other clients have their own buckets
+    limiter.admit("other").release()
+    clock.now += 0.5
+    limiter.admit("client").release()
+
+
+def test_bytes_overdraw(backend, clock):
+    """Uploads may overdraw the byte bucket, which is then repaid."""
+    from icalendar_anonymizer.webapp.ratelimit import BYTES, RateLimitExceeded
+
+    limiter = _limiter(backend, clock, bytes=100.0, burst=1.0)
+    lease = limiter.admit("client")
+    lease.charge(BYTES, 1100)
+    lease.release()
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.admit("client")
+    assert error.value.reason == "bytes"
+    assert error.value.retry_after == pytest.approx(10)
+    assert error.value.retry_after_header == "10"
+    clock.now += 10
+    limiter.admit("client").release()
+
+
+def test_cpu_is_charged(backend, clock):
+    """CPU time charged to a lease counts against the CPU bucket."""
+    from icalendar_anonymizer.webapp.ratelimit import RateLimitExceeded
+
+    limiter = _limiter(backend, clock, cpu=0.5, burst=2.0)
+    lease = limiter.admit("client")
+    lease.charge_cpu(3.0)
+    lease.release()
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.admit("client")
+    assert error.value.reason == "cpu"
+    assert error.value.retry_after == pytest.approx(4)
+
+
+def test_concurrency(backend, clock):
+    """A client may have a limited number of requests in progress."""
+    from icalendar_anonymizer.webapp.ratelimit import RateLimitExceeded
+
+    limiter = _limiter(backend, clock, concurrency=2)
+    first = limiter.admit("client")
+    second = limiter.admit("client")
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.admit("client")
+    assert error.value.reason == "concurrency"
+    second.retain()
+    second.release()
+    with pytest.raises(RateLimitExceeded):
+        limiter.admit("client")
+    second.release()
+    limiter.admit("client")
+    first.release()
+
+
+def test_idle_clients_are_forgotten(clock):
+    """Clients with full buckets and nothing in progress are not kept."""
+    from icalendar_anonymizer.webapp.ratelimit import MemoryBackend
+
+    backend = MemoryBackend()
+    limiter = _limiter(backend, clock, requests=1.0, burst=10.0)
+    lease = limiter.admit("client")
+    clock.now += 1
+    lease.release()
+    assert backend._states == {}
+
+
+def _clients(backend) -> int:
+    """Count the clients a backend keeps."""
+    states = []
+    backend.sweep(lambda state: states.append(state) or False)
+    return len(states)
+
+
+def test_idle_clients_are_swept(backend, clock):
+    """Many clients sending one request each do not accumulate."""
+    from icalendar_anonymizer.webapp.ratelimit import SWEEP_INTERVAL
+
+    limiter = _limiter(backend, clock, requests=5.0, burst=60.0)
+    counts = []
+    for number in range(1000):
+        limiter.admit(f"client-{number}").release()
+        clock.now += 0.1
+        counts.append(_clients(backend))
+    # The clients since the last sweep, and those whose token was not back yet
+    assert max(counts) <= SWEEP_INTERVAL / 0.1 + 5
+    assert counts[-1] < 1000
+
+    # A client with a request in progress is kept
+    lease = limiter.admit("busy")
+    clock.now += SWEEP_INTERVAL
+    limiter.admit("other").release()
+    assert _clients(backend) == 2
+    lease.release()
+
+
+def test_sqlite_backend_is_shared(tmp_path, clock):
+    """Limiters using the same database share the limits."""
+    from icalendar_anonymizer.webapp.ratelimit import RateLimitExceeded, SQLiteBackend
+
+    path = tmp_path / "limits.sqlite"
+    first = _limiter(SQLiteBackend(path), clock, concurrency=1)
+    second = _limiter(SQLiteBackend(path), clock, concurrency=1)
+    lease = first.admit("client")
+    with pytest.raises(RateLimitExceeded):
+        second.admit("client")
+    lease.release()
+    second.admit("client").release()
+
+
+def test_limits_from_environment(monkeypatch):
+    """Limits are read from the environment, 0 disables a limit."""
+    from icalendar_anonymizer.webapp.ratelimit import RateLimits
+
+    monkeypatch.setenv("ICAN_RATE_REQUESTS", "10")
+    monkeypatch.setenv("ICAN_RATE_CPU", "0")
+    monkeypatch.setenv("ICAN_CLIENT_CONCURRENCY", "2")
+    limits = RateLimits.from_environment()
+    assert limits.requests == 10
+    assert limits.bytes == RateLimits().bytes
+    assert limits.cpu is None
+    assert limits.concurrency == 2
+    assert "cpu" not in limits.rates
+
+
+# Worker Pool Tests
+
+
+def test_pool_reports_cpu_time():
+    """Tasks report their CPU time to the account of their context."""
+    from icalendar_anonymizer.webapp.pool import CPU_ACCOUNT, WorkerPool
+
+    charged = []
+
+    async def main():
+        pool = WorkerPool(1)
+        CPU_ACCOUNT.set(charged.append)
+        await pool.run(sum, range(100_000))
+        pool.shutdown()
+
+    asyncio.run(main())
+    assert len(charged) == 1
+    assert charged[0] >= 0
+
+
+# API Tests
+
+
+@pytest.fixture
+def make_client(tmp_path, clock):
+    """Create test clients of applications with the given limits."""
+    from fastapi.testclient import TestClient
+
+    from icalendar_anonymizer.webapp.jobs import JobStore
+    from icalendar_anonymizer.webapp.main import create_app
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+    from icalendar_anonymizer.webapp.ratelimit import MemoryBackend
+
+    clients = []
+
+    def make_client(**limits):
+        app = create_app(
+            Metrics(),
+            WorkerPool(2),
+            JobStore(tmp_path / "jobs"),
+            _limiter(MemoryBackend(), clock, **limits),
+        )
+        client = TestClient(app)
+        clients.append(client.__enter__())
+        return client
+
+    yield make_client
+    for client in clients:
+        client.__exit__(None, None, None)
+
+
+def test_throttled_request(make_client, clock):
+    """Throttled requests are answered with 429 and Retry-After."""
+    client = make_client(requests=0.5, burst=2.0)
+    assert client.post("/anonymize", json={"ics": ICS}).status_code == 200
+    response = client.post("/anonymize", json={"ics": ICS})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "2"
+    assert "requests" in response.json()["detail"]
+    metrics = client.get("/metrics").text
+    assert 'ican_throttled_total{reason="requests"} 1' in metrics
+    assert 'ican_requests_total{endpoint="/anonymize",status="429"} 1' in metrics
+    clock.now += 2
+    assert client.post("/anonymize", json={"ics": ICS}).status_code == 200
+
+
+def test_uploaded_bytes_are_charged(make_client):
+    """The size of an upload is charged to the client."""
+    client = make_client(bytes=10.0, burst=1.0)
+    assert client.post("/upload", files={"file": ("a.ics", ICS)}).status_code == 200
+    response = client.post("/upload", files={"file": ("a.ics", ICS)})
+    assert response.status_code == 429
+    assert "bytes" in response.json()["detail"]
+
+
+def test_anonymization_cpu_is_charged(make_client):
+    """The CPU time of anonymization is charged to the client."""
+    client = make_client(cpu=1e-9, burst=1.0)
+    assert client.post("/anonymize", json={"ics": ICS}).status_code == 200
+    response = client.post("/anonymize", json={"ics": ICS})
+    assert response.status_code == 429
+    assert "cpu" in response.json()["detail"]
+
+
+def test_reads_are_not_limited(make_client):
+    """Metrics and job status requests are not rate limited."""
+    client = make_client(requests=1e-9, burst=1.0)
+    for _ in range(3):
+        assert client.get("/metrics").status_code == 200
+        assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_finished_job_releases_lease(make_client):
+    """Once a job is finished, the client may start another request."""
+    from .test_jobs import _wait
+
+    client = make_client(concurrency=1)
+    job = client.post("/jobs", files={"file": ("a.ics", ICS)}).json()
+    assert _wait(client, job["id"])["status"] == "done"
+    assert client.post("/anonymize", json={"ics": ICS}).status_code == 200
+
+
+def test_job_holds_lease(clock, tmp_path):
+    """The lease of a job is released when the job is finished."""
+    from icalendar_anonymizer.webapp.jobs import JobStore
+    from icalendar_anonymizer.webapp.metrics import Metrics
+    from icalendar_anonymizer.webapp.pool import WorkerPool
+    from icalendar_anonymizer.webapp.ratelimit import MemoryBackend, RateLimitExceeded
+
+    limiter = _limiter(MemoryBackend(), clock, concurrency=1)
+    store = JobStore(tmp_path / "jobs")
+
+    async def main():
+        pool = WorkerPool(1)
+        lease = limiter.admit("client")
+        job = store.create()
+        job.input_path.write_text(ICS)
+        finished = asyncio.Event()
+
+        def done():
+            lease.release()
+            finished.set()
+
+        lease.retain()
+        store.start(job, pool, Metrics(), done)
+        # The request is answered, the job is still in progress
+        lease.release()
+        with pytest.raises(RateLimitExceeded):
+            limiter.admit("client")
+        await finished.wait()
+        assert job.status == "done"
+        limiter.admit("client").release()
+        pool.shutdown()
+
+    asyncio.run(main())
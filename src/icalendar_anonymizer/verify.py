@@ -0,0 +1,354 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Check anonymized output for personal data that survived.
+
+Collects tokens (words, email addresses and their parts) from the original
+calendar's personal properties and ``CN`` or address parameters, then scans
+the anonymized output for them in a single pass with an Aho-Corasick
+automaton. Scanning takes time linear in the size of the output plus the
+number of matches, however many tokens were collected.
+
+Example:
+    .. code-block:: python
+
+        from icalendar_anonymizer import anonymize, verify_no_leaks
+
+        leaks = verify_no_leaks(cal, anonymize(cal, preserve={"SUMMARY"}))
+        for leak in leaks:
+            print(f"{leak.token!r} from {leak.source} in line {leak.line}")
+"""
+
+import re
+import string
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from icalendar import Calendar, vBinary, vCalAddress
+from icalendar.cal import Component
+
+from ._properties import should_preserve_component, should_preserve_property
+
+# Default minimum token length; shorter words match too much unrelated text
+MIN_TOKEN_LENGTH = 4
+
+# Parameters holding names or calendar addresses
+PERSONAL_PARAMETERS = {
+    "CN",
+    "DELEGATED-FROM",
+    "DELEGATED-TO",
+    "DIR",
+    "EMAIL",
+    "MEMBER",
+    "SENT-BY",
+}
+
+# Preserved properties whose values are vocabulary, not content. Words that
+# also appear here (for example "CONFIRMED" in a summary) are not reported.
+_VOCABULARY_PROPERTIES = {
+    "ACTION",
+    "CALSCALE",
+    "CLASS",
+    "FBTYPE",
+    "METHOD",
+    "PRODID",
+    "STATUS",
+    "TRANSP",
+    "VERSION",
+}
+
+# Separators inside a token: whitespace, and characters that are escaped or
+# quoted in iCalendar text, so a token never spans an escape sequence
+_TOKEN_SEPARATORS = re.compile(r'[\s,;\\"]+')
+
+# Punctuation removed from both ends of a token
+_TOKEN_STRIP = string.punctuation
+
+# Words of names and vocabulary values
+_WORD = re.compile(r"\w+")
+
+# Dates and date-times, which are not personal and match preserved values
+_DATE_TIME = re.compile(r"\d{8}(T\d{6}Z?)?")
+
+# Folded content lines continue with a line break and one space or tab
+_FOLDING = re.compile(r"\r?\n[ \t]")
+
+
+@dataclass(frozen=True)
+class Leak:
+    """A token from the original calendar found in the anonymized output.
+
+    Attributes:
+        token: The token that was found
+        source: Where the token came from, e.g. ``"VEVENT SUMMARY"`` or
+                ``"VEVENT ATTENDEE;CN"``
+        line: Line number in the scanned output, starting at 1
+        offset: Character offset of the token in that line
+    """
+
+    token: str
+    source: str
+    line: int
+    offset: int
+
+
+class TokenScanner:
+    """Find whole-word occurrences of many tokens in one pass.
+
+    An Aho-Corasick automaton: a trie of all tokens with failure links, so
+    every character of the scanned text is examined once regardless of the
+    number of tokens. Matching is case-sensitive, because anonymization
+    leaks copy text verbatim. A match is only reported if it is not part of
+    a longer word, which keeps short tokens from matching inside hashes.
+
+    Args:
+        tokens: The tokens to search for
+    """
+
+    def __init__(self, tokens: Iterable[str]):
+        # State 0 is the root. For each state: transitions, failure link,
+        # the token ending here (or None) and the nearest state on the
+        # failure chain that ends a token (the dictionary suffix link).
+        self._goto: list[dict[str, int]] = [{}]
+        self._token: list[str | None] = [None]
+        self._fail: list[int] = []
+        self._output_link: list[int] = []
+        for token in tokens:
+            self._insert(token)
+        self._link()
+
+    def __len__(self) -> int:
+        return sum(token is not None for token in self._token)
+
+    def _insert(self, token: str) -> None:
+        goto = self._goto
+        state = 0
+        for char in token:
+            transitions = goto[state]
+            next_state = transitions.get(char)
+            if next_state is None:
+                next_state = transitions[char] = len(goto)
+                goto.append({})
+            state = next_state
+        self._token.extend([None] * (len(goto) - len(self._token)))
+        self._token[state] = token
+
+    def _link(self) -> None:
+        # Breadth-first, so the failure link of a state's suffix is known
+        goto, token = self._goto, self._token
+        fail = self._fail = [0] * len(goto)
+        output_link = self._output_link = [0] * len(goto)
+        level = list(goto[0].values())
+        while level:
+            next_level = []
+            for state in level:
+                for char, child in goto[state].items():
+                    next_level.append(child)
+                    target = fail[state]
+                    while target and char not in goto[target]:
+                        target = fail[target]
+                    linked = fail[child] = goto[target].get(char, 0)
+                    output_link[child] = (
+                        linked if token[linked] is not None else output_link[linked]
+                    )
+            level = next_level
+
+    def scan(self, text: str) -> Iterator[tuple[int, str]]:
+        """Yield whole-word occurrences of the tokens in text.
+
+        Args:
+            text: The text to search
+
+        Yields:
+            Start offset and token of each occurrence
+        """
+        goto, fail, token, output_link = self._goto, self._fail, self._token, self._output_link
+        state = 0
+        length = len(text)
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not state:
+                continue
+            if end + 1 < length and _is_word_char(text[end + 1]):
+                # Every token ending here would be followed by a word character
+                continue
+            match = state if token[state] is not None else output_link[state]
+            while match:
+                start = end + 1 - len(token[match])
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    yield start, token[match]
+                match = output_link[match]
+
+
+def collect_pii_tokens(cal: Calendar, min_token_length: int = MIN_TOKEN_LENGTH) -> dict[str, str]:
+    """Collect the personal tokens of a calendar.
+
+    Tokens come from all properties that are anonymized by default, including
+    unknown and ``X-`` properties, and from ``CN`` and address parameters of
+    any property. Words that also appear in component, property or parameter
+    names, in other parameter values or in vocabulary properties such as
+    ``STATUS`` are left out, since they are expected in the output.
+
+    Args:
+        cal: The original calendar
+        min_token_length: Shorter tokens are ignored
+
+    Returns:
+        Mapping of token to the place it was first found
+    """
+    tokens: dict[str, str] = {}
+    vocabulary: set[str] = set()
+    for component in cal.walk():
+        if should_preserve_component(component.name):
+            vocabulary.update(
+                _vocabulary_words(component.to_ical().decode("utf-8", errors="replace"))
+            )
+            continue
+        vocabulary.add(component.name)
+        for name, value in _iter_properties(component):
+            vocabulary.add(name)
+            _collect_parameters(component.name, name, value, tokens, vocabulary)
+            if name in _VOCABULARY_PROPERTIES:
+                vocabulary.update(_vocabulary_words(str(value)))
+            elif not should_preserve_property(name) and not isinstance(value, vBinary):
+                source = f"{component.name} {name}"
+                for text in _property_texts(value):
+                    for token in _split_tokens(text):
+                        tokens.setdefault(token, source)
+
+    return {
+        token: source
+        for token, source in tokens.items()
+        if len(token) >= min_token_length
+        and token not in vocabulary
+        and not _DATE_TIME.fullmatch(token)
+    }
+
+
+def verify_no_leaks(
+    original: Calendar,
+    anonymized: Calendar | str | bytes,
+    min_token_length: int = MIN_TOKEN_LENGTH,
+) -> list[Leak]:
+    """Check that no personal token of the original survived anonymization.
+
+    Args:
+        original: The calendar before anonymization
+        anonymized: The anonymized calendar, or its serialized form in any
+                    text format (ICS, jCal or xCal)
+        min_token_length: Shorter tokens are ignored
+
+    Returns:
+        The leaks found, in output order. An empty list means the output
+        contains none of the collected tokens.
+
+    Raises:
+        TypeError: If original is not a Calendar
+
+    Examples:
+        >>> from icalendar import Calendar, Event
+        >>> from icalendar_anonymizer import anonymize
+        >>> cal = Calendar()
+        >>> event = Event()
+        >>> event.add("summary", "Dentist appointment")
+        >>> cal.add_component(event)
+        >>> verify_no_leaks(cal, anonymize(cal))
+        []
+        >>> [leak.token for leak in verify_no_leaks(cal, anonymize(cal, preserve={"SUMMARY"}))]
+        ['Dentist', 'appointment']
+    """
+    if not isinstance(original, Calendar):
+        raise TypeError(f"Expected Calendar, got {type(original).__name__}")
+
+    if isinstance(anonymized, Calendar):
+        anonymized = anonymized.to_ical()
+    if isinstance(anonymized, bytes):
+        anonymized = anonymized.decode("utf-8", errors="replace")
+
+    tokens = collect_pii_tokens(original, min_token_length)
+    if not tokens:
+        return []
+    scanner = TokenScanner(tokens)
+
+    leaks = []
+    text = _FOLDING.sub("", anonymized)
+    for number, line in enumerate(text.splitlines(), 1):
+        leaks.extend(
+            Leak(token, tokens[token], number, offset) for offset, token in scanner.scan(line)
+        )
+    return leaks
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _iter_properties(component: Component) -> Iterator[tuple[str, object]]:
+    for key, value in component.property_items(recursive=False):
+        if key not in ("BEGIN", "END"):
+            yield key.upper(), value
+
+
+def _collect_parameters(
+    component_name: str,
+    property_name: str,
+    value,
+    tokens: dict[str, str],
+    vocabulary: set[str],
+) -> None:
+    params = getattr(value, "params", None)
+    if not params:
+        return
+    for key, param_value in params.items():
+        param_name = key.upper()
+        vocabulary.add(param_name)
+        items = param_value if isinstance(param_value, list) else [param_value]
+        for item in items:
+            if param_name in PERSONAL_PARAMETERS:
+                source = f"{component_name} {property_name};{param_name}"
+                for text in _address_texts(str(item)):
+                    for token in _split_tokens(text):
+                        tokens.setdefault(token, source)
+            else:
+                vocabulary.update(_vocabulary_words(str(item)))
+
+
+def _property_texts(value) -> Iterator[str]:
+    if isinstance(value, vCalAddress):
+        yield from _address_texts(str(value))
+    elif isinstance(value, list):
+        for item in value:
+            yield from _property_texts(item)
+    elif hasattr(value, "cats"):
+        # vCategory
+        yield from (str(category) for category in value.cats)
+    elif hasattr(value, "to_ical") and not isinstance(value, str):
+        ical = value.to_ical()
+        yield ical.decode("utf-8", errors="replace") if isinstance(ical, bytes) else str(ical)
+    else:
+        yield str(value)
+
+
+def _address_texts(address: str) -> Iterator[str]:
+    """Yield an address and its parts: full address, local part, domain."""
+    if address.lower().startswith("mailto:"):
+        address = address[7:]
+    yield address
+    if "@" in address:
+        local, domain = address.rsplit("@", 1)
+        yield local
+        yield domain
+
+
+def _vocabulary_words(text: str) -> Iterator[str]:
+    yield from _WORD.findall(text)
+    yield from _split_tokens(text)
+
+
+def _split_tokens(text: str) -> Iterator[str]:
+    for part in _TOKEN_SEPARATORS.split(text):
+        token = part.strip(_TOKEN_STRIP)
+        if token:
+            yield token
@@ -0,0 +1,361 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Keep a directory of anonymized calendars up to date.
+
+Watches a vdir (one ``.ics`` file per calendar item) and re-anonymizes only
+the files that were created or modified, removing outputs for deleted files.
+Uses inotify through the optional ``inotify_simple`` package on Linux and
+falls back to polling everywhere else.
+
+Example:
+    .. code-block:: python
+
+        from icalendar_anonymizer.watch import DirectoryWatcher
+
+        watcher = DirectoryWatcher("calendars", "anonymized", salt)
+        watcher.sync()
+        watcher.run()  # blocks until interrupted
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from ._vdir import (
+    anonymize_file,
+    anonymized_relpath,
+    iter_calendar_files,
+    remove_output,
+)
+
+# Upper bound for a single blocking wait, so that stop requests are noticed
+_MAX_WAIT = 1.0
+
+
+@dataclass
+class WatchStats:
+    """Counters and latency samples collected by a DirectoryWatcher.
+
+    Latency is measured from the first change event seen for a file until
+    its output was written or removed, so it includes the debounce delay.
+    """
+
+    updated: int = 0
+    removed: int = 0
+    failed: int = 0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=1024))
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, kind: str, latency: float) -> None:
+        """Record a processed change.
+
+        Args:
+            kind: One of "updated", "removed" or "failed"
+            latency: Seconds from first event to completion
+        """
+        with self._lock:
+            setattr(self, kind, getattr(self, kind) + 1)
+            if kind != "failed":
+                self.latencies.append(latency)
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Return a latency percentile in seconds.
+
+        Args:
+            percentile: Value between 0 and 100
+
+        Returns:
+            The latency, or None if nothing was processed yet
+        """
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        index = round(percentile / 100 * (len(samples) - 1))
+        return samples[index]
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        """Return the statistics as a plain dictionary."""
+        return {
+            "updated": self.updated,
+            "removed": self.removed,
+            "failed": self.failed,
+            "latency_p50": self.latency_percentile(50),
+            "latency_p95": self.latency_percentile(95),
+            "latency_max": self.latency_percentile(100),
+        }
+
+
+class PollingBackend:
+    """Detect changes by comparing directory snapshots."""
+
+    name = "polling"
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot = {}
+        for relpath in iter_calendar_files(self.root):
+            try:
+                stat = (self.root / relpath).stat()
+            except FileNotFoundError:
+                continue
+            snapshot[relpath] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def read(self, timeout: float) -> set[Path] | None:
+        """Wait for timeout seconds and return the paths that changed.
+
+        Args:
+            timeout: Seconds to wait before scanning
+
+        Returns:
+            Relative paths that were created, modified or removed
+        """
+        time.sleep(timeout)
+        old, self._snapshot = self._snapshot, self._scan()
+        changed = {path for path, state in self._snapshot.items() if old.get(path) != state}
+        changed.update(old.keys() - self._snapshot.keys())
+        return changed
+
+    def close(self) -> None:
+        """Release resources (nothing to do for polling)."""
+
+
+class InotifyBackend:
+    """Detect changes with Linux inotify via the ``inotify_simple`` package."""
+
+    name = "inotify"
+
+    def __init__(self, root: Path):
+        from inotify_simple import INotify, flags
+
+        self.root = Path(root)
+        self._flags = flags
+        self._mask = (
+            flags.CLOSE_WRITE | flags.CREATE | flags.DELETE | flags.MOVED_FROM | flags.MOVED_TO
+        )
+        self._inotify = INotify()
+        self._directories: dict[int, Path] = {}
+        self._watch_tree(Path())
+
+    def _watch_tree(self, reldir: Path) -> None:
+        wd = self._inotify.add_watch(self.root / reldir, self._mask)
+        self._directories[wd] = reldir
+        for child in sorted((self.root / reldir).iterdir()):
+            if child.is_dir() and not child.name.startswith("."):
+                self._watch_tree(reldir / child.name)
+
+    def read(self, timeout: float) -> set[Path] | None:
+        """Wait up to timeout seconds for events and return changed paths.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Relative paths that were created, modified or removed, or None
+            if events were lost and the whole tree must be rescanned
+        """
+        flags = self._flags
+        changed: set[Path] = set()
+        for event in self._inotify.read(timeout=int(timeout * 1000)):
+            if event.mask & flags.Q_OVERFLOW:
+                return None
+            reldir = self._directories.get(event.wd)
+            if reldir is None or not event.name or event.name.startswith("."):
+                continue
+            relpath = reldir / event.name
+            if event.mask & flags.ISDIR:
+                if event.mask & (flags.CREATE | flags.MOVED_TO):
+                    self._watch_tree(relpath)
+                    changed.update(relpath / p for p in iter_calendar_files(self.root / relpath))
+                else:
+                    # A directory went away; we no longer know its files
+                    return None
+            elif relpath.suffix == ".ics":
+                changed.add(relpath)
+        return changed
+
+    def close(self) -> None:
+        """Close the inotify file descriptor."""
+        self._inotify.close()
+
+
+def create_backend(root: Path, *, polling: bool = False) -> InotifyBackend | PollingBackend:
+    """Create the best available change detection backend.
+
+    Args:
+        root: Directory to watch
+        polling: Force the polling backend
+
+    Returns:
+        An inotify backend if available, otherwise a polling backend
+    """
+    if not polling:
+        try:
+            return InotifyBackend(root)
+        except (ImportError, OSError):
+            pass
+    return PollingBackend(root)
+
+
+class DirectoryWatcher:
+    """Mirror a directory of calendars into an anonymized copy.
+
+    Args:
+        source: Directory containing the original ``.ics`` files
+        destination: Directory receiving the anonymized files
+        salt: Persistent salt, so pseudonyms stay stable across runs
+        debounce: Seconds without further events before a file is processed
+        workers: Number of worker threads anonymizing files
+        poll_interval: Seconds between change checks when idle
+        backend: Change detection backend (default: :func:`create_backend`)
+        report: Optional callback receiving human-readable progress messages
+    """
+
+    def __init__(
+        self,
+        source: Path,
+        destination: Path,
+        salt: bytes,
+        *,
+        debounce: float = 0.5,
+        workers: int = 4,
+        poll_interval: float = 1.0,
+        backend: InotifyBackend | PollingBackend | None = None,
+        report: Callable[[str], None] | None = None,
+    ):
+        self.source = Path(source)
+        self.destination = Path(destination)
+        self.salt = salt
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = backend if backend is not None else create_backend(self.source)
+        self.stats = WatchStats()
+        self._report = report
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ican-watch")
+        # Path -> time of the last event, and of the first not yet handled event
+        self._pending: dict[Path, float] = {}
+        self._first_seen: dict[Path, float] = {}
+        self._in_flight: set[Path] = set()
+        self._lock = threading.Lock()
+
+    def output_path(self, relpath: Path) -> Path:
+        """Return the output file for a source path relative to the source."""
+        return self.destination / anonymized_relpath(relpath, self.salt)
+
+    def sync(self) -> None:
+        """Bring the destination fully up to date and wait for completion.
+
+        Anonymizes source files whose output is missing or older than the
+        source and removes outputs that have no source file anymore.
+        """
+        now = time.monotonic()
+        expected = set()
+        futures = []
+        for relpath in iter_calendar_files(self.source):
+            output = self.output_path(relpath)
+            expected.add(output)
+            try:
+                if output.stat().st_mtime_ns >= (self.source / relpath).stat().st_mtime_ns:
+                    continue
+            except FileNotFoundError:
+                pass
+            futures.append(self._submit(relpath, now))
+
+        if self.destination.exists():
+            for output in sorted(self.destination.rglob("*.ics")):
+                if output not in expected and remove_output(output, self.destination):
+                    self.stats.record("removed", 0.0)
+        wait(futures)
+
+    def process(self, relpaths: set[Path], first_seen: float | None = None) -> list[Future]:
+        """Schedule changed source paths for processing.
+
+        Args:
+            relpaths: Paths relative to the source directory
+            first_seen: Monotonic time of the change (default: now)
+
+        Returns:
+            Futures completing when each path has been handled
+        """
+        started = time.monotonic() if first_seen is None else first_seen
+        return [self._submit(relpath, started) for relpath in sorted(relpaths)]
+
+    def run(self, stop: threading.Event | None = None) -> None:
+        """Watch for changes until stop is set or the process is interrupted.
+
+        Args:
+            stop: Optional event that ends the loop when set
+        """
+        stop = stop if stop is not None else threading.Event()
+        while not stop.is_set():
+            changed = self.backend.read(self._next_timeout())
+            now = time.monotonic()
+            if changed is None:
+                self._report_message("Change events lost, rescanning")
+                self.sync()
+                continue
+            for relpath in changed:
+                self._pending[relpath] = now
+                self._first_seen.setdefault(relpath, now)
+            self._dispatch(now)
+
+    def close(self) -> None:
+        """Wait for running jobs and release the backend."""
+        self._executor.shutdown(wait=True)
+        self.backend.close()
+
+    def _next_timeout(self) -> float:
+        if not self._pending:
+            return min(self.poll_interval, _MAX_WAIT)
+        deadline = min(self._pending.values()) + self.debounce
+        return max(0.01, min(deadline - time.monotonic(), _MAX_WAIT))
+
+    def _dispatch(self, now: float) -> None:
+        for relpath, last_event in list(self._pending.items()):
+            if now - last_event < self.debounce:
+                continue
+            with self._lock:
+                if relpath in self._in_flight:
+                    # Handled again once the running job is done
+                    continue
+            del self._pending[relpath]
+            self._submit(relpath, self._first_seen.pop(relpath))
+
+    def _submit(self, relpath: Path, first_seen: float) -> Future:
+        with self._lock:
+            self._in_flight.add(relpath)
+        return self._executor.submit(self._apply, relpath, first_seen)
+
+    def _apply(self, relpath: Path, first_seen: float) -> None:
+        source = self.source / relpath
+        output = self.output_path(relpath)
+        try:
+            if source.is_file():
+                anonymize_file(source, output, self.salt)
+                kind = "updated"
+            elif remove_output(output, self.destination):
+                kind = "removed"
+            else:
+                return
+        except (ValueError, OSError) as e:
+            self.stats.record("failed", 0.0)
+            self._report_message(f"Failed to anonymize {relpath}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._in_flight.discard(relpath)
+        self.stats.record(kind, time.monotonic() - first_seen)
+        self._report_message(f"{kind.capitalize()}: {relpath}")
+
+    def _report_message(self, message: str) -> None:
+        if self._report is not None:
+            self._report(message)
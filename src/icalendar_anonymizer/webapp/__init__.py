@@ -0,0 +1,7 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Web service for anonymizing iCalendar files.
+
+Requires the ``web`` extra: ``pip install icalendar-anonymizer[web]``.
+"""
@@ -0,0 +1,175 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Inputs and streamed outputs of ``POST /anonymize/batch``.
+
+Uploaded zip archives are expanded into their members. Results are written
+as a zip archive or a ``multipart/mixed`` body, one entry at a time, so
+each calendar can be sent as soon as it has been anonymized.
+
+Entries are named by the position of the calendar in the upload
+(``calendar-1.ics``, ``calendar-2.ics``, ...), since file names may
+contain personal data themselves.
+"""
+
+import io
+import secrets
+import zipfile
+from collections.abc import Iterable, Iterator
+from typing import BinaryIO
+
+# Largest number of calendars in one batch
+MAX_BATCH_FILES = 1000
+
+# Largest total size of the calendars of one batch in bytes
+MAX_BATCH_SIZE = 100 * 1024 * 1024
+
+# Start of zip archives, and of empty zip archives
+ZIP_MAGIC = (b"PK\x03\x04", b"PK\x05\x06")
+
+
+class BatchError(ValueError):
+    """The uploaded files cannot be processed as a batch.
+
+    Args:
+        message: Message for the client
+        status_code: HTTP status code of the response
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def read_batch(
+    files: Iterable[BinaryIO],
+    max_file_size: int,
+    max_files: int = MAX_BATCH_FILES,
+    max_size: int = MAX_BATCH_SIZE,
+) -> list[bytes]:
+    """Read the calendars of a batch, expanding zip archives.
+
+    Args:
+        files: The uploaded files
+        max_file_size: Largest accepted calendar in bytes
+        max_files: Largest accepted number of calendars
+        max_size: Largest accepted total size in bytes
+
+    Returns:
+        The data of each calendar, in upload order
+
+    Raises:
+        BatchError: If a limit is exceeded or an archive is invalid
+    """
+    calendars = []
+    total = 0
+    for data in _iter_calendars(files, max_file_size):
+        calendars.append(data)
+        total += len(data)
+        if len(calendars) > max_files:
+            raise BatchError(f"Batch exceeds the limit of {max_files} calendars", 413)
+        if total > max_size:
+            raise BatchError(f"Batch exceeds the size limit of {max_size} bytes", 413)
+    if not calendars:
+        raise BatchError("Batch contains no calendars")
+    return calendars
+
+
+def _iter_calendars(files: Iterable[BinaryIO], max_file_size: int) -> Iterator[bytes]:
+    for file in files:
+        head = file.read(4)
+        file.seek(0)
+        if head not in ZIP_MAGIC:
+            yield _read_limited(file, max_file_size)
+            continue
+        try:
+            with zipfile.ZipFile(file) as archive:
+                for info in archive.infolist():
+                    if info.is_dir():
+                        continue
+                    # Declared sizes can lie, so reading is limited as well
+                    if info.file_size > max_file_size:
+                        raise _too_large(max_file_size)
+                    with archive.open(info) as member:
+                        yield _read_limited(member, max_file_size)
+        except zipfile.BadZipFile as e:
+            raise BatchError(f"Invalid zip archive: {e}") from e
+
+
+def _read_limited(file: BinaryIO, max_file_size: int) -> bytes:
+    data = file.read(max_file_size + 1)
+    if len(data) > max_file_size:
+        raise _too_large(max_file_size)
+    return data
+
+
+def _too_large(max_file_size: int) -> BatchError:
+    return BatchError(f"A calendar exceeds the size limit of {max_file_size} bytes", 413)
+
+
+def result_name(index: int, error: bool = False) -> str:  # noqa: FBT001
+    """Return the entry name of the calendar at index (starting at 0)."""
+    return f"calendar-{index + 1}.error.txt" if error else f"calendar-{index + 1}.ics"
+
+
+class ZipWriter:
+    """Write a zip archive entry by entry into chunks of bytes."""
+
+    media_type = "application/zip"
+
+    def __init__(self):
+        self._stream = _ChunkStream()
+        # The stream cannot seek, so sizes follow each entry's data
+        self._archive = zipfile.ZipFile(self._stream, "w", zipfile.ZIP_DEFLATED)
+
+    def add(self, name: str, data: bytes, content_type: str) -> bytes:  # noqa: ARG002
+        """Add an entry and return the bytes of the archive written for it."""
+        self._archive.writestr(name, data)
+        return self._stream.take()
+
+    def close(self) -> bytes:
+        """Finish the archive and return its remaining bytes."""
+        self._archive.close()
+        return self._stream.take()
+
+
+class MultipartWriter:
+    """Write a ``multipart/mixed`` body part by part."""
+
+    def __init__(self):
+        self.boundary = secrets.token_hex(16)
+        self.media_type = f"multipart/mixed; boundary={self.boundary}"
+
+    def add(self, name: str, data: bytes, content_type: str) -> bytes:
+        """Return a part holding data."""
+        header = (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f'Content-Disposition: attachment; filename="{name}"\r\n'
+            "\r\n"
+        )
+        return header.encode("ascii") + data + b"\r\n"
+
+    def close(self) -> bytes:
+        """Return the end of the body."""
+        return f"--{self.boundary}--\r\n".encode("ascii")
+
+
+class _ChunkStream(io.RawIOBase):
+    """Unseekable stream collecting what is written until it is taken."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
@@ -0,0 +1,302 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Asynchronous anonymization jobs for very large uploads.
+
+An upload is spooled to a file, anonymized in the worker pool, and written
+to another file one component at a time. Clients poll the progress and
+download the result from disk. Jobs are queued in process: at most
+``max_running`` jobs use the worker pool at once, at most ``max_jobs`` are
+kept, and finished jobs are removed with their files after ``ttl`` seconds.
+
+Jobs live in the memory of one process. With several uvicorn workers,
+route all requests for a job to the same worker.
+"""
+
+import asyncio
+import os
+import secrets
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from icalendar import Calendar
+
+from icalendar_anonymizer.anonymizer import anonymize_components
+from icalendar_anonymizer.formats import write_ical
+from icalendar_anonymizer.limits import Limits, check_lines
+
+from .metrics import Metrics
+from .pool import SATURATED_RETRY_DELAY, PoolSaturatedError, WorkerPool
+
+# Environment variables configuring the jobs
+JOBS_DIR_VARIABLE = "ICAN_JOBS_DIR"
+JOB_TTL_VARIABLE = "ICAN_JOB_TTL"
+MAX_JOBS_VARIABLE = "ICAN_MAX_JOBS"
+
+# Seconds that finished jobs and their results are kept
+DEFAULT_JOB_TTL = 3600
+
+# Seconds between two removals of expired jobs while the service runs
+DEFAULT_EXPIRY_INTERVAL = 60.0
+
+# Jobs kept at once, in any state
+DEFAULT_MAX_JOBS = 100
+
+# Jobs using the worker pool at once
+DEFAULT_MAX_RUNNING_JOBS = 2
+
+# Largest accepted upload in bytes
+MAX_JOB_INPUT_SIZE = 1024 * 1024 * 1024
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobLimitError(Exception):
+    """Raised when the maximum number of jobs is reached.
+
+    Unlike :class:`~icalendar_anonymizer.webapp.pool.PoolSaturatedError`,
+    this is not about the worker pool: jobs are kept until they expire.
+    """
+
+
+@dataclass
+class Job:
+    """An anonymization job and its progress.
+
+    Attributes:
+        id: Unguessable identifier, which is all that is needed to get the result
+        directory: Directory holding the input and the result
+        created: Creation time (``time.time()``)
+        status: ``"queued"``, ``"running"``, ``"done"`` or ``"failed"``
+        components_done: Top-level components anonymized so far
+        components_total: Top-level components of the calendar, once parsed
+        error: Error message of a failed job
+        finished: Time the job was done or failed
+        salt: Salt of the tenant of the job, random if None
+    """
+
+    id: str
+    directory: Path
+    created: float
+    status: str = QUEUED
+    components_done: int = 0
+    components_total: int | None = None
+    error: str | None = None
+    finished: float | None = None
+    salt: bytes | None = field(default=None, repr=False)
+
+    @property
+    def input_path(self) -> Path:
+        """File holding the uploaded calendar."""
+        return self.directory / "input.ics"
+
+    @property
+    def result_path(self) -> Path:
+        """File holding the anonymized calendar."""
+        return self.directory / "anonymized.ics"
+
+    def as_dict(self, ttl: float) -> dict[str, object]:
+        """Return the state of the job for clients."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "components_done": self.components_done,
+            "components_total": self.components_total,
+            "error": self.error,
+            "created": self.created,
+            "expires": (self.finished or self.created) + ttl,
+        }
+
+
+@dataclass
+class JobStore:
+    """Jobs of this process, with their files in one spool directory.
+
+    Args:
+        directory: Spool directory, by default a new temporary directory
+                   created for the first job
+        ttl: Seconds after which finished jobs are removed. Queued and
+             running jobs do not expire.
+        max_jobs: Largest number of jobs kept at once
+        max_running: Largest number of jobs running at once
+        clock: Function returning the current time, for tests
+        limits: Limits the uploads are checked against while they are read,
+                before they are parsed
+        expiry_interval: Seconds between two removals of expired jobs by
+                         :meth:`expire_periodically`
+    """
+
+    directory: str | Path | None = None
+    ttl: float = DEFAULT_JOB_TTL
+    max_jobs: int = DEFAULT_MAX_JOBS
+    max_running: int = DEFAULT_MAX_RUNNING_JOBS
+    clock: Callable[[], float] = time.time
+    jobs: dict[str, Job] = field(default_factory=dict)
+    limits: Limits | None = None
+    expiry_interval: float = DEFAULT_EXPIRY_INTERVAL
+
+    def __post_init__(self):
+        self._slots: asyncio.Semaphore | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._temporary = False
+
+    @classmethod
+    def from_environment(cls, limits: Limits | None = None) -> "JobStore":
+        """Create a store configured by the ``ICAN_*JOB*`` environment variables.
+
+        Args:
+            limits: Limits on the uploads
+        """
+        directory = os.environ.get(JOBS_DIR_VARIABLE)
+        ttl = os.environ.get(JOB_TTL_VARIABLE)
+        max_jobs = os.environ.get(MAX_JOBS_VARIABLE)
+        return cls(
+            directory or None,
+            ttl=float(ttl) if ttl else DEFAULT_JOB_TTL,
+            max_jobs=int(max_jobs) if max_jobs else DEFAULT_MAX_JOBS,
+            limits=limits,
+        )
+
+    def create(self) -> Job:
+        """Create a job with an empty directory for its files.
+
+        Raises:
+            JobLimitError: If max_jobs jobs are kept already
+        """
+        self.expire()
+        if len(self.jobs) >= self.max_jobs:
+            raise JobLimitError(f"{self.max_jobs} jobs are queued or kept")
+        if self.directory is None:
+            # Created on first use, not when the application is imported
+            self.directory = Path(tempfile.mkdtemp(prefix="ican-jobs-"))
+            self._temporary = True
+        job_id = secrets.token_urlsafe(16)
+        job = Job(job_id, Path(self.directory) / job_id, self.clock())
+        job.directory.mkdir(parents=True)
+        self.jobs[job_id] = job
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Return a job that has not expired, or None."""
+        self.expire()
+        return self.jobs.get(job_id)
+
+    def remove(self, job: Job) -> None:
+        """Forget a job and delete its files."""
+        self.jobs.pop(job.id, None)
+        shutil.rmtree(job.directory, ignore_errors=True)
+
+    def expire(self) -> None:
+        """Remove finished jobs older than ttl."""
+        now = self.clock()
+        for job in list(self.jobs.values()):
+            if job.finished is not None and now - job.finished >= self.ttl:
+                self.remove(job)
+
+    async def expire_periodically(self) -> None:
+        """Remove expired jobs every expiry_interval seconds until cancelled.
+
+        Without it, expired jobs are only removed when jobs are created or
+        looked up, and their files stay on the disk of an idle service.
+        """
+        while True:
+            await asyncio.sleep(self.expiry_interval)
+            self.expire()
+
+    def start(
+        self,
+        job: Job,
+        pool: WorkerPool,
+        metrics: Metrics,
+        done: Callable[[], None] | None = None,
+    ) -> None:
+        """Queue a job; it runs once fewer than max_running jobs run.
+
+        Args:
+            job: The job, with its input spooled
+            pool: Worker pool running the job
+            metrics: Metrics receiving the phase times and counters
+            done: Called when the job is finished or cancelled
+        """
+        task = asyncio.get_running_loop().create_task(self._run(job, pool, metrics, done))
+        # Keep a reference until the task is done
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def close(self) -> None:
+        """Cancel unfinished jobs and delete all files."""
+        for task in self._tasks:
+            task.cancel()
+        for job in list(self.jobs.values()):
+            self.remove(job)
+        if self._temporary:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+            self._temporary = False
+
+    async def _run(
+        self, job: Job, pool: WorkerPool, metrics: Metrics, done: Callable[[], None] | None
+    ) -> None:
+        try:
+            await self._run_job(job, pool, metrics)
+        finally:
+            if done is not None:
+                done()
+
+    async def _run_job(self, job: Job, pool: WorkerPool, metrics: Metrics) -> None:
+        if self._slots is None:
+            # Created here, so that it belongs to the running event loop
+            self._slots = asyncio.Semaphore(self.max_running)
+        async with self._slots:
+            job.status = RUNNING
+            while job.status == RUNNING:
+                try:
+                    await pool.run(_run_job, job, metrics, self.limits)
+                except PoolSaturatedError:
+                    # Requests have priority, the job waits for a free worker
+                    await asyncio.sleep(SATURATED_RETRY_DELAY)
+                except Exception as e:  # noqa: BLE001
+                    job.error = str(e)
+                    job.status = FAILED
+                    metrics.inc("ican_errors_total", type="job")
+                else:
+                    job.status = DONE
+        job.finished = self.clock()
+        # The upload is not needed anymore
+        job.input_path.unlink(missing_ok=True)
+
+
+def _run_job(job: Job, metrics: Metrics, limits: Limits | None = None) -> None:
+    """Anonymize the input of a job into its result file.
+
+    Runs in a worker thread.
+    """
+    with metrics.time("ican_phase_duration_seconds", phase="parse"):
+        with job.input_path.open("rb") as f:
+            data = b"".join(check_lines(f, limits)) if limits is not None else f.read()
+        cal = Calendar.from_ical(data)
+    if cal.name != "VCALENDAR":
+        raise ValueError(f"Invalid ICS format: Expected BEGIN:VCALENDAR, got {cal.name}")
+    job.components_total = len(cal.subcomponents)
+
+    def counted(components):
+        for component in components:
+            yield component
+            job.components_done += 1
+
+    calendar, components = anonymize_components(cal, salt=job.salt, consume=True)
+    with (
+        metrics.time("ican_phase_duration_seconds", phase="anonymize"),
+        job.result_path.open("wb") as result,
+    ):
+        write_ical(calendar, counted(components), result)
+    metrics.inc("ican_components_total", job.components_done)
+    metrics.inc("ican_output_bytes_total", job.result_path.stat().st_size)
@@ -0,0 +1,540 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""FastAPI application of the web service.
+
+Run with ``uvicorn icalendar_anonymizer.webapp.main:app``. Calendars are
+parsed, anonymized and serialized in a bounded worker pool, see
+:mod:`icalendar_anonymizer.webapp.pool`, and each phase is timed for
+``/metrics``, see :mod:`icalendar_anonymizer.webapp.metrics`. Requests
+that anonymize calendars are rate limited by client, see
+:mod:`icalendar_anonymizer.webapp.ratelimit`. Calendars exceeding the
+:class:`~icalendar_anonymizer.limits.Limits` are rejected before they are
+parsed. Very large calendars are anonymized in the background as jobs, see
+:mod:`icalendar_anonymizer.webapp.jobs`.
+"""
+
+import asyncio
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
+from typing import BinaryIO, Literal
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from icalendar import Calendar
+from pydantic import BaseModel
+
+from icalendar_anonymizer._hash import generate_salt
+from icalendar_anonymizer._stats import AnonymizationStats
+from icalendar_anonymizer.anonymizer import anonymize
+from icalendar_anonymizer.limits import LimitExceeded, Limits, check_ical
+from icalendar_anonymizer.tenants import TenantKeyring
+from icalendar_anonymizer.version import __version__
+
+from .batch import BatchError, MultipartWriter, ZipWriter, read_batch, result_name
+from .jobs import DONE, FAILED, MAX_JOB_INPUT_SIZE, Job, JobLimitError, JobStore
+from .metrics import Metrics
+from .pool import CPU_ACCOUNT, PoolSaturatedError, WorkerPool
+from .ratelimit import BYTES, Lease, RateLimiter, RateLimitExceeded
+
+# Largest accepted calendar in bytes
+MAX_INPUT_SIZE = 10 * 1024 * 1024
+
+# Environment variables configuring the limits on calendars
+MAX_LINE_LENGTH_VARIABLE = "ICAN_MAX_LINE_LENGTH"
+MAX_COMPONENTS_VARIABLE = "ICAN_MAX_COMPONENTS"
+MAX_PROPERTIES_VARIABLE = "ICAN_MAX_PROPERTIES"
+MAX_DEPTH_VARIABLE = "ICAN_MAX_DEPTH"
+
+# Limits on calendars, generous for real calendars up to MAX_INPUT_SIZE
+DEFAULT_LIMITS = Limits(
+    max_size=MAX_INPUT_SIZE,
+    max_line_length=1024 * 1024,
+    max_components=50_000,
+    max_properties=200_000,
+    max_depth=10,
+)
+
+# Seconds a client should wait after the worker pool was saturated
+RETRY_AFTER = 1
+
+# Bytes copied at once while spooling a job upload
+CHUNK_SIZE = 1024 * 1024
+
+# Header selecting the tenant whose salt is used
+TENANT_HEADER = "X-Tenant"
+
+# Environment variable naming the file with the master secret of the tenants
+MASTER_KEY_FILE_VARIABLE = "ICAN_MASTER_KEY_FILE"
+
+# Endpoints that are rate limited
+RATE_LIMITED_PATHS = frozenset({"/anonymize", "/upload", "/anonymize/batch", "/jobs"})
+
+router = APIRouter()
+
+
+class AnonymizeRequest(BaseModel):
+    """Body of ``POST /anonymize``."""
+
+    ics: str
+
+
+class InputError(ValueError):
+    """The request does not contain a valid calendar.
+
+    Args:
+        message: Message for the client
+        kind: Error type reported in the metrics
+        status_code: HTTP status code of the response
+    """
+
+    def __init__(self, message: str, kind: str, status_code: int = 400):
+        super().__init__(message)
+        self.kind = kind
+        self.status_code = status_code
+
+
+def limits_from_environment() -> Limits:
+    """Read the limits on calendars from the environment; ``0`` disables a limit."""
+
+    def read(variable: str, value: int | None) -> int | None:
+        text = os.environ.get(variable)
+        if not text:
+            return value
+        return int(text) or None
+
+    return replace(
+        DEFAULT_LIMITS,
+        max_line_length=read(MAX_LINE_LENGTH_VARIABLE, DEFAULT_LIMITS.max_line_length),
+        max_components=read(MAX_COMPONENTS_VARIABLE, DEFAULT_LIMITS.max_components),
+        max_properties=read(MAX_PROPERTIES_VARIABLE, DEFAULT_LIMITS.max_properties),
+        max_depth=read(MAX_DEPTH_VARIABLE, DEFAULT_LIMITS.max_depth),
+    )
+
+
+def create_app(
+    metrics: Metrics | None = None,
+    pool: WorkerPool | None = None,
+    jobs: JobStore | None = None,
+    limiter: RateLimiter | None = None,
+    keyring: TenantKeyring | None = None,
+    limits: Limits | None = None,
+) -> FastAPI:
+    """Create the web service.
+
+    Args:
+        metrics: Metrics registry, by default configured from the environment
+        pool: Worker pool, by default configured from the environment
+        jobs: Job store, by default configured from the environment
+        limiter: Rate limiter, by default configured from the environment
+        keyring: Keyring of the tenants, by default read from the file named
+                 by ``ICAN_MASTER_KEY_FILE``. Without one, each calendar
+                 is anonymized with a random salt.
+        limits: Limits on calendars, by default configured from the
+                environment. The job store created by default applies the
+                line length and depth limits to jobs.
+
+    Returns:
+        The FastAPI application
+    """
+    metrics = metrics if metrics is not None else Metrics.from_environment()
+    pool = pool if pool is not None else WorkerPool.from_environment()
+    limits = limits if limits is not None else limits_from_environment()
+    if jobs is None:
+        # Jobs are for calendars too large to count their parts
+        jobs = JobStore.from_environment(
+            replace(limits, max_size=None, max_components=None, max_properties=None)
+        )
+    limiter = limiter if limiter is not None else RateLimiter.from_environment()
+    if keyring is None and os.environ.get(MASTER_KEY_FILE_VARIABLE):
+        keyring = TenantKeyring.from_file(os.environ[MASTER_KEY_FILE_VARIABLE])
+
+    @asynccontextmanager
+    async def lifespan(_app: FastAPI):
+        expiry = asyncio.create_task(jobs.expire_periodically())
+        yield
+        expiry.cancel()
+        with suppress(asyncio.CancelledError):
+            await expiry
+        jobs.close()
+        metrics.flush(force=True)
+        pool.shutdown()
+
+    app = FastAPI(title="icalendar-anonymizer", version=__version__, lifespan=lifespan)
+    app.state.metrics = metrics
+    app.state.pool = pool
+    app.state.jobs = jobs
+    app.state.limiter = limiter
+    app.state.keyring = keyring
+    app.state.limits = limits
+
+    def collect_pool_state() -> None:
+        metrics.set("ican_pool_busy_workers", pool.busy)
+        metrics.set("ican_pool_queue_depth", pool.queue_depth)
+
+    metrics.add_collector(collect_pool_state)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=False,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.include_router(router)
+
+    async def limit_rate(request: Request, call_next) -> Response:
+        client = request.client.host if request.client is not None else "unknown"
+        try:
+            lease = limiter.admit(client)
+        except RateLimitExceeded as e:
+            metrics.inc("ican_throttled_total", reason=e.reason)
+            return JSONResponse(
+                {"detail": f"Too many requests: {e}"},
+                status_code=429,
+                headers={"Retry-After": e.retry_after_header},
+            )
+        request.state.lease = lease
+        # Tasks submitted to the worker pool for this request charge the client
+        token = CPU_ACCOUNT.set(lease.charge_cpu)
+        try:
+            response = await call_next(request)
+        except BaseException:
+            lease.release()
+            raise
+        finally:
+            CPU_ACCOUNT.reset(token)
+        # Streamed responses are in progress until their last chunk is sent
+        response.body_iterator = _released(response.body_iterator, lease)
+        return response
+
+    @app.middleware("http")
+    async def record_request(request: Request, call_next):
+        start = time.perf_counter()
+        if request.method == "POST" and request.url.path in RATE_LIMITED_PATHS:
+            response = await limit_rate(request, call_next)
+        else:
+            response = await call_next(request)
+        route = request.scope.get("route")
+        if route is not None:
+            endpoint = route.path
+        elif response.status_code == 429:
+            # Rejected before routing
+            endpoint = request.url.path
+        else:
+            # Unknown paths are not labelled individually
+            endpoint = "other"
+        metrics.observe(
+            "ican_request_duration_seconds", time.perf_counter() - start, endpoint=endpoint
+        )
+        metrics.inc("ican_requests_total", endpoint=endpoint, status=str(response.status_code))
+        metrics.flush()
+        return response
+
+    @app.exception_handler(InputError)
+    async def input_error(_request: Request, error: InputError) -> JSONResponse:
+        metrics.inc("ican_errors_total", type=error.kind)
+        return JSONResponse({"detail": str(error)}, status_code=error.status_code)
+
+    @app.exception_handler(RequestValidationError)
+    async def validation_error(request: Request, error: RequestValidationError) -> JSONResponse:
+        metrics.inc("ican_errors_total", type="validation")
+        return await request_validation_exception_handler(request, error)
+
+    @app.exception_handler(PoolSaturatedError)
+    async def pool_saturated(_request: Request, error: PoolSaturatedError) -> JSONResponse:
+        metrics.inc("ican_pool_rejections_total")
+        metrics.inc("ican_errors_total", type="saturated")
+        return JSONResponse(
+            {"detail": f"Server is busy: {error}"},
+            status_code=503,
+            headers={"Retry-After": str(RETRY_AFTER)},
+        )
+
+    @app.exception_handler(JobLimitError)
+    async def job_limit(_request: Request, error: JobLimitError) -> JSONResponse:
+        metrics.inc("ican_job_rejections_total")
+        metrics.inc("ican_errors_total", type="job_limit")
+        return JSONResponse(
+            {"detail": f"Too many jobs: {error}"},
+            status_code=503,
+            headers={"Retry-After": str(RETRY_AFTER)},
+        )
+
+    return app
+
+
+@router.post("/anonymize", response_class=Response)
+async def anonymize_json(body: AnonymizeRequest, request: Request) -> Response:
+    """Anonymize iCalendar content provided as JSON."""
+    return await _anonymize_response(request, body.ics.encode("utf-8"))
+
+
+@router.post("/upload", response_class=Response)
+async def anonymize_upload(file: UploadFile, request: Request) -> Response:
+    """Anonymize an uploaded iCalendar file."""
+    data = await file.read(MAX_INPUT_SIZE + 1)
+    if len(data) > MAX_INPUT_SIZE:
+        raise InputError(f"File exceeds the size limit of {MAX_INPUT_SIZE} bytes", "too_large", 413)
+    return await _anonymize_response(request, data)
+
+
+@router.post("/anonymize/batch", response_class=StreamingResponse)
+async def anonymize_batch(
+    files: list[UploadFile],
+    request: Request,
+    output: Literal["zip", "multipart"] = "zip",
+) -> StreamingResponse:
+    """Anonymize several calendars with one salt and one UID mapping.
+
+    Files may be calendars or zip archives of calendars. Results are
+    streamed in the order in which they are finished.
+    """
+    metrics: Metrics = request.app.state.metrics
+    pool: WorkerPool = request.app.state.pool
+    try:
+        # Reading and decompressing is CPU-bound as well; raises
+        # PoolSaturatedError before reading if the pool is full
+        calendars = await pool.run(read_batch, [upload.file for upload in files], MAX_INPUT_SIZE)
+    except BatchError as e:
+        raise InputError(str(e), "batch", e.status_code) from e
+    _count_input(request, sum(len(data) for data in calendars))
+
+    # Consistent UIDs across the calendars of this batch
+    salt = _tenant_salt(request) or generate_salt()
+    anonymize_one = partial(
+        _anonymize_ics, metrics=metrics, salt=salt, uid_map={}, limits=request.app.state.limits
+    )
+    writer = ZipWriter() if output == "zip" else MultipartWriter()
+
+    async def stream():
+        async for index, result in pool.map_unordered(anonymize_one, calendars):
+            if isinstance(result, Exception):
+                kind = result.kind if isinstance(result, InputError) else "internal"
+                metrics.inc("ican_errors_total", type=kind)
+                yield writer.add(
+                    result_name(index, error=True), str(result).encode("utf-8"), "text/plain"
+                )
+            else:
+                metrics.inc("ican_output_bytes_total", len(result))
+                yield writer.add(result_name(index), result, "text/calendar")
+        yield writer.close()
+
+    filename = "anonymized.zip" if output == "zip" else "anonymized"
+    return StreamingResponse(
+        stream(),
+        media_type=writer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(file: UploadFile, request: Request) -> JSONResponse:
+    """Spool a large calendar to disk and anonymize it in the background.
+
+    Returns the job, with its URL in the ``Location`` header.
+    """
+    jobs: JobStore = request.app.state.jobs
+    salt = _tenant_salt(request)
+    job = jobs.create()
+    job.salt = salt
+    try:
+        size = await _spool(file, job.input_path)
+    except BaseException:
+        jobs.remove(job)
+        raise
+    _count_input(request, size)
+    # The job counts against the concurrency limit of the client until it is finished
+    lease: Lease = request.state.lease
+    lease.retain()
+    jobs.start(job, request.app.state.pool, request.app.state.metrics, lease.release)
+    return JSONResponse(
+        job.as_dict(jobs.ttl), status_code=202, headers={"Location": f"/jobs/{job.id}"}
+    )
+
+
+@router.get("/jobs/{job_id}")
+def job_status(job_id: str, request: Request) -> JSONResponse:
+    """Report the status and progress of a job."""
+    jobs: JobStore = request.app.state.jobs
+    return JSONResponse(_get_job(jobs, job_id).as_dict(jobs.ttl))
+
+
+@router.get("/jobs/{job_id}/result", response_class=FileResponse)
+def job_result(job_id: str, request: Request) -> FileResponse:
+    """Download the anonymized calendar of a finished job."""
+    job = _get_job(request.app.state.jobs, job_id)
+    if job.status == FAILED:
+        raise HTTPException(422, f"Job failed: {job.error}")
+    if job.status != DONE:
+        raise HTTPException(409, f"Job is {job.status}")
+    return FileResponse(job.result_path, media_type="text/calendar", filename="anonymized.ics")
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Report the metrics of all workers in the Prometheus text format."""
+    return PlainTextResponse(
+        request.app.state.metrics.render(), media_type="text/plain; version=0.0.4"
+    )
+
+
+def _tenant_salt(request: Request) -> bytes | None:
+    """Return the salt of the tenant named in the request, if any.
+
+    Raises:
+        InputError: If a tenant is named, but tenants are not configured
+    """
+    tenant = request.headers.get(TENANT_HEADER)
+    if tenant is None:
+        return None
+    keyring: TenantKeyring | None = request.app.state.keyring
+    if keyring is None:
+        raise InputError(f"{TENANT_HEADER} is not supported by this server", "tenant")
+    try:
+        return keyring.anonymizer_for(tenant).salt
+    except ValueError as e:
+        raise InputError(f"Invalid {TENANT_HEADER}: {e}", "tenant") from e
+
+
+def _count_input(request: Request, size: int) -> None:
+    """Count received calendar data and charge the client for it."""
+    request.app.state.metrics.inc("ican_input_bytes_total", size)
+    request.state.lease.charge(BYTES, size)
+
+
+async def _released(body: AsyncIterator[bytes], lease: Lease) -> AsyncIterator[bytes]:
+    """Pass on a response body and release the lease once it is sent."""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        lease.release()
+
+
+async def _spool(file: UploadFile, path: Path) -> int:
+    """Copy an upload to path in chunks and return its size."""
+    # Writing up to MAX_JOB_INPUT_SIZE to disk would block the event loop
+    return await run_in_threadpool(_copy_upload, file.file, path)
+
+
+def _copy_upload(source: BinaryIO, path: Path) -> int:
+    """Copy an upload to path in chunks and return its size."""
+    size = 0
+    with path.open("wb") as spool:
+        while chunk := source.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_JOB_INPUT_SIZE:
+                raise InputError(
+                    f"File exceeds the size limit of {MAX_JOB_INPUT_SIZE} bytes", "too_large", 413
+                )
+            spool.write(chunk)
+    if size == 0:
+        raise InputError("Input is empty", "empty")
+    return size
+
+
+def _get_job(jobs: JobStore, job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(404, "Job not found or expired")
+    return job
+
+
+async def _anonymize_response(request: Request, data: bytes) -> Response:
+    """Anonymize a calendar in the worker pool and return it as a download."""
+    metrics: Metrics = request.app.state.metrics
+    pool: WorkerPool = request.app.state.pool
+    salt = _tenant_salt(request)
+    _count_input(request, len(data))
+
+    try:
+        output = await pool.run(
+            partial(_anonymize_ics, limits=request.app.state.limits), data, metrics, salt
+        )
+    except (InputError, PoolSaturatedError):
+        raise
+    except Exception as e:
+        metrics.inc("ican_errors_total", type="internal")
+        raise HTTPException(500, f"Anonymization failed: {e}") from e
+
+    metrics.inc("ican_output_bytes_total", len(output))
+    return Response(
+        output,
+        media_type="text/calendar",
+        headers={"Content-Disposition": 'attachment; filename="anonymized.ics"'},
+    )
+
+
+def _anonymize_ics(
+    data: bytes,
+    metrics: Metrics,
+    salt: bytes | None = None,
+    uid_map: dict[str, str] | None = None,
+    limits: Limits | None = None,
+) -> bytes:
+    """Parse, anonymize and serialize a calendar, timing each phase.
+
+    Runs in a worker thread.
+
+    Args:
+        data: The iCalendar data
+        metrics: Metrics receiving the phase times and counters
+        salt: Salt shared with other calendars, random by default
+        uid_map: UID mapping shared with other calendars
+        limits: Limits checked before parsing
+
+    Returns:
+        The anonymized iCalendar data
+
+    Raises:
+        InputError: If data is empty, exceeds a limit, is not UTF-8 or not
+                    a calendar
+    """
+    if not data.strip():
+        raise InputError("Input is empty", "empty")
+    with metrics.time("ican_phase_duration_seconds", phase="parse"):
+        if limits is not None:
+            try:
+                check_ical(data, limits)
+            except LimitExceeded as e:
+                raise InputError(str(e), "limit", 413) from e
+        try:
+            data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise InputError(f"Input is not valid UTF-8: {e}", "encoding") from e
+        try:
+            cal = Calendar.from_ical(data)
+        except ValueError as e:
+            raise InputError(f"Invalid ICS format: {e}", "invalid_ics") from e
+        if cal.name != "VCALENDAR":
+            raise InputError(
+                f"Invalid ICS format: Expected BEGIN:VCALENDAR, got {cal.name}", "invalid_ics"
+            )
+
+    stats = AnonymizationStats()
+    with metrics.time("ican_phase_duration_seconds", phase="anonymize"):
+        anonymized = anonymize(cal, salt=salt, stats=stats, consume=True, uid_map=uid_map)
+    metrics.inc("ican_components_total", stats.components)
+    metrics.inc("ican_memo_hits_total", stats.memo_hits)
+    metrics.inc("ican_memo_misses_total", stats.memo_misses)
+
+    with metrics.time("ican_phase_duration_seconds", phase="serialize"):
+        return anonymized.to_ical()
+
+
+app = create_app()
@@ -0,0 +1,267 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Prometheus metrics of the web service.
+
+Counters, gauges and histograms are kept in memory and rendered in the
+Prometheus text exposition format. Recording a sample takes a dictionary
+update under a lock, so metrics are cheap enough to record on every request.
+
+With several uvicorn workers, each worker is its own process with its own
+metrics. If a metrics directory is configured (``ICAN_METRICS_DIR``), each
+worker writes a snapshot of its metrics to ``metrics-<pid>.json`` in that
+directory, at most once per flush interval, and ``/metrics`` adds up the
+snapshots of all workers. Counters and histograms of workers that have
+exited are kept, gauges only count for running workers.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# Environment variable naming the directory shared by all workers
+METRICS_DIR_VARIABLE = "ICAN_METRICS_DIR"
+
+# Upper bounds of the latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Type and help text of each metric
+METRICS = {
+    "ican_requests_total": ("counter", "HTTP requests by endpoint and status code"),
+    "ican_request_duration_seconds": ("histogram", "HTTP request latency by endpoint"),
+    "ican_phase_duration_seconds": (
+        "histogram",
+        "Time spent in the parse, anonymize and serialize phases",
+    ),
+    "ican_input_bytes_total": ("counter", "Bytes of calendar data received"),
+    "ican_output_bytes_total": ("counter", "Bytes of anonymized calendar data sent"),
+    "ican_components_total": ("counter", "Top-level components anonymized"),
+    "ican_memo_hits_total": ("counter", "Property values taken from the value memo"),
+    "ican_memo_misses_total": ("counter", "Property values anonymized and memoized"),
+    "ican_memo_hit_ratio": ("gauge", "Share of memo lookups that were hits"),
+    "ican_pool_busy_workers": ("gauge", "Anonymization tasks running in the worker pool"),
+    "ican_pool_queue_depth": ("gauge", "Anonymization tasks waiting for a worker"),
+    "ican_pool_rejections_total": ("counter", "Requests rejected by a saturated worker pool"),
+    "ican_job_rejections_total": ("counter", "Jobs rejected because too many jobs are kept"),
+    "ican_throttled_total": ("counter", "Requests rejected by the rate limiter by reason"),
+    "ican_errors_total": ("counter", "Failed requests by error type"),
+}
+
+_Key = tuple[str, tuple[tuple[str, str], ...]]
+
+
+class Metrics:
+    """Registry of the metrics of one process.
+
+    Args:
+        directory: Directory shared by all worker processes, or None to
+                   report only the metrics of this process
+        flush_interval: Minimum number of seconds between two snapshots
+                        written to directory
+    """
+
+    def __init__(self, directory: str | Path | None = None, flush_interval: float = 1.0):
+        self.directory = Path(directory) if directory is not None else None
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._counters: dict[_Key, float] = {}
+        self._gauges: dict[_Key, float] = {}
+        # Per bucket counts (not cumulative), followed by the sum and the count
+        self._histograms: dict[_Key, list[float]] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._last_flush: float | None = None
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_environment(cls) -> "Metrics":
+        """Create the metrics, shared through ``ICAN_METRICS_DIR`` if it is set."""
+        return cls(os.environ.get(METRICS_DIR_VARIABLE) or None)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Call collector before each snapshot, e.g. to set gauges of current state."""
+        self._collectors.append(collector)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add value to a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add a sample to a latency histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0.0] * (len(LATENCY_BUCKETS) + 3)
+            histogram[_bucket_index(value)] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    @contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the time taken by the body of a with statement."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict[str, list]:
+        """Return the metrics of this process as JSON serializable data."""
+        for collector in self._collectors:
+            collector()
+        with self._lock:
+            return {
+                "counters": _samples(self._counters),
+                "gauges": _samples(self._gauges),
+                "histograms": [
+                    [name, dict(labels), list(values)]
+                    for (name, labels), values in self._histograms.items()
+                ],
+            }
+
+    def flush(self, force: bool = False) -> None:  # noqa: FBT001
+        """Write a snapshot for the other workers, at most once per flush interval.
+
+        Args:
+            force: Write even if the last snapshot is more recent than the
+                   flush interval
+        """
+        if self.directory is None:
+            return
+        now = time.monotonic()
+        if (
+            not force
+            and self._last_flush is not None
+            and now - self._last_flush < self.flush_interval
+        ):
+            return
+        self._last_flush = now
+        path = self._path(os.getpid())
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.snapshot()), encoding="utf-8")
+        # Readers see either the old or the new snapshot, never a partial one
+        temporary.replace(path)
+
+    def render(self) -> str:
+        """Return the metrics of all workers in the Prometheus text format."""
+        counters: dict[_Key, float] = {}
+        gauges: dict[_Key, float] = {}
+        histograms: dict[_Key, list[float]] = {}
+        for snapshot, alive in self._snapshots():
+            for name, labels, value in snapshot["counters"]:
+                key = (name, tuple(sorted(labels.items())))
+                counters[key] = counters.get(key, 0) + value
+            if alive:
+                for name, labels, value in snapshot["gauges"]:
+                    key = (name, tuple(sorted(labels.items())))
+                    gauges[key] = gauges.get(key, 0) + value
+            for name, labels, values in snapshot["histograms"]:
+                key = (name, tuple(sorted(labels.items())))
+                total = histograms.setdefault(key, [0.0] * len(values))
+                for index, value in enumerate(values):
+                    total[index] += value
+
+        hits = sum(value for (name, _), value in counters.items() if name == "ican_memo_hits_total")
+        misses = sum(
+            value for (name, _), value in counters.items() if name == "ican_memo_misses_total"
+        )
+        if hits + misses:
+            gauges["ican_memo_hit_ratio", ()] = hits / (hits + misses)
+
+        lines = []
+        for name, (metric_type, help_text) in METRICS.items():
+            samples = {"counter": counters, "gauge": gauges, "histogram": histograms}[metric_type]
+            keys = sorted(key for key in samples if key[0] == name)
+            if not keys:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for key in keys:
+                labels = key[1]
+                if metric_type == "histogram":
+                    lines.extend(_histogram_lines(name, labels, samples[key]))
+                else:
+                    lines.append(f"{name}{_labels(labels)} {_number(samples[key])}")
+        return "\n".join(lines) + "\n"
+
+    def _path(self, pid: int) -> Path:
+        return self.directory / f"metrics-{pid}.json"
+
+    def _snapshots(self) -> Iterator[tuple[dict, bool]]:
+        """Yield the snapshot of each worker and whether it is running."""
+        yield self.snapshot(), True
+        if self.directory is None:
+            return
+        own = self._path(os.getpid())
+        for path in sorted(self.directory.glob("metrics-*.json")):
+            if path == own:
+                continue
+            try:
+                snapshot = json.loads(path.read_text(encoding="utf-8"))
+                pid = int(path.stem.removeprefix("metrics-"))
+            except (OSError, ValueError):
+                # Removed or replaced while reading
+                continue
+            yield snapshot, _is_running(pid)
+
+
+def _samples(values: dict[_Key, float]) -> list[list]:
+    return [[name, dict(labels), value] for (name, labels), value in values.items()]
+
+
+def _bucket_index(value: float) -> int:
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if value <= bound:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def _histogram_lines(name: str, labels: tuple, values: list[float]) -> Iterator[str]:
+    cumulative = 0.0
+    bounds = [*(_number(bound) for bound in LATENCY_BUCKETS), "+Inf"]
+    for bound, count in zip(bounds, values, strict=False):
+        cumulative += count
+        yield f"{name}_bucket{_labels((*labels, ('le', bound)))} {_number(cumulative)}"
+    yield f"{name}_sum{_labels(labels)} {_number(values[-2])}"
+    yield f"{name}_count{_labels(labels)} {_number(values[-1])}"
+
+
+def _labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _is_running(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill() would terminate the process on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists, but belongs to another user
+        return True
+    return True
@@ -0,0 +1,190 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Bounded worker pool for anonymization tasks.
+
+Parsing and anonymizing a calendar is CPU-bound, so it runs in worker
+threads instead of the event loop. The number of tasks waiting for a worker
+is limited: once the queue is full, new tasks are rejected immediately
+instead of piling up until their clients time out.
+
+The CPU time of each task is reported to the account in
+:data:`CPU_ACCOUNT` when the task was submitted, which the rate limiter
+uses to charge the client of the request.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import partial
+from typing import TypeVar
+
+# Environment variables configuring the pool
+WORKERS_VARIABLE = "ICAN_WORKERS"
+QUEUE_SIZE_VARIABLE = "ICAN_QUEUE_SIZE"
+
+# Default number of tasks waiting for a worker, per worker
+DEFAULT_QUEUE_PER_WORKER = 4
+
+# Seconds between two attempts to submit to a saturated pool
+SATURATED_RETRY_DELAY = 0.05
+
+T = TypeVar("T")
+
+# Receives the CPU-seconds of each task submitted in the current context
+CPU_ACCOUNT: ContextVar[Callable[[float], None] | None] = ContextVar(
+    "ican_cpu_account", default=None
+)
+
+
+class PoolSaturatedError(Exception):
+    """Raised when all workers are busy and the queue is full."""
+
+
+class WorkerPool:
+    """Run functions in worker threads, with a bounded queue.
+
+    A task holds its place in the pool until its thread has finished, even
+    if the caller stopped waiting for it: threads cannot be interrupted.
+
+    Args:
+        workers: Number of worker threads, by default the number of CPUs
+        queue_size: Number of tasks that may wait for a worker, by default
+                    four per worker
+    """
+
+    def __init__(self, workers: int | None = None, queue_size: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = (
+            queue_size if queue_size is not None else self.workers * DEFAULT_QUEUE_PER_WORKER
+        )
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="ican-worker")
+        self._pending = 0
+        # Tasks are released in their worker thread
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "WorkerPool":
+        """Create a pool sized by ``ICAN_WORKERS`` and ``ICAN_QUEUE_SIZE`` if set."""
+        workers = os.environ.get(WORKERS_VARIABLE)
+        queue_size = os.environ.get(QUEUE_SIZE_VARIABLE)
+        return cls(
+            int(workers) if workers else None,
+            int(queue_size) if queue_size else None,
+        )
+
+    @property
+    def busy(self) -> int:
+        """Number of tasks being run by a worker."""
+        return min(self._pending, self.workers)
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a worker."""
+        return max(self._pending - self.workers, 0)
+
+    @property
+    def saturated(self) -> bool:
+        """True if all workers are busy and the queue is full."""
+        return self._pending >= self.workers + self.queue_size
+
+    async def run(self, function: Callable[..., T], *args) -> T:
+        """Run a function in a worker thread and return its result.
+
+        Args:
+            function: The function to run
+            *args: Its arguments
+
+        Returns:
+            The return value of function
+
+        Raises:
+            PoolSaturatedError: If all workers are busy and the queue is full
+        """
+        return await self._submit(function, *args)
+
+    async def map_unordered(
+        self, function: Callable[[object], T], items: Iterable, window: int | None = None
+    ) -> AsyncIterator[tuple[int, T | Exception]]:
+        """Run a function on each item and yield the results as they complete.
+
+        At most window tasks of this call run or wait at once, so that one
+        large batch does not fill the queue. While the pool is saturated by
+        other tasks, items wait instead of being rejected.
+
+        Args:
+            function: The function to run on each item
+            items: The items, consumed as tasks are submitted
+            window: Tasks of this call at once, by default the number of workers
+
+        Yields:
+            Index of the item and the return value of function, or the
+            exception it raised
+        """
+        window = window or self.workers
+        iterator = enumerate(items)
+        running: dict[asyncio.Future, int] = {}
+        waiting = next(iterator, None)
+        try:
+            while waiting is not None or running:
+                while waiting is not None and len(running) < window:
+                    if self.saturated:
+                        if running:
+                            break
+                        await asyncio.sleep(SATURATED_RETRY_DELAY)
+                        continue
+                    index, item = waiting
+                    running[self._submit(function, item)] = index
+                    waiting = next(iterator, None)
+                if not running:
+                    continue
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    error = future.exception()
+                    yield index, error if error is not None else future.result()
+        finally:
+            # The caller stopped early, e.g. because the client disconnected
+            for future in running:
+                future.cancel()
+
+    def _submit(self, function: Callable[..., T], *args) -> "asyncio.Future[T]":
+        if self.saturated:
+            raise PoolSaturatedError(
+                f"All {self.workers} workers are busy and {self.queue_size} tasks are waiting"
+            )
+        account = CPU_ACCOUNT.get()
+        if account is not None:
+            function = partial(_accounted, account, function)
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Cancelling the asyncio future cancels the task only if it has not
+        # started; a running task is released when its thread finishes
+        future.add_done_callback(self._release)
+        return asyncio.wrap_future(future)
+
+    def _release(self, _future: Future | None = None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Wait for running tasks and stop the worker threads."""
+        self._executor.shutdown()
+
+
+def _accounted(account: Callable[[float], None], function: Callable[..., T], *args) -> T:
+    """Run function and report the CPU time of the worker thread."""
+    start = time.thread_time()
+    try:
+        return function(*args)
+    finally:
+        account(time.thread_time() - start)
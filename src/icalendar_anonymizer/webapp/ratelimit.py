@@ -0,0 +1,415 @@
+# SPDX-FileCopyrightText: 2025 icalendar-anonymizer contributors
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""Rate limiting of the web service by client.
+
+Each client has a token bucket for requests, one for bytes uploaded and one
+for CPU-seconds spent anonymizing its calendars, and a number of requests
+and jobs it may have in progress at once. Buckets refill at a constant rate
+up to ``burst`` seconds worth of tokens.
+
+The size of an upload and the CPU time of its anonymization are only known
+once they have been read and spent, so they are charged afterwards and may
+overdraw the bucket. A client with an overdrawn bucket waits until it has
+refilled: one huge upload is admitted, but pays for itself before the next
+request.
+
+The state of the clients is kept by a backend. :class:`MemoryBackend` keeps
+it in this process. :class:`SQLiteBackend` keeps it in a SQLite database,
+which the uvicorn workers of one machine can share. Clients with nothing in
+progress are forgotten once their buckets are full again, which is checked
+for all clients every :data:`SWEEP_INTERVAL` seconds, so that the state
+does not grow with every address ever seen.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol, TypeVar
+
+from .metrics import _is_running
+
+# Environment variables configuring the limits
+RATE_REQUESTS_VARIABLE = "ICAN_RATE_REQUESTS"
+RATE_BYTES_VARIABLE = "ICAN_RATE_BYTES"
+RATE_CPU_VARIABLE = "ICAN_RATE_CPU"
+CLIENT_CONCURRENCY_VARIABLE = "ICAN_CLIENT_CONCURRENCY"
+RATE_LIMIT_DB_VARIABLE = "ICAN_RATE_LIMIT_DB"
+
+# Seconds a client should wait when it has too many requests in progress
+CONCURRENCY_RETRY_AFTER = 1
+
+# Seconds between two sweeps of the clients for idle ones
+SWEEP_INTERVAL = 10.0
+
+# Resources with a token bucket
+REQUESTS = "requests"
+BYTES = "bytes"
+CPU = "cpu"
+
+T = TypeVar("T")
+
+_State = dict | None
+
+
+class RateLimitExceeded(Exception):  # noqa: N818
+    """Raised when a client has to wait before its next request.
+
+    Args:
+        message: Message for the client
+        retry_after: Seconds until the request would be admitted
+        reason: Exhausted resource, ``"requests"``, ``"bytes"``, ``"cpu"``
+                or ``"concurrency"``
+    """
+
+    def __init__(self, message: str, retry_after: float, reason: str):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.reason = reason
+
+    @property
+    def retry_after_header(self) -> str:
+        """Value of the ``Retry-After`` header, in whole seconds."""
+        return str(max(math.ceil(self.retry_after), 1))
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Limits per client. None disables a limit.
+
+    Attributes:
+        requests: Requests per second
+        bytes: Uploaded bytes per second
+        cpu: CPU-seconds of anonymization per second
+        concurrency: Requests and jobs in progress at once
+        burst: Seconds worth of tokens a bucket holds when full
+    """
+
+    requests: float | None = 5.0
+    bytes: float | None = 2 * 1024 * 1024
+    cpu: float | None = 1.0
+    concurrency: int | None = 8
+    burst: float = 60.0
+
+    @classmethod
+    def from_environment(cls) -> "RateLimits":
+        """Read the limits from the environment; ``0`` disables a limit."""
+        default = cls()
+
+        def read(variable: str, value: float | None, kind: type) -> float | None:
+            text = os.environ.get(variable)
+            if not text:
+                return value
+            return kind(text) or None
+
+        return cls(
+            requests=read(RATE_REQUESTS_VARIABLE, default.requests, float),
+            bytes=read(RATE_BYTES_VARIABLE, default.bytes, float),
+            cpu=read(RATE_CPU_VARIABLE, default.cpu, float),
+            concurrency=read(CLIENT_CONCURRENCY_VARIABLE, default.concurrency, int),
+        )
+
+    @property
+    def rates(self) -> dict[str, float]:
+        """Refill rate of each limited bucket."""
+        rates = {REQUESTS: self.requests, BYTES: self.bytes, CPU: self.cpu}
+        return {name: rate for name, rate in rates.items() if rate is not None}
+
+
+class RateLimitBackend(Protocol):
+    """Storage of the state of the clients.
+
+    The state of a client is a JSON serializable dictionary.
+    """
+
+    def update(self, key: str, function: Callable[[_State], tuple[_State, T]]) -> T:
+        """Replace the state of a client atomically.
+
+        Args:
+            key: The client
+            function: Called with the current state, or None for a new
+                      client. Returns the new state, or None to forget the
+                      client, and a result.
+
+        Returns:
+            The result of function
+        """
+
+    def sweep(self, forget: Callable[[dict], bool]) -> int:
+        """Forget the clients whose state forget returns True for.
+
+        Args:
+            forget: Called with the state of each client, which it may change
+
+        Returns:
+            Number of clients forgotten
+        """
+
+
+class MemoryBackend:
+    """Keep the state of the clients in the memory of this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states: dict[str, dict] = {}
+
+    def update(self, key: str, function: Callable[[_State], tuple[_State, T]]) -> T:
+        """Replace the state of a client atomically."""
+        with self._lock:
+            state, result = function(self._states.get(key))
+            if state is None:
+                self._states.pop(key, None)
+            else:
+                self._states[key] = state
+            return result
+
+    def sweep(self, forget: Callable[[dict], bool]) -> int:
+        """Forget the clients whose state forget returns True for."""
+        with self._lock:
+            idle = [key for key, state in self._states.items() if forget(state)]
+            for key in idle:
+                del self._states[key]
+            return len(idle)
+
+
+class SQLiteBackend:
+    """Keep the state of the clients in a SQLite database.
+
+    All processes using the same database file share the limits. The
+    database serializes updates, so it is meant for the workers of one
+    machine, not as a replacement for a network store.
+
+    Args:
+        path: The database file, created if it does not exist
+        timeout: Seconds to wait for another process to finish an update
+    """
+
+    def __init__(self, path: str | Path, timeout: float = 5.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS clients (key TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+
+    def update(self, key: str, function: Callable[[_State], tuple[_State, T]]) -> T:
+        """Replace the state of a client atomically."""
+        connection = self._connection()
+        # Take the write lock before reading, so that updates cannot interleave
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT state FROM clients WHERE key = ?", (key,)).fetchone()
+            state, result = function(json.loads(row[0]) if row is not None else None)
+            if state is None:
+                connection.execute("DELETE FROM clients WHERE key = ?", (key,))
+            else:
+                connection.execute(
+                    "INSERT OR REPLACE INTO clients (key, state) VALUES (?, ?)",
+                    (key, json.dumps(state)),
+                )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return result
+
+    def sweep(self, forget: Callable[[dict], bool]) -> int:
+        """Forget the clients whose state forget returns True for."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            idle = [
+                (key,)
+                for key, state in connection.execute("SELECT key, state FROM clients")
+                if forget(json.loads(state))
+            ]
+            connection.executemany("DELETE FROM clients WHERE key = ?", idle)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return len(idle)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections cannot be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            # The state may be lost in a crash, so updates need not wait for the disk
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = OFF")
+            self._local.connection = connection
+        return connection
+
+
+class RateLimiter:
+    """Admit requests of clients within their limits.
+
+    Args:
+        limits: The limits per client, by default :class:`RateLimits`
+        backend: Storage of the state of the clients, by default in memory
+        clock: Function returning the current time. It has to be the same
+               for all processes sharing a backend.
+    """
+
+    def __init__(
+        self,
+        limits: RateLimits | None = None,
+        backend: RateLimitBackend | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.limits = limits if limits is not None else RateLimits()
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.clock = clock
+        self._rates = self.limits.rates
+        self._next_sweep = clock() + SWEEP_INTERVAL
+
+    @classmethod
+    def from_environment(cls) -> "RateLimiter":
+        """Create a limiter, shared through ``ICAN_RATE_LIMIT_DB`` if it is set."""
+        path = os.environ.get(RATE_LIMIT_DB_VARIABLE)
+        return cls(RateLimits.from_environment(), SQLiteBackend(path) if path else None)
+
+    def admit(self, key: str) -> "Lease":
+        """Admit a request of a client and count it as in progress.
+
+        Args:
+            key: The client
+
+        Returns:
+            Lease that charges the client and ends the request
+
+        Raises:
+            RateLimitExceeded: If the client has to wait
+        """
+        now = self.clock()
+        if now >= self._next_sweep:
+            # Clients that sent a request and left are not released as idle,
+            # as their buckets are not full yet
+            self._next_sweep = now + SWEEP_INTERVAL
+            self.backend.sweep(lambda state: self._forget_idle(self._refill(state)) is None)
+        pid = str(os.getpid())
+
+        def update(state: _State) -> tuple[_State, RateLimitExceeded | None]:
+            state = self._refill(state)
+            tokens = state["tokens"]
+            # A request needs a whole token, overdrawn bytes and CPU need to be repaid
+            waits = {
+                name: ((1 if name == REQUESTS else 0) - tokens[name]) / rate
+                for name, rate in self._rates.items()
+            }
+            reason, wait = max(waits.items(), key=lambda item: item[1], default=(None, 0))
+            if wait > 0:
+                return state, RateLimitExceeded(f"Rate limit of {reason} exceeded", wait, reason)
+            active = state["active"]
+            if self.limits.concurrency is not None:
+                in_progress = sum(active.values())
+                if in_progress >= self.limits.concurrency:
+                    return state, RateLimitExceeded(
+                        f"{in_progress} requests or jobs are in progress",
+                        CONCURRENCY_RETRY_AFTER,
+                        "concurrency",
+                    )
+            if REQUESTS in tokens:
+                tokens[REQUESTS] -= 1
+            active[pid] = active.get(pid, 0) + 1
+            return state, None
+
+        error = self.backend.update(key, update)
+        if error is not None:
+            raise error
+        return Lease(self, key)
+
+    def charge(self, key: str, resource: str, amount: float) -> None:
+        """Take amount from a bucket of a client, which may overdraw it."""
+        if resource not in self._rates:
+            return
+
+        def update(state: _State) -> tuple[_State, None]:
+            state = self._refill(state)
+            state["tokens"][resource] -= amount
+            return state, None
+
+        self.backend.update(key, update)
+
+    def release(self, key: str) -> None:
+        """End a request or job of a client that was admitted."""
+        pid = str(os.getpid())
+
+        def update(state: _State) -> tuple[_State, None]:
+            state = self._refill(state)
+            active = state["active"]
+            if active.get(pid, 0) > 1:
+                active[pid] -= 1
+            else:
+                active.pop(pid, None)
+            return self._forget_idle(state), None
+
+        self.backend.update(key, update)
+
+    def _refill(self, state: _State) -> dict:
+        now = self.clock()
+        if state is None:
+            state = {"tokens": {}, "updated": now, "active": {}}
+        elapsed = max(now - state["updated"], 0)
+        tokens = state["tokens"]
+        for name, rate in self._rates.items():
+            capacity = rate * self.limits.burst
+            tokens[name] = min(tokens.get(name, capacity) + rate * elapsed, capacity)
+        state["updated"] = now
+        # Requests of processes that exited will not be released
+        state["active"] = {
+            pid: count for pid, count in state["active"].items() if _is_running(int(pid))
+        }
+        return state
+
+    def _forget_idle(self, state: dict) -> _State:
+        if state["active"]:
+            return state
+        for name, rate in self._rates.items():
+            if state["tokens"][name] < rate * self.limits.burst:
+                return state
+        # Same as a new client
+        return None
+
+
+class Lease:
+    """A request or job of a client in progress.
+
+    The lease is released once the request is answered. Work that outlives
+    the request, such as a job, retains the lease and releases it when it is
+    finished, so that it keeps counting against the concurrency limit.
+
+    Args:
+        limiter: The limiter that admitted the request
+        key: The client
+    """
+
+    def __init__(self, limiter: RateLimiter, key: str):
+        self.limiter = limiter
+        self.key = key
+        self._references = 1
+
+    def charge(self, resource: str, amount: float) -> None:
+        """Charge the client for resources used by the request."""
+        self.limiter.charge(self.key, resource, amount)
+
+    def charge_cpu(self, seconds: float) -> None:
+        """Charge the client for CPU time, see :data:`~.pool.CPU_ACCOUNT`."""
+        self.charge(CPU, seconds)
+
+    def retain(self) -> None:
+        """Keep the lease beyond the request until release is called once more."""
+        self._references += 1
+
+    def release(self) -> None:
+        """Release the lease, and end it once it is not retained anymore."""
+        self._references -= 1
+        if self._references == 0:
+            self.limiter.release(self.key)